@@ -0,0 +1,101 @@
+"""
+Benchmark del motor ARP AF_PACKET contra scapy.srp en una red local aislada.
+
+Uso (requiere root e iproute2):
+    python -m benchmarks.bench_arp_engine [--hosts 200] [--rounds 5]
+
+Crea un network namespace con un par veth: del lado del namespace se
+asignan `--hosts` direcciones (el kernel responde ARP por todas) y del
+lado propio se barre el /24 con cada implementación. Mide tiempo real,
+tiempo de CPU y dispositivos encontrados por barrido; al final borra el
+namespace (lo que también elimina el par veth).
+"""
+
+import argparse
+import ipaddress
+import subprocess
+import time
+
+import psutil
+
+from core.arp_engine import ArpEngine
+
+NAMESPACE = "arpbench"
+LOCAL_IF = "arpb0"
+PEER_IF = "arpb1"
+NETWORK = ipaddress.ip_network("10.201.0.0/24")
+
+
+def ip(*args, netns: bool = False):
+    """Ejecuta un comando de iproute2 (opcionalmente dentro del namespace)."""
+    prefix = ["ip", "netns", "exec", NAMESPACE, "ip"] if netns else ["ip"]
+    subprocess.run(prefix + list(args), check=True)
+
+
+def setup(hosts: int):
+    """Crea el namespace, el par veth y las direcciones que responden."""
+    local = NETWORK.network_address + 1
+    ip("netns", "add", NAMESPACE)
+    ip("link", "add", LOCAL_IF, "type", "veth", "peer", "name", PEER_IF, "netns", NAMESPACE)
+    ip("addr", "add", f"{local}/{NETWORK.prefixlen}", "dev", LOCAL_IF)
+    ip("link", "set", LOCAL_IF, "up")
+    batch = "".join(
+        f"addr add {NETWORK.network_address + 2 + i}/{NETWORK.prefixlen} dev {PEER_IF}\n" for i in range(hosts)
+    )
+    subprocess.run(["ip", "netns", "exec", NAMESPACE, "ip", "-batch", "-"], input=batch.encode(), check=True)
+    ip("link", "set", PEER_IF, "up", netns=True)
+    time.sleep(0.5)  # Que el enlace termine de levantar
+
+
+def teardown():
+    subprocess.run(["ip", "netns", "del", NAMESPACE], check=False, stderr=subprocess.DEVNULL)
+
+
+def measure(func):
+    """Retorna (segundos reales, segundos de CPU, resultado)."""
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = func()
+    return time.perf_counter() - wall, time.process_time() - cpu, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hosts", type=int, default=200, help="Direcciones que responden en el namespace")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=0.3, help="Espera tras el último pedido")
+    args = parser.parse_args()
+
+    teardown()
+    setup(args.hosts)
+    try:
+        mac = next(a.address for a in psutil.net_if_addrs()[LOCAL_IF] if a.family == psutil.AF_LINK)
+        target = str(NETWORK)
+
+        import_s, _, scapy = measure(lambda: __import__("scapy.all", fromlist=["srp"]))
+        packet = scapy.Ether(dst="ff:ff:ff:ff:ff:ff") / scapy.ARP(pdst=target)
+
+        def raw_sweep():
+            engine = ArpEngine(LOCAL_IF, bytes.fromhex(mac.replace(":", "")), str(NETWORK.network_address + 1))
+            try:
+                return engine.sweep(target, timeout=args.timeout, rate_pps=1_000_000)
+            finally:
+                engine.close()
+
+        def scapy_sweep():
+            return scapy.srp(packet, iface=LOCAL_IF, timeout=args.timeout, verbose=False)[0]
+
+        print(f"import scapy.all: {import_s * 1000:.0f} ms (the raw engine does not need it)")
+        print(f"{'engine':<8} {'wall (ms)':>10} {'cpu (ms)':>10} {'found':>7}")
+        for name, sweep in (("raw", raw_sweep), ("scapy", scapy_sweep)):
+            walls, cpus = [], []
+            for _ in range(args.rounds):
+                wall, cpu, found = measure(sweep)
+                walls.append(wall)
+                cpus.append(cpu)
+            print(f"{name:<8} {min(walls) * 1000:>10.1f} {min(cpus) * 1000:>10.1f} {len(found):>7}")
+    finally:
+        teardown()
+
+
+if __name__ == "__main__":
+    main()
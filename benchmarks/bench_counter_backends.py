@@ -0,0 +1,58 @@
+"""
+Benchmark del costo por muestra de cada backend de contadores.
+
+Uso:
+    python -m benchmarks.bench_counter_backends [--samples 20000]
+
+Mide read_into() de cada backend disponible y NetworkSensor.sample()
+completo (lectura + deltas + conversión), en microsegundos por muestra.
+"""
+
+import argparse
+import time
+import numpy as np
+
+from core.net_counters import BACKENDS
+from core.sensor import NetworkSensor
+
+
+def time_per_call(func, samples: int) -> float:
+    """Retorna microsegundos promedio por llamada."""
+    func()  # Calentamiento
+    start = time.perf_counter_ns()
+    for _ in range(samples):
+        func()
+    return (time.perf_counter_ns() - start) / samples / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'backend':<10} {'read_into (us)':>15} {'sensor.sample (us)':>20} {'interfaces':>11}")
+    for name, backend_cls in BACKENDS.items():
+        try:
+            backend = backend_cls()
+            names = backend.interface_names()
+        except (OSError, AttributeError, ValueError) as e:
+            print(f"{name:<10} unavailable: {e}")
+            continue
+
+        out = np.zeros((len(names), 2), dtype=np.int64)
+        read_us = time_per_call(lambda: backend.read_into(out), args.samples)
+        backend.close()
+
+        sensor = NetworkSensor(backend=name)
+        sample_us = time_per_call(sensor.sample, args.samples)
+        sensor.close()
+
+        print(f"{name:<10} {read_us:>15.2f} {sample_us:>20.2f} {len(names):>11}")
+
+    # Referencia: el camino clásico (psutil.net_io_counters() agregado)
+    classic = NetworkSensor()
+    print(f"{'classic':<10} {'-':>15} {time_per_call(classic.sample, args.samples):>20.2f} {'-':>11}")
+
+
+if __name__ == "__main__":
+    main()
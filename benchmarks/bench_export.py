@@ -0,0 +1,77 @@
+"""
+Benchmark de exportación del historial: un mes de muestras a 1 s.
+
+Uso:
+    python -m benchmarks.bench_export [--days 30] [--chunk-rows 65536]
+
+Genera el historial en una base temporal (insertando directo, sin pasar
+por la cola de HistoryStore) y mide tiempo, filas por segundo y tamaño
+del archivo para cada formato disponible.
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import numpy as np
+
+from core.exporter import ExportFormat, arrow_available, export_history
+from core.history_store import SCHEMA, HistoryStore
+
+START_TS = 1_700_000_000
+
+
+def populate(path: str, days: int, batch: int = 86400):
+    """Llena la tabla samples con `days` días de tráfico sintético a 1 s."""
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    rng = np.random.default_rng(0)
+    total = days * 86400
+    with conn:
+        for offset in range(0, total, batch):
+            n = min(batch, total - offset)
+            ts_ms = (START_TS + offset + np.arange(n)) * 1000
+            down = rng.gamma(2.0, 1.5, n)
+            up = rng.gamma(2.0, 0.3, n)
+            conn.executemany(
+                "INSERT INTO samples VALUES (?, 0, ?, ?, 1.0, ?, ?)",
+                zip(ts_ms.tolist(), down.tolist(), up.tolist(), (down * 1.2).tolist(), (up * 1.2).tolist()),
+            )
+    conn.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--chunk-rows", type=int, default=65536)
+    args = parser.parse_args()
+
+    formats = [ExportFormat.CSV]
+    if arrow_available():
+        formats += [ExportFormat.PARQUET, ExportFormat.ARROW]
+    else:
+        print("pyarrow not installed: only CSV is measured")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "history.db")
+        start = time.perf_counter()
+        total = populate(db_path, args.days)
+        print(f"generated {total:,} rows in {time.perf_counter() - start:.1f} s")
+
+        store = HistoryStore(db_path)
+        print(f"{'format':<10} {'seconds':>9} {'rows/s':>12} {'size (MB)':>10}")
+        for fmt in formats:
+            out = os.path.join(tmp, f"export.{fmt.value}")
+            start = time.perf_counter()
+            rows = export_history(store, out, fmt, start=0, end=START_TS + total, chunk_rows=args.chunk_rows)
+            elapsed = time.perf_counter() - start
+            size_mb = os.path.getsize(out) / 1e6
+            print(f"{fmt.value:<10} {elapsed:>9.2f} {rows / elapsed:>12,.0f} {size_mb:>10.1f}")
+            os.remove(out)
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
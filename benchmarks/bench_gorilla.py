@@ -0,0 +1,82 @@
+"""
+Benchmark de la serie comprimida Gorilla contra una deque de tuplas.
+
+Uso:
+    python -m benchmarks.bench_gorilla [--samples 86400] [--idle 0.5]
+
+Genera tráfico sintético a 1 s (con jitter de reloj y una fracción de
+segundos ociosos en 0) y mide, para cada contenedor, bytes por muestra,
+muestras agregadas por segundo y muestras decodificadas por segundo.
+"""
+
+import argparse
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+from core.gorilla import GorillaSeries
+
+
+def make_traffic(samples: int, idle: float):
+    """Timestamps a ~1 Hz y tasas (download, upload) como las del sensor."""
+    rng = np.random.default_rng(0)
+    ts = 1_700_000_000 + np.cumsum(1.0 + rng.normal(0, 0.002, samples))
+    # Bytes enteros / tiempo real transcurrido / 2^20, como NetworkSensor
+    values = np.floor(rng.gamma(2.0, 800_000, (samples, 2))) / 1.000_3 / 1_048_576
+    values[rng.random(samples) < idle] = 0.0
+    return ts.tolist(), [tuple(v) for v in values.tolist()]
+
+
+def deque_bytes(container: deque) -> int:
+    """Memoria de la deque, sus tuplas y los floats que contienen."""
+    total = sys.getsizeof(container)
+    for item in container:
+        total += sys.getsizeof(item) + sum(sys.getsizeof(v) for v in item)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=86400)
+    parser.add_argument("--idle", type=float, default=0.5, help="Fracción de segundos sin tráfico")
+    args = parser.parse_args()
+
+    ts, values = make_traffic(args.samples, args.idle)
+    n = args.samples
+
+    # deque de (timestamp, download, upload): lo que usaría un historial "plano"
+    start = time.perf_counter()
+    plain = deque()
+    for t, v in zip(ts, values):
+        plain.append((t, v[0], v[1]))
+    append_plain = n / (time.perf_counter() - start)
+    start = time.perf_counter()
+    np.array(plain)
+    decode_plain = n / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    series = GorillaSeries(channels=2)
+    for t, v in zip(ts, values):
+        series.append(t, v)
+    append_gorilla = n / (time.perf_counter() - start)
+    start = time.perf_counter()
+    out_ts, out_values = series.read_range()
+    decode_gorilla = n / (time.perf_counter() - start)
+    assert np.array_equal(out_values, np.array(values))
+
+    # Acceso aleatorio: una hora en el medio (solo decodifica sus bloques)
+    middle = ts[n // 2]
+    start = time.perf_counter()
+    series.read_range(middle, middle + 3600)
+    range_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{'container':<10} {'bytes/sample':>13} {'append (/s)':>13} {'decode (/s)':>13}")
+    print(f"{'deque':<10} {deque_bytes(plain) / n:>13.1f} {append_plain:>13,.0f} {decode_plain:>13,.0f}")
+    print(f"{'gorilla':<10} {series.nbytes / n:>13.1f} {append_gorilla:>13,.0f} {decode_gorilla:>13,.0f}")
+    print(f"1 h range read from gorilla: {range_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
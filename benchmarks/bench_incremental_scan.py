@@ -0,0 +1,100 @@
+"""
+Benchmark de rescans incrementales (LivenessTracker) contra barridos completos.
+
+Uso (requiere root e iproute2):
+    python -m benchmarks.bench_incremental_scan [--hosts 100] [--rounds 96] [--interval 300]
+
+Arma una /22 aislada (network namespace + par veth, como
+bench_arp_engine) con `--hosts` direcciones que responden y repite el
+barrido con el motor AF_PACKET: unas pocas rondas barriendo el rango
+completo (no tiene estado, todas cuestan igual) y `--rounds` en modo
+incremental. El reloj del tracker es simulado y avanza `--interval`
+segundos entre rondas (el período del descubrimiento de fondo), así se
+llega al estado estable sin esperar horas; el promedio "steady" usa la
+segunda mitad de las rondas, cuando el backoff ya llegó a su tope.
+Mide paquetes enviados (contadores de la interfaz) y tiempo real.
+"""
+
+import argparse
+import ipaddress
+import subprocess
+import time
+
+import psutil
+
+from benchmarks.bench_arp_engine import ip, teardown, NAMESPACE, LOCAL_IF, PEER_IF
+from core.liveness import LivenessTracker
+from core.scanner import NetworkScanner
+
+NETWORK = ipaddress.ip_network("10.202.0.0/22")
+
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def setup(hosts: int):
+    """Namespace con la /22 y `hosts` direcciones repartidas en todo el rango."""
+    ip("netns", "add", NAMESPACE)
+    ip("link", "add", LOCAL_IF, "type", "veth", "peer", "name", PEER_IF, "netns", NAMESPACE)
+    ip("addr", "add", f"{NETWORK.network_address + 1}/{NETWORK.prefixlen}", "dev", LOCAL_IF)
+    ip("link", "set", LOCAL_IF, "up")
+    step = (NETWORK.num_addresses - 4) // hosts
+    batch = "".join(
+        f"addr add {NETWORK.network_address + 2 + i * step}/{NETWORK.prefixlen} dev {PEER_IF}\n" for i in range(hosts)
+    )
+    subprocess.run(["ip", "netns", "exec", NAMESPACE, "ip", "-batch", "-"], input=batch.encode(), check=True)
+    ip("link", "set", PEER_IF, "up", netns=True)
+    time.sleep(0.5)
+
+
+def run(scanner: NetworkScanner, rounds: int, interval: float, clock: SimulatedClock | None):
+    """Retorna (paquetes enviados por ronda, segundos por ronda, dispositivos de la última)."""
+    packets, walls, found = [], [], []
+    for _ in range(rounds):
+        before = psutil.net_io_counters(pernic=True)[LOCAL_IF].packets_sent
+        start = time.perf_counter()
+        found = scanner.scan_network(str(NETWORK), interface=LOCAL_IF)
+        walls.append(time.perf_counter() - start)
+        packets.append(psutil.net_io_counters(pernic=True)[LOCAL_IF].packets_sent - before)
+        if clock is not None:
+            clock.now += interval
+    return packets, walls, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hosts", type=int, default=100, help="Direcciones que responden en la /22")
+    parser.add_argument("--rounds", type=int, default=96, help="Rondas incrementales (96 x 300 s = 8 h)")
+    parser.add_argument("--full-rounds", type=int, default=3)
+    parser.add_argument("--interval", type=float, default=300, help="Segundos simulados entre rondas")
+    args = parser.parse_args()
+
+    teardown()
+    setup(args.hosts)
+    try:
+        clock = SimulatedClock()
+        modes = (
+            ("full", NetworkScanner(backend="auto"), args.full_rounds, None),
+            ("incremental", NetworkScanner(backend="auto", liveness=LivenessTracker(clock=clock)), args.rounds, clock),
+        )
+        print(f"{NETWORK} with {args.hosts} hosts, rescans every {args.interval:.0f} s (simulated)")
+        print(f"{'mode':<12} {'first pkts':>10} {'steady pkts':>12} {'steady ms':>10} {'found':>6}")
+        for name, scanner, rounds, mode_clock in modes:
+            # El fabricante se consulta por HTTP: fuera del benchmark
+            scanner.vendor_service.get_vendor = lambda mac: "Unknown"
+            packets, walls, found = run(scanner, rounds, args.interval, mode_clock)
+            steady = slice(max(rounds // 2, 1), None)
+            steady_pkts = sum(packets[steady]) / len(packets[steady])
+            steady_ms = sum(walls[steady]) / len(walls[steady]) * 1000
+            print(f"{name:<12} {packets[0]:>10} {steady_pkts:>12.0f} {steady_ms:>10.0f} {len(found):>6}")
+    finally:
+        teardown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Detector adaptativo de anomalías de tráfico.
+
+Aprende una línea base por hora de la semana (168 franjas) con media y
+varianza exponenciales (EWMA) sobre log1p(MB/s) y marca las muestras que
+se alejan hacia arriba más de `z_threshold` desviaciones. Cada muestra
+toca una sola franja: O(1) por muestra y memoria constante. El estado
+aprendido se guarda en JSON para sobrevivir reinicios.
+
+Una franja recibe 3600 muestras por semana, así que el peso por muestra
+es del orden de 1/(3600 · semanas): la memoria abarca semanas y no los
+últimos segundos, y una anomalía sostenida de varios minutos apenas
+mueve la línea base.
+"""
+
+import json
+import math
+import os
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+# Franjas estacionales: hora de la semana (lunes 00h = 0)
+SLOTS = 7 * 24
+CHANNELS = 2  # download, upload
+STATE_VERSION = 1
+
+# Memoria de la línea base: ~4 semanas por franja (muestras de 1 s) y
+# ~1 semana para la global
+MEMORY_WEEKS = 4
+SLOT_ALPHA = 1.0 / (3600 * MEMORY_WEEKS)
+GLOBAL_ALPHA = 1.0 / (SLOTS * 3600)
+# Muestras antes de confiar: una hora completa de la franja, 10 min la global
+MIN_SLOT_SAMPLES = 3600
+MIN_GLOBAL_SAMPLES = 600
+
+
+class AnomalyScore(NamedTuple):
+    """Resultado de evaluar una muestra contra la línea base."""
+    anomalous: bool
+    z_download: float
+    z_upload: float
+    upper_download: float  # MB/s a partir del cual la muestra sería anómala
+    upper_upload: float
+
+
+class AnomalyDetector:
+    """
+    Línea base estacional EWMA con respaldo global.
+
+    Mientras una franja no tiene suficientes muestras se usa la línea base
+    global (todas las horas), y mientras esa tampoco, no se marca nada.
+    Las muestras anómalas se incorporan recortadas al límite superior, así
+    una ráfaga larga no infla la línea base de golpe.
+    """
+
+    def __init__(self, alpha: float = SLOT_ALPHA, z_threshold: float = 4.0, min_samples: int = MIN_SLOT_SAMPLES,
+                 min_std: float = 0.1, state_path: str | None = None, save_interval: float = 300.0,
+                 global_alpha: float = GLOBAL_ALPHA, min_global_samples: int = MIN_GLOBAL_SAMPLES):
+        """
+        Args:
+            alpha: Peso de cada muestra nueva en la EWMA de su franja
+            z_threshold: Desviaciones (en escala log1p) para marcar anomalía
+            min_samples: Muestras de una franja antes de confiar en ella
+            min_std: Desviación mínima (evita alertas en enlaces casi ociosos)
+            state_path: Archivo JSON de estado; None = sin persistencia
+            save_interval: Segundos entre guardados automáticos
+            global_alpha: Peso de cada muestra en la EWMA global
+            min_global_samples: Muestras antes de confiar en la línea base global
+        """
+        self.alpha = alpha
+        self.global_alpha = global_alpha
+        self.z_threshold = z_threshold
+        self.min_samples = min_samples
+        self.min_global_samples = min_global_samples
+        self.min_std = min_std
+        self.state_path = state_path
+        self.save_interval = save_interval
+        self._last_save = time.monotonic()
+
+        self.mean = np.zeros((SLOTS, CHANNELS), dtype=np.float64)
+        self.var = np.zeros((SLOTS, CHANNELS), dtype=np.float64)
+        self.count = np.zeros(SLOTS, dtype=np.int64)
+        self.global_mean = np.zeros(CHANNELS, dtype=np.float64)
+        self.global_var = np.zeros(CHANNELS, dtype=np.float64)
+        self.global_count = 0
+
+        if state_path is not None and os.path.exists(state_path):
+            self.load(state_path)
+
+    @staticmethod
+    def slot_for(timestamp: float) -> int:
+        """Franja (hora de la semana, hora local) de un timestamp."""
+        t = time.localtime(timestamp)
+        return t.tm_wday * 24 + t.tm_hour
+
+    def update(self, timestamp: float, download_mb: float, upload_mb: float) -> AnomalyScore:
+        """
+        Evalúa una muestra contra la línea base y luego la aprende.
+
+        Args:
+            timestamp: Segundos epoch de la muestra
+            download_mb: Tasa de descarga en MB/s
+            upload_mb: Tasa de subida en MB/s
+
+        Returns:
+            AnomalyScore con el veredicto y los límites usados
+        """
+        slot = self.slot_for(timestamp)
+        values = (math.log1p(max(download_mb, 0.0)), math.log1p(max(upload_mb, 0.0)))
+
+        if self.count[slot] >= self.min_samples:
+            mean, var = self.mean[slot], self.var[slot]
+        elif self.global_count >= self.min_global_samples:
+            mean, var = self.global_mean, self.global_var
+        else:
+            mean = var = None
+
+        if mean is None:
+            score = AnomalyScore(False, 0.0, 0.0, math.inf, math.inf)
+            learned = values
+        else:
+            z = []
+            upper = []
+            learned = []
+            for ch in range(CHANNELS):
+                m = float(mean[ch])
+                std = max(math.sqrt(var[ch]), self.min_std)
+                limit = m + self.z_threshold * std
+                z.append((values[ch] - m) / std)
+                upper.append(math.expm1(limit))
+                learned.append(min(values[ch], limit))  # Recorte de anomalías
+            score = AnomalyScore(max(z) > self.z_threshold, z[0], z[1], upper[0], upper[1])
+
+        self._learn(slot, learned)
+        if self.state_path is not None and time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+        return score
+
+    def _learn(self, slot: int, values):
+        """Actualiza la EWMA de la franja y la global (varianza EWMA incremental)."""
+        self.count[slot] += 1
+        self.global_count += 1
+        # Arranque en frío: promedio simple hasta que 1/n < alpha
+        for mean, var, n, base_alpha in ((self.mean[slot], self.var[slot], self.count[slot], self.alpha),
+                                         (self.global_mean, self.global_var, self.global_count, self.global_alpha)):
+            alpha = max(base_alpha, 1.0 / n)
+            for ch in range(CHANNELS):
+                diff = values[ch] - mean[ch]
+                increment = alpha * diff
+                mean[ch] += increment
+                var[ch] = (1 - alpha) * (var[ch] + diff * increment)
+
+    def expected(self, timestamp: float) -> tuple:
+        """
+        Tasas esperadas (MB/s) para la franja de un timestamp.
+
+        Returns:
+            Tupla (download, upload), o (0, 0) si aún no hay línea base
+        """
+        slot = self.slot_for(timestamp)
+        if self.count[slot] >= self.min_samples:
+            mean = self.mean[slot]
+        elif self.global_count >= self.min_global_samples:
+            mean = self.global_mean
+        else:
+            return 0.0, 0.0
+        return math.expm1(float(mean[0])), math.expm1(float(mean[1]))
+
+    def to_dict(self) -> dict:
+        """Estado aprendido serializable a JSON."""
+        return {
+            "version": STATE_VERSION,
+            "alpha": self.alpha,
+            "global_alpha": self.global_alpha,
+            "mean": self.mean.tolist(),
+            "var": self.var.tolist(),
+            "count": self.count.tolist(),
+            "global_mean": self.global_mean.tolist(),
+            "global_var": self.global_var.tolist(),
+            "global_count": self.global_count,
+        }
+
+    def save(self, path: str | None = None):
+        """Guarda el estado de forma atómica (archivo temporal + rename)."""
+        path = path or self.state_path
+        if path is None:
+            return
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error saving anomaly baseline: {e}")
+        self._last_save = time.monotonic()
+
+    def load(self, path: str):
+        """Carga un estado guardado; si es inválido, arranca de cero."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("version") != STATE_VERSION:
+                return
+            mean = np.array(state["mean"], dtype=np.float64)
+            var = np.array(state["var"], dtype=np.float64)
+            count = np.array(state["count"], dtype=np.int64)
+            if mean.shape != (SLOTS, CHANNELS) or var.shape != mean.shape or count.shape != (SLOTS,):
+                return
+            self.mean, self.var, self.count = mean, var, count
+            self.global_mean = np.array(state["global_mean"], dtype=np.float64)
+            self.global_var = np.array(state["global_var"], dtype=np.float64)
+            self.global_count = int(state["global_count"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Error loading anomaly baseline: {e}")
@@ -0,0 +1,261 @@
+"""
+Motor de barrido ARP nativo de Linux sobre sockets AF_PACKET.
+
+Evita el costo por paquete de scapy (construir y disecar objetos Packet)
+y el import de scapy.all:
+- Envío: una trama Ethernet+ARP precalculada con struct; por cada destino
+  solo se reescribe la IP objetivo (pack_into sobre el mismo bytearray).
+- Recepción: un filtro BPF clásico en el kernel deja pasar únicamente
+  respuestas ARP (opcode 2), así el proceso no despierta por otro tráfico.
+- Parseo: recv_into sobre un buffer fijo y unpack_from por offset, sin
+  copiar la trama ni crear objetos intermedios.
+
+Un solo socket envía y recibe: entre ráfagas de envío se drenan las
+respuestas ya llegadas, sin hilos extra. Requiere CAP_NET_RAW (root).
+"""
+
+import ctypes
+import ipaddress
+import select
+import socket
+import struct
+import time
+
+import psutil
+
+ETH_P_ARP = 0x0806
+ETH_P_IP = 0x0800
+ARP_REQUEST = 1
+ARP_REPLY = 2
+SO_ATTACH_FILTER = 26  # linux/asm-generic/socket.h
+
+# Trama ARP request: Ethernet (14) + ARP (28), rellenada al mínimo de 60
+ETHER_ARP = struct.Struct("!6s6sH HHBBH 6s4s6s4s")
+FRAME_LEN = 60
+TARGET_IP_OFFSET = 38  # tpa dentro de la trama
+# Respuesta: opcode y (sha, spa) por offset
+REPLY_OPCODE = struct.Struct("!H")
+REPLY_OPCODE_OFFSET = 20
+REPLY_SENDER = struct.Struct("!6sI")
+REPLY_SENDER_OFFSET = 22
+TARGET_IP = struct.Struct("!I")
+
+# Filtro BPF equivalente a "arp and arp[6:2] = 2"; (code, jt, jf, k)
+BPF_INSN = struct.Struct("HBBI")
+ARP_REPLY_BPF = (
+    (0x28, 0, 0, 12),          # ldh [12]          (ethertype)
+    (0x15, 0, 3, ETH_P_ARP),   # jeq #0x806        sino -> descartar
+    (0x28, 0, 0, 20),          # ldh [20]          (opcode ARP)
+    (0x15, 0, 1, ARP_REPLY),   # jeq #2            sino -> descartar
+    (0x06, 0, 0, 64),          # ret #64           (alcanza para la trama ARP)
+    (0x06, 0, 0, 0),           # ret #0
+)
+
+DEFAULT_RATE_PPS = 1000
+SEND_BURST = 32
+
+
+def raw_available() -> bool:
+    """True si la plataforma tiene sockets AF_PACKET (Linux)."""
+    return hasattr(socket, "AF_PACKET")
+
+
+def attach_filter(sock: socket.socket, program=ARP_REPLY_BPF):
+    """Adjunta un programa BPF clásico al socket (SO_ATTACH_FILTER)."""
+    code = ctypes.create_string_buffer(b"".join(BPF_INSN.pack(*insn) for insn in program))
+    # struct sock_fprog { unsigned short len; struct sock_filter *filter; }
+    fprog = struct.pack("HP", len(program), ctypes.addressof(code))
+    sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER, fprog)
+
+
+def build_request(src_mac: bytes, src_ip: str) -> bytearray:
+    """Trama ARP request broadcast con la IP objetivo en cero."""
+    frame = bytearray(FRAME_LEN)
+    ETHER_ARP.pack_into(
+        frame, 0,
+        b"\xff" * 6, src_mac, ETH_P_ARP,
+        1, ETH_P_IP, 6, 4, ARP_REQUEST,
+        src_mac, socket.inet_aton(src_ip), b"\x00" * 6, b"\x00" * 4,
+    )
+    return frame
+
+
+def parse_reply(view, size: int):
+    """
+    Extrae (ip, mac) de una respuesta ARP sin copiar la trama.
+
+    Returns:
+        Tupla (ip como int, mac como bytes) o None si no es una respuesta
+    """
+    if size < REPLY_SENDER_OFFSET + REPLY_SENDER.size:
+        return None
+    if REPLY_OPCODE.unpack_from(view, REPLY_OPCODE_OFFSET)[0] != ARP_REPLY:
+        return None
+    mac, ip = REPLY_SENDER.unpack_from(view, REPLY_SENDER_OFFSET)
+    return ip, mac
+
+
+def format_mac(mac: bytes) -> str:
+    """MAC en el formato de scapy (aa:bb:cc:dd:ee:ff)."""
+    return mac.hex(":")
+
+
+def find_interface(network: ipaddress.IPv4Network, interface: str | None = None):
+    """
+    Busca la interfaz con una dirección IPv4 dentro de `network`.
+
+    Args:
+        network: Red a barrer
+        interface: Restringe la búsqueda a esa interfaz (None = cualquiera)
+
+    Returns:
+        Tupla (nombre, mac bytes, ip str)
+
+    Raises:
+        OSError: Si ninguna interfaz está en esa red
+    """
+    for name, addrs in psutil.net_if_addrs().items():
+        if interface is not None and name != interface:
+            continue
+        mac = next((a.address for a in addrs if a.family == psutil.AF_LINK), None)
+        for addr in addrs:
+            if addr.family != socket.AF_INET or not mac or not addr.netmask:
+                continue
+            local = ipaddress.ip_interface(f"{addr.address}/{addr.netmask}")
+            if local.network.overlaps(network):
+                return name, bytes.fromhex(mac.replace(":", "").replace("-", "")), addr.address
+    raise OSError(f"No interface found on {network}")
+
+
+class ArpEngine:
+    """Barrido ARP sobre un socket AF_PACKET atado a una interfaz."""
+
+    def __init__(self, interface: str, src_mac: bytes, src_ip: str, buffer_size: int = 2048):
+        """
+        Args:
+            interface: Interfaz por la que se envía (ej: eth0)
+            src_mac: MAC propia (6 bytes)
+            src_ip: IPv4 propia (sender de los pedidos)
+            buffer_size: Tamaño del buffer de recepción
+
+        Raises:
+            OSError: Sin AF_PACKET o sin permisos (CAP_NET_RAW)
+        """
+        if not raw_available():
+            raise OSError("AF_PACKET sockets are not available on this platform")
+        self.interface = interface
+        self.sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ARP))
+        try:
+            attach_filter(self.sock)
+            self.sock.bind((interface, ETH_P_ARP))
+            self.sock.setblocking(False)
+        except OSError:
+            self.sock.close()
+            raise
+        self._frame = build_request(src_mac, src_ip)
+        self._buf = bytearray(buffer_size)
+        self._view = memoryview(self._buf)
+        self._poll = select.poll()
+        self._poll.register(self.sock, select.POLLIN)
+        # Tramas encoladas antes de adjuntar el filtro
+        self._drain(None, None, None)
+
+    @classmethod
+    def for_network(cls, target: str):
+        """Crea el motor sobre la interfaz local que está en la red `target`."""
+        network = ipaddress.ip_network(target, strict=False)
+        return cls(*find_interface(network))
+
+    def _drain(self, bounds, seen, on_reply):
+        """Lee todas las respuestas pendientes sin bloquear (bounds None = descartar)."""
+        recv_into = self.sock.recv_into
+        while True:
+            try:
+                size = recv_into(self._buf)
+            except BlockingIOError:
+                return
+            if bounds is None:
+                continue
+            reply = parse_reply(self._view, size)
+            if reply is None:
+                continue
+            ip, mac = reply
+            if ip in seen or not bounds[0] <= ip <= bounds[1]:
+                continue
+            seen[ip] = mac
+            if on_reply is not None:
+                on_reply(socket.inet_ntoa(TARGET_IP.pack(ip)), format_mac(mac))
+
+    def _wait_until(self, deadline, bounds, seen, on_reply, stop=None, done=None):
+        """
+        Procesa respuestas hasta `deadline` (monotonic), despertando solo al llegar alguna.
+
+        `done` (opcional) corta la espera antes, p. ej. si ya respondieron todos.
+        """
+        while True:
+            self._drain(bounds, seen, on_reply)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (stop is not None and stop.is_set()) or (done is not None and done()):
+                return
+            # Tope de 100 ms para notar `stop` aunque no llegue nada
+            self._poll.poll(min(remaining, 0.1) * 1000)
+
+    def sweep(self, target: str, timeout: float = 1.0, rate_pps: int = DEFAULT_RATE_PPS,
+              on_reply=None, stop=None, skip=None) -> list:
+        """
+        Envía un pedido ARP a cada host de `target` y junta las respuestas.
+
+        Args:
+            target: Rango CIDR (ej: 192.168.1.1/24)
+            timeout: Segundos de espera tras el último pedido
+            rate_pps: Pedidos por segundo (en ráfagas de SEND_BURST)
+            on_reply: Callback (ip, mac) por cada dispositivo nuevo
+            stop: threading.Event opcional para cortar el barrido
+            skip: IPs (str) que no se consultan, p. ej. ya confirmadas por
+                la tabla de vecinos
+
+        Returns:
+            Lista de tuplas (ip, mac) en orden de llegada
+        """
+        network = ipaddress.ip_network(target, strict=False)
+        self._drain(None, None, None)  # Respuestas viejas de otro barrido
+        first, last = int(network.network_address), int(network.broadcast_address)
+        hosts = range(first + 1, last) if network.num_addresses > 2 else range(first, last + 1)
+        skipped = set()
+        if skip:
+            skipped = {int(ipaddress.ip_address(ip)) for ip in skip}
+            hosts = [ip for ip in hosts if ip not in skipped]
+        bounds = (first, last)
+        seen = {}
+        frame = self._frame
+        send = self.sock.send
+        pack_into = TARGET_IP.pack_into
+        interval = SEND_BURST / rate_pps
+
+        next_burst = time.monotonic()
+        for i, ip in enumerate(hosts):
+            if stop is not None and stop.is_set():
+                break
+            pack_into(frame, TARGET_IP_OFFSET, ip)
+            try:
+                send(frame)
+            except BlockingIOError:
+                # Cola de la interfaz llena: esperar a que se libere
+                select.select([], [self.sock], [], interval)
+                send(frame)
+            if (i + 1) % SEND_BURST == 0:
+                # Entre ráfagas se atienden las respuestas hasta el próximo deadline
+                next_burst += interval
+                self._wait_until(next_burst, bounds, seen, on_reply)
+
+        def all_answered():
+            # Si respondieron todos los consultados no hay nada más que esperar
+            # (típico de un rescan incremental que solo reconfirma hosts vivos)
+            return len(seen) >= len(hosts) and len(seen.keys() - skipped) >= len(hosts)
+
+        self._wait_until(time.monotonic() + timeout, bounds, seen, on_reply, stop, all_answered)
+        return [(socket.inet_ntoa(TARGET_IP.pack(ip)), format_mac(mac)) for ip, mac in seen.items()]
+
+    def close(self):
+        """Cierra el socket."""
+        self.sock.close()
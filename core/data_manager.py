@@ -1,18 +1,68 @@
 import math
+import time
+import numpy as np
 import flet_charts as fch
 from collections import deque
 
+from core.anomaly_detector import AnomalyDetector
+from core.downsampling import lttb_aligned
+from core.quantiles import TrafficQuantiles
+from core.timeseries import TieredTimeSeries
+from core.window_stats import WindowStats
+
+# Ventanas del gráfico ofrecidas en la UI (etiqueta -> segundos)
+CHART_WINDOWS = {
+    "1 min": 60,
+    "15 min": 900,
+    "1 h": 3600,
+}
+
+# Máximo de puntos por serie que se envían al LineChart
+CHART_PIXEL_BUDGET = 300
+
+# Modos de alerta de tráfico alto
+ALERT_MODE_THRESHOLD = "threshold"  # Umbral fijo en MB/s
+ALERT_MODE_ADAPTIVE = "adaptive"  # Desvío de la línea base aprendida
+ALERT_MODES = (ALERT_MODE_THRESHOLD, ALERT_MODE_ADAPTIVE)
+
+
 class DataManager:
-    def __init__(self):
-        # 1. POOL DE OBJETOS GRÁFICOS (UI)
-        # Creamos los 60 puntos UNA sola vez al inicio.
-        self.download_points = [fch.LineChartDataPoint(i, 0) for i in range(60)]
-        self.upload_points = [fch.LineChartDataPoint(i, 0) for i in range(60)]
+    def __init__(self, history_store=None, chart_window=60, max_chart_window=3600,
+                 pixel_budget=CHART_PIXEL_BUDGET, anomaly_detector=None, quota_tracker=None,
+                 traffic_cube=None):
+        """
+        Args:
+            history_store: HistoryStore opcional; si se pasa, las muestras se
+                persisten y las estadísticas se recuperan al iniciar
+            chart_window: Cantidad de muestras visibles en el gráfico
+            max_chart_window: Ventana más larga que se puede elegir
+            pixel_budget: Máximo de puntos por serie; las ventanas más largas
+                se reducen con LTTB
+            anomaly_detector: AnomalyDetector a usar (por defecto uno en
+                memoria, sin persistencia)
+            quota_tracker: QuotaTracker opcional para enlaces medidos
+            traffic_cube: TrafficCube opcional (mapa de calor por hora de la semana)
+        """
+        # 1. PUNTOS GRÁFICOS (UI)
+        # Mientras la ventana entra en el presupuesto de puntos, el gráfico
+        # avanza por "append-and-drop": cada tick agrega un punto nuevo al
+        # final (x creciente) y quita el más viejo, sin tocar los demás.
+        # Las ventanas más largas se reducen con LTTB sobre buckets alineados
+        # al x absoluto, así cada tick solo recalcula la cola y el gráfico
+        # no pasa de `pixel_budget` puntos.
+        self.pixel_budget = pixel_budget
+        self.max_chart_window = max(max_chart_window, chart_window)
+        self.chart_window = chart_window
+        self.chart_x = chart_window  # x del próximo punto
+        self.download_points = [fch.LineChartDataPoint(i, 0) for i in range(chart_window)]
+        self.upload_points = [fch.LineChartDataPoint(i, 0) for i in range(chart_window)]
 
         # 2. BUFFER DE DATOS CRUDOS (Memoria optimizada)
         # Usamos deque para que los datos viejos se borren solos.
-        self.download_values = deque([0]*60, maxlen=60)
-        self.upload_values = deque([0]*60, maxlen=60)
+        self.download_values = deque([0]*chart_window, maxlen=chart_window)
+        self.upload_values = deque([0]*chart_window, maxlen=chart_window)
+        # Serie cruda de la ventana más larga: buffer circular indexado por x
+        self.chart_values = np.zeros((self.max_chart_window, 2), dtype=np.float64)
         
         # 3. ESTADÍSTICAS DE TRÁFICO
         self.peak_download = 0.0
@@ -20,38 +70,401 @@ class DataManager:
         self.total_download = 0.0
         self.total_upload = 0.0
         self.sample_count = 0
+        self.elapsed_total = 0.0  # Segundos reales cubiertos por las muestras
         
         # 4. CONFIGURACIÓN DE ALERTAS DE TRÁFICO ALTO
         self.traffic_threshold_mb = 10.0  # Umbral por defecto: 10 MB/s
         self.high_traffic_alerts_enabled = False  # Deshabilitado por defecto
+        self.alert_mode = ALERT_MODE_THRESHOLD
+        # Línea base por hora de la semana para el modo adaptativo
+        self.anomaly_detector = anomaly_detector or AnomalyDetector()
+        self.last_anomaly = None  # AnomalyScore de la última muestra
+        # Intervalos [inicio, fin] (hora de pared) de tráfico generado por la
+        # propia app (speedtest de fondo): no se aprende en la línea base.
+        # La cuota sí lo cuenta (el proveedor lo factura igual). Se agregan
+        # desde otro hilo (deque es thread-safe)
+        self.self_traffic_spans = deque()
+
+        # 5. HISTORIAL POR INTERFAZ (NIC)
+        # Todas las interfaces comparten una matriz (n_nics, ventana máx, 2)
+        # escrita como buffer circular: una sola asignación vectorizada por tick.
+        self.nic_names = []
+        self.nic_values = np.zeros((0, self.max_chart_window, 2), dtype=np.float64)
+        self.nic_x = np.zeros(self.max_chart_window, dtype=np.int64)  # x de cada columna
+        self.nic_cursor = 0
+        self.nic_count = 0  # Columnas escritas (hasta max_chart_window)
+        self._nic_rows = {}
+        # Solo las interfaces elegidas tienen puntos gráficos propios. Se
+        # recuerda lo pedido: una interfaz que aún no llegó (o que se fue y
+        # vuelve) se grafica en cuanto aparece
+        self.requested_nics = []
+        self.selected_nics = []
+        self.nic_points = {}
+
+        # 6. HISTORIAL MULTI-RESOLUCIÓN (1 s, 10 s, 1 min, 1 h, 1 día)
+        # Memoria fija: cada nivel es un buffer circular con min/max/suma.
+        self.history = TieredTimeSeries()
+
+        # 7. PERCENTILES EN STREAMING (toda la vida y ventanas de 5 min / 1 h)
+        self.quantiles = TrafficQuantiles()
+
+        # Promedio/desvío/pico/mínimo de las ventanas de 1 min, 5 min y 1 h
+        self.window_stats = WindowStats()
+
+        # 8. CUOTA DEL CICLO DE FACTURACIÓN (opcional, enlaces medidos)
+        self.quota_tracker = quota_tracker
+        self.last_quota = None  # QuotaStatus de la última muestra
 
-    def update_traffic(self, download_mb, upload_mb):
+        # 9. CUBO DÍA × HORA PARA EL MAPA DE CALOR (opcional)
+        self.traffic_cube = traffic_cube
+
+        # 10. PERSISTENCIA EN DISCO (opcional)
+        self.history_store = history_store
+        if history_store is not None:
+            self._restore_from_store()
+
+    def update_traffic(self, download_mb, upload_mb, elapsed_s=1.0, peak_download=None, peak_upload=None,
+                       timestamp=None):
         """
-        Actualiza los datos usando reciclaje de objetos (Cero impacto en RAM).
+        Registra una muestra: un punto nuevo por serie (sin recalcular los demás) y estadísticas.
+
+        Args:
+            download_mb: Tasa promedio de descarga en MB/s
+            upload_mb: Tasa promedio de subida en MB/s
+            elapsed_s: Segundos reales que cubre la muestra
+            peak_download: Ráfaga máxima sub-segundo (opcional, por defecto la tasa)
+            peak_upload: Ráfaga máxima sub-segundo (opcional, por defecto la tasa)
+            timestamp: Segundos epoch de la muestra (opcional, por defecto ahora)
         """
         # A) Guardamos el dato numérico crudo
         self.download_values.append(download_mb)
         self.upload_values.append(upload_mb)
 
-        # B) Actualizamos los objetos gráficos existentes
-        for i in range(60):
-            self.download_points[i].y = self.download_values[i]
-            self.upload_points[i].y = self.upload_values[i]
+        # B) Serie cruda y puntos gráficos
+        self.chart_values[self.chart_x % self.max_chart_window] = (download_mb, upload_mb)
+        if self.chart_window <= self.pixel_budget:
+            # Agregamos un punto nuevo y descartamos el más viejo (sin tocar el resto de los puntos)
+            self._append_point(self.download_points, download_mb)
+            self._append_point(self.upload_points, upload_mb)
+            self.chart_x += 1
+        else:
+            # Solo cambian el último bucket completo y el incompleto
+            self.chart_x += 1
+            start = self._tail_start()
+            x = np.arange(start, self.chart_x)
+            values = self.chart_values[x % self.max_chart_window]
+            self._write_points(self.download_points, x, values[:, 0], start)
+            self._write_points(self.upload_points, x, values[:, 1], start)
+        # Las interfaces que no reciban muestra en este x igual salen de la ventana
+        for down_points, up_points in self.nic_points.values():
+            self._drop_old_points(down_points, self.chart_x - 1 - self.chart_window)
+            self._drop_old_points(up_points, self.chart_x - 1 - self.chart_window)
         
         # C) Actualizar estadísticas
-        # Actualizar picos
-        if download_mb > self.peak_download:
-            self.peak_download = download_mb
-        if upload_mb > self.peak_upload:
-            self.peak_upload = upload_mb
+        # Actualizar picos (las ráfagas sub-segundo cuentan si vienen informadas)
+        peak_download = download_mb if peak_download is None else max(peak_download, download_mb)
+        peak_upload = upload_mb if peak_upload is None else max(peak_upload, upload_mb)
+        if peak_download > self.peak_download:
+            self.peak_download = peak_download
+        if peak_upload > self.peak_upload:
+            self.peak_upload = peak_upload
         
-        # Acumular totales
-        self.total_download += download_mb
-        self.total_upload += upload_mb
+        # Acumular totales (tasa x tiempo real transcurrido)
+        self.total_download += download_mb * elapsed_s
+        self.total_upload += upload_mb * elapsed_s
+        self.elapsed_total += elapsed_s
         
         # Incrementar contador de muestras
         self.sample_count += 1
 
+        # D) Rollup incremental en todos los niveles del historial
+        timestamp = time.time() if timestamp is None else timestamp
+        self.history.add(timestamp, download_mb, upload_mb)
+        self.quantiles.add(timestamp, download_mb, upload_mb)
+        self.window_stats.add(timestamp, download_mb, upload_mb, elapsed_s, peak_download, peak_upload)
+        if self._is_self_traffic(timestamp):
+            # Ni se aprende en la línea base ni se evalúa contra ella
+            self.last_anomaly = None
+        else:
+            self.last_anomaly = self.anomaly_detector.update(timestamp, download_mb, upload_mb)
+        if self.quota_tracker is not None:
+            self.last_quota = self.quota_tracker.add(timestamp, download_mb, upload_mb, elapsed_s)
+        if self.traffic_cube is not None:
+            self.traffic_cube.add(timestamp, download_mb, upload_mb, elapsed_s, peak_download, peak_upload)
+
+        # E) Encolar para disco (el hilo escritor hace el volcado)
+        if self.history_store is not None:
+            self.history_store.append(timestamp, download_mb, upload_mb, elapsed_s, peak_download, peak_upload)
+
+    def begin_self_traffic(self, start=None) -> list:
+        """
+        Marca el comienzo de tráfico generado por la propia app.
+
+        Args:
+            start: Segundos epoch (por defecto ahora)
+
+        Returns:
+            El intervalo abierto, para cerrarlo con end_self_traffic()
+        """
+        span = [time.time() if start is None else start, math.inf]
+        self.self_traffic_spans.append(span)
+        return span
+
+    def end_self_traffic(self, span, end=None):
+        """Cierra un intervalo abierto con begin_self_traffic()."""
+        span[1] = time.time() if end is None else end
+
+    def _is_self_traffic(self, timestamp) -> bool:
+        """True si la muestra cae en algún intervalo de tráfico propio."""
+        # Las muestras llegan en orden: los intervalos ya cerrados y pasados se descartan
+        while self.self_traffic_spans and self.self_traffic_spans[0][1] < timestamp:
+            self.self_traffic_spans.popleft()
+        return any(start <= timestamp <= end for start, end in self.self_traffic_spans)
+
+    def _restore_from_store(self):
+        """Recupera estadísticas y la última hora de historial desde disco."""
+        stats = self.history_store.load_stats()
+        self.peak_download = stats["peak_download"]
+        self.peak_upload = stats["peak_upload"]
+        self.total_download = stats["total_download"]
+        self.total_upload = stats["total_upload"]
+        self.elapsed_total = stats["elapsed_total"]
+        self.sample_count = stats["sample_count"]
+
+        now = time.time()
+        for ts, down, up, elapsed, peak_down, peak_up in self.history_store.read_range(now - 3600, now).tolist():
+            self.history.add(ts, down, up)
+            self.quantiles.add(ts, down, up)
+            self.window_stats.add(ts, down, up, elapsed, peak_down, peak_up)
+            self.download_values.append(down)
+            self.upload_values.append(up)
+            self.chart_values[self.chart_x % self.max_chart_window] = (down, up)
+            self.chart_x += 1
+        self.set_chart_window(self.chart_window)
+
+    def _append_point(self, points, y, x=None):
+        """
+        Agrega un punto al final de la serie y quita los que salen de la
+        ventana. La ventana se mide en x, no en cantidad de puntos: si ya
+        hay un punto en ese x se actualiza en lugar de duplicarlo.
+        """
+        x = self.chart_x if x is None else x
+        if points and points[-1].x == x:
+            points[-1].y = y
+            return
+        self._drop_old_points(points, x - self.chart_window)
+        points.append(fch.LineChartDataPoint(x, y))
+
+    @staticmethod
+    def _drop_old_points(points, min_x):
+        """
+        Quita del principio los puntos con x <= min_x.
+
+        Es O(n) por llamada (un solo corrimiento de la lista, no uno por
+        punto): la lista es la que lee el LineChart, así que no puede ser
+        una deque, y mide a lo sumo `pixel_budget` puntos.
+        """
+        count = 0
+        while count < len(points) and points[count].x <= min_x:
+            count += 1
+        if count:
+            del points[:count]
+
+    def _bucket_width(self):
+        """
+        Ancho de los buckets LTTB para la ventana actual (1 = sin reducción).
+
+        Una ventana de n muestras ocupa a lo sumo n // ancho + 1 buckets
+        completos más los 2 puntos del incompleto, y eso entra en el
+        presupuesto. Se prefiere un ancho que divida la ventana: la ventana
+        cubre entonces una cantidad entera de buckets y, como chart_x
+        arranca en chart_window, la primera muestra abre un bucket.
+        """
+        if self.chart_window <= self.pixel_budget:
+            return 1
+        width = -(-self.chart_window // max(1, self.pixel_budget - 3))
+        for candidate in range(width, 2 * width + 1):
+            if self.chart_window % candidate == 0:
+                return candidate
+        return width
+
+    def _tail_start(self):
+        """x desde el que hay que recalcular: el último bucket completo."""
+        width = self._bucket_width()
+        start = ((self.chart_x - 1) // width - 1) * width
+        return max(start, self.chart_x - self.chart_window, 0)
+
+    def _write_points(self, points, x, y, start=None):
+        """
+        Vuelca una serie cruda en sus puntos gráficos, reducida con LTTB
+        (buckets alineados al x absoluto) si la ventana excede el
+        presupuesto. Reutiliza los objetos existentes: Flet solo envía los
+        puntos cuyo x/y cambió.
+
+        Args:
+            points: Lista de puntos que referencia el LineChartData
+            x: Coordenadas X crudas desde `start` (o de toda la ventana)
+            y: Valores correspondientes
+            start: x desde el que se recalcula; los puntos anteriores se
+                conservan tal cual (None = redibujar la ventana completa)
+        """
+        self._drop_old_points(points, self.chart_x - 1 - self.chart_window)
+        kept = 0
+        if start is not None:
+            kept = len(points)
+            while kept and points[kept - 1].x >= start:
+                kept -= 1
+        anchor = (points[kept - 1].x, points[kept - 1].y) if kept else None
+        idx = lttb_aligned(x, y, self._bucket_width(), anchor)
+        x, y = x[idx].tolist(), y[idx].tolist()
+
+        # La lista se modifica en su lugar: el LineChartData la referencia
+        tail = points[kept:]
+        for point, xi, yi in zip(tail, x, y):
+            point.x = xi
+            point.y = yi
+        if len(x) > len(tail):
+            points.extend(fch.LineChartDataPoint(xi, yi) for xi, yi in zip(x[len(tail):], y[len(tail):]))
+        else:
+            del points[kept + len(x):]
+
+    def _window_values(self):
+        """
+        Serie cruda de la ventana actual.
+
+        Returns:
+            Tupla (x, valores (n, 2)) con las muestras disponibles de la ventana
+        """
+        n = min(self.chart_window, self.chart_x)
+        x = np.arange(self.chart_x - n, self.chart_x)
+        return x, self.chart_values[x % self.max_chart_window]
+
+    def set_chart_window(self, seconds):
+        """
+        Cambia la ventana visible del gráfico (ej: 60, 900, 3600 muestras).
+
+        Args:
+            seconds: Largo de la ventana (se limita a max_chart_window)
+        """
+        self.chart_window = min(max(1, int(seconds)), self.max_chart_window)
+        x, values = self._window_values()
+        self.download_values = deque(values[:, 0].tolist(), maxlen=self.chart_window)
+        self.upload_values = deque(values[:, 1].tolist(), maxlen=self.chart_window)
+        self._write_points(self.download_points, x, values[:, 0])
+        self._write_points(self.upload_points, x, values[:, 1])
+        for name in self.selected_nics:
+            self._write_nic_points(name)
+
+    def chart_x_range(self):
+        """
+        Rango del eje X visible (se desplaza con cada muestra).
+
+        Returns:
+            Tupla (min_x, max_x)
+        """
+        return self.chart_x - self.chart_window, self.chart_x - 1
+
+    def get_history(self, seconds, max_points=3600):
+        """
+        Retorna el historial de los últimos `seconds` desde el nivel adecuado
+        (última hora a 1 s, último día a 1 min, último mes a 1 h, etc.).
+
+        Args:
+            seconds: Largo de la ventana en segundos
+            max_points: Máximo de buckets deseado
+
+        Returns:
+            Diccionario con timestamps, min, max, mean, sum, count y resolution
+        """
+        return self.history.window(seconds, max_points)
+
+    def update_nic_traffic(self, nic_names, rates):
+        """
+        Registra una muestra por interfaz, en el x de la última muestra
+        agregada (llamar después de update_traffic con el mismo lote).
+
+        Args:
+            nic_names: Lista de nombres de interfaz (orden de las filas de `rates`)
+            rates: Array (n, 2) con [download_mb, upload_mb] por interfaz
+        """
+        if nic_names is not self.nic_names and nic_names != self.nic_names:
+            self._resize_nics(nic_names)
+
+        # Una sola escritura para todas las interfaces, alineada con el
+        # último punto agregado del gráfico. Otra muestra en el mismo x
+        # (sin update_traffic en el medio) reemplaza la columna: el eje X
+        # de las interfaces nunca se adelanta al del agregado.
+        x = self.chart_x - 1
+        last = (self.nic_cursor - 1) % self.max_chart_window
+        if not self.nic_count or self.nic_x[last] != x:
+            last = self.nic_cursor
+            self.nic_cursor = (self.nic_cursor + 1) % self.max_chart_window
+            self.nic_count = min(self.nic_count + 1, self.max_chart_window)
+        self.nic_values[:, last, :] = rates
+        self.nic_x[last] = x
+
+        # Solo las interfaces elegidas tienen puntos
+        for name in self.selected_nics:
+            if self.chart_window <= self.pixel_budget:
+                down, up = rates[self._nic_rows[name]]
+                down_points, up_points = self.nic_points[name]
+                self._append_point(down_points, float(down), x)
+                self._append_point(up_points, float(up), x)
+            else:
+                self._write_nic_points(name, self._tail_start())
+
+    def select_nics(self, nic_names):
+        """
+        Elige qué interfaces se grafican como series propias.
+
+        Args:
+            nic_names: Nombres de interfaz; los que todavía no tienen
+                muestras quedan pendientes hasta que aparezcan
+
+        Returns:
+            Diccionario nombre -> (puntos download, puntos upload)
+        """
+        self.requested_nics = list(nic_names)
+        self.selected_nics = [n for n in nic_names if n in self._nic_rows]
+        previous = self.nic_points
+        self.nic_points = {name: previous.get(name) or ([], []) for name in self.selected_nics}
+        for name in self.selected_nics:
+            if name not in previous:
+                self._write_nic_points(name)
+        return self.nic_points
+
+    def _write_nic_points(self, name, start=None):
+        """
+        Vuelca el historial de una interfaz (dentro de la ventana) en sus puntos.
+
+        Args:
+            name: Interfaz elegida
+            start: x desde el que se recalcula (None = toda la ventana)
+        """
+        low = max(self.chart_x - self.chart_window, 0 if start is None else start)
+        # Cada columna tiene un x distinto y menor que chart_x: alcanza con
+        # mirar las últimas chart_x - low
+        count = max(0, min(self.nic_count, self.chart_x - low))
+        idx = (self.nic_cursor - np.arange(count, 0, -1)) % self.max_chart_window
+        x = self.nic_x[idx]
+        inside = x >= low
+        idx, x = idx[inside], x[inside]
+        values = self.nic_values[self._nic_rows[name], idx]
+        down_points, up_points = self.nic_points[name]
+        self._write_points(down_points, x, values[:, 0], start)
+        self._write_points(up_points, x, values[:, 1], start)
+
+    def _resize_nics(self, nic_names):
+        """Redimensiona la matriz de historial conservando las interfaces existentes."""
+        values = np.zeros((len(nic_names), self.max_chart_window, 2), dtype=np.float64)
+        for row, name in enumerate(nic_names):
+            if name in self._nic_rows:
+                values[row] = self.nic_values[self._nic_rows[name]]
+        self.nic_names = nic_names
+        self.nic_values = values
+        self._nic_rows = {name: row for row, name in enumerate(nic_names)}
+        self.select_nics(self.requested_nics)
+
     def calculate_dynamic_scale(self, current_down, current_up):
         """
         Calcula el eje Y del gráfico de forma dinámica.
@@ -65,11 +478,13 @@ class DataManager:
         Retorna un diccionario con todas las estadísticas de tráfico.
         
         Returns:
-            Diccionario con peak, total y avg para download y upload
+            Diccionario con peak, total, avg y percentiles (p50/p95/p99 de
+            toda la vida y de las ventanas de 5 min y 1 h) para download y upload,
+            más avg/std/peak/min de las ventanas de 1 min, 5 min y 1 h
         """
-        # Calcular promedios
-        avg_download = self.total_download / self.sample_count if self.sample_count > 0 else 0.0
-        avg_upload = self.total_upload / self.sample_count if self.sample_count > 0 else 0.0
+        # Calcular promedios sobre el tiempo real cubierto
+        avg_download = self.total_download / self.elapsed_total if self.elapsed_total > 0 else 0.0
+        avg_upload = self.total_upload / self.elapsed_total if self.elapsed_total > 0 else 0.0
         
         return {
             "peak_download": self.peak_download,
@@ -77,7 +492,9 @@ class DataManager:
             "total_download": self.total_download,
             "total_upload": self.total_upload,
             "avg_download": avg_download,
-            "avg_upload": avg_upload
+            "avg_upload": avg_upload,
+            **self.quantiles.snapshot(),
+            **self.window_stats.snapshot()
         }
     
     def reset_stats(self):
@@ -87,6 +504,11 @@ class DataManager:
         self.total_download = 0.0
         self.total_upload = 0.0
         self.sample_count = 0
+        self.elapsed_total = 0.0
+        self.quantiles.reset()
+        self.window_stats.reset()
+        if self.history_store is not None:
+            self.history_store.reset_stats()
     
     def set_traffic_threshold(self, threshold_mb: float):
         """
@@ -99,7 +521,8 @@ class DataManager:
     
     def check_high_traffic(self, download_mb: float, upload_mb: float) -> bool:
         """
-        Verifica si el tráfico actual supera el umbral configurado.
+        Verifica si el tráfico actual supera el umbral configurado
+        (fijo, o el límite de la línea base en modo adaptativo).
         
         Args:
             download_mb: Tráfico de descarga en MB/s
@@ -110,5 +533,34 @@ class DataManager:
         """
         if not self.high_traffic_alerts_enabled:
             return False
+
+        if self.alert_mode == ALERT_MODE_ADAPTIVE:
+            score = self.last_anomaly
+            if score is None:
+                return False
+            return download_mb > score.upper_download or upload_mb > score.upper_upload
         
-        return download_mb > self.traffic_threshold_mb or upload_mb > self.traffic_threshold_mb
\ No newline at end of file
+        return download_mb > self.traffic_threshold_mb or upload_mb > self.traffic_threshold_mb
+
+    def set_alert_mode(self, mode: str):
+        """
+        Elige el modo de alerta de tráfico alto.
+
+        Args:
+            mode: ALERT_MODE_THRESHOLD o ALERT_MODE_ADAPTIVE
+        """
+        if mode not in ALERT_MODES:
+            raise ValueError(f"Unknown alert mode: {mode}")
+        self.alert_mode = mode
+
+    def current_alert_threshold(self) -> float:
+        """
+        Umbral vigente en MB/s (para mostrar en la notificación).
+
+        Returns:
+            El umbral fijo, o el límite adaptativo del sentido más desviado
+        """
+        score = self.last_anomaly
+        if self.alert_mode == ALERT_MODE_ADAPTIVE and score is not None:
+            return score.upper_download if score.z_download >= score.z_upload else score.upper_upload
+        return self.traffic_threshold_mb
\ No newline at end of file
@@ -0,0 +1,177 @@
+"""
+Inventario persistente de dispositivos de la red (SQLite en modo WAL).
+
+Cada dispositivo se identifica por su MAC y guarda la última IP, el
+fabricante, la interfaz, first_seen y last_seen; el historial de IPs va
+en una tabla aparte. Hay índices secundarios por IP y por fabricante.
+
+Un escaneo completo se fusiona en una única transacción (upsert por
+lotes). Saber qué dispositivos son nuevos es una búsqueda por clave
+primaria de las MACs del escaneo: el costo depende de los dispositivos
+escaneados, no del tamaño del inventario, y sobrevive a los reinicios.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from core.paths import get_data_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS devices (
+    mac TEXT PRIMARY KEY,
+    ip TEXT NOT NULL,
+    vendor TEXT NOT NULL,
+    interface TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS devices_by_ip ON devices (ip);
+CREATE INDEX IF NOT EXISTS devices_by_vendor ON devices (vendor);
+
+CREATE TABLE IF NOT EXISTS ip_history (
+    mac TEXT NOT NULL,
+    ip TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (mac, ip)
+) WITHOUT ROWID;
+"""
+
+COLUMNS = ("mac", "ip", "vendor", "interface", "first_seen", "last_seen")
+
+# Un fabricante desconocido no pisa uno ya resuelto
+UPSERT_DEVICE = """
+INSERT INTO devices VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (mac) DO UPDATE SET
+    ip = excluded.ip,
+    vendor = CASE WHEN excluded.vendor = 'Unknown' THEN vendor ELSE excluded.vendor END,
+    interface = CASE WHEN excluded.interface = '' THEN interface ELSE excluded.interface END,
+    last_seen = MAX(last_seen, excluded.last_seen)
+"""
+
+UPSERT_IP = """
+INSERT INTO ip_history VALUES (?, ?, ?, ?)
+ON CONFLICT (mac, ip) DO UPDATE SET last_seen = MAX(last_seen, excluded.last_seen)
+"""
+
+# Parámetros por consulta IN (...): debajo del límite de SQLite
+LOOKUP_BATCH = 500
+
+
+class DeviceInventory:
+    """
+    Inventario de dispositivos por MAC con índices por IP y fabricante.
+
+    Usa una sola conexión protegida por un lock: los escaneos corren en
+    hilos (asyncio.to_thread / ThreadPoolExecutor) y las escrituras son
+    pocas (una transacción por escaneo).
+    """
+
+    DEFAULT_FILENAME = "devices.db"
+
+    def __init__(self, path: str | None = None):
+        """
+        Args:
+            path: Ruta del archivo SQLite (por defecto en get_data_dir())
+        """
+        self.path = path or os.path.join(get_data_dir(), self.DEFAULT_FILENAME)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def merge(self, devices: list, timestamp: float | None = None) -> list:
+        """
+        Fusiona un escaneo en el inventario (una transacción).
+
+        Args:
+            devices: Diccionarios con ip, mac, vendor (e interface opcional)
+            timestamp: Segundos epoch del escaneo (por defecto ahora)
+
+        Returns:
+            Los dispositivos cuya MAC no estaba en el inventario, en el
+            orden del escaneo y sin repetir
+        """
+        now = time.time() if timestamp is None else timestamp
+        batch = {}
+        for device in devices:
+            mac = (device.get("mac") or "").lower()
+            if mac:
+                batch.setdefault(mac, device)
+        if not batch:
+            return []
+
+        with self._lock:
+            try:
+                with self._conn:
+                    known = self._existing(list(batch))
+                    self._conn.executemany(UPSERT_DEVICE, (
+                        (mac, d.get("ip", ""), d.get("vendor") or "Unknown", d.get("interface", ""), now, now)
+                        for mac, d in batch.items()
+                    ))
+                    self._conn.executemany(UPSERT_IP, (
+                        (mac, d["ip"], now, now) for mac, d in batch.items() if d.get("ip")
+                    ))
+            except sqlite3.Error as e:
+                print(f"Error updating device inventory: {e}")
+                return []
+        return [d for mac, d in batch.items() if mac not in known]
+
+    def _existing(self, macs: list) -> set:
+        """MACs de `macs` que ya están en el inventario (búsqueda por clave primaria)."""
+        found = set()
+        for i in range(0, len(macs), LOOKUP_BATCH):
+            chunk = macs[i:i + LOOKUP_BATCH]
+            rows = self._conn.execute(
+                f"SELECT mac FROM devices WHERE mac IN ({','.join('?' * len(chunk))})", chunk
+            )
+            found.update(row[0] for row in rows)
+        return found
+
+    def _query(self, sql: str, params=()) -> list:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def get(self, mac: str) -> dict | None:
+        """Dispositivo por MAC, o None si nunca se vio."""
+        rows = self._query("SELECT * FROM devices WHERE mac = ?", (mac.lower(),))
+        return rows[0] if rows else None
+
+    def find_by_ip(self, ip: str) -> list:
+        """Dispositivos cuya última IP es `ip` (índice devices_by_ip)."""
+        return self._query("SELECT * FROM devices WHERE ip = ? ORDER BY last_seen DESC", (ip,))
+
+    def find_by_vendor(self, vendor: str) -> list:
+        """Dispositivos de un fabricante (índice devices_by_vendor)."""
+        return self._query("SELECT * FROM devices WHERE vendor = ? ORDER BY last_seen DESC", (vendor,))
+
+    def ip_history(self, mac: str) -> list:
+        """
+        IPs que usó un dispositivo.
+
+        Returns:
+            Lista de (ip, first_seen, last_seen), la más reciente primero
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT ip, first_seen, last_seen FROM ip_history WHERE mac = ? ORDER BY last_seen DESC",
+                (mac.lower(),),
+            ).fetchall()
+
+    def all(self) -> list:
+        """Todo el inventario, visto más recientemente primero."""
+        return self._query("SELECT * FROM devices ORDER BY last_seen DESC")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM devices").fetchone()[0]
+
+    def close(self):
+        """Cierra la conexión."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,205 @@
+"""
+Registro central de dispositivos de la red con publicación de cambios.
+
+Es el único dueño del último escaneo: las vistas se suscriben a sus
+eventos y piden `ensure_fresh()` al mostrarse, en vez de lanzar cada una
+su propio barrido ARP. Mientras los datos tengan menos de `ttl` segundos
+se sirven al instante desde memoria; si están vencidos se refrescan en
+segundo plano y, si ya hay un refresco en curso, se comparte.
+
+Eventos (RegistryEvent.kind):
+    SCAN_STARTED   comenzó un refresco
+    DEVICE         llegó un dispositivo del refresco en curso, o uno
+                   nuevo/cambiado visto pasivamente (observe)
+    SCAN_FINISHED  terminó; `devices` es el resultado completo
+    SCAN_FAILED    el refresco falló; se conservan los datos anteriores
+"""
+
+import asyncio
+import time
+from typing import Callable, NamedTuple
+
+# Antigüedad máxima (segundos) con la que un escaneo se sirve sin refrescar
+DEFAULT_TTL = 60.0
+
+SCAN_STARTED = "scan_started"
+DEVICE = "device"
+SCAN_FINISHED = "scan_finished"
+SCAN_FAILED = "scan_failed"
+
+
+class RegistryEvent(NamedTuple):
+    """Cambio publicado a los suscriptores."""
+    kind: str
+    device: dict | None = None   # Solo en DEVICE
+    devices: tuple = ()          # Resultado completo en SCAN_FINISHED
+    new_devices: tuple = ()      # Nunca vistos antes (SCAN_FINISHED y DEVICE pasivo)
+    error: Exception | None = None  # Solo en SCAN_FAILED
+
+
+class DeviceRegistry:
+    """
+    Último escaneo de la red compartido entre vistas.
+
+    Vive en el event loop de la UI: los suscriptores se llaman en ese
+    mismo hilo y pueden tocar controles de Flet directamente.
+    """
+
+    def __init__(self, scanner, ttl: float = DEFAULT_TTL, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            scanner: NetworkScanner (usa scan_all_stream y detect_new_devices)
+            ttl: Segundos durante los que un escaneo se considera fresco
+            clock: Reloj monotónico (inyectable para tests)
+        """
+        self.scanner = scanner
+        self.ttl = ttl
+        self._clock = clock
+        self._devices = []
+        self._updated_at = None
+        self._subscribers = []
+        self._refresh_task = None
+        # Vistos pasivamente durante el refresco en curso (ip -> dispositivo)
+        self._observed_during_refresh = {}
+
+    @property
+    def devices(self) -> list:
+        """Dispositivos del último escaneo completo (copia)."""
+        return list(self._devices)
+
+    @property
+    def age(self) -> float | None:
+        """Segundos desde el último escaneo completo, o None si nunca hubo uno."""
+        if self._updated_at is None:
+            return None
+        return self._clock() - self._updated_at
+
+    @property
+    def scanning(self) -> bool:
+        return self._refresh_task is not None and not self._refresh_task.done()
+
+    def is_fresh(self) -> bool:
+        """True si hay un escaneo de menos de `ttl` segundos."""
+        age = self.age
+        return age is not None and age < self.ttl
+
+    def subscribe(self, callback: Callable[[RegistryEvent], None]) -> Callable[[], None]:
+        """
+        Registra un suscriptor de eventos.
+
+        Returns:
+            Función que cancela la suscripción
+        """
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback) if callback in self._subscribers else None
+
+    def _publish(self, event: RegistryEvent):
+        # Un suscriptor roto no debe dejar sin eventos a los demás
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Error in device registry subscriber: {e}")
+
+    def ensure_fresh(self) -> bool:
+        """
+        Arranca un refresco en segundo plano si los datos están vencidos.
+
+        Nunca espera: los datos en caché ya están en `devices`.
+
+        Returns:
+            True si hay un refresco en curso (nuevo o ya existente)
+        """
+        if self.scanning:
+            return True
+        if self.is_fresh():
+            return False
+        self._start_refresh()
+        return True
+
+    async def refresh(self, force: bool = True) -> list:
+        """
+        Refresca y espera el resultado.
+
+        Args:
+            force: Si es False y los datos están frescos, no escanea
+
+        Returns:
+            Dispositivos del escaneo (el anterior si este falló)
+        """
+        if not force and self.is_fresh() and not self.scanning:
+            return self.devices
+        task = self._refresh_task if self.scanning else self._start_refresh()
+        # shield: cancelar a quien espera no corta el escaneo compartido
+        await asyncio.shield(task)
+        return self.devices
+
+    def observe(self, observation) -> asyncio.Task:
+        """
+        Incorpora un dispositivo visto en el tráfico (descubrimiento pasivo).
+
+        Se llama desde el loop (p. ej. con call_soon_threadsafe desde el
+        hilo de captura); el fabricante se resuelve en un hilo.
+        """
+        return asyncio.ensure_future(self._add_observed(observation))
+
+    async def _add_observed(self, observation):
+        try:
+            device = await asyncio.to_thread(self.scanner.observed_device, observation)
+            if device is None:
+                return
+            index = next((i for i, d in enumerate(self._devices) if d["ip"] == device["ip"]), None)
+            if index is not None:
+                current = self._devices[index]
+                if current.get("mac") == device["mac"] and device.get("hostname") in (None, current.get("hostname")):
+                    return  # Nada nuevo que mostrar
+                self._devices[index] = {**current, **device}
+            else:
+                self._devices.append(device)
+            if self.scanning:
+                # El resultado del barrido reemplaza a _devices: se reincorpora al terminar
+                self._observed_during_refresh[device["ip"]] = self._devices[index if index is not None else -1]
+            new_devices = await asyncio.to_thread(self.scanner.detect_new_devices, [device])
+        except Exception as e:
+            print(f"Error adding observed device: {e}")
+            return
+        self._publish(RegistryEvent(DEVICE, device=device, new_devices=tuple(new_devices)))
+
+    def _start_refresh(self) -> asyncio.Task:
+        self._refresh_task = asyncio.ensure_future(self._run_refresh())
+        return self._refresh_task
+
+    async def _run_refresh(self):
+        self._publish(RegistryEvent(SCAN_STARTED))
+        self._observed_during_refresh = {}
+        found = []
+        try:
+            async for device in self.scanner.scan_all_stream():
+                found.append(device)
+                self._publish(RegistryEvent(DEVICE, device=device))
+            # Un solo registro por escaneo (una transacción en el inventario)
+            new_devices = await asyncio.to_thread(self.scanner.detect_new_devices, found)
+        except Exception as e:
+            print(f"Error refreshing devices: {e}")
+            self._publish(RegistryEvent(SCAN_FAILED, error=e))
+            return
+        self._merge_observed(found)
+        self._devices = found
+        self._updated_at = self._clock()
+        self._publish(RegistryEvent(SCAN_FINISHED, devices=tuple(found), new_devices=tuple(new_devices)))
+
+    def _merge_observed(self, found: list):
+        """
+        Incorpora a `found` lo visto pasivamente mientras corría el barrido.
+
+        Un dispositivo que no respondió al barrido (o llegó después de su
+        turno) no debe desaparecer; si respondió, manda lo del barrido y se
+        conservan solo los campos que este no trae (p. ej. el hostname).
+        """
+        observed, self._observed_during_refresh = self._observed_during_refresh, {}
+        index = {d["ip"]: i for i, d in enumerate(found)}
+        for ip, device in observed.items():
+            if ip in index:
+                found[index[ip]] = {**device, **found[index[ip]]}
+            else:
+                found.append(device)
@@ -0,0 +1,58 @@
+"""
+Reducción de series para graficar: Largest-Triangle-Three-Buckets (LTTB,
+Steinarsson, 2013). Conserva la forma visual (picos y valles) de una
+serie larga con un número acotado de puntos, así el costo de dibujo no
+depende de la ventana.
+"""
+
+import numpy as np
+
+
+def lttb_aligned(x, y, width: int, anchor=None) -> np.ndarray:
+    """
+    LTTB con buckets de ancho fijo alineados al x absoluto (bucket x // width).
+
+    Los bordes no dependen de dónde empieza la serie: al avanzar la ventana los buckets completos eligen siempre el
+    mismo punto, así que solo hace falta recalcular la cola. Cada bucket
+    completo aporta un punto (triángulo con el elegido antes y el promedio
+    del bucket siguiente). El último bucket, todavía incompleto, aporta el
+    punto más alejado de la recta entre el elegido antes y su última
+    muestra, más esa última muestra.
+
+    Args:
+        x: Array 1D creciente de coordenadas X enteras
+        y: Array 1D de valores
+        width: Ancho de los buckets en unidades de x
+        anchor: Punto (x, y) elegido antes del primer bucket (opcional; por
+            defecto la primera muestra)
+
+    Returns:
+        Array de índices (ordenados) de los puntos elegidos
+    """
+    n = len(x)
+    if n == 0 or width <= 1:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    buckets = x // width
+    edges = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1, [n]))
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x, edges[:-1]) / counts
+    avg_y = np.add.reduceat(y, edges[:-1]) / counts
+    # Para cada bucket, el promedio del siguiente (el último mira a su última muestra)
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    out = []
+    ax, ay = (x[0], y[0]) if anchor is None else anchor
+    for i in range(len(counts)):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((ax - next_x[i]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y[i] - ay))
+        a = lo + int(area.argmax())
+        out.append(a)
+        ax, ay = x[a], y[a]
+    if out[-1] != n - 1:
+        out.append(n - 1)
+    return np.array(out, dtype=np.int64)
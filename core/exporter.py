@@ -0,0 +1,171 @@
+"""
+Exportación del historial de tráfico a CSV, Parquet o Arrow IPC.
+
+Los datos se leen de HistoryStore en bloques acotados (iter_range) y se
+escriben bloque a bloque, así exportar meses de muestras a 1 s usa la
+misma memoria que exportar un minuto. CSV no necesita dependencias;
+Parquet y Arrow requieren `pyarrow` (opcional).
+"""
+
+import asyncio
+import os
+import time
+from enum import Enum
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depende del entorno
+    pa = None
+
+from core.history_store import HistoryStore
+from core.paths import get_data_dir
+
+# Columnas exportadas (mismo orden que HistoryStore.read_range)
+COLUMNS = ("timestamp", "download_mb", "upload_mb", "elapsed_s", "peak_download_mb", "peak_upload_mb")
+CSV_FORMATS = ("%.3f",) + ("%.6f",) * (len(COLUMNS) - 1)
+
+DEFAULT_CHUNK_ROWS = 65536
+
+
+class ExportFormat(Enum):
+    CSV = "csv"          # Texto, sin dependencias
+    PARQUET = "parquet"  # Columnar comprimido (zstd), requiere pyarrow
+    ARROW = "arrow"      # Arrow IPC (Feather v2), requiere pyarrow
+
+
+def arrow_available() -> bool:
+    """True si pyarrow está instalado (Parquet y Arrow disponibles)."""
+    return pa is not None
+
+
+def available_formats() -> list:
+    """Formatos exportables en este entorno (CSV siempre; el resto con pyarrow)."""
+    return [fmt for fmt in ExportFormat if fmt is ExportFormat.CSV or arrow_available()]
+
+
+def default_export_path(fmt: ExportFormat, directory: str | None = None, now: float | None = None) -> str:
+    """
+    Ruta de destino por defecto: traffic_<fecha>_<hora>.<formato>.
+
+    Args:
+        fmt: Formato de salida (da la extensión)
+        directory: Carpeta de destino (por defecto get_data_dir())
+        now: Segundos epoch para el nombre (por defecto ahora)
+
+    Returns:
+        Ruta absoluta del archivo
+    """
+    stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(time.time() if now is None else now))
+    return os.path.join(directory or get_data_dir(), f"traffic_{stamp}.{ExportFormat(fmt).value}")
+
+
+def export_history(store: HistoryStore, path: str, fmt: ExportFormat = ExportFormat.CSV,
+                   start: float = 0.0, end: float | None = None,
+                   chunk_rows: int = DEFAULT_CHUNK_ROWS, progress=None) -> int:
+    """
+    Exporta las muestras de [start, end] a un archivo.
+
+    El archivo se escribe en `<path>.tmp` y se renombra al terminar, así
+    una exportación interrumpida nunca deja un archivo a medias.
+
+    Args:
+        store: Historial de origen
+        path: Archivo de destino
+        fmt: Formato de salida
+        start: Segundos epoch (inclusive)
+        end: Segundos epoch (inclusive); None = ahora
+        chunk_rows: Filas por bloque (cota de memoria)
+        progress: Callback opcional progress(filas_escritas) tras cada bloque
+
+    Returns:
+        Cantidad de filas exportadas
+
+    Raises:
+        RuntimeError: Si el formato requiere pyarrow y no está instalado
+    """
+    fmt = ExportFormat(fmt)
+    if fmt is not ExportFormat.CSV and pa is None:
+        raise RuntimeError(f"pyarrow is required to export {fmt.value} files")
+
+    end = time.time() if end is None else end
+    chunks = store.iter_range(start, end, chunk_rows)
+    writer = {
+        ExportFormat.CSV: _write_csv,
+        ExportFormat.PARQUET: _write_parquet,
+        ExportFormat.ARROW: _write_arrow,
+    }[fmt]
+
+    tmp_path = f"{path}.tmp"
+    try:
+        rows = writer(chunks, tmp_path, progress)
+        os.replace(tmp_path, path)
+    finally:
+        chunks.close()  # Cierra la conexión de lectura aunque falle la escritura
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return rows
+
+
+async def export_history_async(store: HistoryStore, path: str, fmt: ExportFormat = ExportFormat.CSV,
+                               start: float = 0.0, end: float | None = None,
+                               chunk_rows: int = DEFAULT_CHUNK_ROWS, progress=None) -> int:
+    """Igual que export_history(), pero en un hilo aparte (no bloquea la UI)."""
+    return await asyncio.to_thread(export_history, store, path, fmt, start, end, chunk_rows, progress)
+
+
+def _write_csv(chunks, path: str, progress) -> int:
+    """CSV con encabezado; cada bloque se formatea con np.savetxt."""
+    rows = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(",".join(COLUMNS) + "\n")
+        for chunk in chunks:
+            np.savetxt(f, chunk, fmt=CSV_FORMATS, delimiter=",")
+            rows += len(chunk)
+            if progress:
+                progress(rows)
+    return rows
+
+
+def _arrow_schema():
+    """Esquema Arrow: timestamp en ms UTC y el resto float64."""
+    fields = [pa.field("timestamp", pa.timestamp("ms", tz="UTC"))]
+    fields += [pa.field(name, pa.float64()) for name in COLUMNS[1:]]
+    return pa.schema(fields)
+
+
+def _to_record_batch(chunk: np.ndarray, schema):
+    """Convierte un bloque (n, 6) en un RecordBatch sin copiar por fila."""
+    ts_ms = np.rint(chunk[:, 0] * 1000).astype(np.int64)
+    arrays = [pa.array(ts_ms, type=schema.field(0).type)]
+    arrays += [pa.array(np.ascontiguousarray(chunk[:, i])) for i in range(1, len(COLUMNS))]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _write_parquet(chunks, path: str, progress) -> int:
+    """Parquet comprimido con zstd; un row group por bloque."""
+    schema = _arrow_schema()
+    rows = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for chunk in chunks:
+            writer.write_batch(_to_record_batch(chunk, schema))
+            rows += len(chunk)
+            if progress:
+                progress(rows)
+    return rows
+
+
+def _write_arrow(chunks, path: str, progress) -> int:
+    """Archivo Arrow IPC (legible con pyarrow.feather / polars / DuckDB)."""
+    schema = _arrow_schema()
+    rows = 0
+    with pa_ipc.new_file(path, schema) as writer:
+        for chunk in chunks:
+            writer.write_batch(_to_record_batch(chunk, schema))
+            rows += len(chunk)
+            if progress:
+                progress(rows)
+    return rows
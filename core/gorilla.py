@@ -0,0 +1,330 @@
+"""
+Series de tiempo comprimidas en memoria al estilo Gorilla (Facebook, 2015).
+
+- Timestamps (ms enteros): delta-of-delta con códigos de largo variable;
+  a 1 Hz estable casi todas las muestras ocupan 1 bit.
+- Valores float64: XOR con el valor anterior; repetir un valor (p. ej.
+  tráfico nulo) cuesta 1 bit y el resto guarda solo los bits significativos.
+
+Las muestras se agrupan en bloques de `block_size`: solo el bloque abierto
+está en el codificador, los cerrados son `bytes` inmutables. Buscar un
+rango de tiempo es una bisección sobre los inicios de bloque y decodificar
+únicamente los bloques que lo cubren (acceso aleatorio por bloque).
+
+DataManager no la usa: la serie cruda de largo plazo ya vive en disco
+(HistoryStore) y una segunda copia en memoria no tenía lectores. Queda
+como contenedor para retención en RAM sin disco (benchmarks/bench_gorilla.py
+la compara con una deque).
+"""
+
+import bisect
+import struct
+from collections import deque
+
+import numpy as np
+
+_pack_double = struct.Struct(">d").pack
+_unpack_u64 = struct.Struct(">Q").unpack
+_pack_u64 = struct.Struct(">Q").pack
+_unpack_double = struct.Struct(">d").unpack
+
+DEFAULT_BLOCK_SIZE = 1024
+
+# Códigos delta-of-delta: (prefijo, bits del prefijo, bits del valor)
+_DOD_CLASSES = (
+    (0b10, 2, 7),
+    (0b110, 3, 9),
+    (0b1110, 4, 12),
+)
+_DOD_ESCAPE = (0b1111, 4, 64)
+
+
+def _float_bits(value: float) -> int:
+    return _unpack_u64(_pack_double(value))[0]
+
+
+def _bits_float(bits: int) -> float:
+    return _unpack_double(_pack_u64(bits))[0]
+
+
+class BitWriter:
+    """Escritura de bits MSB-first; acumula en un int y vuelca de a 8 bytes."""
+
+    __slots__ = ("buffer", "_acc", "_bits", "bit_length")
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self._acc = 0
+        self._bits = 0
+        self.bit_length = 0
+
+    def write(self, value: int, nbits: int):
+        """Escribe los `nbits` bits bajos de `value` (value ya debe caber)."""
+        self._acc = (self._acc << nbits) | value
+        self._bits += nbits
+        self.bit_length += nbits
+        if self._bits >= 64:
+            extra = self._bits - 64
+            self.buffer += (self._acc >> extra).to_bytes(8, "big")
+            self._acc &= (1 << extra) - 1
+            self._bits = extra
+
+    def getvalue(self) -> bytes:
+        """Bytes escritos hasta ahora, con el último byte completado con ceros."""
+        if not self._bits:
+            return bytes(self.buffer)
+        pad = -self._bits % 8
+        tail = (self._acc << pad).to_bytes((self._bits + pad) // 8, "big")
+        return bytes(self.buffer) + tail
+
+
+class BitReader:
+    """Lectura de bits MSB-first sobre bytes, recargando de a 8 bytes."""
+
+    __slots__ = ("_data", "_pos", "_acc", "_bits")
+
+    def __init__(self, data: bytes):
+        self._data = data
+        self._pos = 0
+        self._acc = 0
+        self._bits = 0
+
+    def read(self, nbits: int) -> int:
+        while self._bits < nbits:
+            chunk = self._data[self._pos:self._pos + 8]
+            self._pos += 8
+            # El final del buffer se completa con ceros (padding de getvalue)
+            self._acc = (self._acc << 64) | (int.from_bytes(chunk, "big") << (8 * (8 - len(chunk))))
+            self._bits += 64
+        self._bits -= nbits
+        value = self._acc >> self._bits
+        self._acc &= (1 << self._bits) - 1
+        return value
+
+
+class BlockEncoder:
+    """Codificador de un bloque: timestamps en ms y `channels` valores float64."""
+
+    def __init__(self, channels: int):
+        self.channels = channels
+        self.writer = BitWriter()
+        self.count = 0
+        self.first_ts = None
+        self.last_ts = None
+        self._prev_delta = 0
+        self._prev_bits = [0] * channels
+        # Ventana de bits significativos vigente por canal: (leading, trailing)
+        self._windows = [None] * channels
+
+    def append(self, ts_ms: int, values):
+        write = self.writer.write
+        if self.count == 0:
+            write(ts_ms & 0xFFFFFFFFFFFFFFFF, 64)
+            self.first_ts = ts_ms
+            for ch in range(self.channels):
+                bits = _float_bits(values[ch])
+                write(bits, 64)
+                self._prev_bits[ch] = bits
+        else:
+            delta = ts_ms - self.last_ts
+            dod = delta - self._prev_delta
+            self._prev_delta = delta
+            if dod == 0:
+                write(0, 1)
+            else:
+                for prefix, prefix_bits, value_bits in _DOD_CLASSES:
+                    half = 1 << (value_bits - 1)
+                    if -half < dod <= half:
+                        write(prefix, prefix_bits)
+                        write(dod + half - 1, value_bits)  # Desplazado a [0, 2^bits)
+                        break
+                else:
+                    prefix, prefix_bits, value_bits = _DOD_ESCAPE
+                    write(prefix, prefix_bits)
+                    write(dod & 0xFFFFFFFFFFFFFFFF, value_bits)
+
+            for ch in range(self.channels):
+                bits = _float_bits(values[ch])
+                xor = bits ^ self._prev_bits[ch]
+                self._prev_bits[ch] = bits
+                if xor == 0:
+                    write(0, 1)
+                    continue
+                leading = min(64 - xor.bit_length(), 31)
+                trailing = (xor & -xor).bit_length() - 1
+                window = self._windows[ch]
+                if window is not None and leading >= window[0] and trailing >= window[1]:
+                    # Cabe en la ventana anterior: '10' + bits significativos
+                    write(0b10, 2)
+                    write(xor >> window[1], 64 - window[0] - window[1])
+                else:
+                    # Ventana nueva: '11' + leading (5 bits) + largo (6 bits) + bits
+                    meaningful = 64 - leading - trailing
+                    write(0b11, 2)
+                    write(leading, 5)
+                    write(meaningful & 0x3F, 6)  # 64 se guarda como 0
+                    write(xor >> trailing, meaningful)
+                    self._windows[ch] = (leading, trailing)
+        self.last_ts = ts_ms
+        self.count += 1
+
+
+def decode_block(data: bytes, count: int, channels: int):
+    """
+    Decodifica un bloque.
+
+    Returns:
+        Tupla (timestamps_ms, valores) como listas: [n] y [n][channels]
+    """
+    if count == 0:
+        return [], []
+    reader = BitReader(data)
+    read = reader.read
+    ts = read(64)
+    if ts >= 1 << 63:
+        ts -= 1 << 64
+    prev_bits = [read(64) for _ in range(channels)]
+    timestamps = [ts]
+    values = [[_bits_float(b) for b in prev_bits]]
+    windows = [(0, 0)] * channels
+    delta = 0
+
+    for _ in range(count - 1):
+        if read(1):
+            # Prefijos '10', '110', '1110', '1111' (ver _DOD_CLASSES)
+            if not read(1):
+                value_bits = 7
+            elif not read(1):
+                value_bits = 9
+            elif not read(1):
+                value_bits = 12
+            else:
+                value_bits = 64
+            raw = read(value_bits)
+            if value_bits == 64:
+                dod = raw - (1 << 64) if raw >= 1 << 63 else raw
+            else:
+                dod = raw - (1 << (value_bits - 1)) + 1
+            delta += dod
+        ts += delta
+        timestamps.append(ts)
+
+        row = []
+        for ch in range(channels):
+            if read(1):
+                if read(1):
+                    leading = read(5)
+                    meaningful = read(6) or 64
+                    windows[ch] = (leading, 64 - leading - meaningful)
+                leading, trailing = windows[ch]
+                prev_bits[ch] ^= read(64 - leading - trailing) << trailing
+            row.append(_bits_float(prev_bits[ch]))
+        values.append(row)
+    return timestamps, values
+
+
+class GorillaSeries:
+    """
+    Serie comprimida de (timestamp, valores) con retención opcional.
+
+    Reemplaza deques de floats en historiales largos: ~1-2 bytes por
+    timestamp y entre 1 bit y ~8 bytes por valor según cuánto cambie,
+    contra ~32 bytes por float en una deque de Python.
+    """
+
+    def __init__(self, channels: int = 2, block_size: int = DEFAULT_BLOCK_SIZE, max_samples: int | None = None):
+        """
+        Args:
+            channels: Valores por muestra (download, upload)
+            block_size: Muestras por bloque (granularidad del acceso aleatorio)
+            max_samples: Retención; al superarla se descartan bloques enteros
+                viejos (None = sin límite)
+        """
+        self.channels = channels
+        self.block_size = block_size
+        self.max_samples = max_samples
+        self.clear()
+
+    def clear(self):
+        """Descarta todas las muestras."""
+        # Bloques cerrados: (first_ts_ms, last_ts_ms, count, bytes)
+        self.blocks = deque()
+        self._block_starts = deque()  # first_ts_ms de cada bloque (para bisect)
+        self._open = BlockEncoder(self.channels)
+        self._sealed_count = 0
+
+    def __len__(self) -> int:
+        return self._sealed_count + self._open.count
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes de datos comprimidos (bloques cerrados + bloque abierto)."""
+        return sum(len(b[3]) for b in self.blocks) + (self._open.writer.bit_length + 7) // 8
+
+    def append(self, timestamp: float, values):
+        """
+        Agrega una muestra (timestamps crecientes).
+
+        Args:
+            timestamp: Segundos epoch (se guarda con resolución de ms)
+            values: Un float por canal
+        """
+        encoder = self._open
+        encoder.append(round(timestamp * 1000), values)
+        if encoder.count >= self.block_size:
+            self._seal()
+
+    def _seal(self):
+        """Cierra el bloque abierto y aplica la retención."""
+        encoder = self._open
+        self.blocks.append((encoder.first_ts, encoder.last_ts, encoder.count, encoder.writer.getvalue()))
+        self._block_starts.append(encoder.first_ts)
+        self._sealed_count += encoder.count
+        self._open = BlockEncoder(self.channels)
+
+        if self.max_samples is not None:
+            while self.blocks and len(self) - self.blocks[0][2] >= self.max_samples:
+                self._sealed_count -= self.blocks.popleft()[2]
+                self._block_starts.popleft()
+
+    def _iter_blocks(self):
+        """(first_ts, last_ts, count, bytes) de todos los bloques, incluido el abierto."""
+        yield from self.blocks
+        encoder = self._open
+        if encoder.count:
+            yield encoder.first_ts, encoder.last_ts, encoder.count, encoder.writer.getvalue()
+
+    def read_range(self, start: float | None = None, end: float | None = None):
+        """
+        Decodifica las muestras con timestamp en [start, end].
+
+        Solo se decodifican los bloques que se solapan con el rango.
+
+        Returns:
+            Tupla (timestamps en segundos (n,), valores (n, channels))
+        """
+        start_ms = None if start is None else round(start * 1000)
+        end_ms = None if end is None else round(end * 1000)
+        # Primer bloque candidato: el último que empieza antes de start
+        first = 0 if start_ms is None else max(bisect.bisect_right(self._block_starts, start_ms) - 1, 0)
+
+        ts_parts, value_parts = [], []
+        for i, (first_ts, last_ts, count, data) in enumerate(self._iter_blocks()):
+            if i < first or (start_ms is not None and last_ts < start_ms):
+                continue
+            if end_ms is not None and first_ts > end_ms:
+                break
+            timestamps, values = decode_block(data, count, self.channels)
+            ts_parts.append(np.array(timestamps, dtype=np.int64))
+            value_parts.append(np.array(values, dtype=np.float64).reshape(-1, self.channels))
+
+        if not ts_parts:
+            return np.empty(0), np.empty((0, self.channels))
+        ts = np.concatenate(ts_parts)
+        values = np.concatenate(value_parts)
+        mask = np.ones(len(ts), dtype=bool)
+        if start_ms is not None:
+            mask &= ts >= start_ms
+        if end_ms is not None:
+            mask &= ts <= end_ms
+        return ts[mask] / 1000, values[mask]
@@ -0,0 +1,290 @@
+"""
+Persistencia en disco del historial de tráfico (SQLite en modo WAL).
+
+La UI solo encola filas en un SPSCRingBuffer; un hilo escritor las
+vuelca cada `flush_interval` segundos en una única transacción, así el
+bucle de 1 Hz nunca espera al disco. La tabla está agrupada por
+timestamp (WITHOUT ROWID), de modo que leer un rango es un seek por
+índice y no un recorrido completo. Las muestras más viejas que
+`retention_days` se borran en el mismo volcado; los acumulados de toda
+la vida no se tocan.
+"""
+
+import os
+import sqlite3
+import threading
+import numpy as np
+
+from core.paths import get_data_dir
+from core.ring_buffer import SPSCRingBuffer
+
+# seq distingue muestras del mismo milisegundo (dos lotes seguidos o un
+# reloj de pared que retrocedió): la clave (ts_ms, seq) nunca choca
+SAMPLES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    ts_ms INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    download_mb REAL NOT NULL,
+    upload_mb REAL NOT NULL,
+    elapsed_s REAL NOT NULL,
+    peak_download_mb REAL NOT NULL,
+    peak_upload_mb REAL NOT NULL,
+    PRIMARY KEY (ts_ms, seq)
+) WITHOUT ROWID
+"""
+
+SCHEMA = SAMPLES_SCHEMA + """;
+
+CREATE TABLE IF NOT EXISTS lifetime_stats (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    peak_download REAL NOT NULL,
+    peak_upload REAL NOT NULL,
+    total_download REAL NOT NULL,
+    total_upload REAL NOT NULL,
+    elapsed_total REAL NOT NULL,
+    sample_count INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO lifetime_stats VALUES (0, 0, 0, 0, 0, 0, 0);
+"""
+
+# Columnas de cada fila encolada y de cada fila leída (samples sin seq)
+ROW_FIELDS = 6
+COLUMNS = "ts_ms, download_mb, upload_mb, elapsed_s, peak_download_mb, peak_upload_mb"
+
+# seq = siguiente libre para ese milisegundo (seek por la clave primaria)
+INSERT_SAMPLE = (
+    "INSERT INTO samples VALUES (?1, (SELECT COALESCE(MAX(seq) + 1, 0) FROM samples WHERE ts_ms = ?1),"
+    " ?2, ?3, ?4, ?5, ?6)"
+)
+
+
+class HistoryStore:
+    """
+    Historial persistente de muestras de tráfico con escritura por lotes.
+
+    Además de las muestras guarda los acumulados de toda la vida (picos,
+    totales, tiempo cubierto), actualizados en la misma transacción que
+    las filas, para que DataManager los recupere al reiniciar.
+    """
+
+    DEFAULT_FILENAME = "history.db"
+
+    # Filas pendientes que tolera la cola antes de descartar
+    QUEUE_CAPACITY = 3600
+
+    # Días de muestras que se conservan (~8 M filas a 1 Hz)
+    RETENTION_DAYS = 90
+
+    def __init__(self, path: str | None = None, flush_interval: float = 5.0,
+                 retention_days: float | None = RETENTION_DAYS):
+        """
+        Args:
+            path: Ruta del archivo SQLite (por defecto en get_data_dir())
+            flush_interval: Segundos entre volcados a disco
+            retention_days: Antigüedad máxima de las muestras, contada desde
+                la más nueva escrita (None = conservar todo)
+        """
+        self.path = path or os.path.join(get_data_dir(), self.DEFAULT_FILENAME)
+        self.flush_interval = flush_interval
+        self.retention_ms = None if retention_days is None else round(retention_days * 86400 * 1000)
+        self._queue = SPSCRingBuffer(self.QUEUE_CAPACITY, ROW_FIELDS)
+        self._reset_pending = False
+
+        # El esquema se crea en el hilo que construye el store; el escritor
+        # abre su propia conexión (sqlite3 no comparte conexiones entre hilos)
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        self._migrate(conn)
+        conn.close()
+        self._reader = None
+
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run_writer, name="history-writer", daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre una conexión en modo WAL."""
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection):
+        """Pasa una tabla samples de versiones previas (clave ts_ms sola) a (ts_ms, seq)."""
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(samples)")]
+        if "seq" in columns:
+            return
+        conn.execute("BEGIN")
+        try:
+            conn.execute("ALTER TABLE samples RENAME TO samples_old")
+            conn.execute(SAMPLES_SCHEMA)
+            conn.execute(
+                "INSERT INTO samples SELECT ts_ms, 0, download_mb, upload_mb, elapsed_s,"
+                " peak_download_mb, peak_upload_mb FROM samples_old"
+            )
+            conn.execute("DROP TABLE samples_old")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+
+    def append(self, timestamp: float, download_mb: float, upload_mb: float,
+               elapsed_s: float = 1.0, peak_download: float | None = None, peak_upload: float | None = None) -> bool:
+        """
+        Encola una muestra para el próximo volcado (no toca el disco).
+
+        Args:
+            timestamp: Segundos epoch de la muestra
+            download_mb: Tasa promedio de descarga en MB/s
+            upload_mb: Tasa promedio de subida en MB/s
+            elapsed_s: Segundos reales que cubre la muestra
+            peak_download: Ráfaga máxima (opcional, por defecto la tasa)
+            peak_upload: Ráfaga máxima (opcional, por defecto la tasa)
+
+        Returns:
+            False si la cola estaba llena y la muestra se descartó
+        """
+        return self._queue.push((
+            round(timestamp * 1000), download_mb, upload_mb, elapsed_s,
+            download_mb if peak_download is None else max(peak_download, download_mb),
+            upload_mb if peak_upload is None else max(peak_upload, upload_mb),
+        ))
+
+    def _run_writer(self):
+        """Bucle del hilo escritor: vuelca la cola cada flush_interval."""
+        conn = self._connect()
+        try:
+            while not self._stop_event.wait(self.flush_interval):
+                self._flush(conn)
+            self._flush(conn)  # Último volcado al cerrar
+        finally:
+            conn.close()
+
+    def _flush(self, conn: sqlite3.Connection):
+        """Escribe las filas pendientes y los acumulados en una transacción."""
+        reset = self._reset_pending
+        rows = self._queue.drain()
+        if not len(rows) and not reset:
+            return
+
+        try:
+            with conn:
+                if reset:
+                    self._reset_pending = False
+                    conn.execute(
+                        "UPDATE lifetime_stats SET peak_download = 0, peak_upload = 0, total_download = 0,"
+                        " total_upload = 0, elapsed_total = 0, sample_count = 0"
+                    )
+                if not len(rows):
+                    return
+                # executemany sobre la lista: un solo statement preparado
+                conn.executemany(INSERT_SAMPLE, rows.tolist())
+                if self.retention_ms is not None:
+                    conn.execute("DELETE FROM samples WHERE ts_ms < ?",
+                                 (int(rows[:, 0].max()) - self.retention_ms,))
+                elapsed = rows[:, 3]
+                conn.execute(
+                    "UPDATE lifetime_stats SET"
+                    " peak_download = MAX(peak_download, ?), peak_upload = MAX(peak_upload, ?),"
+                    " total_download = total_download + ?, total_upload = total_upload + ?,"
+                    " elapsed_total = elapsed_total + ?, sample_count = sample_count + ?",
+                    (
+                        float(rows[:, 4].max()), float(rows[:, 5].max()),
+                        float(np.dot(rows[:, 1], elapsed)), float(np.dot(rows[:, 2], elapsed)),
+                        float(elapsed.sum()), len(rows),
+                    ),
+                )
+        except sqlite3.Error as e:
+            # Un error de disco no debe matar el hilo escritor
+            print(f"Error writing traffic history: {e}")
+
+    def read_range(self, start: float, end: float) -> np.ndarray:
+        """
+        Lee las muestras con timestamp en [start, end] (seek por la clave primaria).
+
+        Args:
+            start: Segundos epoch (inclusive)
+            end: Segundos epoch (inclusive)
+
+        Returns:
+            Array (n, 6): timestamp_s, download_mb, upload_mb, elapsed_s,
+            peak_download_mb, peak_upload_mb
+        """
+        if self._reader is None:
+            self._reader = self._connect()
+        rows = self._reader.execute(
+            f"SELECT {COLUMNS} FROM samples WHERE ts_ms BETWEEN ? AND ? ORDER BY ts_ms, seq",
+            (round(start * 1000), round(end * 1000)),
+        ).fetchall()
+        data = np.array(rows, dtype=np.float64).reshape(-1, ROW_FIELDS)
+        data[:, 0] /= 1000
+        return data
+
+    def iter_range(self, start: float, end: float, chunk_rows: int = 65536):
+        """
+        Recorre las muestras de [start, end] en bloques de a lo sumo `chunk_rows`.
+
+        Pagina por clave ((ts_ms, seq) > último leído) en lugar de OFFSET, así cada
+        bloque es un seek por índice y la memoria no depende del rango. Abre
+        su propia conexión: puede usarse desde un hilo de exportación
+        mientras la UI sigue leyendo y el escritor sigue volcando.
+
+        Args:
+            start: Segundos epoch (inclusive)
+            end: Segundos epoch (inclusive)
+            chunk_rows: Filas máximas por bloque
+
+        Yields:
+            Arrays (n, 6) con el mismo formato que read_range()
+        """
+        conn = self._connect()
+        try:
+            last = (round(start * 1000), -1)
+            end_ms = round(end * 1000)
+            while True:
+                rows = conn.execute(
+                    f"SELECT {COLUMNS}, seq FROM samples WHERE (ts_ms, seq) > (?, ?) AND ts_ms <= ?"
+                    " ORDER BY ts_ms, seq LIMIT ?",
+                    (*last, end_ms, chunk_rows),
+                ).fetchall()
+                if not rows:
+                    return
+                last = (rows[-1][0], rows[-1][-1])
+                data = np.array(rows, dtype=np.float64)[:, :ROW_FIELDS]
+                data[:, 0] /= 1000
+                yield data
+                if len(rows) < chunk_rows:
+                    return
+        finally:
+            conn.close()
+
+    def load_stats(self) -> dict:
+        """
+        Acumulados persistidos (ya volcados) de toda la vida.
+
+        Returns:
+            Diccionario con peak, total, elapsed_total y sample_count
+        """
+        if self._reader is None:
+            self._reader = self._connect()
+        row = self._reader.execute(
+            "SELECT peak_download, peak_upload, total_download, total_upload, elapsed_total, sample_count"
+            " FROM lifetime_stats WHERE id = 0"
+        ).fetchone()
+        keys = ("peak_download", "peak_upload", "total_download", "total_upload", "elapsed_total", "sample_count")
+        return dict(zip(keys, row))
+
+    def reset_stats(self):
+        """Pide al escritor reiniciar los acumulados en el próximo volcado."""
+        self._reset_pending = True
+
+    def close(self):
+        """Vuelca lo pendiente y detiene el hilo escritor."""
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=5)
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
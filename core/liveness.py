@@ -0,0 +1,126 @@
+"""
+Seguimiento de vida por host para rescans incrementales.
+
+Cada IP que respondió se da por viva durante un TTL (con una dispersión
+al azar, así los hosts descubiertos en el mismo barrido no vencen todos
+juntos). Un rescan incremental solo consulta:
+- direcciones nunca consultadas,
+- hosts vivos cuyo TTL venció,
+- hosts que dejaron de responder y direcciones que nunca respondieron,
+  con backoff exponencial (base, 2·base, 4·base, ... hasta un tope).
+
+En una red estable casi todas las direcciones están vivas y sin vencer o
+muertas con backoff largo, así que un rescan envía una fracción de los
+pedidos de un barrido completo.
+"""
+
+import ipaddress
+import random
+import time
+from typing import Callable
+
+# Segundos que un host que respondió se da por vivo sin volver a consultarlo
+DEFAULT_TTL = 900.0
+# Fracción del TTL que se descuenta al azar por host (0.25 = vence entre 75% y 100%)
+TTL_SPREAD = 0.25
+# Backoff para direcciones que no responden; el tope es alto porque un host
+# nuevo que habla con nosotros ya aparece antes por la tabla de vecinos
+BACKOFF_BASE = 60.0
+BACKOFF_MAX = 7200.0
+
+
+class HostState:
+    """Estado de una dirección consultada alguna vez."""
+
+    __slots__ = ("device", "last_seen", "misses", "next_probe")
+
+    def __init__(self):
+        self.device = None  # Último dispositivo que respondió (None si no está vivo)
+        self.last_seen = None
+        self.misses = 0  # Consultas seguidas sin respuesta
+        self.next_probe = 0.0
+
+
+class LivenessTracker:
+    """TTL de vida y backoff por dirección IPv4."""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, backoff_base: float = BACKOFF_BASE,
+                 backoff_max: float = BACKOFF_MAX, ttl_spread: float = TTL_SPREAD,
+                 clock: Callable[[], float] = time.monotonic, rng: random.Random | None = None):
+        """
+        Args:
+            ttl: Segundos que un host vivo no se vuelve a consultar
+            backoff_base: Espera tras la primera consulta sin respuesta
+            backoff_max: Tope de la espera entre consultas sin respuesta
+            ttl_spread: Fracción del TTL que se descuenta al azar por host
+            clock: Reloj monotónico (inyectable para tests y benchmarks)
+            rng: Generador para la dispersión del TTL
+        """
+        self.ttl = ttl
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.ttl_spread = ttl_spread
+        self.clock = clock
+        self._rng = rng or random.Random()
+        self._hosts = {}  # ip (str) -> HostState
+
+    def __len__(self) -> int:
+        return len(self._hosts)
+
+    def state(self, ip: str) -> HostState | None:
+        return self._hosts.get(ip)
+
+    def not_due(self, network, now: float) -> set:
+        """
+        IPs de `network` que todavía no hace falta consultar.
+
+        Recorre solo las direcciones conocidas, no todo el rango.
+        """
+        network = ipaddress.ip_network(network, strict=False)
+        # list() copia atómicamente: la captura pasiva también registra hosts
+        return {
+            ip for ip, state in list(self._hosts.items())
+            if now < state.next_probe and ipaddress.ip_address(ip) in network
+        }
+
+    def live(self, network, exclude=()) -> list:
+        """Dispositivos vivos (sin vencer o no) de `network`, menos los de `exclude`."""
+        network = ipaddress.ip_network(network, strict=False)
+        return [
+            state.device for ip, state in list(self._hosts.items())
+            if state.device is not None and ip not in exclude and ipaddress.ip_address(ip) in network
+        ]
+
+    def cached(self, ip: str, mac: str) -> dict | None:
+        """El dispositivo guardado si `ip` sigue respondiendo con la misma MAC."""
+        state = self._hosts.get(ip)
+        if state is not None and state.device is not None and state.device.get("mac") == mac:
+            return state.device
+        return None
+
+    def seen(self, device: dict, now: float):
+        """Registra una respuesta: vivo por un TTL (disperso) desde `now`."""
+        state = self._hosts.setdefault(device["ip"], HostState())
+        state.device = device
+        state.last_seen = now
+        state.misses = 0
+        state.next_probe = now + self.ttl * (1 - self.ttl_spread * self._rng.random())
+
+    def missed(self, ip: str, now: float):
+        """Registra una consulta sin respuesta: deja de estar vivo y entra en backoff."""
+        state = self._hosts.setdefault(ip, HostState())
+        state.device = None
+        state.misses += 1
+        state.next_probe = now + min(self.backoff_base * 2 ** (state.misses - 1), self.backoff_max)
+
+    def record_sweep(self, probed, answered, now: float):
+        """
+        Registra el resultado de un barrido.
+
+        Args:
+            probed: IPs consultadas
+            answered: IPs que respondieron (ya registradas con seen())
+        """
+        for ip in probed:
+            if ip not in answered:
+                self.missed(ip, now)
@@ -0,0 +1,185 @@
+"""
+Lectura de la tabla de vecinos del kernel (caché ARP / NDP) en Linux.
+
+Permite conocer los hosts vivos sin enviar un solo paquete:
+- netlink: RTM_GETNEIGH vía rtnetlink; IPv4 e IPv6, con el estado NUD de
+           cada entrada (REACHABLE, STALE, ...).
+- procfs:  /proc/net/arp; solo IPv4 y sin estado (una entrada completa
+           puede estar vencida, así que se informa como "stale").
+
+Ambos exponen:
+    read() -> list[Neighbor]
+    close()
+"""
+
+import ipaddress
+import socket
+import struct
+from typing import NamedTuple
+
+from core.netlink import NetlinkSocket, iter_attributes
+
+# Orden de preferencia para cada backend solicitado
+FALLBACK_ORDER = {
+    "auto": ("netlink", "procfs"),
+    "netlink": ("netlink", "procfs"),
+    "procfs": ("procfs",),
+}
+
+# Estados que se informan: frescos (no hace falta reconfirmarlos) o vencidos
+REACHABLE = "reachable"
+STALE = "stale"
+
+
+class Neighbor(NamedTuple):
+    """Entrada de la tabla de vecinos con dirección de enlace resuelta."""
+    ip: str
+    mac: str
+    interface: str
+    state: str  # REACHABLE o STALE
+
+
+class ProcNetArpNeighbors:
+    """Backend Linux que parsea /proc/net/arp (solo IPv4)."""
+
+    name = "procfs"
+    PATH = "/proc/net/arp"
+    ATF_COM = 0x2  # Entrada completa (MAC resuelta)
+
+    def __init__(self, path: str = PATH):
+        """
+        Args:
+            path: Ruta del archivo (configurable para tests)
+        """
+        self.path = path
+
+    def read(self) -> list:
+        """Entradas completas de la caché ARP."""
+        with open(self.path, "rb") as f:
+            lines = f.read().splitlines()[1:]  # Sin la cabecera
+        neighbors = []
+        for line in lines:
+            fields = line.split()
+            if len(fields) < 6:
+                raise ValueError(f"Formato inesperado en {self.path}")
+            if not int(fields[2], 16) & self.ATF_COM:
+                continue
+            # Sin estado NUD: una entrada completa puede estar vencida
+            neighbors.append(Neighbor(fields[0].decode(), fields[3].decode().lower(), fields[5].decode(), STALE))
+        return neighbors
+
+    def close(self):
+        """Nada que liberar."""
+
+
+class NetlinkNeighbors:
+    """
+    Backend Linux basado en rtnetlink (RTM_GETNEIGH).
+
+    Un único volcado trae IPv4 e IPv6; las entradas INCOMPLETE/FAILED
+    (sin MAC o que no respondieron) y las de multicast se descartan.
+    """
+
+    name = "netlink"
+
+    # Constantes de linux/rtnetlink.h y linux/neighbour.h
+    RTM_NEWNEIGH = 28
+    RTM_GETNEIGH = 30
+    NDA_DST = 1
+    NDA_LLADDR = 2
+    NDMSG = struct.Struct("=BxxxiHBB")
+    NUD_INCOMPLETE = 0x01
+    NUD_REACHABLE = 0x02
+    NUD_STALE = 0x04
+    NUD_DELAY = 0x08
+    NUD_PROBE = 0x10
+    NUD_FAILED = 0x20
+    NUD_NOARP = 0x40
+    NUD_PERMANENT = 0x80
+    # NOARP queda afuera: son entradas de multicast/punto a punto, no hosts
+    FRESH_STATES = NUD_REACHABLE | NUD_PERMANENT
+    STALE_STATES = NUD_STALE | NUD_DELAY | NUD_PROBE
+
+    def __init__(self):
+        self._nl = NetlinkSocket()
+        self._request = self.NDMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+        self._names = {}  # ifindex -> nombre
+
+    def _interface_name(self, ifindex: int) -> str:
+        name = self._names.get(ifindex)
+        if name is None:
+            try:
+                name = socket.if_indextoname(ifindex)
+            except OSError:
+                name = str(ifindex)
+            self._names[ifindex] = name
+        return name
+
+    def read(self) -> list:
+        """Entradas IPv4 e IPv6 con MAC resuelta."""
+        neighbors = []
+        buf = self._nl.buf
+        for mtype, start, end in self._nl.dump(self.RTM_GETNEIGH, self._request):
+            if mtype != self.RTM_NEWNEIGH:
+                continue
+            family, ifindex, state, _flags, _type = self.NDMSG.unpack_from(buf, start)
+            if state & self.FRESH_STATES:
+                status = REACHABLE
+            elif state & self.STALE_STATES:
+                status = STALE
+            else:
+                continue  # INCOMPLETE / FAILED / NONE
+            dst = lladdr = None
+            for atype, astart, aend in iter_attributes(buf, start + self.NDMSG.size, end):
+                if atype == self.NDA_DST:
+                    dst = bytes(buf[astart:aend])
+                elif atype == self.NDA_LLADDR:
+                    lladdr = bytes(buf[astart:aend])
+            if dst is None or not lladdr or not any(lladdr):
+                continue
+            ip = socket.inet_ntop(family, dst)
+            if ipaddress.ip_address(ip).is_multicast:
+                continue
+            neighbors.append(Neighbor(ip, lladdr.hex(":"), self._interface_name(ifindex), status))
+        return neighbors
+
+    def close(self):
+        """Cierra el socket netlink."""
+        self._nl.close()
+
+
+BACKENDS = {
+    "netlink": NetlinkNeighbors,
+    "procfs": ProcNetArpNeighbors,
+}
+
+
+def read_neighbors(preferred: str = "auto") -> list:
+    """
+    Lee la tabla de vecinos con el primer backend disponible.
+
+    Args:
+        preferred: "auto", "netlink" o "procfs"
+
+    Returns:
+        Lista de Neighbor (vacía si no hay backend, p. ej. fuera de Linux)
+    """
+    for name in FALLBACK_ORDER.get(preferred, FALLBACK_ORDER["auto"]):
+        backend = None
+        try:
+            backend = BACKENDS[name]()
+            return backend.read()
+        except (OSError, AttributeError, ValueError) as e:
+            print(f"Neighbor backend '{name}' unavailable: {e}")
+        finally:
+            if backend is not None:
+                backend.close()
+    return []
+
+
+def in_network(neighbor: Neighbor, network) -> bool:
+    """True si el vecino es IPv4 y está dentro de `network`."""
+    try:
+        return ipaddress.ip_address(neighbor.ip) in network
+    except ValueError:
+        return False
@@ -0,0 +1,273 @@
+"""
+Backends de lectura de contadores de interfaz para NetworkSensor.
+
+- psutil:  portable, pero crea un namedtuple por interfaz en cada llamada.
+- procfs:  Linux, lee /proc/net/dev con os.preadv sobre un buffer reutilizado
+           y lo parsea ahí mismo con una regex precompilada (sin copiar el
+           buffer); solo se crean los bytes de nombre, rx y tx por interfaz.
+- netlink: Linux, contadores rtnl_link_stats64 (64 bits) vía RTM_GETSTATS,
+           con RTM_GETLINK solo para resolver nombres.
+
+Todos exponen la misma interfaz:
+    interface_names() -> list[str]    (camino lento, solo al cambiar interfaces)
+    read_into(out) -> int             (llena out[i] = [rx_bytes, tx_bytes])
+
+read_into retorna la cantidad de interfaces presentes, o -1 si ya no
+coinciden con las de la última llamada a interface_names() (una interfaz
+reemplazó a otra sin cambiar la cantidad): las filas se asignan por
+posición, así que hay que volver a pedir los nombres antes de restar.
+"""
+
+import os
+import re
+import socket
+import struct
+import numpy as np
+import psutil
+
+from core.netlink import RTATTR, NetlinkSocket, iter_attributes
+
+# Orden de preferencia para cada backend solicitado (siempre termina en psutil)
+FALLBACK_ORDER = {
+    "auto": ("procfs", "psutil"),
+    "procfs": ("procfs", "psutil"),
+    "netlink": ("netlink", "procfs", "psutil"),
+    "psutil": ("psutil",),
+}
+
+
+class PsutilCounters:
+    """Backend portable basado en psutil.net_io_counters(pernic=True)."""
+
+    name = "psutil"
+
+    def __init__(self):
+        self._names = None  # De la última llamada a interface_names()
+
+    def interface_names(self) -> list:
+        """Nombres de interfaz en el orden en que read_into llena las filas."""
+        self._names = list(psutil.net_io_counters(pernic=True))
+        return list(self._names)
+
+    def read_into(self, out: np.ndarray) -> int:
+        """
+        Llena `out` con [bytes_recv, bytes_sent] por interfaz.
+
+        Returns:
+            Cantidad de interfaces presentes (si difiere de len(out),
+            el conjunto cambió y hay que volver a pedir los nombres), o -1
+            si los nombres ya no son los de interface_names()
+        """
+        counters = psutil.net_io_counters(pernic=True)
+        if self._names is not None and len(counters) == len(self._names) and \
+                any(name != known for name, known in zip(counters, self._names)):
+            return -1
+        rows = len(out)
+        for i, c in enumerate(counters.values()):
+            if i >= rows:
+                break
+            out[i, 0] = c.bytes_recv
+            out[i, 1] = c.bytes_sent
+        return len(counters)
+
+    def close(self):
+        """Nada que liberar."""
+
+
+class ProcNetDevCounters:
+    """
+    Backend Linux que lee /proc/net/dev directamente.
+
+    El archivo se mantiene abierto y se relee con os.preadv (offset 0)
+    sobre un bytearray fijo, sin reabrirlo ni decodificarlo a str. Una
+    regex precompilada recorre el buffer entre offsets (sin copiarlo) y
+    captura solo nombre, rx_bytes y tx_bytes de cada línea: no se crean
+    namedtuples ni diccionarios por interfaz como en psutil.
+    """
+
+    name = "procfs"
+    PATH = "/proc/net/dev"
+    # nombre: rx_bytes + 7 de recepción, tx_bytes + 7 de transmisión.
+    # Los nombres de interfaz no pueden contener ':' ni espacios
+    LINE = re.compile(rb"^ *([^\s:]+): *(\d+)(?: +\d+){7} +(\d+)(?: +\d+){7} *$", re.MULTILINE)
+
+    def __init__(self, path: str = PATH, buffer_size: int = 1 << 16):
+        """
+        Args:
+            path: Ruta del archivo (configurable para tests)
+            buffer_size: Tamaño inicial del buffer de lectura
+        """
+        self.path = path
+        self._fd = os.open(path, os.O_RDONLY)
+        self._alloc(buffer_size)
+        self._names = None  # Nombres (bytes) de la última llamada a interface_names()
+
+    def _alloc(self, size: int):
+        """(Re)asigna el buffer de lectura."""
+        self._buf = bytearray(size)
+
+    def _read(self) -> int:
+        """Relee el archivo completo en el buffer; lo agranda si no alcanza."""
+        while True:
+            size = os.preadv(self._fd, [self._buf], 0)
+            if size < len(self._buf):
+                return size
+            self._alloc(len(self._buf) * 2)
+
+    def _data_start(self, size: int) -> int:
+        """Offset donde terminan las dos líneas de cabecera."""
+        first = self._buf.find(b"\n", 0, size)
+        second = self._buf.find(b"\n", first + 1, size)
+        return second + 1 if second >= 0 else size
+
+    def _lines(self) -> list:
+        """Relee el archivo y retorna (nombre, rx_bytes, tx_bytes) por interfaz."""
+        size = self._read()
+        start = self._data_start(size)
+        # La regex recorre el bytearray entre offsets: el buffer no se copia
+        lines = self.LINE.findall(self._buf, start, size)
+        if len(lines) != self._buf.count(b"\n", start, size):
+            raise ValueError(f"Formato inesperado en {self.path}")
+        return lines
+
+    def interface_names(self) -> list:
+        """Nombres de interfaz (camino lento: decodifica el texto)."""
+        self._names = [line[0] for line in self._lines()]
+        return [name.decode("ascii", "replace") for name in self._names]
+
+    def read_into(self, out: np.ndarray) -> int:
+        """
+        Llena `out` con [rx_bytes, tx_bytes] por interfaz.
+
+        Returns:
+            Cantidad de interfaces presentes, o -1 si los nombres ya no son
+            los de interface_names()
+        """
+        lines = self._lines()
+        # Misma cantidad no alcanza: una veth puede reemplazar a otra
+        if self._names is not None and [line[0] for line in lines] != self._names:
+            return -1
+
+        count = len(lines)
+        rows = min(count, len(out))
+        # NumPy convierte los bytes numéricos directamente (sin int() por campo)
+        if rows:
+            out[:rows] = [line[1:] for line in lines[:rows]]
+        return count
+
+    def close(self):
+        """Cierra el descriptor de archivo."""
+        os.close(self._fd)
+
+
+class NetlinkCounters:
+    """
+    Backend Linux basado en rtnetlink.
+
+    El camino rápido usa RTM_GETSTATS filtrado a IFLA_STATS_LINK_64: el
+    kernel responde solo rtnl_link_stats64 por interfaz, sin los ~40
+    atributos que trae RTM_GETLINK. RTM_GETLINK se usa únicamente para
+    mapear ifindex -> nombre. Los contadores son de 64 bits.
+    """
+
+    name = "netlink"
+
+    # Constantes de linux/rtnetlink.h y linux/if_link.h
+    RTM_NEWLINK = 16
+    RTM_GETLINK = 18
+    RTM_NEWSTATS = 92
+    RTM_GETSTATS = 94
+    IFLA_IFNAME = 3
+    IFLA_STATS_LINK_64 = 1
+    IFINFOMSG = struct.Struct("=BxHiII")
+    IF_STATS_MSG = struct.Struct("=BBHII")
+    # rtnl_link_stats64: rx_packets, tx_packets, rx_bytes, tx_bytes, ...
+    STATS64_BYTES = struct.Struct("=QQ")
+    STATS64_BYTES_OFFSET = 16
+
+    def __init__(self):
+        self._nl = NetlinkSocket()
+        self._link_request = self.IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+        self._stats_request = self.IF_STATS_MSG.pack(
+            socket.AF_UNSPEC, 0, 0, 0, 1 << (self.IFLA_STATS_LINK_64 - 1)
+        )
+        self._rows = {}  # ifindex -> fila
+
+    def interface_names(self) -> list:
+        """Nombres de interfaz; también reconstruye el mapa ifindex -> fila."""
+        names = []
+        rows = {}
+        buf = self._nl.buf
+        for mtype, start, end in self._nl.dump(self.RTM_GETLINK, self._link_request):
+            if mtype != self.RTM_NEWLINK:
+                continue
+            ifindex = self.IFINFOMSG.unpack_from(buf, start)[2]
+            for atype, astart, aend in iter_attributes(buf, start + self.IFINFOMSG.size, end):
+                if atype == self.IFLA_IFNAME:
+                    rows[ifindex] = len(names)
+                    names.append(bytes(buf[astart:aend]).rstrip(b"\0").decode())
+                    break
+        self._rows = rows
+        return names
+
+    def read_into(self, out: np.ndarray) -> int:
+        """
+        Llena `out` con [rx_bytes, tx_bytes] por interfaz.
+
+        Returns:
+            Cantidad de interfaces presentes, o -1 si apareció un ifindex
+            desconocido (hay que volver a pedir los nombres)
+        """
+        count = 0
+        unknown = False
+        rows = len(out)
+        buf = self._nl.buf
+        data = self.IF_STATS_MSG.size + RTATTR.size
+        for mtype, start, end in self._nl.dump(self.RTM_GETSTATS, self._stats_request):
+            if mtype != self.RTM_NEWSTATS:
+                continue
+            count += 1
+            row = self._rows.get(self.IF_STATS_MSG.unpack_from(buf, start)[3])
+            # Una interfaz que reemplaza a otra (aunque tome su nombre) trae
+            # un ifindex nuevo: nunca hereda la fila de la anterior
+            if row is None:
+                unknown = True
+            elif row < rows:
+                out[row] = self.STATS64_BYTES.unpack_from(buf, start + data + self.STATS64_BYTES_OFFSET)
+        return -1 if unknown else count
+
+    def close(self):
+        """Cierra el socket netlink."""
+        self._nl.close()
+
+
+BACKENDS = {
+    "psutil": PsutilCounters,
+    "procfs": ProcNetDevCounters,
+    "netlink": NetlinkCounters,
+}
+
+
+def create_counter_backend(preferred: str = "auto"):
+    """
+    Crea el backend pedido, cayendo a los siguientes si no está disponible
+    (otro sistema operativo, sin permisos, formato inesperado).
+
+    Args:
+        preferred: "auto", "procfs", "netlink" o "psutil"
+
+    Returns:
+        Instancia de backend lista para usar
+    """
+    for name in FALLBACK_ORDER.get(preferred, FALLBACK_ORDER["auto"]):
+        backend = None
+        try:
+            backend = BACKENDS[name]()
+            # Lectura de prueba: valida permisos y formato
+            backend.read_into(np.zeros((0, 2), dtype=np.int64))
+            return backend
+        except (OSError, AttributeError, ValueError) as e:
+            print(f"Counter backend '{name}' unavailable: {e}")
+            if backend is not None:
+                backend.close()
+    return PsutilCounters()
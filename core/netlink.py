@@ -0,0 +1,94 @@
+"""
+Cliente mínimo de rtnetlink (Linux) sin dependencias externas.
+Envía peticiones de volcado (NLM_F_DUMP) y recorre las respuestas
+sobre un buffer reutilizado, sin copiar cada mensaje.
+"""
+
+import socket
+import struct
+
+# Constantes de linux/netlink.h y linux/rtnetlink.h
+NETLINK_ROUTE = 0
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLA_TYPE_MASK = 0x3FFF
+
+# Estructuras: nlmsghdr y rtattr
+NLMSG_HDR = struct.Struct("=IHHII")
+RTATTR = struct.Struct("=HH")
+
+
+def align4(length: int) -> int:
+    """Redondea una longitud al múltiplo de 4 (NLMSG_ALIGN / RTA_ALIGN)."""
+    return (length + 3) & ~3
+
+
+class NetlinkSocket:
+    """
+    Socket NETLINK_ROUTE con buffer de recepción reutilizable.
+    Las respuestas se entregan como offsets dentro de `self.buf`, válidos
+    solo hasta la siguiente iteración del volcado.
+    """
+
+    def __init__(self, buffer_size: int = 1 << 16):
+        """
+        Args:
+            buffer_size: Tamaño del buffer de recepción en bytes
+        """
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        self.sock.bind((0, 0))
+        self.buf = bytearray(buffer_size)
+        self.seq = 0
+
+    def dump(self, msg_type: int, payload: bytes):
+        """
+        Envía una petición de volcado y recorre los mensajes de respuesta.
+
+        Args:
+            msg_type: Tipo de petición (ej: RTM_GETLINK)
+            payload: Cabecera específica de la familia (ej: ifinfomsg)
+
+        Yields:
+            Tuplas (tipo, inicio_payload, fin_mensaje) con offsets en self.buf
+        """
+        self.seq += 1
+        header = NLMSG_HDR.pack(NLMSG_HDR.size + len(payload), msg_type, NLM_F_REQUEST | NLM_F_DUMP, self.seq, 0)
+        self.sock.send(header + payload)
+
+        while True:
+            received = self.sock.recv_into(self.buf)
+            offset = 0
+            while offset + NLMSG_HDR.size <= received:
+                length, mtype, _flags, seq, _pid = NLMSG_HDR.unpack_from(self.buf, offset)
+                if length < NLMSG_HDR.size:
+                    return
+                if seq == self.seq:
+                    if mtype == NLMSG_DONE:
+                        return
+                    if mtype == NLMSG_ERROR:
+                        error = struct.unpack_from("=i", self.buf, offset + NLMSG_HDR.size)[0]
+                        raise OSError(-error, "netlink error")
+                    yield mtype, offset + NLMSG_HDR.size, offset + length
+                offset += align4(length)
+
+    def close(self):
+        """Cierra el socket."""
+        self.sock.close()
+
+
+def iter_attributes(buf, start: int, end: int):
+    """
+    Recorre los atributos rtattr de un mensaje.
+
+    Yields:
+        Tuplas (tipo, inicio_datos, fin_datos) con offsets en `buf`
+    """
+    offset = start
+    while offset + RTATTR.size <= end:
+        length, atype = RTATTR.unpack_from(buf, offset)
+        if length < RTATTR.size:
+            return
+        yield atype & NLA_TYPE_MASK, offset + RTATTR.size, offset + length
+        offset += align4(length)
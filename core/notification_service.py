@@ -89,7 +89,23 @@ class NotificationService:
         message = f"Current traffic: {current_mb:.2f} MB/s\nThreshold: {threshold_mb:.2f} MB/s"
         
         return self.notify(title, message, notification_type="high_traffic")
-    
+
+    def notify_quota_warning(self, used_mb: float, cap_mb: float, exhausts_at: float = None):
+        """
+        Notifica que la cuota de datos del ciclo está por agotarse.
+
+        Args:
+            used_mb: MB consumidos en el ciclo
+            cap_mb: Cuota del ciclo en MB
+            exhausts_at: Epoch estimado de agotamiento (opcional)
+        """
+        title = "📶 Data Cap Warning"
+        message = f"Used: {used_mb / 1024:.2f} GB of {cap_mb / 1024:.2f} GB ({used_mb / cap_mb:.0%})"
+        if exhausts_at is not None:
+            message += f"\nCap reached by: {time.strftime('%Y-%m-%d %H:%M', time.localtime(exhausts_at))}"
+
+        return self.notify(title, message, notification_type="quota")
+
     def reset_cooldown(self, notification_type: str = None):
         """
         Reinicia el cooldown para un tipo de notificación específico o todos.
@@ -0,0 +1,366 @@
+"""
+Descubrimiento pasivo de dispositivos a partir del tráfico de la red.
+
+Un hilo de larga vida escucha en un socket AF_PACKET con un filtro BPF
+clásico en el kernel que deja pasar solo:
+- ARP (cualquier opcode): IP y MAC del remitente.
+- DHCP (UDP 67/68): MAC del cliente, IP pedida/asignada y hostname.
+- mDNS (UDP 5353): IP y MAC del emisor, nombre .local de sus registros A.
+- SSDP (UDP 1900): IP y MAC del emisor.
+
+El resto del tráfico nunca llega al proceso, y el hilo duerme en poll()
+sin timeout (se despierta para detenerse por un pipe), así que con la red
+quieta no consume CPU. Solo IPv4; los fragmentos y VLANs se descartan en
+el filtro.
+
+Para tests y análisis offline, `replay()` procesa tramas de un archivo
+pcap (ver read_pcap) con el mismo parseo.
+"""
+
+import os
+import select
+import socket
+import struct
+import threading
+import time
+from typing import Callable, NamedTuple
+
+from core.arp_engine import ETH_P_ARP, ETH_P_IP, attach_filter, format_mac, raw_available
+
+ETH_P_ALL = 0x0003
+PACKET_OUTGOING = 4  # pkttype de las tramas que envía este host
+IPPROTO_UDP = 17
+
+DHCP_SERVER_PORT = 67
+DHCP_CLIENT_PORT = 68
+MDNS_PORT = 5353
+SSDP_PORT = 1900
+
+# Origen de cada observación
+ARP = "arp"
+DHCP = "dhcp"
+MDNS = "mdns"
+SSDP = "ssdp"
+
+# Bytes que el filtro entrega por trama (alcanza para DHCP y mDNS típicos)
+SNAPLEN = 2048
+
+# Filtro BPF: "arp or (ip and udp and not ip fragment and
+# udp dst port in (67, 68, 5353, 1900))"; (code, jt, jf, k)
+PASSIVE_BPF = (
+    (0x28, 0, 0, 12),                # 0: ldh [12]              (ethertype)
+    (0x15, 11, 0, ETH_P_ARP),        # 1: jeq #0x806            -> aceptar
+    (0x15, 0, 11, ETH_P_IP),         # 2: jeq #0x800            sino -> descartar
+    (0x30, 0, 0, 23),                # 3: ldb [23]              (protocolo IP)
+    (0x15, 0, 9, IPPROTO_UDP),       # 4: jeq #17               sino -> descartar
+    (0x28, 0, 0, 20),                # 5: ldh [20]              (flags + offset)
+    (0x45, 7, 0, 0x1FFF),            # 6: jset #0x1fff          fragmento -> descartar
+    (0xB1, 0, 0, 14),                # 7: ldxb 4*([14]&0xf)     (largo cabecera IP)
+    (0x48, 0, 0, 16),                # 8: ldh [x+16]            (puerto UDP destino)
+    (0x15, 3, 0, DHCP_SERVER_PORT),  # 9: jeq #67               -> aceptar
+    (0x15, 2, 0, DHCP_CLIENT_PORT),  # 10: jeq #68              -> aceptar
+    (0x15, 1, 0, MDNS_PORT),         # 11: jeq #5353            -> aceptar
+    (0x15, 0, 1, SSDP_PORT),         # 12: jeq #1900            sino -> descartar
+    (0x06, 0, 0, SNAPLEN),           # 13: ret #SNAPLEN
+    (0x06, 0, 0, 0),                 # 14: ret #0
+)
+
+# Cabeceras por offset
+ETHER = struct.Struct("!6s6sH")
+ARP_SENDER = struct.Struct("!H6s4s")  # opcode, sha, spa (desde el offset 20)
+UDP_PORTS = struct.Struct("!HH")
+BOOTP = struct.Struct("!BBBB4xHH4s4s4s4s16s")  # op .. chaddr (sin sname/file)
+BOOTP_OPTIONS_OFFSET = 236
+DHCP_MAGIC = b"\x63\x82\x53\x63"
+DNS_HEADER = struct.Struct("!HHHHHH")
+
+DHCP_OPT_HOSTNAME = 12
+DHCP_OPT_REQUESTED_IP = 50
+DHCP_OPT_MESSAGE_TYPE = 53
+DHCP_ACK = 5
+
+DNS_TYPE_A = 1
+
+# Una misma observación (IP, MAC, nombre) se vuelve a informar recién
+# pasado este intervalo: el chatter de mDNS/SSDP no inunda la UI
+REFRESH_INTERVAL = 60.0
+
+NO_ADDRESS = b"\x00" * 4
+
+
+class Observation(NamedTuple):
+    """Dispositivo visto en el tráfico."""
+    ip: str
+    mac: str
+    interface: str
+    source: str  # ARP, DHCP, MDNS o SSDP
+    hostname: str | None = None
+
+
+def _valid(ip: bytes, mac: bytes) -> bool:
+    """Descarta remitentes sin IP (sondas ARP, DHCP sin dirección) y MACs de grupo."""
+    return ip != NO_ADDRESS and not mac[0] & 0x01 and any(mac)
+
+
+def _dhcp_options(payload, offset: int) -> dict:
+    """Opciones DHCP (código -> bytes) desde `offset` hasta END."""
+    options = {}
+    end = len(payload)
+    while offset < end:
+        code = payload[offset]
+        if code == 255:  # END
+            break
+        if code == 0:  # PAD
+            offset += 1
+            continue
+        if offset + 1 >= end:
+            break
+        length = payload[offset + 1]
+        options[code] = bytes(payload[offset + 2:offset + 2 + length])
+        offset += 2 + length
+    return options
+
+
+def _parse_dhcp(payload, interface: str) -> Observation | None:
+    if len(payload) < BOOTP_OPTIONS_OFFSET + 4 or payload[BOOTP_OPTIONS_OFFSET:BOOTP_OPTIONS_OFFSET + 4] != DHCP_MAGIC:
+        return None
+    op, htype, hlen, _hops, _secs, _flags, ciaddr, yiaddr, _siaddr, _giaddr, chaddr = BOOTP.unpack_from(payload)
+    if htype != 1 or hlen != 6:
+        return None
+    mac = chaddr[:6]
+    options = _dhcp_options(payload, BOOTP_OPTIONS_OFFSET + 4)
+    if op == 2:
+        # Respuesta del servidor: solo un ACK confirma la dirección
+        if options.get(DHCP_OPT_MESSAGE_TYPE) != bytes([DHCP_ACK]):
+            return None
+        ip = yiaddr
+    else:
+        ip = ciaddr if ciaddr != NO_ADDRESS else options.get(DHCP_OPT_REQUESTED_IP, NO_ADDRESS)
+    if len(ip) != 4 or not _valid(ip, mac):
+        return None
+    hostname = options.get(DHCP_OPT_HOSTNAME)
+    return Observation(socket.inet_ntoa(ip), format_mac(mac), interface, DHCP,
+                       hostname.decode(errors="replace") if hostname else None)
+
+
+def _read_name(payload, offset: int):
+    """Nombre DNS en `offset` (con punteros de compresión). Retorna (nombre, offset siguiente)."""
+    labels = []
+    next_offset = None
+    for _ in range(128):  # Tope contra punteros en ciclo
+        length = payload[offset]
+        if length & 0xC0 == 0xC0:
+            if next_offset is None:
+                next_offset = offset + 2
+            offset = ((length & 0x3F) << 8) | payload[offset + 1]
+            continue
+        if length == 0:
+            return ".".join(labels), offset + 1 if next_offset is None else next_offset
+        labels.append(bytes(payload[offset + 1:offset + 1 + length]).decode(errors="replace"))
+        offset += 1 + length
+    raise ValueError("DNS name too long")
+
+
+def _mdns_hostname(payload, src_ip: bytes) -> str | None:
+    """Nombre del registro A de una respuesta mDNS que apunta a `src_ip` (sin '.local')."""
+    _id, flags, qdcount, ancount, nscount, arcount = DNS_HEADER.unpack_from(payload)
+    if not flags & 0x8000:  # Consulta, no respuesta
+        return None
+    offset = DNS_HEADER.size
+    for _ in range(qdcount):
+        _name, offset = _read_name(payload, offset)
+        offset += 4
+    for _ in range(ancount + nscount + arcount):
+        name, offset = _read_name(payload, offset)
+        rtype, _rclass, _ttl, rdlength = struct.unpack_from("!HHIH", payload, offset)
+        offset += 10
+        if rtype == DNS_TYPE_A and rdlength == 4 and payload[offset:offset + 4] == src_ip:
+            return name.removesuffix(".local")
+        offset += rdlength
+    return None
+
+
+def parse_frame(frame, interface: str = "") -> Observation | None:
+    """
+    Extrae la observación de una trama Ethernet que pasó el filtro.
+
+    Returns:
+        Observation, o None si la trama no identifica a ningún dispositivo
+    """
+    try:
+        _dst, src_mac, ethertype = ETHER.unpack_from(frame)
+        if ethertype == ETH_P_ARP:
+            _opcode, mac, ip = ARP_SENDER.unpack_from(frame, 20)
+            return Observation(socket.inet_ntoa(ip), format_mac(mac), interface, ARP) if _valid(ip, mac) else None
+        # Mismas condiciones que el filtro BPF, para las tramas de replay()
+        if ethertype != ETH_P_IP or frame[23] != IPPROTO_UDP or struct.unpack_from("!H", frame, 20)[0] & 0x1FFF:
+            return None
+        ihl = (frame[14] & 0x0F) * 4
+        src_ip = bytes(frame[26:30])
+        udp = 14 + ihl
+        _sport, dport = UDP_PORTS.unpack_from(frame, udp)
+        payload = memoryview(frame)[udp + 8:]
+        if dport in (DHCP_SERVER_PORT, DHCP_CLIENT_PORT):
+            return _parse_dhcp(payload, interface)
+        if not _valid(src_ip, src_mac):
+            return None
+        if dport == MDNS_PORT:
+            hostname = _mdns_hostname(payload, src_ip)
+            return Observation(socket.inet_ntoa(src_ip), format_mac(src_mac), interface, MDNS, hostname)
+        if dport == SSDP_PORT:
+            return Observation(socket.inet_ntoa(src_ip), format_mac(src_mac), interface, SSDP)
+    except (struct.error, IndexError, ValueError):
+        pass  # Trama truncada o malformada
+    return None
+
+
+def read_pcap(path: str):
+    """
+    Tramas de un archivo pcap clásico con enlace Ethernet.
+
+    Yields:
+        bytes de cada trama
+    """
+    with open(path, "rb") as f:
+        header = f.read(24)
+        if len(header) < 24:
+            raise ValueError(f"{path} is not a pcap file")
+        magic = header[:4]
+        if magic in (b"\xd4\xc3\xb2\xa1", b"\x4d\x3c\xb2\xa1"):
+            endian = "<"
+        elif magic in (b"\xa1\xb2\xc3\xd4", b"\xa1\xb2\x3c\x4d"):
+            endian = ">"
+        else:
+            raise ValueError(f"{path} is not a pcap file")
+        if struct.unpack_from(endian + "I", header, 20)[0] != 1:
+            raise ValueError(f"{path} is not an Ethernet capture")
+        record = struct.Struct(endian + "IIII")
+        while True:
+            raw = f.read(record.size)
+            if len(raw) < record.size:
+                return
+            _sec, _frac, incl_len, _orig_len = record.unpack(raw)
+            yield f.read(incl_len)
+
+
+class PassiveDiscovery:
+    """Sniffer de larga vida que informa dispositivos vistos en el tráfico."""
+
+    def __init__(self, on_observation: Callable[[Observation], None], interface: str | None = None,
+                 refresh_interval: float = REFRESH_INTERVAL, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            on_observation: Callback por cada observación nueva o refrescada
+                (se llama desde el hilo de captura)
+            interface: Escuchar solo esa interfaz (None = todas)
+            refresh_interval: Segundos antes de repetir una misma observación
+            clock: Reloj monotónico (inyectable para tests)
+        """
+        self.on_observation = on_observation
+        self.interface = interface
+        self.refresh_interval = refresh_interval
+        self._clock = clock
+        self._last = {}  # (ip, mac) -> (hostname, instante informado)
+        self._sock = None
+        self._thread = None
+        self._wake = None
+
+    def _emit(self, observation: Observation):
+        """Informa la observación si es nueva, cambió el nombre o venció el intervalo."""
+        now = self._clock()
+        key = (observation.ip, observation.mac)
+        previous = self._last.get(key)
+        if previous is not None:
+            hostname, reported_at = previous
+            if now - reported_at < self.refresh_interval and (observation.hostname in (None, hostname)):
+                return
+            if observation.hostname is None:
+                observation = observation._replace(hostname=hostname)
+        self._last[key] = (observation.hostname, now)
+        self.on_observation(observation)
+
+    def replay(self, frames, interface: str = "") -> int:
+        """
+        Procesa tramas ya capturadas (p. ej. de read_pcap) como si llegaran en vivo.
+
+        Returns:
+            Cantidad de tramas que identificaron un dispositivo
+        """
+        count = 0
+        for frame in frames:
+            observation = parse_frame(frame, interface)
+            if observation is not None:
+                count += 1
+                self._emit(observation)
+        return count
+
+    def start(self):
+        """
+        Abre el socket y arranca el hilo de captura.
+
+        Raises:
+            OSError: Sin AF_PACKET o sin permisos (CAP_NET_RAW)
+        """
+        if not raw_available():
+            raise OSError("AF_PACKET sockets are not available on this platform")
+        sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+        try:
+            attach_filter(sock, PASSIVE_BPF)
+            if self.interface is not None:
+                sock.bind((self.interface, ETH_P_ALL))
+            sock.setblocking(False)
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+        self._wake = os.pipe()
+        self._thread = threading.Thread(target=self._run, name="passive-discovery", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        buf = bytearray(SNAPLEN)
+        view = memoryview(buf)
+        poll = select.poll()
+        poll.register(self._sock, select.POLLIN)
+        poll.register(self._wake[0], select.POLLIN)
+        # Tramas encoladas antes de adjuntar el filtro
+        self._drain(buf, view, discard=True)
+        while True:
+            # Sin timeout: con la red quieta el hilo no se despierta
+            events = poll.poll()
+            if any(fd == self._wake[0] for fd, _ in events):
+                return
+            self._drain(buf, view)
+
+    def _drain(self, buf, view, discard: bool = False):
+        """Procesa todas las tramas pendientes sin bloquear."""
+        while True:
+            try:
+                size, address = self._sock.recvfrom_into(buf)
+            except BlockingIOError:
+                return
+            except OSError as e:
+                print(f"Passive discovery receive error: {e}")
+                return
+            # address = (interfaz, protocolo, pkttype, hatype, mac)
+            if discard or address[2] == PACKET_OUTGOING:
+                continue
+            observation = parse_frame(view[:size], address[0])
+            if observation is not None:
+                try:
+                    self._emit(observation)
+                except Exception as e:
+                    print(f"Error handling passive observation: {e}")
+
+    def stop(self):
+        """Detiene el hilo y cierra el socket."""
+        if self._thread is None:
+            return
+        os.write(self._wake[1], b"x")
+        self._thread.join(timeout=2)
+        self._sock.close()
+        for fd in self._wake:
+            os.close(fd)
+        self._thread = None
+        self._sock = None
+        self._wake = None
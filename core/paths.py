@@ -0,0 +1,24 @@
+"""
+Rutas de datos persistentes de la aplicación.
+"""
+
+import os
+
+APP_DIR_NAME = ".network_monitor"
+
+
+def get_data_dir(create: bool = True) -> str:
+    """
+    Directorio donde la aplicación guarda su estado entre ejecuciones.
+    Se puede redefinir con la variable de entorno NETWORK_MONITOR_DATA_DIR.
+
+    Args:
+        create: Si es True, crea el directorio si no existe
+
+    Returns:
+        Ruta absoluta del directorio de datos
+    """
+    path = os.environ.get("NETWORK_MONITOR_DATA_DIR") or os.path.join(os.path.expanduser("~"), APP_DIR_NAME)
+    if create:
+        os.makedirs(path, exist_ok=True)
+    return path
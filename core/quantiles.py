@@ -0,0 +1,230 @@
+"""
+Estimadores de percentiles en streaming para las tasas de tráfico.
+
+- P2Quantile: algoritmo P² (Jain & Chlamtac), 5 marcadores, O(1) por
+  muestra y memoria constante. Se usa para el percentil de toda la vida.
+- SlidingHistogram: histograma logarítmico por buckets de tiempo con
+  total acumulado; al expirar un bucket se resta. Permite consultar
+  percentiles de una ventana deslizante (5 min, 1 h) sin guardar muestras.
+"""
+
+import math
+import numpy as np
+
+# Percentiles reportados y ventanas deslizantes (sufijo -> segundos, bucket)
+STATS_QUANTILES = (0.5, 0.95, 0.99)
+STATS_WINDOWS = {
+    "5m": (300, 10),
+    "1h": (3600, 60),
+}
+
+# Bins logarítmicos: 1e-4 .. 1e5 MB/s, 32 por década (error relativo ~4%)
+LOG_MIN = -4
+LOG_MAX = 5
+BINS_PER_DECADE = 32
+
+CHANNELS = ("download", "upload")
+
+
+class P2Quantile:
+    """Estimador P² de un único cuantil."""
+
+    def __init__(self, p: float):
+        """
+        Args:
+            p: Cuantil a estimar (0-1)
+        """
+        self.p = p
+        self.count = 0
+        self.q = []  # Alturas de los marcadores
+        self.n = [0, 1, 2, 3, 4]  # Posiciones reales
+        self.desired = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+        self.increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, x: float):
+        """Incorpora una observación (O(1))."""
+        self.count += 1
+        q = self.q
+        if self.count <= 5:
+            q.append(x)
+            q.sort()
+            return
+
+        # 1. Ubicar la celda y ajustar extremos
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        n = self.n
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # 2. Ajustar los marcadores centrales
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                candidate = self._parabolic(i, d)
+                if not q[i - 1] < candidate < q[i + 1]:
+                    candidate = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = candidate
+                n[i] += d
+
+    def _parabolic(self, i: int, d: int) -> float:
+        """Predicción parabólica (P²) de la nueva altura del marcador i."""
+        q, n = self.q, self.n
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self) -> float:
+        """Estimación actual (exacta mientras haya 5 muestras o menos)."""
+        if not self.q:
+            return 0.0
+        if self.count <= 5:
+            return self.q[round(self.p * (len(self.q) - 1))]
+        return self.q[2]
+
+
+def value_to_bin(value: float) -> int:
+    """Bin logarítmico de un valor (0 = cero o menor que 10^LOG_MIN)."""
+    if value <= 0:
+        return 0
+    b = int((math.log10(value) - LOG_MIN) * BINS_PER_DECADE) + 1
+    return min(max(b, 0), (LOG_MAX - LOG_MIN) * BINS_PER_DECADE)
+
+
+def bin_to_value(b: int) -> float:
+    """Valor representativo de un bin (media geométrica de sus bordes)."""
+    if b == 0:
+        return 0.0
+    return 10 ** (LOG_MIN + (b - 0.5) / BINS_PER_DECADE)
+
+
+class SlidingHistogram:
+    """
+    Histograma de una ventana deslizante, dividido en buckets de tiempo.
+    La ventana es relativa a la muestra más reciente.
+    """
+
+    BINS = (LOG_MAX - LOG_MIN) * BINS_PER_DECADE + 1
+
+    def __init__(self, window_s: float, bucket_s: float, channels: int = len(CHANNELS)):
+        """
+        Args:
+            window_s: Largo de la ventana en segundos
+            bucket_s: Granularidad de expiración en segundos
+            channels: Cantidad de series (download, upload)
+        """
+        self.bucket_s = bucket_s
+        self.n_buckets = max(1, math.ceil(window_s / bucket_s))
+        self.counts = np.zeros((self.n_buckets, channels, self.BINS), dtype=np.int64)
+        self.total = np.zeros((channels, self.BINS), dtype=np.int64)
+        self.current_bucket = None
+
+    def add(self, timestamp: float, values):
+        """
+        Agrega una muestra por canal (O(1) salvo al expirar buckets).
+
+        Args:
+            timestamp: Segundos epoch
+            values: Un valor por canal
+        """
+        bucket = int(timestamp // self.bucket_s)
+        if self.current_bucket is None:
+            self.current_bucket = bucket
+        elif bucket > self.current_bucket:
+            self._expire(bucket)
+        elif bucket <= self.current_bucket - self.n_buckets:
+            return  # Fuera de la ventana
+
+        slot = bucket % self.n_buckets
+        for channel, value in enumerate(values):
+            b = value_to_bin(value)
+            self.counts[slot, channel, b] += 1
+            self.total[channel, b] += 1
+
+    def _expire(self, bucket: int):
+        """Resta y limpia los buckets que salen de la ventana."""
+        steps = min(bucket - self.current_bucket, self.n_buckets)
+        for j in range(1, steps + 1):
+            slot = (self.current_bucket + j) % self.n_buckets
+            self.total -= self.counts[slot]
+            self.counts[slot] = 0
+        self.current_bucket = bucket
+
+    def quantile(self, p: float, channel: int = 0) -> float:
+        """
+        Percentil `p` de la ventana para un canal.
+
+        Returns:
+            Valor aproximado (0.0 si la ventana está vacía)
+        """
+        cumulative = np.cumsum(self.total[channel])
+        if cumulative[-1] == 0:
+            return 0.0
+        b = int(np.searchsorted(cumulative, p * cumulative[-1], side="left"))
+        return bin_to_value(min(b, self.BINS - 1))
+
+    def clear(self):
+        """Vacía el histograma."""
+        self.counts[:] = 0
+        self.total[:] = 0
+        self.current_bucket = None
+
+
+class TrafficQuantiles:
+    """Percentiles de download/upload de toda la vida y por ventana."""
+
+    def __init__(self, quantiles=STATS_QUANTILES, windows=STATS_WINDOWS):
+        """
+        Args:
+            quantiles: Cuantiles a reportar (0-1)
+            windows: Diccionario sufijo -> (ventana_s, bucket_s)
+        """
+        self.quantiles = quantiles
+        self.lifetime = [[P2Quantile(p) for p in quantiles] for _ in CHANNELS]
+        self.windows = {
+            name: SlidingHistogram(window_s, bucket_s) for name, (window_s, bucket_s) in windows.items()
+        }
+
+    def add(self, timestamp: float, download_mb: float, upload_mb: float):
+        """Registra una muestra en todos los estimadores."""
+        values = (download_mb, upload_mb)
+        for estimators, value in zip(self.lifetime, values):
+            for estimator in estimators:
+                estimator.add(value)
+        for histogram in self.windows.values():
+            histogram.add(timestamp, values)
+
+    def snapshot(self) -> dict:
+        """
+        Retorna los percentiles actuales.
+
+        Returns:
+            Diccionario con claves p50_download, p95_upload, p99_download_5m, etc.
+        """
+        stats = {}
+        for channel, name in enumerate(CHANNELS):
+            for p, estimator in zip(self.quantiles, self.lifetime[channel]):
+                stats[f"p{round(p * 100)}_{name}"] = estimator.value()
+            for suffix, histogram in self.windows.items():
+                for p in self.quantiles:
+                    stats[f"p{round(p * 100)}_{name}_{suffix}"] = histogram.quantile(p, channel)
+        return stats
+
+    def reset(self):
+        """Reinicia todos los estimadores."""
+        self.lifetime = [[P2Quantile(p) for p in self.quantiles] for _ in CHANNELS]
+        for histogram in self.windows.values():
+            histogram.clear()
@@ -0,0 +1,279 @@
+"""
+Seguimiento de cuota de datos (enlaces medidos) por ciclo de facturación.
+
+Los contadores acumulan MB consumidos (tasa × tiempo real de cada
+muestra, ya corregida por el sensor ante desbordes y reinicios de los
+contadores del sistema) y se guardan en JSON de forma atómica y con
+fsync, así sobreviven cierres inesperados y reinicios del equipo. El
+pronóstico de agotamiento se recalcula en O(1) por muestra a partir de
+la tasa promedio de la última ventana (RollingStats).
+"""
+
+import calendar
+import json
+import math
+import os
+import time
+from typing import NamedTuple
+
+from core.window_stats import RollingStats
+
+# Qué tráfico cuenta para la cuota
+QUOTA_DIRECTIONS = ("both", "download", "upload")
+
+# Fracciones de la cuota que disparan un aviso (una vez por ciclo)
+WARNING_LEVELS = (0.8, 0.9, 1.0)
+# Aviso por pronóstico: se agota antes de fin de ciclo y en menos de esto
+FORECAST_WARNING_S = 24 * 3600
+
+STATE_VERSION = 1
+
+
+class QuotaStatus(NamedTuple):
+    """Estado de la cuota tras la última muestra."""
+    cycle_start: float
+    cycle_end: float
+    used_mb: float
+    cap_mb: float | None  # None = sin cuota configurada
+    fraction: float  # used / cap (0 si no hay cuota)
+    rate_mb: float  # Tasa promedio reciente en MB/s (la que usa el pronóstico)
+    exhausts_at: float | None  # Epoch estimado de agotamiento (None = no se agota en el ciclo)
+    warning: str | None  # "80%", "90%", "100%" o "forecast" si hay que avisar ahora
+
+
+def cycle_bounds(timestamp: float, cycle_day: int = 1) -> tuple:
+    """
+    Inicio y fin (epoch, hora local) del ciclo de facturación que contiene `timestamp`.
+
+    El ciclo empieza el día `cycle_day` de cada mes a las 00:00; en meses
+    más cortos se usa el último día (p. ej. día 31 -> 30 de abril).
+    """
+    t = time.localtime(timestamp)
+    year, month = t.tm_year, t.tm_mon
+    start = _cycle_anchor(year, month, cycle_day)
+    if timestamp < start:
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+        start = _cycle_anchor(year, month, cycle_day)
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return start, _cycle_anchor(next_year, next_month, cycle_day)
+
+
+def _cycle_anchor(year: int, month: int, cycle_day: int) -> float:
+    """Epoch de las 00:00 locales del día de corte de un mes."""
+    day = min(cycle_day, calendar.monthrange(year, month)[1])
+    return time.mktime((year, month, day, 0, 0, 0, 0, 0, -1))
+
+
+class QuotaTracker:
+    """
+    Contadores persistentes del ciclo actual, pronóstico y avisos.
+
+    Cada nivel de aviso se dispara una sola vez por ciclo (y el registro
+    de avisos dados también se persiste, así reiniciar no repite avisos).
+    Los avisos quedan además en cola hasta pop_warnings(): la UI procesa
+    varios lotes por frame y no debe perder el de un lote intermedio.
+    """
+
+    def __init__(self, cap_mb: float | None = None, cycle_day: int = 1, direction: str = "both",
+                 forecast_window_s: float = 3600.0, state_path: str | None = None, save_interval: float = 60.0):
+        """
+        Args:
+            cap_mb: Cuota del ciclo en MB; None = sin cuota (solo cuenta)
+            cycle_day: Día del mes en que se reinicia el ciclo (1-31)
+            direction: "both", "download" o "upload"
+            forecast_window_s: Ventana de la tasa usada para pronosticar
+            state_path: Archivo JSON de estado; None = sin persistencia
+            save_interval: Segundos entre guardados automáticos
+        """
+        if direction not in QUOTA_DIRECTIONS:
+            raise ValueError(f"Unknown quota direction: {direction}")
+        self.cap_mb = cap_mb
+        self.cycle_day = self._validate_day(cycle_day)
+        self.direction = direction
+        self.state_path = state_path
+        self.save_interval = save_interval
+        self._last_save = time.monotonic()
+
+        self.rate = RollingStats(forecast_window_s, channels=1)
+        self.pending_warnings = []  # QuotaStatus con aviso, aún no notificados
+        self._start_cycle(time.time())
+
+        if state_path is not None and os.path.exists(state_path):
+            self.load(state_path)
+
+    @staticmethod
+    def _validate_day(cycle_day: int) -> int:
+        if not 1 <= cycle_day <= 31:
+            raise ValueError(f"Billing cycle day must be 1-31, got {cycle_day}")
+        return cycle_day
+
+    def _start_cycle(self, timestamp: float):
+        """Arranca el ciclo que contiene `timestamp` con contadores en cero."""
+        self.cycle_start, self.cycle_end = cycle_bounds(timestamp, self.cycle_day)
+        self.used_download_mb = 0.0
+        self.used_upload_mb = 0.0
+        self.warned = set()
+
+    @property
+    def used_mb(self) -> float:
+        """MB del ciclo que cuentan para la cuota (según direction)."""
+        if self.direction == "download":
+            return self.used_download_mb
+        if self.direction == "upload":
+            return self.used_upload_mb
+        return self.used_download_mb + self.used_upload_mb
+
+    def add(self, timestamp: float, download_mb: float, upload_mb: float, elapsed_s: float = 1.0) -> QuotaStatus:
+        """
+        Suma una muestra al ciclo y recalcula el pronóstico.
+
+        Args:
+            timestamp: Segundos epoch de la muestra
+            download_mb: Tasa de descarga en MB/s
+            upload_mb: Tasa de subida en MB/s
+            elapsed_s: Segundos reales que cubre la muestra
+
+        Returns:
+            QuotaStatus; `warning` indica si corresponde avisar ahora
+        """
+        # Solo se avanza de ciclo hacia adelante: un ajuste del reloj hacia
+        # atrás (NTP) no debe borrar lo consumido
+        if timestamp >= self.cycle_end:
+            self._start_cycle(timestamp)
+            self.save()
+
+        self.used_download_mb += download_mb * elapsed_s
+        self.used_upload_mb += upload_mb * elapsed_s
+        counted = {"download": download_mb, "upload": upload_mb}.get(self.direction, download_mb + upload_mb)
+        self.rate.add(timestamp, (counted,), elapsed_s)
+
+        status = self.status(timestamp)
+        if status.warning is not None:
+            self.warned.add(status.warning)
+            self.pending_warnings.append(status)
+            self.save()
+        elif self.state_path is not None and time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+        return status
+
+    def status(self, now: float | None = None) -> QuotaStatus:
+        """Estado actual de la cuota (sin registrar avisos)."""
+        now = time.time() if now is None else now
+        used = self.used_mb
+        rate = self.rate.stats(0)["avg"]
+        if not self.cap_mb:
+            return QuotaStatus(self.cycle_start, self.cycle_end, used, None, 0.0, rate, None, None)
+
+        fraction = used / self.cap_mb
+        exhausts_at = None
+        if used >= self.cap_mb:
+            exhausts_at = now
+        elif rate > 0:
+            eta = now + (self.cap_mb - used) / rate
+            if eta < self.cycle_end:
+                exhausts_at = eta
+
+        warning = None
+        for level in reversed(WARNING_LEVELS):
+            if fraction >= level:
+                name = f"{level:.0%}"
+                if name not in self.warned:
+                    warning = name
+                break
+        if (warning is None and exhausts_at is not None and "forecast" not in self.warned
+                and exhausts_at - now <= FORECAST_WARNING_S):
+            warning = "forecast"
+        return QuotaStatus(self.cycle_start, self.cycle_end, used, self.cap_mb, fraction, rate, exhausts_at, warning)
+
+    def pop_warnings(self) -> list:
+        """
+        Avisos disparados desde la última llamada, en orden.
+
+        Returns:
+            Lista de QuotaStatus (vacía si no hubo avisos)
+        """
+        warnings, self.pending_warnings = self.pending_warnings, []
+        return warnings
+
+    def set_cap(self, cap_mb: float | None):
+        """
+        Cambia la cuota; los avisos del ciclo se vuelven a evaluar.
+
+        Raises:
+            ValueError: Si la cuota es negativa o no es un número finito
+        """
+        if cap_mb is not None and not (math.isfinite(cap_mb) and cap_mb >= 0):
+            raise ValueError(f"Data cap must be a non-negative number, got {cap_mb}")
+        self.cap_mb = cap_mb if cap_mb else None
+        self.warned.clear()
+        self.save()
+
+    def set_cycle_day(self, cycle_day: int):
+        """Cambia el día de corte; el ciclo vigente se recalcula sin perder lo consumido."""
+        self.cycle_day = self._validate_day(cycle_day)
+        self.cycle_start, self.cycle_end = cycle_bounds(time.time(), self.cycle_day)
+        self.save()
+
+    def reset(self):
+        """Pone en cero los contadores del ciclo actual."""
+        self._start_cycle(time.time())
+        self.rate.clear()
+        self.save()
+
+    def to_dict(self) -> dict:
+        """Estado serializable a JSON."""
+        return {
+            "version": STATE_VERSION,
+            "cap_mb": self.cap_mb,
+            "cycle_day": self.cycle_day,
+            "direction": self.direction,
+            "cycle_start": self.cycle_start,
+            "cycle_end": self.cycle_end,
+            "used_download_mb": self.used_download_mb,
+            "used_upload_mb": self.used_upload_mb,
+            "warned": sorted(self.warned),
+        }
+
+    def save(self, path: str | None = None):
+        """Guarda el estado de forma atómica (archivo temporal + fsync + rename)."""
+        path = path or self.state_path
+        if path is None:
+            return
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error saving quota state: {e}")
+        self._last_save = time.monotonic()
+
+    def load(self, path: str):
+        """Carga un estado guardado; si el ciclo ya venció, arranca uno nuevo."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("version") != STATE_VERSION:
+                return
+            cap_mb = state["cap_mb"]
+            self.cap_mb = float(cap_mb) if cap_mb else None
+            self.cycle_day = self._validate_day(int(state["cycle_day"]))
+            if state["direction"] in QUOTA_DIRECTIONS:
+                self.direction = state["direction"]
+            self.cycle_start = float(state["cycle_start"])
+            self.cycle_end = float(state["cycle_end"])
+            used_download = float(state["used_download_mb"])
+            used_upload = float(state["used_upload_mb"])
+            if not (math.isfinite(used_download) and math.isfinite(used_upload)):
+                return
+            self.used_download_mb, self.used_upload_mb = used_download, used_upload
+            self.warned = set(state["warned"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Error loading quota state: {e}")
+            return
+
+        now = time.time()
+        if not self.cycle_start <= now < self.cycle_end:
+            self._start_cycle(now)
@@ -0,0 +1,75 @@
+"""
+Buffer circular preasignado para un productor y un consumidor (SPSC).
+Permite pasar muestras del hilo de muestreo a la UI sin locks.
+"""
+
+import numpy as np
+
+
+class SPSCRingBuffer:
+    """
+    Buffer circular de filas numéricas de ancho fijo.
+
+    Sin locks: solo el productor escribe `_head` y solo el consumidor
+    escribe `_tail`. Ambos son contadores que solo crecen (la posición
+    real es contador % capacidad), así lleno y vacío no se confunden.
+    El productor publica `_head` recién después de escribir la fila, y en
+    CPython la asignación de un atributo es atómica, de modo que el
+    consumidor nunca ve una fila a medio escribir.
+    """
+
+    def __init__(self, capacity: int, fields: int):
+        """
+        Args:
+            capacity: Cantidad máxima de filas pendientes
+            fields: Columnas por fila
+        """
+        self.capacity = max(1, capacity)
+        self._data = np.zeros((self.capacity, fields), dtype=np.float64)
+        self._head = 0  # Total de filas escritas (solo productor)
+        self._tail = 0  # Total de filas leídas (solo consumidor)
+        self.dropped = 0  # Filas descartadas por buffer lleno (solo productor)
+
+    def push(self, row) -> bool:
+        """
+        Agrega una fila (lado productor).
+
+        Returns:
+            False si el buffer está lleno y la fila se descartó
+        """
+        head = self._head
+        if head - self._tail >= self.capacity:
+            self.dropped += 1
+            return False
+        self._data[head % self.capacity] = row
+        self._head = head + 1  # Publicación
+        return True
+
+    def drain(self, max_rows: int | None = None) -> np.ndarray:
+        """
+        Retira todas las filas pendientes (lado consumidor).
+
+        Args:
+            max_rows: Límite opcional de filas a retirar
+
+        Returns:
+            Copia de las filas en orden de llegada, shape (n, fields)
+        """
+        tail = self._tail
+        pending = self._head - tail
+        if max_rows is not None:
+            pending = min(pending, max_rows)
+
+        start = tail % self.capacity
+        end = start + pending
+        if end <= self.capacity:
+            rows = self._data[start:end].copy()
+        else:
+            rows = np.concatenate((self._data[start:], self._data[:end - self.capacity]))
+
+        self._tail = tail + pending  # Libera las posiciones para el productor
+        return rows
+
+    def __len__(self) -> int:
+        """Filas pendientes de leer."""
+        return self._head - self._tail
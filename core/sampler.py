@@ -0,0 +1,282 @@
+"""
+Motor de muestreo de tráfico de alta frecuencia.
+Lee el sensor a 1-100 Hz con deadlines absolutos (sin deriva acumulada)
+y agrupa las muestras en lotes para la UI.
+
+Puede correr en el loop de asyncio (run) o en un hilo propio (start),
+entregando los lotes por un SPSCRingBuffer que la UI vacía a su ritmo.
+En modo hilo con `pernic`, las tasas por interfaz también se leen en el
+hilo (una vez por lote) y viajan en la misma fila del ring que su lote:
+un descarte por ring lleno pierde lote y tasas juntos, nunca los desfasa.
+"""
+
+import asyncio
+import inspect
+import threading
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from core.ring_buffer import SPSCRingBuffer
+from core.sensor import NetworkSensor
+
+
+class TrafficBatch(NamedTuple):
+    """Resumen de las muestras tomadas durante un intervalo de lote."""
+    timestamp_ns: int
+    elapsed_s: float
+    download_mb: float  # MB/s promedio real del lote
+    upload_mb: float  # MB/s promedio real del lote
+    peak_download_mb: float  # Ráfaga máxima sub-segundo
+    peak_upload_mb: float
+    samples: int
+
+
+BATCH_FIELDS = len(TrafficBatch._fields)
+
+
+class NicRates(NamedTuple):
+    """Tasas por interfaz del mismo intervalo que un TrafficBatch."""
+    names: list  # Mismo objeto mientras no cambie el conjunto de interfaces
+    rates: np.ndarray  # (n, 2) [download_mb, upload_mb] en MB/s
+
+
+class TrafficSampler:
+    """
+    Muestrea un NetworkSensor a frecuencia fija y emite lotes.
+
+    Cada muestra trae su propio tiempo transcurrido, así que un tick
+    atrasado no distorsiona la tasa: los bytes se reparten sobre el
+    tiempo real. Las ráfagas cortas quedan registradas como pico del lote.
+    """
+
+    MIN_RATE_HZ = 1
+    MAX_RATE_HZ = 100
+
+    # Lotes pendientes que tolera el ring antes de descartar (1 h a 1 lote/s)
+    RING_CAPACITY = 3600
+    # Interfaces por lote que caben en la fila del ring (el resto se descarta
+    # con un aviso y queda en `dropped_nics`)
+    MAX_NICS = 16
+
+    def __init__(self, sensor: NetworkSensor, rate_hz: float = 10, batch_interval: float = 1.0,
+                 pernic: bool = False):
+        """
+        Args:
+            sensor: Sensor a muestrear
+            rate_hz: Frecuencia de muestreo (1-100 Hz)
+            batch_interval: Segundos por lote entregado a la UI
+            pernic: Leer también las tasas por interfaz (get_traffic_per_nic)
+                en el hilo, una vez por lote; se retiran con drain_with_nics()
+        """
+        self.sensor = sensor
+        self.rate_hz = min(max(rate_hz, self.MIN_RATE_HZ), self.MAX_RATE_HZ)
+        self.period_ns = int(1e9 / self.rate_hz)
+        self.batch_interval_ns = int(batch_interval * 1e9)
+        self.running = False
+        self.missed_ticks = 0
+        self._reset_batch()
+
+        # Modo hilo: los lotes viajan a la UI por un ring preasignado. Con
+        # pernic cada fila es el lote + generación de nombres + [down, up]
+        # por interfaz; los nombres cambian rara vez y viajan aparte,
+        # indexados por generación
+        self.pernic = pernic
+        width = BATCH_FIELDS + (1 + 2 * self.MAX_NICS if pernic else 0)
+        self.ring = SPSCRingBuffer(self.RING_CAPACITY, width)
+        self._row = np.zeros(width, dtype=np.float64)
+        self._nic_names = {}  # Generación -> lista de nombres
+        self._nic_generation = -1  # Última generación publicada (productor)
+        self._consumed_generation = 0  # Última generación retirada (consumidor)
+        self.dropped_nics = []  # Interfaces que no entran en MAX_NICS
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def _reset_batch(self):
+        """Reinicia los acumuladores del lote en curso."""
+        self._batch_start_ns = None
+        self._batch_elapsed = 0.0
+        self._batch_down = 0.0  # MB acumulados
+        self._batch_up = 0.0
+        self._batch_peak_down = 0.0
+        self._batch_peak_up = 0.0
+        self._batch_samples = 0
+
+    def sample(self) -> TrafficBatch | None:
+        """
+        Toma una muestra y la acumula en el lote actual.
+
+        Returns:
+            El lote cerrado si se completó el intervalo, o None
+        """
+        s = self.sensor.sample()
+        if self._batch_start_ns is None:
+            self._batch_start_ns = s.timestamp_ns - int(s.elapsed_s * 1e9)
+
+        self._batch_elapsed += s.elapsed_s
+        self._batch_down += s.download_mb * s.elapsed_s
+        self._batch_up += s.upload_mb * s.elapsed_s
+        self._batch_peak_down = max(self._batch_peak_down, s.download_mb)
+        self._batch_peak_up = max(self._batch_peak_up, s.upload_mb)
+        self._batch_samples += 1
+
+        if s.timestamp_ns - self._batch_start_ns < self.batch_interval_ns:
+            return None
+
+        batch = TrafficBatch(
+            timestamp_ns=s.timestamp_ns,
+            elapsed_s=self._batch_elapsed,
+            download_mb=self._batch_down / self._batch_elapsed,
+            upload_mb=self._batch_up / self._batch_elapsed,
+            peak_download_mb=self._batch_peak_down,
+            peak_upload_mb=self._batch_peak_up,
+            samples=self._batch_samples,
+        )
+        self._reset_batch()
+        return batch
+
+    def next_deadline(self, deadline_ns: int, now_ns: int) -> int:
+        """
+        Calcula el próximo deadline absoluto.
+        Si vamos atrasados más de un período, saltamos los ticks perdidos
+        en lugar de dispararlos en ráfaga (la tasa no se pierde: la próxima
+        muestra cubre todo el tiempo transcurrido).
+        """
+        deadline_ns += self.period_ns
+        if now_ns > deadline_ns:
+            skipped = (now_ns - deadline_ns) // self.period_ns + 1
+            self.missed_ticks += skipped
+            deadline_ns += skipped * self.period_ns
+        return deadline_ns
+
+    async def run(self, on_batch):
+        """
+        Bucle de muestreo asíncrono con deadlines absolutos.
+
+        Args:
+            on_batch: Callback (sync o async) que recibe cada TrafficBatch
+        """
+        self.running = True
+        deadline = time.monotonic_ns() + self.period_ns
+        while self.running:
+            delay = (deadline - time.monotonic_ns()) / 1e9
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            batch = self.sample()
+            if batch is not None:
+                result = on_batch(batch)
+                if inspect.isawaitable(result):
+                    await result
+
+            deadline = self.next_deadline(deadline, time.monotonic_ns())
+
+    def start(self):
+        """
+        Lanza el muestreo en un hilo daemon dedicado. Los lotes se
+        escriben en `self.ring`; la UI los retira con drain().
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.running = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_thread, name="traffic-sampler", daemon=True)
+        self._thread.start()
+
+    def _run_thread(self):
+        """Bucle del hilo de muestreo: mismo esquema de deadlines que run()."""
+        deadline = time.monotonic_ns() + self.period_ns
+        while self.running:
+            delay = (deadline - time.monotonic_ns()) / 1e9
+            if delay > 0 and self._stop_event.wait(delay):
+                break
+
+            try:
+                batch = self.sample()
+            except Exception as e:
+                # Un error de lectura no debe matar el hilo de muestreo
+                print(f"Error sampling traffic: {e}")
+                batch = None
+            if batch is not None:
+                self._publish(batch)
+
+            deadline = self.next_deadline(deadline, time.monotonic_ns())
+
+    def _publish(self, batch: TrafficBatch):
+        """Encola el lote (y con pernic, sus tasas por interfaz) en una sola fila."""
+        row = self._row
+        row[:BATCH_FIELDS] = batch
+        if self.pernic:
+            self._fill_nics(row[BATCH_FIELDS:])
+        self.ring.push(row)
+
+    def _fill_nics(self, row: np.ndarray):
+        """Lee las tasas por interfaz (lado productor) y las escribe en `row`."""
+        try:
+            names, rates = self.sensor.get_traffic_per_nic()
+        except Exception as e:
+            print(f"Error sampling per-interface traffic: {e}")
+            names, rates = [], np.zeros((0, 2))
+        current = self._nic_names.get(self._nic_generation)
+        if current is None or current != names[:self.MAX_NICS]:
+            self._new_generation(names)
+            current = self._nic_names[self._nic_generation]
+        row[0] = self._nic_generation
+        row[1:1 + 2 * len(current)] = rates[:len(current)].ravel()
+
+    def _new_generation(self, names: list):
+        """
+        Publica un conjunto de nombres nuevo antes que la fila que lo usa.
+
+        Las generaciones que el consumidor ya dejó atrás no vuelven a
+        aparecer en el ring (son crecientes) y se descartan.
+        """
+        if len(names) > self.MAX_NICS:
+            self.dropped_nics = list(names[self.MAX_NICS:])
+            print(f"Sampling only the first {self.MAX_NICS} of {len(names)} interfaces; "
+                  f"ignoring {', '.join(self.dropped_nics)}")
+        else:
+            self.dropped_nics = []
+        for generation in [g for g in self._nic_names if g < self._consumed_generation]:
+            del self._nic_names[generation]
+        self._nic_names[self._nic_generation + 1] = list(names[:self.MAX_NICS])
+        self._nic_generation += 1
+
+    def drain_with_nics(self) -> list:
+        """
+        Como drain(), pero cada lote viene con las tasas por interfaz del
+        mismo intervalo (requiere pernic=True).
+
+        Returns:
+            Lista de tuplas (TrafficBatch, NicRates) en orden de llegada
+        """
+        result = []
+        for row in self.ring.drain():
+            generation = int(row[BATCH_FIELDS])
+            names = self._nic_names[generation]
+            nics = row[BATCH_FIELDS + 1:BATCH_FIELDS + 1 + 2 * len(names)].reshape(-1, 2)
+            result.append((self._batch_from_row(row.tolist()), NicRates(names, nics)))
+            self._consumed_generation = generation
+        return result
+
+    def drain(self) -> list:
+        """
+        Retira los lotes acumulados por el hilo (lado UI).
+
+        Returns:
+            Lista de TrafficBatch en orden de llegada
+        """
+        return [self._batch_from_row(r) for r in self.ring.drain().tolist()]
+
+    @staticmethod
+    def _batch_from_row(r) -> TrafficBatch:
+        return TrafficBatch(int(r[0]), r[1], r[2], r[3], r[4], r[5], int(r[6]))
+
+    def stop(self):
+        """Detiene el bucle de muestreo (y espera al hilo si existe)."""
+        self.running = False
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+            self._thread = None
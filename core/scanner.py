@@ -1,73 +1,734 @@
 from asyncio import timeout
 from _socket import socket
-import scapy.all as scapy
+import asyncio
+import fnmatch
+import ipaddress
+import threading
+import time
 import socket
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+import psutil
+from core import arp_engine, neighbor_table
+from core.arp_engine import ArpEngine
 from core.mac_vendor import MacVendorService
+from core.sensor import VIRTUAL_INTERFACE_PATTERNS
+
+# Ritmo de envío del barrido en streaming (paquetes ARP por segundo)
+DEFAULT_RATE_PPS = 1000
+# Paquetes por ráfaga: el ritmo se respeta por ráfaga con deadlines absolutos
+SEND_BURST = 32
+# Filtro BPF del sniffer: solo respuestas ARP (opcode 2)
+ARP_REPLY_FILTER = "arp and arp[6:2] = 2"
+# Direcciones por bloque del barrido con scapy: acota lo que queda en vuelo
+# y el tamaño de cada lista de respuestas de srp()
+SCAN_WINDOW = 256
+# Máscara más amplia que se barre entera; redes mayores (ej: /8) se
+# limitan a la /16 que contiene nuestra IP
+MIN_SCAN_PREFIX = 16
+# Rango por defecto si no hay ninguna red local que barrer
+DEFAULT_TARGET = "192.168.1.1/24"
+# MAC de las interfaces sin capa de enlace real (loopback)
+NULL_MAC = "00:00:00:00:00:00"
+# Bytes en el cable por dirección consultada: pedido y respuesta ARP
+# (tramas Ethernet mínimas de 60 B)
+ARP_BYTES_PER_ADDRESS = 2 * 60
+
+
+class LocalNetwork(NamedTuple):
+    """Subred IPv4 de una interfaz local, lista para barrer."""
+    interface: str
+    address: str
+    target: str  # Rango CIDR a barrer (ej: 10.20.0.1/20)
+
+    @property
+    def subnet(self) -> str:
+        """Subred normalizada (ej: 10.20.0.0/20)."""
+        return str(ipaddress.ip_network(self.target, strict=False))
+
+
+def scan_target(address: str, prefix: int) -> str:
+    """Rango a barrer para una IP local y su máscara (ej: 10.20.0.1/20), con tope MIN_SCAN_PREFIX."""
+    prefix = max(prefix, MIN_SCAN_PREFIX)
+    network = ipaddress.ip_network(f"{address}/{prefix}", strict=False)
+    return f"{network.network_address + 1}/{prefix}"
+
+
+def list_local_networks() -> list:
+    """
+    Enumera las subredes IPv4 de las interfaces levantadas, sin tráfico de red.
+
+    Se omiten loopback, link-local (169.254/16) y subredes repetidas
+    (varias IPs o interfaces en la misma red se barren una sola vez).
+    También las interfaces sin dirección de enlace (tun, WireGuard: ARP
+    no funciona ahí) y las virtuales de VIRTUAL_INTERFACE_PATTERNS (docker,
+    veth, bridges: cada barrido sería una /16 interna cada pocos minutos).
+
+    Returns:
+        Lista de LocalNetwork en el orden de psutil
+    """
+    try:
+        stats = psutil.net_if_stats()
+        interfaces = psutil.net_if_addrs()
+    except OSError as e:
+        print(f"Error listing interfaces: {e}")
+        return []
+
+    networks = []
+    targets = set()
+    for name, addrs in interfaces.items():
+        if name in stats and not stats[name].isup:
+            continue
+        if any(fnmatch.fnmatch(name, pattern) for pattern in VIRTUAL_INTERFACE_PATTERNS):
+            continue
+        if not any(addr.family == psutil.AF_LINK and addr.address and addr.address != NULL_MAC for addr in addrs):
+            continue
+        for addr in addrs:
+            if addr.family != socket.AF_INET or not addr.netmask:
+                continue
+            ip = ipaddress.ip_address(addr.address)
+            if ip.is_loopback or ip.is_link_local:
+                continue
+            target = scan_target(addr.address, ipaddress.ip_network(f"0.0.0.0/{addr.netmask}").prefixlen)
+            if target in targets:
+                continue
+            targets.add(target)
+            networks.append(LocalNetwork(name, addr.address, target))
+    return networks
+
+
+def split_target(target: str, window: int = SCAN_WINDOW):
+    """
+    Divide un rango CIDR en bloques de a lo sumo `window` direcciones.
+
+    Yields:
+        Subredes en formato CIDR (una sola si el rango ya es chico)
+    """
+    network = ipaddress.ip_network(target, strict=False)
+    prefix = max(network.prefixlen, network.max_prefixlen - (window.bit_length() - 1))
+    for chunk in network.subnets(new_prefix=prefix):
+        yield str(chunk)
+
+
+def _without(target: str, skip):
+    """`target` tal cual, o la lista de sus direcciones menos las de `skip`."""
+    if not skip:
+        return target
+    return [str(ip) for ip in ipaddress.ip_network(target, strict=False) if str(ip) not in skip]
+
+
+def estimate_duration(target: str, rate_pps: int = DEFAULT_RATE_PPS, timeout: float = 1.0,
+                      window: int | None = None) -> float:
+    """
+    Segundos que tarda un barrido de `target`.
+
+    Args:
+        window: Tamaño de bloque si cada bloque espera su propio timeout
+            (scapy); None para un único envío continuo (motor AF_PACKET)
+    """
+    addresses = ipaddress.ip_network(target, strict=False).num_addresses
+    chunks = 1 if window is None else -(-addresses // window)
+    return addresses / rate_pps + chunks * timeout
+
+
+def estimate_sweep_bytes(networks=None, rate_pps: int = DEFAULT_RATE_PPS) -> int:
+    """
+    Bytes que mueve un barrido completo de `networks` (por defecto las
+    redes locales): durante la fase de envío de estimate_duration() sale
+    un pedido por dirección a `rate_pps`, y se cuenta una respuesta por
+    pedido como cota superior.
+    """
+    networks = list_local_networks() if networks is None else networks
+    frames = sum(estimate_duration(net.target, rate_pps, timeout=0) * rate_pps for net in networks)
+    return round(frames * ARP_BYTES_PER_ADDRESS)
+
+
+def _scapy():
+    """Importa scapy recién cuando se usa (import scapy.all tarda ~1 s)."""
+    import scapy.all as scapy
+    return scapy
+
+
+class ProbePlan(NamedTuple):
+    """Qué consultar en un barrido incremental (ver NetworkScanner._plan_probe)."""
+    skip: set  # IPs que no se consultan (las pedidas más las vivas sin vencer)
+    probed: list  # IPs que sí se consultan
+    cached: list  # Dispositivos vivos sin vencer, entregados sin consultar
+    now: float
+
 
 class NetworkScanner:
-    def __init__(self):
+    def __init__(self, backend=None, inventory=None, liveness=None):
+        """
+        Args:
+            backend: None usa scapy; "auto" prueba el motor AF_PACKET
+                (core/arp_engine.py) y cae a scapy si no está disponible
+            inventory: DeviceInventory persistente; sin él los dispositivos
+                conocidos se recuerdan solo durante la sesión
+            liveness: LivenessTracker para rescans incrementales; sin él
+                cada barrido consulta el rango completo
+        """
         # Intentamos detectar nuestra IP local y el rango (ej: 192.168.1.1/24)
         self.target_ip = self.get_local_range()
+        self.backend = backend
+        self._raw_interfaces = {}  # (rango, interfaz) -> (nombre, mac, ip), resuelto en el primer uso
+        self._raw_failures = set()  # (rango, interfaz) donde el motor no pudo abrirse
         # Servicio para detectar fabricantes de dispositivos
         self.vendor_service = MacVendorService()
         # Set de MACs conocidas para detectar nuevos dispositivos
         self.known_devices = set()
+        self.inventory = inventory
+        self.liveness = liveness
 
     def get_local_range(self):
-        """Detecta la IP de nuestra PC y calcula el rango de la red local"""
-        try:
-            # Obtenemos IP local sin conectar realmente a internet
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            local_ip = s.getsockname()[0]
-            s.close()
-            
-            # Calculamos el rango (ej: 192.168.1.1 -> 192.168.1.1/24)
-            ip_parts = local_ip.split(".")
-            network_range = f"{ip_parts[0]}.{ip_parts[1]}.{ip_parts[2]}.1/24"
-            return network_range
-        except Exception as e:
-            print(f"Error detecting local IP: {e}")
-            return "192.168.1.1/24"  # Fallback por defecto
+        """
+        Rango de la primera red local de list_local_networks(), con la
+        máscara real de la interfaz (ej: 10.20.5.7 en una /20 -> 10.20.0.1/20).
+
+        No genera tráfico: funciona sin conexión a internet.
+        """
+        networks = list_local_networks()
+        if not networks:
+            print(f"No local network found, using {DEFAULT_TARGET}")
+            return DEFAULT_TARGET
+        return networks[0].target
     
-    def scan_network(self):
+    def scan_network(self, target: str = None, rate_pps: int = DEFAULT_RATE_PPS, window: int = SCAN_WINDOW,
+                     interface: str = None, skip=None):
         """
         Escanea la red local usando ARP y retorna lista de dispositivos
+
+        Rangos mayores que `window` se barren por bloques: con scapy cada
+        bloque es un srp() propio a ritmo `rate_pps`, así lo que está en
+        vuelo y las listas de respuestas quedan acotadas al bloque.
+
+        Args:
+            target: Rango CIDR (por defecto self.target_ip)
+            rate_pps: Pedidos ARP por segundo
+            window: Direcciones por bloque
+            interface: Interfaz de salida (None = la que indique la ruta)
+            skip: IPs que no se consultan (ya confirmadas por otra vía)
+
+        Con `liveness` el barrido es incremental: solo se consultan las
+        direcciones vencidas o desconocidas y los hosts vivos sin vencer se
+        agregan al resultado desde la caché.
         """
+        target = target or self.target_ip
+        plan = self._plan_probe(target, skip)
+        if plan is not None:
+            if not plan.probed:
+                return plan.cached
+            skip = plan.skip
+        engine = self._open_engine(target, interface)
+        if engine is not None:
+            try:
+                # El motor envía a ritmo constante y solo guarda las respuestas
+                replies = engine.sweep(target, rate_pps=rate_pps, skip=skip)
+                return self._finish_probe(plan, [self._make_device(ip, mac) for ip, mac in replies])
+            except OSError as e:
+                print(f"Raw ARP sweep failed, using scapy: {e}")
+            finally:
+                engine.close()
+
         try:
-            print(f"Scanning target: {self.target_ip}...")
+            scapy = _scapy()
+            print(f"Scanning target: {target} (~{estimate_duration(target, rate_pps, 1, window):.0f} s)...")
             
-            # 1. Crear paquete ARP
-            arp_request = scapy.ARP(pdst=self.target_ip)
-            broadcast = scapy.Ether(dst="ff:ff:ff:ff:ff:ff")
-            arp_request_broadcast = broadcast / arp_request
-            
-            # 2. Enviar y recibir respuestas
-            # Espera solo 1 segundo (timeout) para no congelar la pantalla
-            answered_list = scapy.srp(arp_request_broadcast, timeout=1, verbose=False)[0]
-            
-            # 3. Procesar resultados
             clients_list = []
-            for element in answered_list:
-                # element[1] es el paquete de respuesta (p.answer)
-                ip_address = element[1].psrc
-                mac_address = element[1].hwsrc
-                client_dict = {
-                    "ip": ip_address,
-                    "mac": mac_address,
-                    "vendor": self.vendor_service.get_vendor(mac_address)
-                }
-                clients_list.append(client_dict)
+            for chunk in split_target(target, window):
+                pdst = _without(chunk, skip)
+                if not pdst:
+                    continue
+                # 1. Crear paquete ARP
+                arp_request = scapy.ARP(pdst=pdst)
+                broadcast = scapy.Ether(dst="ff:ff:ff:ff:ff:ff")
+                arp_request_broadcast = broadcast / arp_request
+                
+                # 2. Enviar y recibir respuestas
+                # Espera solo 1 segundo (timeout) para no congelar la pantalla
+                answered_list = scapy.srp(
+                    arp_request_broadcast, timeout=1, verbose=False, inter=1 / rate_pps,
+                    **({"iface": interface} if interface else {})
+                )[0]
+                
+                # 3. Procesar resultados
+                for element in answered_list:
+                    # element[1] es el paquete de respuesta (p.answer)
+                    clients_list.append(self._make_device(element[1].psrc, element[1].hwsrc))
                 
-            return clients_list
+            return self._finish_probe(plan, clients_list)
             
         except Exception as e:
             print(f"Error scanning: {e}")
             return []
+
+    def _open_engine(self, target: str, interface: str = None):
+        """
+        Abre el motor AF_PACKET si el backend lo pide.
+
+        Una falla propia del rango (ninguna interfaz en esa red, interfaz
+        caída) solo deja ese (rango, interfaz) en scapy; sin AF_PACKET o
+        sin permisos el scanner entero queda en scapy.
+
+        Returns:
+            ArpEngine listo para barrer, o None para usar scapy
+        """
+        key = (target, interface)
+        if self.backend != "auto" or key in self._raw_failures:
+            return None
+        try:
+            if key not in self._raw_interfaces:
+                network = ipaddress.ip_network(target, strict=False)
+                self._raw_interfaces[key] = arp_engine.find_interface(network, interface)
+            return ArpEngine(*self._raw_interfaces[key])
+        except OSError as e:
+            if isinstance(e, PermissionError) or not arp_engine.raw_available():
+                print(f"Raw ARP engine unavailable, using scapy: {e}")
+                self.backend = None
+            else:
+                print(f"Raw ARP engine unavailable for {target}, using scapy: {e}")
+                self._raw_failures.add(key)
+                self._raw_interfaces.pop(key, None)
+            return None
+
+    def _plan_probe(self, target: str, skip=None) -> ProbePlan | None:
+        """
+        Decide qué direcciones consultar según el LivenessTracker.
+
+        Returns:
+            ProbePlan, o None si el scanner no es incremental
+        """
+        if self.liveness is None:
+            return None
+        now = self.liveness.clock()
+        requested = set(skip or ())
+        not_due = self.liveness.not_due(target, now) - requested
+        network = ipaddress.ip_network(target, strict=False)
+        skip = requested | not_due
+        probed = [ip for ip in map(str, network.hosts()) if ip not in skip]
+        cached = [device for device in self.liveness.live(target) if device["ip"] in not_due]
+        return ProbePlan(skip, probed, cached, now)
+
+    def _finish_probe(self, plan: ProbePlan | None, devices: list) -> list:
+        """Registra las respuestas y fallas de un barrido incremental y suma los vivos en caché."""
+        if plan is None:
+            return devices
+        for device in devices:
+            self.liveness.seen(device, plan.now)
+        answered = {device["ip"] for device in devices}
+        self.liveness.record_sweep(plan.probed, answered, plan.now)
+        return devices + [device for device in plan.cached if device["ip"] not in answered]
+
+    def _make_device(self, ip_address: str, mac_address: str) -> dict:
+        """Arma el diccionario de un dispositivo (resuelve el fabricante)."""
+        if self.liveness is not None:
+            # Mismo host con la misma MAC: no hace falta resolver el fabricante
+            cached = self.liveness.cached(ip_address, mac_address)
+            if cached is not None:
+                return cached
+        return {
+            "ip": ip_address,
+            "mac": mac_address,
+            "vendor": self.vendor_service.get_vendor(mac_address)
+        }
+
+    async def scan_stream(self, target: str = None, timeout: float = 1.0, rate_pps: int = DEFAULT_RATE_PPS,
+                          interface: str = None, skip=None):
+        """
+        Barrido ARP que entrega cada dispositivo apenas responde.
+
+        Un sniffer en segundo plano (filtro BPF de respuestas ARP) se arranca
+        antes de enviar; los pedidos salen a ritmo `rate_pps` desde un hilo y
+        cada respuesta se entrega en cuanto se resuelve su fabricante (en
+        paralelo, sin esperar al resto). El barrido termina `timeout`
+        segundos después del último envío. Si no se puede abrir el sniffer
+        (p. ej. sin permisos), cae al escaneo clásico de scan_network().
+        Con backend="auto" el envío y la recepción los hace el motor
+        AF_PACKET en un solo hilo, sin sniffer de scapy.
+
+        Args:
+            target: Rango CIDR a barrer (por defecto self.target_ip)
+            timeout: Segundos de espera tras el último pedido
+            rate_pps: Pedidos ARP por segundo
+            interface: Interfaz por la que enviar y escuchar (None = por defecto)
+            skip: IPs que no se consultan
+
+        Con `liveness`, los hosts vivos sin vencer se entregan primero desde
+        la caché y solo se consultan las direcciones vencidas o desconocidas.
+
+        Yields:
+            Diccionarios de dispositivo (ip, mac, vendor), sin repetidos
+        """
+        target = target or self.target_ip
+        network = ipaddress.ip_network(target, strict=False)
+        loop = asyncio.get_running_loop()
+        results = asyncio.Queue()
+        seen = set()
+        pending = set()
+        answered = []
+
+        requested_skip = skip
+        plan = self._plan_probe(target, skip)
+        if plan is not None:
+            for device in plan.cached:
+                seen.add(device["ip"])
+                yield device
+            if not plan.probed:
+                return
+            skip = plan.skip
+
+        def on_done(task):
+            pending.discard(task)
+            answered.append(task.result())
+            results.put_nowait(task.result())
+
+        def on_reply(ip, mac):
+            # Corre en el loop (call_soon_threadsafe desde el hilo del sniffer)
+            if ip in seen or ipaddress.ip_address(ip) not in network:
+                return
+            seen.add(ip)
+            task = loop.create_task(asyncio.to_thread(self._make_device, ip, mac))
+            pending.add(task)
+            task.add_done_callback(on_done)
+
+        stop = threading.Event()
+        engine = self._open_engine(target, interface)
+        sniffer = None
+        if engine is not None:
+            # El motor AF_PACKET envía y recibe en un mismo hilo y su barrido
+            # ya incluye la espera final
+            grace = 0.0
+            send_task = loop.create_task(asyncio.to_thread(
+                self._raw_sweep, engine, target, timeout, rate_pps,
+                lambda ip, mac: loop.call_soon_threadsafe(on_reply, ip, mac), stop, skip
+            ))
+        else:
+            scapy = _scapy()
+
+            def on_packet(packet):
+                arp = packet[scapy.ARP]
+                loop.call_soon_threadsafe(on_reply, arp.psrc, arp.hwsrc)
+
+            sniffer = self._start_sniffer(on_packet, interface)
+            if sniffer is None:
+                # scan_network planifica por su cuenta: recibe el skip pedido
+                for device in await asyncio.to_thread(self.scan_network, target, rate_pps, SCAN_WINDOW, interface,
+                                                      requested_skip):
+                    if device["ip"] not in seen:
+                        yield device
+                return
+            grace = timeout
+            send_task = loop.create_task(
+                asyncio.to_thread(self._send_requests, target, rate_pps, stop, interface, skip)
+            )
+
+        deadline = None
+        try:
+            while True:
+                try:
+                    yield results.get_nowait()
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+
+                if deadline is None and send_task.done():
+                    # Un envío fallido no es un barrido: se propaga sin
+                    # registrar como fallas las direcciones no consultadas
+                    send_task.result()
+                    deadline = loop.time() + grace
+                if deadline is not None and loop.time() >= deadline and not pending:
+                    # Barrido completo: recién ahora las no respuestas cuentan como fallas
+                    self._finish_probe(plan, answered)
+                    break
+                wait = 0.05 if deadline is None else max(deadline - loop.time(), 0.05)
+                try:
+                    yield await asyncio.wait_for(results.get(), wait)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            stop.set()
+            if sniffer is not None:
+                try:
+                    sniffer.stop()
+                except Exception as e:
+                    print(f"Error stopping ARP sniffer: {e}")
+
+    def neighbor_devices(self, networks: list = None) -> list:
+        """
+        Dispositivos que ya figuran en la tabla de vecinos del kernel (sin enviar paquetes).
+
+        Returns:
+            Dispositivos etiquetados como en scan_all(), más "state"
+            ("reachable" o "stale") y "ipv6" si la misma MAC tiene vecinos IPv6
+        """
+        networks = list_local_networks() if networks is None else networks
+        entries, _ = self._neighbor_entries(networks)
+        return [self._neighbor_device(*entry) for entry in entries]
+
+    def _neighbor_entries(self, networks: list):
+        """
+        Cruza la tabla de vecinos con las subredes a barrer.
+
+        Returns:
+            Tupla (entradas, frescas): entradas es una lista de
+            (LocalNetwork, Neighbor, ipv6) y frescas un dict target -> IPs
+            en estado REACHABLE, que el barrido activo no necesita consultar
+        """
+        neighbors = neighbor_table.read_neighbors()
+        parsed = [(net, ipaddress.ip_network(net.target, strict=False)) for net in networks]
+        by_interface = {net.interface: net for net in networks}
+        ipv6 = {}
+        for neighbor in neighbors:
+            if ":" in neighbor.ip:
+                ipv6.setdefault(neighbor.mac, []).append(neighbor.ip)
+
+        entries = []
+        fresh = {net.target: set() for net in networks}
+        macs = set()
+        for neighbor in neighbors:
+            if ":" in neighbor.ip:
+                continue
+            # Preferimos la subred de la misma interfaz por la que se aprendió
+            matches = [net for net, network in parsed if neighbor_table.in_network(neighbor, network)]
+            net = next((n for n in matches if n.interface == neighbor.interface), matches[0] if matches else None)
+            if net is None:
+                continue
+            entries.append((net, neighbor, ipv6.get(neighbor.mac, [])))
+            macs.add(neighbor.mac)
+            if neighbor.state == neighbor_table.REACHABLE:
+                fresh[net.target].add(neighbor.ip)
+
+        # Hosts con solo IPv6: un dispositivo por MAC, en la red de su interfaz
+        for neighbor in neighbors:
+            net = by_interface.get(neighbor.interface)
+            if ":" in neighbor.ip and neighbor.mac not in macs and net is not None:
+                macs.add(neighbor.mac)
+                entries.append((net, neighbor, ipv6[neighbor.mac]))
+        return entries, fresh
+
+    def _neighbor_device(self, net: LocalNetwork, neighbor, ipv6: list) -> dict:
+        """Dispositivo (con fabricante) armado desde una entrada de la tabla de vecinos."""
+        device = self._tag(self._make_device(neighbor.ip, neighbor.mac), net)
+        device["state"] = neighbor.state
+        if ipv6:
+            device["ipv6"] = ipv6
+        return device
+
+    def observed_device(self, observation, networks: list = None) -> dict | None:
+        """
+        Dispositivo armado desde una observación pasiva (core/passive_discovery.py).
+
+        Cuenta como una respuesta para el LivenessTracker, así el próximo
+        barrido incremental no vuelve a consultar ese host.
+
+        Returns:
+            Dispositivo etiquetado como en scan_all() (más "hostname" si se
+            conoce), o None si la IP no está en ninguna subred local
+        """
+        networks = list_local_networks() if networks is None else networks
+        address = ipaddress.ip_address(observation.ip)
+        matches = [net for net in networks if address in ipaddress.ip_network(net.target, strict=False)]
+        net = next((n for n in matches if n.interface == observation.interface), matches[0] if matches else None)
+        if net is None:
+            return None
+        base = self._make_device(observation.ip, observation.mac)
+        if self.liveness is not None:
+            self.liveness.seen(base, self.liveness.clock())
+        device = self._tag(base, net)
+        if observation.hostname:
+            device["hostname"] = observation.hostname
+        return device
+
+    def scan_all(self, networks: list = None, rate_pps: int = DEFAULT_RATE_PPS, window: int = SCAN_WINDOW,
+                 neighbors: bool = True) -> list:
+        """
+        Barre todas las subredes locales a la vez, un emisor por interfaz.
+
+        Con `neighbors`, la tabla de vecinos del kernel aporta primero los
+        hosts conocidos y el barrido activo omite los que están REACHABLE
+        (solo consulta direcciones faltantes o vencidas).
+
+        Args:
+            networks: Lista de LocalNetwork (por defecto list_local_networks())
+            rate_pps: Pedidos por segundo de cada emisor
+            window: Direcciones por bloque (ver scan_network)
+            neighbors: Sembrar con la tabla de vecinos
+
+        Returns:
+            Dispositivos sin repetir (por IP y MAC), cada uno con las claves
+            extra "interface" y "subnet"
+        """
+        networks = list_local_networks() if networks is None else networks
+        if not networks:
+            return []
+        entries, fresh = self._neighbor_entries(networks) if neighbors else ([], {})
+
+        merged = {}
+        with ThreadPoolExecutor(max_workers=len(networks) + min(len(entries), 8)) as executor:
+            seeds = [executor.submit(self._neighbor_device, *entry) for entry in entries]
+            futures = [
+                (net, executor.submit(self.scan_network, net.target, rate_pps, window, net.interface,
+                                      fresh.get(net.target)))
+                for net in networks
+            ]
+            for seed in seeds:
+                device = seed.result()
+                merged[(device["ip"], device["mac"])] = device
+            # En orden de interfaz: ante un dispositivo repetido gana la primera
+            for net, future in futures:
+                for device in future.result():
+                    key = (device["ip"], device["mac"])
+                    if key in merged:
+                        if "state" in merged[key]:
+                            merged[key]["state"] = neighbor_table.REACHABLE  # Vecino vencido que respondió
+                    else:
+                        merged[key] = self._tag(device, net)
+        return list(merged.values())
+
+    async def scan_all_stream(self, networks: list = None, timeout: float = 1.0,
+                              rate_pps: int = DEFAULT_RATE_PPS, neighbors: bool = True):
+        """
+        Versión en streaming de scan_all(): un scan_stream() por interfaz en
+        paralelo, entregando cada dispositivo nuevo apenas responde.
+
+        Con `neighbors`, los hosts de la tabla de vecinos se entregan primero
+        (sin esperar a la red) y el barrido activo solo consulta el resto.
+
+        Yields:
+            Diccionarios de dispositivo con "interface" y "subnet", sin repetidos
+
+        Raises:
+            Exception: El primer error de barrido, después de que terminen
+                las demás interfaces (el resultado estaría incompleto)
+        """
+        networks = list_local_networks() if networks is None else networks
+        results = asyncio.Queue()
+        done = object()
+        entries, fresh = self._neighbor_entries(networks) if neighbors else ([], {})
+        errors = []
+
+        async def seed(entry):
+            try:
+                results.put_nowait(await asyncio.to_thread(self._neighbor_device, *entry))
+            finally:
+                results.put_nowait(done)
+
+        async def sweep(net):
+            try:
+                async for device in self.scan_stream(net.target, timeout, rate_pps, net.interface,
+                                                     fresh.get(net.target)):
+                    results.put_nowait(self._tag(device, net))
+            except Exception as e:
+                print(f"Error scanning {net.interface} ({net.target}): {e}")
+                errors.append(e)
+            finally:
+                results.put_nowait(done)
+
+        tasks = [asyncio.create_task(seed(entry)) for entry in entries]
+        tasks += [asyncio.create_task(sweep(net)) for net in networks]
+        seen = set()
+        remaining = len(tasks)
+        try:
+            while remaining:
+                device = await results.get()
+                if device is done:
+                    remaining -= 1
+                    continue
+                key = (device["ip"], device["mac"])
+                if key not in seen:
+                    seen.add(key)
+                    yield device
+            if errors:
+                raise errors[0]
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    def _tag(device: dict, net: LocalNetwork) -> dict:
+        """Copia del dispositivo con la interfaz y subred por las que respondió."""
+        return {**device, "interface": net.interface, "subnet": net.subnet}
+
+    def _raw_sweep(self, engine, target, timeout, rate_pps, on_reply, stop, skip=None):
+        """
+        Barrido con el motor AF_PACKET (en un hilo); cierra el motor al terminar.
+
+        Raises:
+            OSError: Si el barrido falla (p. ej. ENETDOWN); lo recibe scan_stream
+        """
+        try:
+            engine.sweep(target, timeout, rate_pps, on_reply=on_reply, stop=stop, skip=skip)
+        finally:
+            engine.close()
+
+    def _start_sniffer(self, on_packet, interface: str = None):
+        """
+        Arranca un AsyncSniffer de respuestas ARP (en `interface` si se indica).
+
+        Returns:
+            El sniffer ya escuchando, o None si no se pudo iniciar
+        """
+        scapy = _scapy()
+        started = threading.Event()
+        try:
+            sniffer = scapy.AsyncSniffer(
+                filter=ARP_REPLY_FILTER, prn=on_packet, store=False, started_callback=started.set,
+                **({"iface": interface} if interface else {})
+            )
+            sniffer.start()
+        except Exception as e:
+            print(f"Error starting ARP sniffer: {e}")
+            return None
+        if not started.wait(1.0):
+            print("ARP sniffer did not start; falling back to a blocking scan")
+            try:
+                sniffer.stop()
+            except Exception:
+                pass  # El hilo del sniffer ya murió al fallar
+            return None
+        return sniffer
+
+    def _send_requests(self, target: str, rate_pps: int, stop: threading.Event = None, interface: str = None,
+                       skip=None):
+        """
+        Envía los pedidos ARP del rango a ritmo constante (en un hilo).
+
+        El ritmo se mantiene por ráfagas de SEND_BURST paquetes con
+        deadlines absolutos, así un sleep impreciso no acumula deriva.
+
+        Raises:
+            Exception: Si no se puede abrir el socket L2 o falla un envío
+        """
+        scapy = _scapy()
+        request = scapy.Ether(dst="ff:ff:ff:ff:ff:ff") / scapy.ARP(pdst=_without(target, skip))
+        interval = SEND_BURST / rate_pps
+        try:
+            sock = scapy.conf.L2socket(**({"iface": interface} if interface else {}))
+        except Exception as e:
+            print(f"Error opening L2 socket: {e}")
+            raise
+        try:
+            next_burst = time.monotonic()
+            for i, packet in enumerate(request):
+                if stop is not None and stop.is_set():
+                    break
+                sock.send(packet)
+                if (i + 1) % SEND_BURST == 0:
+                    next_burst += interval
+                    delay = next_burst - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+        finally:
+            sock.close()
     
     def detect_new_devices(self, current_scan: list) -> list:
         """
         Detecta dispositivos nuevos comparando con dispositivos conocidos.
+
+        Con inventario, el escaneo se fusiona en disco en una sola
+        transacción y "nuevo" significa nunca visto, también entre
+        reinicios de la aplicación.
         
         Args:
             current_scan: Lista de dispositivos del escaneo actual
@@ -75,6 +736,9 @@ class NetworkScanner:
         Returns:
             Lista de dispositivos nuevos (no vistos antes)
         """
+        if self.inventory is not None:
+            return self.inventory.merge(current_scan)
+
         new_devices = []
         
         for device in current_scan:
@@ -0,0 +1,247 @@
+"""
+Planificador de tareas de fondo (descubrimiento ARP, port scans, speedtests).
+
+Corre en el event loop de la UI y ejecuta cada trabajo cada `interval`
+segundos con un jitter aleatorio (así varias instancias o trabajos con el
+mismo intervalo no se sincronizan). Garantías:
+- Un trabajo nunca se superpone consigo mismo: el próximo turno se
+  calcula recién cuando termina el actual.
+- Como mucho `max_concurrency` trabajos a la vez; si hay más vencidos
+  que lugares, pasan primero los de mayor prioridad.
+- Presupuesto de ancho de banda: cada trabajo declara cuántos bytes
+  estima mover y se posterga si la ventana deslizante no alcanza.
+
+Las funciones síncronas corren en un hilo (asyncio.to_thread), así que
+ni el loop de la UI ni el hilo del sampler esperan por ellas.
+"""
+
+import asyncio
+import inspect
+import random
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Callable
+
+
+class Priority(IntEnum):
+    """Menor valor = se despacha antes."""
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+class BandwidthBudget:
+    """
+    Bytes permitidos por ventana deslizante de `window` segundos.
+
+    Es una estimación declarada por cada trabajo (no se mide el tráfico
+    real): alcanza para que un speedtest no corra dos veces por hora.
+    """
+
+    def __init__(self, max_bytes: int, window: float = 3600.0):
+        """
+        Args:
+            max_bytes: Bytes que pueden gastarse dentro de la ventana
+            window: Largo de la ventana en segundos
+        """
+        self.max_bytes = max_bytes
+        self.window = window
+        self._spent = deque()  # (instante, bytes)
+
+    def _expire(self, now: float):
+        while self._spent and self._spent[0][0] <= now - self.window:
+            self._spent.popleft()
+
+    def available(self, now: float) -> int:
+        """Bytes disponibles en este momento."""
+        self._expire(now)
+        return self.max_bytes - sum(nbytes for _, nbytes in self._spent)
+
+    def try_spend(self, nbytes: int, now: float) -> bool:
+        """Reserva `nbytes` si entran en la ventana."""
+        if nbytes <= 0:
+            return True
+        if nbytes > self.available(now):
+            return False
+        self._spent.append((now, nbytes))
+        return True
+
+    def next_available(self, nbytes: int, now: float) -> float:
+        """Instante a partir del cual `nbytes` entran en la ventana."""
+        missing = nbytes - self.available(now)
+        for spent_at, spent in self._spent:
+            if missing <= 0:
+                break
+            missing -= spent
+            now = spent_at + self.window
+        return now
+
+
+class ScheduledJob:
+    """Trabajo periódico registrado en el planificador."""
+
+    def __init__(self, name: str, func: Callable, interval: float, jitter: float,
+                 priority: Priority, bandwidth: int, next_run: float):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.priority = priority
+        self.bandwidth = bandwidth  # Bytes estimados por ejecución
+        self.next_run = next_run
+        self.running = False
+        self.runs = 0
+        self.last_result = None
+        self.last_error = None
+        self.last_duration = None
+
+
+class ScanScheduler:
+    """Planificador con jitter, prioridades, concurrencia y presupuesto."""
+
+    def __init__(self, max_concurrency: int = 1, budget: BandwidthBudget | None = None,
+                 clock: Callable[[], float] = time.monotonic, rng: random.Random | None = None):
+        """
+        Args:
+            max_concurrency: Trabajos simultáneos como máximo
+            budget: Presupuesto de ancho de banda (None = sin límite)
+            clock: Reloj monotónico (inyectable para tests)
+            rng: Generador para el jitter (inyectable para tests)
+        """
+        self.max_concurrency = max_concurrency
+        self.budget = budget
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self.jobs = {}
+        self._active = set()  # Tasks en ejecución
+        self._wake = None
+        self._task = None
+
+    def add(self, name: str, func: Callable, interval: float, jitter: float = 0.1,
+            priority: Priority = Priority.NORMAL, bandwidth: int = 0, delay: float | None = None) -> ScheduledJob:
+        """
+        Registra un trabajo periódico.
+
+        Args:
+            name: Identificador único
+            func: Función sin argumentos (síncrona o corrutina)
+            interval: Segundos entre el fin de una ejecución y la siguiente
+            jitter: Fracción del intervalo que se varía al azar (0.1 = ±10%)
+            priority: Prioridad al competir por un lugar
+            bandwidth: Bytes que estima mover cada ejecución
+            delay: Primera ejecución (por defecto, un intervalo con jitter)
+        """
+        if interval <= 0 or not 0 <= jitter < 1:
+            raise ValueError("interval must be > 0 and jitter in [0, 1)")
+        if name in self.jobs:
+            raise ValueError(f"Job '{name}' already scheduled")
+        if self.budget is not None and bandwidth > self.budget.max_bytes:
+            raise ValueError(f"Job '{name}' needs more bandwidth than the whole budget")
+        job = ScheduledJob(name, func, interval, jitter, priority, bandwidth, 0.0)
+        job.next_run = self._clock() + (self.next_delay(job) if delay is None else delay)
+        self.jobs[name] = job
+        self._notify()
+        return job
+
+    def remove(self, name: str):
+        """Quita un trabajo (si está corriendo, termina su ejecución actual)."""
+        self.jobs.pop(name, None)
+        self._notify()
+
+    def trigger(self, name: str):
+        """Adelanta un trabajo para que corra en cuanto haya lugar."""
+        self.jobs[name].next_run = self._clock()
+        self._notify()
+
+    def next_delay(self, job: ScheduledJob) -> float:
+        """Intervalo con jitter uniforme de ±jitter."""
+        return job.interval * (1 + self._rng.uniform(-job.jitter, job.jitter))
+
+    def due_jobs(self, now: float) -> list:
+        """Trabajos vencidos que no están corriendo, por prioridad y antigüedad."""
+        due = [job for job in self.jobs.values() if not job.running and job.next_run <= now]
+        return sorted(due, key=lambda job: (job.priority, job.next_run))
+
+    def dispatch(self) -> list:
+        """
+        Lanza los trabajos vencidos que entran en los límites.
+
+        Returns:
+            Los trabajos lanzados
+        """
+        now = self._clock()
+        started = []
+        for job in self.due_jobs(now):
+            if len(self._active) >= self.max_concurrency:
+                break
+            if self.budget is not None and not self.budget.try_spend(job.bandwidth, now):
+                # No alcanza el presupuesto: se posterga hasta que alcance
+                job.next_run = max(self.budget.next_available(job.bandwidth, now), now + 1)
+                print(f"Job '{job.name}' deferred: bandwidth budget exhausted")
+                continue
+            job.running = True
+            task = asyncio.ensure_future(self._execute(job))
+            self._active.add(task)
+            started.append(job)
+        return started
+
+    async def _execute(self, job: ScheduledJob):
+        start = self._clock()
+        try:
+            if inspect.iscoroutinefunction(job.func):
+                job.last_result = await job.func()
+            else:
+                job.last_result = await asyncio.to_thread(job.func)
+            job.last_error = None
+        except Exception as e:
+            job.last_error = e
+            print(f"Scheduled job '{job.name}' failed: {e}")
+        finally:
+            end = self._clock()
+            job.runs += 1
+            job.last_duration = end - start
+            job.next_run = end + self.next_delay(job)
+            job.running = False
+            # Liberar el lugar antes de despertar al bucle (un done_callback
+            # llegaría una vuelta del loop tarde)
+            self._active.discard(asyncio.current_task())
+            self._notify()
+
+    def _notify(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    def _sleep_time(self) -> float | None:
+        """Segundos hasta el próximo vencimiento (None si no hay nada que esperar)."""
+        pending = [job.next_run for job in self.jobs.values() if not job.running]
+        if not pending or len(self._active) >= self.max_concurrency:
+            return None
+        return max(0.0, min(pending) - self._clock())
+
+    async def run(self):
+        """Bucle del planificador (hasta cancelar la tarea o llamar a stop)."""
+        self._wake = asyncio.Event()
+        try:
+            while True:
+                self._wake.clear()
+                self.dispatch()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self._sleep_time())
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in list(self._active):
+                task.cancel()
+
+    def start(self) -> asyncio.Task:
+        """Arranca el bucle en el event loop actual."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self.run())
+        return self._task
+
+    def stop(self):
+        """Detiene el bucle y cancela los trabajos asíncronos en curso."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
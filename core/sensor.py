@@ -1,27 +1,222 @@
+import fnmatch
+import time
+from typing import NamedTuple
+import numpy as np
 import psutil
-import psutil
+
+from core.net_counters import PsutilCounters, create_counter_backend
+
+# Rango de los contadores de 32 bits (algunos drivers y Windows antiguos)
+COUNTER_32_WRAP = 2 ** 32
+
+
+class TrafficSample(NamedTuple):
+    """Una lectura del sensor con su marca de tiempo monotónica."""
+    timestamp_ns: int
+    elapsed_s: float
+    download_mb: float  # MB/s
+    upload_mb: float  # MB/s
+
+
+def counter_delta(current, previous):
+    """
+    Diferencia entre dos lecturas de un contador acumulativo.
+
+    Si el contador retrocede puede ser un desborde de 32 bits (el valor
+    previo cabe en 32 bits y el salto resultante es razonable) o un
+    reinicio de la interfaz, en cuyo caso se cuenta lo acumulado desde cero.
+    """
+    if current >= previous:
+        return current - previous
+    wrapped = current + COUNTER_32_WRAP - previous
+    if previous < COUNTER_32_WRAP and wrapped < COUNTER_32_WRAP // 2:
+        return wrapped
+    return current
+
+
+def counter_deltas(current, previous, out):
+    """Versión vectorizada de counter_delta sobre arrays int64 (escribe en `out`)."""
+    np.subtract(current, previous, out=out)
+    if (out < 0).any():
+        wrapped = out + COUNTER_32_WRAP
+        is_wrap = (previous < COUNTER_32_WRAP) & (wrapped < COUNTER_32_WRAP // 2)
+        np.copyto(out, np.where(is_wrap, wrapped, current), where=out < 0)
+    return out
+
+# Patrones de interfaces virtuales habituales (loopback, docker, bridges, veth, VPN)
+VIRTUAL_INTERFACE_PATTERNS = (
+    "lo", "lo0", "Loopback*", "docker*", "br-*", "veth*",
+    "virbr*", "vmnet*", "vboxnet*", "tun*", "tap*", "wg*",
+)
+
+
+class _CounterSnapshot:
+    """
+    Buffers reutilizables para leer un backend de contadores y calcular
+    el delta de todas sus interfaces con una única operación vectorizada.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.names = []
+        self.prev = np.zeros((0, 2), dtype=np.int64)
+        self.t_prev = time.monotonic_ns()
+        self.resize()
+
+    def resize(self):
+        """Reasigna los buffers cuando cambia el conjunto de interfaces."""
+        old = dict(zip(self.names, self.prev.tolist()))
+        self.names = self.backend.interface_names()
+        self.curr = np.zeros((len(self.names), 2), dtype=np.int64)
+        self.delta = np.zeros((len(self.names), 2), dtype=np.int64)
+        self.backend.read_into(self.curr)
+
+        # Interfaces nuevas arrancan con delta cero; las existentes conservan su referencia
+        self.prev = self.curr.copy()
+        for i, name in enumerate(self.names):
+            if name in old:
+                self.prev[i] = old[name]
+
+    def read(self):
+        """
+        Lee el backend y calcula los deltas desde la lectura anterior.
+
+        Returns:
+            Tupla (deltas (n, 2) [rx, tx], segundos transcurridos, cambió_el_conjunto)
+        """
+        count = self.backend.read_into(self.curr)
+        now = time.monotonic_ns()
+        # -1: otra cantidad o nombres distintos en las mismas filas; se vuelve
+        # a tomar la referencia por nombre para no restar contadores de otra NIC
+        changed = count != len(self.names)
+        if changed:
+            self.resize()
+
+        counter_deltas(self.curr, self.prev, self.delta)
+        elapsed = max(now - self.t_prev, 1) / 1e9
+
+        # La lectura actual pasa a ser la referencia (intercambio sin copias)
+        self.t_prev = now
+        self.prev, self.curr = self.curr, self.prev
+        return self.delta, elapsed, changed
+
+
 class NetworkSensor:
-    def __init__(self):
-        # T0 Lectura inicial para referencia
-        self.io_prev = psutil.net_io_counters()
+    def __init__(self, pernic=False, include=None, exclude=None, backend=None):
+        """
+        Args:
+            pernic: Si es True, además del agregado se muestrea cada interfaz
+            include: Patrones (fnmatch) de interfaces a incluir (None = todas)
+            exclude: Patrones (fnmatch) de interfaces a excluir
+            backend: None usa psutil.net_io_counters() para el agregado.
+                "auto", "procfs", "netlink" o "psutil" eligen un backend de
+                contadores (core/net_counters.py) que alimenta agregado y NICs.
+        """
+        self.pernic = pernic
+        self.include = tuple(include) if include else None
+        self.exclude = tuple(exclude) if exclude else ()
+        self.backend_name = backend
+        self.backend = self._create_backend()
+        self.aggregate_from_backend = backend is not None
+
+        # T0 Lectura inicial para referencia (con reloj monotónico)
+        self.io_prev = None if self.aggregate_from_backend else psutil.net_io_counters()
+        self.t_prev = time.monotonic_ns()
+        self._all = _CounterSnapshot(self.backend) if self.aggregate_from_backend else None
+
+        # Buffers por interfaz (se crean con el primer muestreo por NIC)
+        self.nic_names = []
+        self.nic_backend = None
+        self._nics = None
+        if self.pernic:
+            self._init_nics()
 
     def get_traffic(self):
         """
-        Retorna una tupla: (download_mb, upload_mb)
-        calculada desde la ultima vez que se llamó
+        Retorna una tupla: (download_mb, upload_mb) en MB/s,
+        calculada sobre el tiempo real transcurrido desde la ultima llamada
+        """
+        sample = self.sample()
+        return (sample.download_mb, sample.upload_mb)
+
+    def sample(self) -> TrafficSample:
+        """
+        Toma una lectura agregada y la convierte en tasa usando el tiempo
+        monotónico real entre llamadas (no asume 1 segundo).
+
+        Returns:
+            TrafficSample con timestamp, segundos transcurridos y MB/s
+        """
+        if self.aggregate_from_backend:
+            # Suma de deltas por interfaz (cada uno ya corregido por desbordes)
+            delta, elapsed, _ = self._all.read()
+            download, upload = delta.sum(axis=0).tolist()
+            now = self._all.t_prev
+        else:
+            io_current = psutil.net_io_counters()
+            now = time.monotonic_ns()
+
+            # Diferencia (bytes actuales - bytes anteriores), tolerando desbordes y reinicios
+            upload = counter_delta(io_current.bytes_sent, self.io_prev.bytes_sent)
+            download = counter_delta(io_current.bytes_recv, self.io_prev.bytes_recv)
+            elapsed = max(now - self.t_prev, 1) / 1e9
+
+            # Actualizamos referencia para la proxima vuelta
+            self.io_prev = io_current
+            self.t_prev = now
+
+        # Convertimos a MB/s (1MB = 1048576)
+        return TrafficSample(now, elapsed, download / 1048576 / elapsed, upload / 1048576 / elapsed)
+
+    def get_traffic_per_nic(self):
         """
+        Muestrea todas las interfaces seleccionadas y calcula sus deltas
+        con una única resta vectorizada.
 
-        io_current = psutil.net_io_counters()
+        Returns:
+            Tupla (nombres, tasas). `tasas` es un array (n, 2) con
+            [download_mb, upload_mb] (MB/s) por interfaz, en el mismo orden que
+            `nombres`. Es un buffer reutilizado: copiarlo si se quiere guardar.
+        """
+        if self._nics is None:
+            self._init_nics()
 
-        # Diferencia (bytes actuales - bytes anteriores)
-        upload = io_current.bytes_sent - self.io_prev.bytes_sent
-        download = io_current.bytes_recv - self.io_prev.bytes_recv
+        delta, elapsed, changed = self._nics.read()
+        if changed:
+            self._select_nics()
 
-        # Actualizamos referencia para la proxima vuelta
-        self.io_prev = io_current
+        # Filtrado y conversión a MB/s sobre buffers preasignados
+        np.take(delta, self._nic_index, axis=0, out=self._nic_delta)
+        np.multiply(self._nic_delta, 1 / 1048576 / elapsed, out=self._nic_rates)
+        return self.nic_names, self._nic_rates
 
-        # Convertimos a MB (1MB = 1048576)
-        return (download / 1048576, upload / 1048576)
+    def _create_backend(self):
+        """Instancia el backend de contadores configurado."""
+        return create_counter_backend(self.backend_name) if self.backend_name else PsutilCounters()
+
+    def _init_nics(self):
+        """
+        Crea los buffers por interfaz. Usan su propia instancia de backend:
+        el agregado se lee en cada muestra y las NICs una vez por lote, cada
+        uno con su propia referencia de tiempo.
+        """
+        self.nic_backend = self._create_backend()
+        self._nics = _CounterSnapshot(self.nic_backend)
+        self._select_nics()
+
+    def _select_nics(self):
+        """Aplica los filtros y dimensiona los buffers de salida por NIC."""
+        index = [i for i, name in enumerate(self._nics.names) if self._nic_allowed(name)]
+        self.nic_names = [self._nics.names[i] for i in index]
+        self._nic_index = np.array(index, dtype=np.intp)
+        self._nic_delta = np.zeros((len(index), 2), dtype=np.int64)
+        self._nic_rates = np.zeros((len(index), 2), dtype=np.float64)
+
+    def _nic_allowed(self, name):
+        """Aplica los filtros include/exclude a un nombre de interfaz."""
+        if self.include and not any(fnmatch.fnmatch(name, p) for p in self.include):
+            return False
+        return not any(fnmatch.fnmatch(name, p) for p in self.exclude)
 
     def format_bytes(self, bytes_raw):
         """Convierte bytes crudos a KB, MB, GB para mostrar en pantalla"""
@@ -30,4 +225,10 @@ class NetworkSensor:
             if size < 1024:
                 return f"{size:.2f} {unit}"
             size /=1024
-        return f"{size:.2f} PB"
\ No newline at end of file
+        return f"{size:.2f} PB"
+
+    def close(self):
+        """Libera los recursos de los backends (descriptores, sockets)."""
+        self.backend.close()
+        if self.nic_backend is not None:
+            self.nic_backend.close()
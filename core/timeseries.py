@@ -0,0 +1,156 @@
+"""
+Almacén de series de tiempo en memoria con varias resoluciones.
+Cada nivel es un buffer circular NumPy de tamaño fijo que guarda
+min/max/suma/cantidad por bucket, actualizado incrementalmente.
+"""
+
+import numpy as np
+
+# (resolución en segundos, cantidad de buckets)
+DEFAULT_TIERS = (
+    (1, 3600),       # 1 s  -> última hora
+    (10, 8640),      # 10 s -> último día
+    (60, 10080),     # 1 min -> última semana
+    (3600, 2160),    # 1 h  -> últimos 90 días
+    (86400, 730),    # 1 día -> últimos 2 años
+)
+
+# Canales almacenados: download y upload
+CHANNELS = 2
+
+
+class TimeSeriesTier:
+    """
+    Un nivel de resolución fija respaldado por arrays circulares.
+    El bucket en curso se actualiza en su lugar; al cambiar de bucket
+    se avanza el cursor y se reinicia la celda siguiente.
+    """
+
+    def __init__(self, resolution: int, capacity: int):
+        """
+        Args:
+            resolution: Segundos por bucket
+            capacity: Cantidad de buckets retenidos
+        """
+        self.resolution = resolution
+        self.capacity = capacity
+        self.bucket_ids = np.full(capacity, -1, dtype=np.int64)  # timestamp // resolución
+        self.mins = np.zeros((capacity, CHANNELS), dtype=np.float64)
+        self.maxs = np.zeros((capacity, CHANNELS), dtype=np.float64)
+        self.sums = np.zeros((capacity, CHANNELS), dtype=np.float64)
+        self.counts = np.zeros(capacity, dtype=np.int64)
+        self.cursor = -1  # Posición del bucket en curso
+        self.current_bucket = -1
+
+    def add(self, timestamp: float, values):
+        """
+        Agrega una muestra al bucket que le corresponde (O(1)).
+
+        Args:
+            timestamp: Segundos (epoch)
+            values: Secuencia (download, upload)
+        """
+        bucket = int(timestamp // self.resolution)
+        if bucket < self.current_bucket:
+            return  # Muestra atrasada: ese bucket ya se cerró
+        if bucket != self.current_bucket:
+            self.cursor = (self.cursor + 1) % self.capacity
+            self.current_bucket = bucket
+            self.bucket_ids[self.cursor] = bucket
+            self.mins[self.cursor] = values
+            self.maxs[self.cursor] = values
+            self.sums[self.cursor] = values
+            self.counts[self.cursor] = 1
+            return
+
+        c = self.cursor
+        np.minimum(self.mins[c], values, out=self.mins[c])
+        np.maximum(self.maxs[c], values, out=self.maxs[c])
+        self.sums[c] += values
+        self.counts[c] += 1
+
+    def window(self, seconds: float, now: float | None = None) -> dict:
+        """
+        Retorna los buckets de los últimos `seconds` en orden cronológico.
+
+        Args:
+            seconds: Largo de la ventana
+            now: Timestamp de referencia (por defecto el bucket en curso)
+
+        Returns:
+            Diccionario con arrays: timestamps, min, max, mean, sum, count
+        """
+        if self.cursor < 0:
+            return self._empty()
+
+        n = min(self.capacity, int(np.ceil(seconds / self.resolution)))
+        idx = (self.cursor - np.arange(n - 1, -1, -1)) % self.capacity
+        end_bucket = self.current_bucket if now is None else int(now // self.resolution)
+        ids = self.bucket_ids[idx]
+        keep = (ids > end_bucket - n) & (ids <= end_bucket) & (self.counts[idx] > 0)
+        idx = idx[keep]
+
+        counts = self.counts[idx]
+        sums = self.sums[idx]
+        return {
+            "timestamps": self.bucket_ids[idx] * self.resolution,
+            "min": self.mins[idx],
+            "max": self.maxs[idx],
+            "mean": sums / counts[:, None],
+            "sum": sums,
+            "count": counts,
+        }
+
+    @staticmethod
+    def _empty() -> dict:
+        """Ventana vacía con las mismas claves y formas."""
+        empty = np.zeros((0, CHANNELS), dtype=np.float64)
+        return {
+            "timestamps": np.zeros(0, dtype=np.int64),
+            "min": empty, "max": empty, "mean": empty, "sum": empty,
+            "count": np.zeros(0, dtype=np.int64),
+        }
+
+
+class TieredTimeSeries:
+    """
+    Conjunto de niveles (1 s, 10 s, 1 min, 1 h, 1 día) alimentados en
+    paralelo. Cada muestra toca un bucket por nivel: O(niveles), sin
+    re-escanear datos crudos para obtener vistas largas.
+    """
+
+    def __init__(self, tiers=DEFAULT_TIERS):
+        """
+        Args:
+            tiers: Secuencia de (resolución_segundos, capacidad)
+        """
+        self.tiers = [TimeSeriesTier(res, cap) for res, cap in tiers]
+
+    def add(self, timestamp: float, download_mb: float, upload_mb: float):
+        """Registra una muestra en todos los niveles."""
+        values = (download_mb, upload_mb)
+        for tier in self.tiers:
+            tier.add(timestamp, values)
+
+    def tier_for(self, seconds: float, max_points: int = 3600) -> TimeSeriesTier:
+        """
+        Elige el nivel más fino que cubre `seconds` con a lo sumo `max_points`
+        buckets (ej: 1 h -> 1 s, 1 día -> 1 min, 1 mes -> 1 h).
+        """
+        for tier in self.tiers:
+            covers = tier.resolution * tier.capacity >= seconds
+            if covers and seconds / tier.resolution <= max_points:
+                return tier
+        return self.tiers[-1]
+
+    def window(self, seconds: float, max_points: int = 3600, now: float | None = None) -> dict:
+        """
+        Retorna la ventana pedida desde el nivel adecuado.
+
+        Returns:
+            Diccionario de TimeSeriesTier.window más la clave "resolution"
+        """
+        tier = self.tier_for(seconds, max_points)
+        result = tier.window(seconds, now)
+        result["resolution"] = tier.resolution
+        return result
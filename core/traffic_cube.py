@@ -0,0 +1,236 @@
+"""
+Cubo de agregados por hora de la semana (7 días × 24 horas).
+
+Cada muestra actualiza una sola celda (suma ponderada por tiempo, tiempo
+cubierto, pico y cantidad), así el mapa de calor se dibuja leyendo 168
+celdas y nunca el historial crudo. Los cubos se pueden sumar entre sí
+(merge), de modo que varios archivos exportados se combinan en uno.
+"""
+
+import csv
+import json
+import os
+import time
+from itertools import islice
+
+import numpy as np
+
+try:
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depende del entorno
+    pq = None
+
+DAYS = 7
+HOURS = 24
+CHANNELS = ("download", "upload")
+CUBE_METRICS = ("avg", "peak")
+STATE_VERSION = 1
+
+# Granularidad del caché de celda: un cuarto de hora cubre las zonas
+# horarias con desfase de media hora o 45 minutos
+_SLOT_CACHE_S = 900
+
+
+def cell_for(timestamp: float) -> tuple:
+    """Celda (día de la semana, hora local) de un timestamp; lunes = 0."""
+    t = time.localtime(timestamp)
+    return t.tm_wday, t.tm_hour
+
+
+class TrafficCube:
+    """Promedio y pico de tráfico por celda día × hora, persistente y combinable."""
+
+    def __init__(self, state_path: str | None = None, save_interval: float = 300.0):
+        """
+        Args:
+            state_path: Archivo JSON de estado; None = sin persistencia
+            save_interval: Segundos entre guardados automáticos
+        """
+        self.state_path = state_path
+        self.save_interval = save_interval
+        self._last_save = time.monotonic()
+        self._cached_quarter = None
+        self._cached_cell = None
+        self.clear()
+
+        if state_path is not None and os.path.exists(state_path):
+            self.load(state_path)
+
+    def clear(self):
+        """Vacía todas las celdas."""
+        shape = (DAYS, HOURS, len(CHANNELS))
+        self.weighted_sum = np.zeros(shape, dtype=np.float64)  # Σ MB/s × segundos
+        self.peak = np.zeros(shape, dtype=np.float64)
+        self.elapsed = np.zeros((DAYS, HOURS), dtype=np.float64)
+        self.count = np.zeros((DAYS, HOURS), dtype=np.int64)
+
+    def _cell(self, timestamp: float) -> tuple:
+        """cell_for() con caché por cuarto de hora (evita localtime en cada muestra)."""
+        quarter = int(timestamp // _SLOT_CACHE_S)
+        if quarter != self._cached_quarter:
+            self._cached_quarter = quarter
+            self._cached_cell = cell_for(timestamp)
+        return self._cached_cell
+
+    def add(self, timestamp: float, download_mb: float, upload_mb: float, elapsed_s: float = 1.0,
+            peak_download: float | None = None, peak_upload: float | None = None):
+        """
+        Suma una muestra a su celda (O(1)).
+
+        Args:
+            timestamp: Segundos epoch de la muestra
+            download_mb: Tasa promedio de descarga en MB/s
+            upload_mb: Tasa promedio de subida en MB/s
+            elapsed_s: Segundos reales que cubre la muestra
+            peak_download: Ráfaga máxima (opcional, por defecto la tasa)
+            peak_upload: Ráfaga máxima (opcional, por defecto la tasa)
+        """
+        day, hour = self._cell(timestamp)
+        self.weighted_sum[day, hour, 0] += download_mb * elapsed_s
+        self.weighted_sum[day, hour, 1] += upload_mb * elapsed_s
+        self.elapsed[day, hour] += elapsed_s
+        self.count[day, hour] += 1
+        peak = self.peak[day, hour]
+        peak[0] = max(peak[0], download_mb if peak_download is None else peak_download)
+        peak[1] = max(peak[1], upload_mb if peak_upload is None else peak_upload)
+
+        if self.state_path is not None and time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+    def add_rows(self, rows: np.ndarray):
+        """
+        Suma un bloque de filas en formato HistoryStore/exportación (vectorizado).
+
+        Args:
+            rows: Array (n, 6): timestamp, download, upload, elapsed, peak_download, peak_upload
+        """
+        if not len(rows):
+            return
+        # localtime() una vez por cuarto de hora distinto, no por fila
+        quarters, inverse = np.unique(np.floor_divide(rows[:, 0], _SLOT_CACHE_S), return_inverse=True)
+        cells = np.array([cell_for(q * _SLOT_CACHE_S) for q in quarters.tolist()], dtype=np.int64)
+        flat = (cells[:, 0] * HOURS + cells[:, 1])[inverse.ravel()]
+
+        elapsed = rows[:, 3]
+        weighted = self.weighted_sum.reshape(DAYS * HOURS, len(CHANNELS))
+        peak = self.peak.reshape(DAYS * HOURS, len(CHANNELS))
+        np.add.at(weighted, flat, rows[:, 1:3] * elapsed[:, None])
+        np.maximum.at(peak, flat, np.maximum(rows[:, 4:6], rows[:, 1:3]))
+        np.add.at(self.elapsed.reshape(-1), flat, elapsed)
+        np.add.at(self.count.reshape(-1), flat, 1)
+
+    def merge(self, other: "TrafficCube") -> "TrafficCube":
+        """Suma otro cubo a este (promedios ponderados, picos máximos)."""
+        self.weighted_sum += other.weighted_sum
+        self.elapsed += other.elapsed
+        self.count += other.count
+        np.maximum(self.peak, other.peak, out=self.peak)
+        return self
+
+    def matrix(self, metric: str = "avg", channel: str = "download") -> np.ndarray:
+        """
+        Matriz (7, 24) lista para dibujar.
+
+        Args:
+            metric: "avg" (MB/s ponderado por tiempo) o "peak"
+            channel: "download" o "upload"
+        """
+        if metric not in CUBE_METRICS:
+            raise ValueError(f"Unknown cube metric: {metric}")
+        ch = CHANNELS.index(channel)
+        if metric == "peak":
+            return self.peak[:, :, ch].copy()
+        out = np.zeros((DAYS, HOURS), dtype=np.float64)
+        np.divide(self.weighted_sum[:, :, ch], self.elapsed, out=out, where=self.elapsed > 0)
+        return out
+
+    @classmethod
+    def from_export(cls, path: str, chunk_rows: int = 65536) -> "TrafficCube":
+        """
+        Construye un cubo a partir de un archivo exportado (CSV, Parquet o Arrow).
+
+        El archivo se lee por bloques, igual que se escribió.
+        """
+        cube = cls()
+        for rows in _iter_export(path, chunk_rows):
+            cube.add_rows(rows)
+        return cube
+
+    @classmethod
+    def from_exports(cls, paths, chunk_rows: int = 65536) -> "TrafficCube":
+        """Combina varios archivos exportados en un solo cubo."""
+        cube = cls()
+        for path in paths:
+            cube.merge(cls.from_export(path, chunk_rows))
+        return cube
+
+    def to_dict(self) -> dict:
+        """Estado serializable a JSON."""
+        return {
+            "version": STATE_VERSION,
+            "weighted_sum": self.weighted_sum.tolist(),
+            "peak": self.peak.tolist(),
+            "elapsed": self.elapsed.tolist(),
+            "count": self.count.tolist(),
+        }
+
+    def save(self, path: str | None = None):
+        """Guarda el estado de forma atómica (archivo temporal + rename)."""
+        path = path or self.state_path
+        if path is None:
+            return
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error saving traffic cube: {e}")
+        self._last_save = time.monotonic()
+
+    def load(self, path: str):
+        """Carga un estado guardado; si es inválido, arranca de cero."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("version") != STATE_VERSION:
+                return
+            weighted_sum = np.array(state["weighted_sum"], dtype=np.float64)
+            peak = np.array(state["peak"], dtype=np.float64)
+            elapsed = np.array(state["elapsed"], dtype=np.float64)
+            count = np.array(state["count"], dtype=np.int64)
+            if (weighted_sum.shape != (DAYS, HOURS, len(CHANNELS)) or peak.shape != weighted_sum.shape
+                    or elapsed.shape != (DAYS, HOURS) or count.shape != elapsed.shape):
+                return
+            self.weighted_sum, self.peak, self.elapsed, self.count = weighted_sum, peak, elapsed, count
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Error loading traffic cube: {e}")
+
+
+def _iter_export(path: str, chunk_rows: int):
+    """Bloques (n, 6) de un archivo exportado por core/exporter.py."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        with open(path, encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)  # Encabezado
+            while True:
+                block = list(islice(reader, chunk_rows))
+                if not block:
+                    return
+                yield np.array(block, dtype=np.float64).reshape(-1, 6)
+        return
+
+    if pq is None:
+        raise RuntimeError(f"pyarrow is required to read {ext} files")
+    if ext == ".parquet":
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_rows)
+    else:
+        reader = pa_ipc.open_file(path)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    for batch in batches:
+        # El timestamp se exporta como timestamp[ms] UTC
+        ts = batch.column(0).cast("int64").to_numpy() / 1000
+        rest = [batch.column(i).to_numpy() for i in range(1, 6)]
+        yield np.column_stack([ts] + rest)
@@ -0,0 +1,167 @@
+"""
+Estadísticas de ventana deslizante en O(1) amortizado por muestra.
+
+- Promedio y desvío: Welford ponderado por tiempo, con la actualización
+  inversa al expirar cada muestra (una muestra que cubre 3 s pesa como
+  tres de 1 s). Restar sumas de cuadrados (E[x²] - E[x]²) cancela cifras
+  cuando el desvío es chico frente al promedio; Welford no.
+- Máximo y mínimo: deques monótonas; cada muestra entra y sale una sola vez.
+  El máximo usa la ráfaga sub-segundo de la muestra si viene informada.
+"""
+
+import math
+from collections import deque
+
+# Ventanas reportadas en get_stats (sufijo -> segundos)
+ROLLING_WINDOWS = {
+    "1m": 60,
+    "5m": 300,
+    "1h": 3600,
+}
+
+CHANNELS = ("download", "upload")
+
+
+class RollingStats:
+    """Promedio, desvío, máximo y mínimo de los últimos `window_s` segundos."""
+
+    def __init__(self, window_s: float, channels: int = len(CHANNELS)):
+        """
+        Args:
+            window_s: Largo de la ventana en segundos
+            channels: Cantidad de series (download, upload)
+        """
+        self.window_s = window_s
+        self.channels = channels
+        self.clear()
+
+    def clear(self):
+        """Vacía la ventana."""
+        channels = self.channels
+        self.samples = deque()  # (timestamp, elapsed, valores)
+        self.mean = [0.0] * channels  # Promedio ponderado por elapsed
+        self.m2 = [0.0] * channels  # Σ elapsed × (valor - promedio)²
+        self.elapsed_sum = 0.0
+        # Deques monótonas de (timestamp, valor): decrecientes para el máximo,
+        # crecientes para el mínimo. El frente es siempre el extremo vigente.
+        self.max_deques = [deque() for _ in range(channels)]
+        self.min_deques = [deque() for _ in range(channels)]
+
+    def add(self, timestamp: float, values, elapsed_s: float = 1.0, peaks=None):
+        """
+        Agrega una muestra y expira las que salen de la ventana.
+
+        Args:
+            timestamp: Segundos de la muestra (crecientes)
+            values: Un valor por canal
+            elapsed_s: Segundos que cubre la muestra (peso del promedio y el desvío)
+            peaks: Ráfaga máxima por canal dentro de la muestra (opcional,
+                por defecto el valor)
+        """
+        self.samples.append((timestamp, elapsed_s, values))
+        self.elapsed_sum += elapsed_s
+        for ch, value in enumerate(values):
+            if self.elapsed_sum > 0:
+                delta = value - self.mean[ch]
+                self.mean[ch] += delta * elapsed_s / self.elapsed_sum
+                self.m2[ch] += elapsed_s * delta * (value - self.mean[ch])
+
+            peak = value if peaks is None else max(peaks[ch], value)
+            max_dq = self.max_deques[ch]
+            while max_dq and max_dq[-1][1] <= peak:
+                max_dq.pop()
+            max_dq.append((timestamp, peak))
+
+            min_dq = self.min_deques[ch]
+            while min_dq and min_dq[-1][1] >= value:
+                min_dq.pop()
+            min_dq.append((timestamp, value))
+
+        self.expire(timestamp)
+
+    def expire(self, now: float):
+        """Quita las muestras con timestamp <= now - window_s."""
+        cutoff = now - self.window_s
+        samples = self.samples
+        while samples and samples[0][0] <= cutoff:
+            _, elapsed_s, values = samples.popleft()
+            self.elapsed_sum -= elapsed_s
+            if self.elapsed_sum <= 0:
+                continue  # Se reinicia abajo si la ventana quedó vacía
+            for ch, value in enumerate(values):
+                # Inversa de la actualización de add()
+                old_mean = self.mean[ch]
+                self.mean[ch] -= (value - old_mean) * elapsed_s / self.elapsed_sum
+                self.m2[ch] = max(self.m2[ch] - elapsed_s * (value - old_mean) * (value - self.mean[ch]), 0.0)
+        if self.elapsed_sum <= 0 or not samples:
+            # Sin peso restante: reinicia los acumulados (descarta error de redondeo)
+            self.elapsed_sum = 0.0
+            self.mean = [0.0] * self.channels
+            self.m2 = [0.0] * self.channels
+
+        for dq in self.max_deques + self.min_deques:
+            while dq and dq[0][0] <= cutoff:
+                dq.popleft()
+
+    def stats(self, channel: int = 0) -> dict:
+        """
+        Estadísticas vigentes de un canal.
+
+        Returns:
+            Diccionario con avg y std (ponderados por tiempo), peak y min
+        """
+        if not self.samples:
+            return {"avg": 0.0, "std": 0.0, "peak": 0.0, "min": 0.0}
+
+        avg = variance = 0.0
+        if self.elapsed_sum > 0:
+            avg = self.mean[channel]
+            # Varianza poblacional con el mismo peso que el promedio
+            variance = self.m2[channel] / self.elapsed_sum
+        return {
+            "avg": avg,
+            "std": math.sqrt(variance),
+            "peak": self.max_deques[channel][0][1],
+            "min": self.min_deques[channel][0][1],
+        }
+
+
+class WindowStats:
+    """Varias ventanas deslizantes alimentadas en paralelo."""
+
+    def __init__(self, windows=ROLLING_WINDOWS):
+        """
+        Args:
+            windows: Diccionario sufijo -> segundos
+        """
+        self.windows = {name: RollingStats(seconds) for name, seconds in windows.items()}
+
+    def add(self, timestamp: float, download_mb: float, upload_mb: float, elapsed_s: float = 1.0,
+            peak_download: float | None = None, peak_upload: float | None = None):
+        """Registra una muestra (y sus ráfagas, si vienen) en todas las ventanas."""
+        values = (download_mb, upload_mb)
+        peaks = None
+        if peak_download is not None or peak_upload is not None:
+            peaks = (download_mb if peak_download is None else peak_download,
+                     upload_mb if peak_upload is None else peak_upload)
+        for window in self.windows.values():
+            window.add(timestamp, values, elapsed_s, peaks)
+
+    def snapshot(self) -> dict:
+        """
+        Retorna las estadísticas de todas las ventanas.
+
+        Returns:
+            Diccionario con claves avg_download_1m, peak_upload_5m, std_download_1h, etc.
+        """
+        stats = {}
+        for suffix, window in self.windows.items():
+            for channel, name in enumerate(CHANNELS):
+                for key, value in window.stats(channel).items():
+                    stats[f"{key}_{name}_{suffix}"] = value
+        return stats
+
+    def reset(self):
+        """Vacía todas las ventanas."""
+        for window in self.windows.values():
+            window.clear()
@@ -1,31 +1,77 @@
 import flet as ft
 import asyncio
+import os
+import time
 
 # --- 1. SERVICIOS (BACKEND) ---
-from core.sensor import NetworkSensor
-from core.data_manager import DataManager
-from core.scanner import NetworkScanner
+from core.sensor import NetworkSensor, VIRTUAL_INTERFACE_PATTERNS
+from core.data_manager import DataManager, CHART_WINDOWS
+from core.history_store import HistoryStore
+from core.anomaly_detector import AnomalyDetector
+from core.quota_tracker import QuotaTracker
+from core.traffic_cube import TrafficCube
+from core.paths import get_data_dir
+from core.scanner import NetworkScanner, estimate_sweep_bytes
+from core.device_inventory import DeviceInventory
+from core.device_registry import DeviceRegistry
+from core.liveness import LivenessTracker
+from core.passive_discovery import PassiveDiscovery
 from core.notification_service import NotificationService
+from core.sampler import TrafficSampler
+from core.scheduler import ScanScheduler, BandwidthBudget, Priority
+from core.port_scanner import PortScanner, ScanMode
+from core.speedtest_service import SpeedtestService
 
 # --- 2. COMPONENTES UI ---
 from ui.layout import setup_page, create_app_shell
 from ui.sidebar import create_sidebar
-from ui.charts import create_network_chart
+from ui.charts import create_network_chart, create_nic_series
 
 # --- 3. VISTAS (PANTALLAS) ---
-from ui.views.monitor_view import MonitorView, create_stats_panel, create_alerts_config
+from ui.views.monitor_view import (
+    MonitorView, create_stats_panel, create_alerts_config, create_nic_selector, create_window_selector,
+    create_export_panel, set_nic_options
+)
 from ui.views.scanner_view import ScannerView
 from ui.views.speedtest_view import SpeedtestView
 from ui.views.topology_view import TopologyView
+from ui.views.heatmap_view import HeatmapView
+
+# Frecuencia de muestreo del sensor (las ráfagas sub-segundo se ven como picos)
+SAMPLE_RATE_HZ = 10
+# Frecuencia con la que la UI vacía el buffer del sampler y redibuja
+UI_REFRESH_HZ = 4
+
+# Trabajos de fondo: intervalo en segundos y bytes estimados por ejecución
+# (los bytes del descubrimiento se estiman al arrancar según las redes locales)
+DISCOVERY_INTERVAL_S = 300
+PORT_SCAN_INTERVAL_S = 3600
+PORT_SCAN_BYTES = 2 * 1024 * 1024  # Quick (top 20) a cada dispositivo conocido
+# Speedtest de fondo: solo si el usuario lo activa en la vista Speedtest
+SPEEDTEST_INTERVAL_S = 6 * 3600
+SPEEDTEST_BYTES = 200 * 1024 * 1024
+# Presupuesto de ancho de banda de fondo por hora: un speedtest como máximo
+BACKGROUND_BUDGET_BYTES = 256 * 1024 * 1024
 
 async def main(page: ft.Page):
     # A) Configuración inicial
     setup_page(page)
     
     # B) Instanciar Backend
-    sensor = NetworkSensor()
-    data_manager = DataManager()
-    scanner_service = NetworkScanner()
+    sensor = NetworkSensor(pernic=True, exclude=VIRTUAL_INTERFACE_PATTERNS, backend="auto")
+    history_store = HistoryStore()
+    anomaly_detector = AnomalyDetector(state_path=os.path.join(get_data_dir(), "anomaly_baseline.json"))
+    quota_tracker = QuotaTracker(state_path=os.path.join(get_data_dir(), "quota.json"))
+    traffic_cube = TrafficCube(state_path=os.path.join(get_data_dir(), "traffic_cube.json"))
+    data_manager = DataManager(
+        history_store=history_store, anomaly_detector=anomaly_detector, quota_tracker=quota_tracker,
+        traffic_cube=traffic_cube
+    )
+    device_inventory = DeviceInventory()
+    # Rescans incrementales: solo se consultan hosts vencidos o desconocidos
+    scanner_service = NetworkScanner(backend="auto", inventory=device_inventory, liveness=LivenessTracker())
+    # Único dueño de los resultados de escaneo; las vistas se suscriben
+    device_registry = DeviceRegistry(scanner_service)
     notification_service = NotificationService()
 
     # C) Preparar componentes para la Vista Monitor
@@ -35,19 +81,52 @@ async def main(page: ft.Page):
     stats_panel, peak_text, total_text, avg_text = create_stats_panel()
     alerts_config, alerts_toggle, threshold_field = create_alerts_config(data_manager)
 
+    # Series por interfaz: se agregan detrás de las dos series agregadas
+    aggregate_series = list(chart.data_series)
+
+    def on_nic_selection(nic_names):
+        nic_points = data_manager.select_nics(nic_names)
+        chart.data_series = aggregate_series + create_nic_series(nic_points)
+        page.update()
+
+    nic_selector = create_nic_selector(sensor.nic_names, on_nic_selection)
+    # Nombres que muestra el selector: se reconstruye cuando el sampler
+    # trae otro conjunto (interfaces conectadas en caliente o renombradas)
+    shown_nic_names = list(sensor.nic_names)
+
+    # Ventanas largas: la serie cruda queda en NumPy y se reduce con LTTB
+    def on_window_change(seconds):
+        data_manager.set_chart_window(seconds)
+        chart.min_x, chart.max_x = data_manager.chart_x_range()
+        page.update()
+
+    window_selector = create_window_selector(CHART_WINDOWS, data_manager.chart_window, on_window_change)
+
     # D) Instanciar las Vistas
     # Vista 1: Monitor
-    view_monitor = MonitorView(chart, speed_label, stats_panel, alerts_config)
+    export_panel = create_export_panel(history_store, page)
+    view_monitor = MonitorView(chart, speed_label, stats_panel, alerts_config, nic_selector, window_selector,
+                               export_panel)
     
     # Vista 2: Escáner
-    view_scanner = ScannerView(scanner_service, page, notification_service)
+    view_scanner = ScannerView(device_registry, page, notification_service)
     
     # Vista 3: Topología (Nueva)
     # Vista 3: Topología (Nueva)
-    view_topology, refresh_topology = TopologyView(scanner_service, page)
+    view_topology, refresh_topology = TopologyView(device_registry, page)
     
-    # Vista 4: Speedtest
-    view_speedtest = SpeedtestView(page)
+    # Vista 4: Speedtest (el test periódico de fondo se activa desde acá)
+    def on_speedtest_schedule(enabled):
+        if enabled:
+            scheduler.add("speedtest", run_background_speedtest, SPEEDTEST_INTERVAL_S, jitter=0.1,
+                          priority=Priority.LOW, bandwidth=SPEEDTEST_BYTES)
+        else:
+            scheduler.remove("speedtest")
+
+    view_speedtest = SpeedtestView(page, on_speedtest_schedule)
+
+    # Vista 5: Mapa de calor (lee el cubo día × hora, no el historial)
+    view_heatmap, refresh_heatmap = HeatmapView(traffic_cube, page)
 
     # E) Lógica de Navegación
     async def nav_change(e):
@@ -57,14 +136,19 @@ async def main(page: ft.Page):
         view_scanner.visible = (index == 1)
         view_topology.visible = (index == 2)
         view_speedtest.visible = (index == 3)
+        view_heatmap.visible = (index == 4)
         
-        # Si entramos a la vista de escáner, ejecutar escaneo automático
+        # Escáner y topología muestran el último escaneo compartido al
+        # instante; solo se vuelve a barrer la red si está vencido
         if index == 1:
-            await view_scanner.run_scan(None)
+            view_scanner.show()
             
-        # Si entramos a topología, cargar topología autmáticamente
         if index == 2:
             refresh_topology()
+
+        # Si entramos al mapa de calor, recolorear con el cubo actual
+        if index == 4:
+            refresh_heatmap()
         
         page.update()
 
@@ -72,19 +156,97 @@ async def main(page: ft.Page):
     sidebar = create_sidebar(nav_change)
 
     # F) Ensamblaje Final
-    # Metemos las cuatro vistas en el área de contenido.
-    content_area = ft.Column([view_monitor, view_scanner, view_topology, view_speedtest])
+    # Metemos las cinco vistas en el área de contenido.
+    content_area = ft.Column([view_monitor, view_scanner, view_topology, view_speedtest, view_heatmap])
     
     layout = create_app_shell(sidebar, content_area)
     page.add(layout)
 
     # G) Bucle Principal (Ciclo de Vida)
+    # El sampler corre en su propio hilo: lee el sensor a SAMPLE_RATE_HZ con
+    # deadlines absolutos y deja un lote por segundo en un ring buffer.
+    # La UI lo vacía a su ritmo, así un page.update() lento no pierde muestras.
+    # Las tasas por interfaz también se leen en ese hilo, una vez por lote
+    sampler = TrafficSampler(sensor, rate_hz=SAMPLE_RATE_HZ, pernic=True)
+    sampler.start()
+
+    # Inventario continuo sin intervención: de a un trabajo por vez y con
+    # presupuesto de bytes, para no competir con el tráfico que se mide
+    port_scanner = PortScanner()
+    background_speedtest = SpeedtestService()
+
+    def scan_known_ports():
+        return {d["ip"]: port_scanner.scan(d["ip"], ScanMode.QUICK) for d in device_registry.devices}
+
+    def run_background_speedtest():
+        # Su tráfico no entra en la línea base (la cuota sí lo cuenta)
+        span = data_manager.begin_self_traffic()
+        try:
+            return background_speedtest.run_test()
+        finally:
+            data_manager.end_self_traffic(span)
+
+    # Un /16 son varios MB por barrido: se estima con las redes reales
+    discovery_bytes = min(estimate_sweep_bytes(), BACKGROUND_BUDGET_BYTES)
+    scheduler = ScanScheduler(max_concurrency=1, budget=BandwidthBudget(BACKGROUND_BUDGET_BYTES))
+    scheduler.add("discovery", device_registry.refresh, DISCOVERY_INTERVAL_S, jitter=0.2,
+                  priority=Priority.HIGH, bandwidth=discovery_bytes, delay=0)
+    scheduler.add("port_scan", scan_known_ports, PORT_SCAN_INTERVAL_S, jitter=0.2,
+                  priority=Priority.NORMAL, bandwidth=PORT_SCAN_BYTES)
+    scheduler.start()
+
+    # Dispositivos vistos en el tráfico (ARP, DHCP, mDNS, SSDP) entre barridos;
+    # la captura corre en su propio hilo y entrega en el loop de la UI
+    loop = asyncio.get_running_loop()
+    passive_discovery = PassiveDiscovery(
+        lambda observation: loop.call_soon_threadsafe(device_registry.observe, observation)
+    )
+    try:
+        passive_discovery.start()
+    except OSError as e:
+        print(f"Passive discovery unavailable: {e}")
+
+    def on_close(e):
+        # Detener el muestreo y volcar a disco lo pendiente
+        sampler.stop()
+        scheduler.stop()
+        passive_discovery.stop()
+        history_store.close()
+        device_inventory.close()
+        anomaly_detector.save()
+        quota_tracker.save()
+        traffic_cube.save()
+
+    page.on_close = on_close
+
     while True:
-        await asyncio.sleep(1)
+        await asyncio.sleep(1 / UI_REFRESH_HZ)
         
-        # 1. Obtener datos nuevos
-        down, up = sensor.get_traffic()
-        data_manager.update_traffic(down, up)
+        # 1. Obtener datos nuevos (todos los lotes acumulados desde el último frame)
+        drained = sampler.drain_with_nics()
+        if not drained:
+            continue
+        # Los lotes traen reloj monotónico: se pasan a hora de pared para el historial
+        wall_offset = time.time() - time.monotonic_ns() / 1e9
+        for batch, nics in drained:
+            data_manager.update_traffic(
+                batch.download_mb, batch.upload_mb, batch.elapsed_s,
+                batch.peak_download_mb, batch.peak_upload_mb,
+                timestamp=wall_offset + batch.timestamp_ns / 1e9
+            )
+            data_manager.update_nic_traffic(nics.names, nics.rates)
+        down, up = drained[-1][0].download_mb, drained[-1][0].upload_mb
+
+        nic_names = drained[-1][1].names
+        if nic_names is not shown_nic_names and nic_names != shown_nic_names:
+            shown_nic_names = nic_names
+            set_nic_options(nic_selector, nic_names, on_nic_selection, data_manager.requested_nics)
+            chart.data_series = aggregate_series + create_nic_series(data_manager.nic_points)
+
+        # Avisos de cuota de todos los lotes drenados (aunque no se esté viendo el monitor)
+        for warning in quota_tracker.pop_warnings():
+            notification_service.notify_quota_warning(warning.used_mb, warning.cap_mb, warning.exhausts_at)
+        quota = data_manager.last_quota
         
         # 2. Actualizar UI (Solo si estamos viendo el monitor)
         # Esto ahorra recursos, aunque calculamos los datos igual para no perder historial
@@ -96,17 +258,26 @@ async def main(page: ft.Page):
             # Actualizamos textos y gráfico
             speed_label.value = f"⬇️ {sensor.format_bytes(bytes_down)}/s   ⬆️ {sensor.format_bytes(bytes_up)}/s"
             chart.max_y = new_scale
+            chart.min_x, chart.max_x = data_manager.chart_x_range()
             
             # Actualizar estadísticas
             stats = data_manager.get_stats()
-            peak_text.value = f"Peak: {stats['peak_download']:.2f} MB/s ⬇️ | {stats['peak_upload']:.2f} MB/s ⬆️"
+            peak_text.value = (
+                f"Peak: {stats['peak_download']:.2f} MB/s ⬇️ | {stats['peak_upload']:.2f} MB/s ⬆️\n"
+                f"Last 5 min: {stats['peak_download_5m']:.2f} MB/s ⬇️ | {stats['peak_upload_5m']:.2f} MB/s ⬆️"
+            )
             total_text.value = f"Total: {stats['total_download']:.2f} MB ⬇️ | {stats['total_upload']:.2f} MB ⬆️"
-            avg_text.value = f"Avg: {stats['avg_download']:.2f} MB/s ⬇️ | {stats['avg_upload']:.2f} MB ⬆️"
+            if quota is not None and quota.cap_mb:
+                total_text.value += f"\nCycle: {quota.used_mb / 1024:.2f} / {quota.cap_mb / 1024:.2f} GB ({quota.fraction:.0%})"
+            avg_text.value = (
+                f"Avg: {stats['avg_download']:.2f} MB/s ⬇️ | {stats['avg_upload']:.2f} MB ⬆️\n"
+                f"Last 1 min: {stats['avg_download_1m']:.2f} MB/s ⬇️ | {stats['avg_upload_1m']:.2f} MB/s ⬆️"
+            )
             
             # Verificar tráfico alto y notificar
             if data_manager.check_high_traffic(down, up):
                 max_traffic = max(down, up)
-                notification_service.notify_high_traffic(max_traffic, data_manager.traffic_threshold_mb)
+                notification_service.notify_high_traffic(max_traffic, data_manager.current_alert_threshold())
             
             page.update()
 
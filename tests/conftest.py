@@ -3,6 +3,7 @@ Fixtures compartidas para los tests del Monitor de Red.
 Proporciona mocks para dependencias externas (scapy, psutil, socket).
 """
 
+import itertools
 import pytest
 from unittest.mock import Mock, MagicMock
 from collections import namedtuple
@@ -57,3 +58,12 @@ def mock_flet_chart_point(mocker):
     
     mock_point_class.side_effect = create_point
     return mock_point_class
+
+
+@pytest.fixture
+def mock_monotonic_clock(mocker):
+    """Reloj monotónico falso que avanza exactamente 1 segundo por lectura."""
+    return mocker.patch(
+        "core.sensor.time.monotonic_ns",
+        side_effect=itertools.count(0, 1_000_000_000)
+    )
@@ -0,0 +1,186 @@
+"""
+Tests unitarios para AnomalyDetector (core/anomaly_detector.py).
+Cubre aprendizaje de la línea base, franjas horarias, persistencia
+e integración con el modo de alerta adaptativo de DataManager.
+"""
+
+import json
+import math
+import numpy as np
+import pytest
+from core.anomaly_detector import MIN_SLOT_SAMPLES, SLOTS, AnomalyDetector
+from core.data_manager import ALERT_MODE_ADAPTIVE, DataManager
+
+# Lunes 2024-01-01 a las 12:00 hora local aproximada (solo importa la franja)
+BASE_TS = 1704110400.0
+
+
+def train(detector, rate, samples=900, start=BASE_TS):
+    """Alimenta el detector con una tasa estable (1 muestra por segundo)."""
+    rng = np.random.default_rng(0)
+    for i in range(samples):
+        value = rate * (1 + 0.05 * rng.standard_normal())
+        detector.update(start + i, value, value / 2)
+    return start + samples
+
+
+class TestBaseline:
+    """Tests del aprendizaje de la línea base."""
+
+    def test_no_alerts_while_warming_up(self):
+        """Sin muestras suficientes nunca marca anomalía."""
+        detector = AnomalyDetector(min_samples=30)
+
+        score = detector.update(BASE_TS, 500.0, 500.0)
+
+        assert score.anomalous is False
+        assert math.isinf(score.upper_download)
+
+    def test_stable_traffic_is_not_anomalous(self):
+        """El tráfico que sigue la línea base no se marca."""
+        detector = AnomalyDetector()
+        ts = train(detector, 5.0)
+
+        score = detector.update(ts, 5.2, 2.5)
+
+        assert score.anomalous is False
+
+    def test_spike_is_anomalous(self):
+        """Una ráfaga muy por encima de la línea base se marca."""
+        detector = AnomalyDetector()
+        ts = train(detector, 5.0)
+
+        score = detector.update(ts, 80.0, 2.5)
+
+        assert score.anomalous is True
+        assert score.z_download > detector.z_threshold
+        assert 5.0 < score.upper_download < 80.0
+
+    def test_drop_is_not_reported_as_high_traffic(self):
+        """Una caída de tráfico no dispara alerta de tráfico alto."""
+        detector = AnomalyDetector()
+        ts = train(detector, 5.0)
+
+        assert detector.update(ts, 0.0, 0.0).anomalous is False
+
+    def test_anomalies_are_clipped_when_learned(self):
+        """Una ráfaga no mueve la línea base más allá del límite."""
+        detector = AnomalyDetector()
+        ts = train(detector, 5.0)
+        slot = detector.slot_for(ts)
+        before = detector.mean[slot, 0]
+
+        score = detector.update(ts, 10_000.0, 2.5)
+
+        # Peso efectivo de la muestra (promedio simple durante el arranque en frío)
+        weight = max(detector.alpha, 1.0 / detector.count[slot])
+        limit = math.log1p(score.upper_download)
+        assert detector.mean[slot, 0] <= before + weight * (limit - before) + 1e-9
+
+    def test_slots_learn_independently(self):
+        """Cada hora de la semana tiene su propia línea base."""
+        detector = AnomalyDetector()
+        night = BASE_TS + 12 * 3600
+        train(detector, 50.0, samples=MIN_SLOT_SAMPLES, start=BASE_TS)
+        train(detector, 0.5, samples=MIN_SLOT_SAMPLES, start=night)
+
+        day_expected, _ = detector.expected(BASE_TS)
+        night_expected, _ = detector.expected(night)
+
+        assert day_expected == pytest.approx(50.0, rel=0.1)
+        assert night_expected == pytest.approx(0.5, rel=0.1)
+
+    def test_sustained_spike_is_still_flagged_after_minutes(self):
+        """Una anomalía de varios minutos no se vuelve la línea base (memoria de semanas)."""
+        # Arrange: una hora completa de tráfico normal en la franja
+        detector = AnomalyDetector()
+        ts = train(detector, 5.0, samples=MIN_SLOT_SAMPLES)
+
+        # Act: diez minutos seguidos a 80 MB/s
+        scores = [detector.update(ts + i, 80.0, 2.5) for i in range(600)]
+
+        # Assert
+        assert all(score.anomalous for score in scores)
+        assert detector.expected(ts)[0] < 10.0
+
+    def test_slot_needs_a_full_hour_before_trusted(self):
+        """Con menos de una hora de la franja se usa la línea base global."""
+        detector = AnomalyDetector()
+        ts = train(detector, 5.0, samples=MIN_SLOT_SAMPLES - 1)
+        slot = detector.slot_for(BASE_TS)
+        detector.mean[slot] = detector.global_mean + 1.0  # Distinguir franja de global
+
+        assert detector.expected(BASE_TS)[0] == pytest.approx(math.expm1(detector.global_mean[0]))
+        detector.update(ts, 5.0, 2.5)
+        assert detector.expected(BASE_TS)[0] == pytest.approx(math.expm1(detector.mean[slot, 0]))
+
+    def test_slot_range(self):
+        """La franja está en [0, 168)."""
+        assert 0 <= AnomalyDetector.slot_for(BASE_TS) < SLOTS
+
+
+class TestPersistence:
+    """Tests de guardado y carga del estado aprendido."""
+
+    def test_state_survives_restart(self, tmp_path):
+        """Un detector nuevo recupera la línea base guardada."""
+        # Arrange
+        path = str(tmp_path / "baseline.json")
+        detector = AnomalyDetector(state_path=path)
+        ts = train(detector, 5.0)
+        detector.save()
+
+        # Act
+        restored = AnomalyDetector(state_path=path)
+
+        # Assert
+        assert restored.global_count == detector.global_count
+        assert np.allclose(restored.mean, detector.mean)
+        assert restored.update(ts, 80.0, 2.5).anomalous is True
+
+    def test_invalid_state_is_ignored(self, tmp_path):
+        """Un archivo corrupto o de otra versión no rompe el arranque."""
+        path = tmp_path / "baseline.json"
+        path.write_text(json.dumps({"version": 99}))
+
+        detector = AnomalyDetector(state_path=str(path))
+
+        assert detector.global_count == 0
+
+    def test_save_is_atomic(self, tmp_path):
+        """No deja archivos temporales."""
+        path = tmp_path / "baseline.json"
+        AnomalyDetector(state_path=str(path)).save()
+
+        assert [p.name for p in tmp_path.iterdir()] == ["baseline.json"]
+
+
+class TestAdaptiveAlertMode:
+    """Integración con DataManager.check_high_traffic."""
+
+    def test_adaptive_mode_uses_baseline(self):
+        """En modo adaptativo el umbral es el límite de la línea base."""
+        # Arrange
+        dm = DataManager()
+        dm.high_traffic_alerts_enabled = True
+        dm.set_alert_mode(ALERT_MODE_ADAPTIVE)
+        for i in range(900):
+            dm.update_traffic(20.0, 1.0, timestamp=BASE_TS + i)
+
+        # Act / Assert
+        # 20 MB/s supera el umbral fijo (10) pero es normal para este enlace
+        assert dm.check_high_traffic(20.0, 1.0) is False
+        dm.update_traffic(400.0, 1.0, timestamp=BASE_TS + 900)
+        assert dm.check_high_traffic(400.0, 1.0) is True
+        assert 20.0 < dm.current_alert_threshold() < 400.0
+
+    def test_threshold_mode_is_default(self):
+        """Por defecto se mantiene el umbral fijo."""
+        dm = DataManager()
+        assert dm.alert_mode == "threshold"
+        assert dm.current_alert_threshold() == dm.traffic_threshold_mb
+
+    def test_unknown_mode_raises(self):
+        """Un modo desconocido es un error."""
+        with pytest.raises(ValueError):
+            DataManager().set_alert_mode("magic")
@@ -0,0 +1,255 @@
+"""
+Tests unitarios para el motor ARP AF_PACKET (core/arp_engine.py).
+Cubre la trama precalculada, el parseo de respuestas, el filtro BPF,
+el barrido contra un socket simulado y la integración con NetworkScanner.
+"""
+
+import socket
+import struct
+import threading
+import pytest
+from core import arp_engine
+from core.arp_engine import ArpEngine, build_request, parse_reply
+from core.scanner import NetworkScanner
+
+OWN_MAC = bytes.fromhex("020000000001")
+
+
+def arp_reply_frame(ip: str, mac: bytes, opcode: int = 2) -> bytes:
+    """Trama Ethernet+ARP como la que entrega el kernel al socket."""
+    return arp_engine.ETHER_ARP.pack(
+        OWN_MAC, mac, arp_engine.ETH_P_ARP,
+        1, arp_engine.ETH_P_IP, 6, 4, opcode,
+        mac, socket.inet_aton(ip), OWN_MAC, socket.inet_aton("10.0.0.1"),
+    )
+
+
+class FakePacketSocket:
+    """Socket AF_PACKET simulado: responde por cada IP de `responders`."""
+
+    responders = {}
+
+    def __init__(self, *args):
+        self.sent = []
+        self.inbox = []
+        self.closed = False
+
+    def setsockopt(self, *args):
+        pass
+
+    def bind(self, address):
+        self.address = address
+
+    def setblocking(self, flag):
+        pass
+
+    def fileno(self):
+        return -1
+
+    def send(self, frame):
+        self.sent.append(bytes(frame))
+        target = socket.inet_ntoa(bytes(frame[arp_engine.TARGET_IP_OFFSET:arp_engine.TARGET_IP_OFFSET + 4]))
+        if target in self.responders:
+            self.inbox.append(arp_reply_frame(target, self.responders[target]))
+        return len(frame)
+
+    def recv_into(self, buf):
+        if not self.inbox:
+            raise BlockingIOError
+        frame = self.inbox.pop(0)
+        buf[:len(frame)] = frame
+        return len(frame)
+
+    def close(self):
+        self.closed = True
+
+
+class FakePoll:
+    def register(self, *args):
+        pass
+
+    def poll(self, timeout_ms):
+        return []
+
+
+@pytest.fixture
+def fake_engine(mocker):
+    """ArpEngine sobre FakePacketSocket en 10.0.0.0/24."""
+    mocker.patch("core.arp_engine.socket.socket", FakePacketSocket)
+    mocker.patch("core.arp_engine.select.poll", FakePoll)
+    FakePacketSocket.responders = {
+        "10.0.0.7": bytes.fromhex("aabbccddee07"),
+        "10.0.0.200": bytes.fromhex("aabbccddeec8"),
+    }
+    return ArpEngine("eth0", OWN_MAC, "10.0.0.1")
+
+
+class TestFrames:
+    """Tests de la trama precalculada y el parseo."""
+
+    def test_request_template(self):
+        """La trama es un ARP request broadcast con nuestro remitente."""
+        frame = build_request(OWN_MAC, "10.0.0.1")
+
+        assert len(frame) == arp_engine.FRAME_LEN
+        assert frame[:6] == b"\xff" * 6
+        assert frame[6:12] == OWN_MAC
+        assert struct.unpack_from("!H", frame, 12)[0] == arp_engine.ETH_P_ARP
+        assert struct.unpack_from("!H", frame, 20)[0] == arp_engine.ARP_REQUEST
+        assert frame[28:32] == socket.inet_aton("10.0.0.1")
+
+    def test_request_matches_scapy(self):
+        """Los 42 bytes útiles coinciden con lo que arma scapy."""
+        import scapy.all as scapy
+        frame = build_request(OWN_MAC, "10.0.0.1")
+        arp_engine.TARGET_IP.pack_into(frame, arp_engine.TARGET_IP_OFFSET, 0x0A000009)
+
+        reference = bytes(
+            scapy.Ether(dst="ff:ff:ff:ff:ff:ff", src="02:00:00:00:00:01")
+            / scapy.ARP(hwsrc="02:00:00:00:00:01", psrc="10.0.0.1", pdst="10.0.0.9")
+        )
+
+        assert bytes(frame[:42]) == reference
+
+    def test_parse_reply(self):
+        """Extrae IP y MAC del remitente desde un memoryview."""
+        frame = arp_reply_frame("10.0.0.7", bytes.fromhex("aabbccddee07"))
+
+        ip, mac = parse_reply(memoryview(frame), len(frame))
+
+        assert socket.inet_ntoa(struct.pack("!I", ip)) == "10.0.0.7"
+        assert arp_engine.format_mac(mac) == "aa:bb:cc:dd:ee:07"
+
+    def test_parse_ignores_requests_and_short_frames(self):
+        """Descarta pedidos (opcode 1) y tramas truncadas."""
+        request = arp_reply_frame("10.0.0.7", OWN_MAC, opcode=1)
+
+        assert parse_reply(memoryview(request), len(request)) is None
+        assert parse_reply(memoryview(request), 20) is None
+
+    @pytest.mark.skipif(not arp_engine.raw_available(), reason="SO_ATTACH_FILTER es propio de Linux")
+    def test_bpf_program_passes_kernel_verifier(self):
+        """El kernel acepta el programa BPF (se valida en cualquier socket)."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            arp_engine.attach_filter(sock)
+        finally:
+            sock.close()
+
+
+class TestSweep:
+    """Tests del barrido sobre el socket simulado."""
+
+    def test_sweep_finds_responders(self, fake_engine):
+        """Envía un pedido por host y retorna las respuestas en orden."""
+        result = fake_engine.sweep("10.0.0.0/24", timeout=0, rate_pps=1_000_000)
+
+        assert result == [("10.0.0.7", "aa:bb:cc:dd:ee:07"), ("10.0.0.200", "aa:bb:cc:dd:ee:c8")]
+        assert len(fake_engine.sock.sent) == 254
+
+    def test_sweep_rewrites_only_target_ip(self, fake_engine):
+        """Todas las tramas comparten la plantilla salvo la IP objetivo."""
+        fake_engine.sweep("10.0.0.0/30", timeout=0, rate_pps=1_000_000)
+
+        first, second = fake_engine.sock.sent
+        assert first[:38] == second[:38]
+        assert first[38:42] == socket.inet_aton("10.0.0.1")
+        assert second[38:42] == socket.inet_aton("10.0.0.2")
+
+    def test_sweep_ignores_replies_outside_target(self, fake_engine):
+        """Respuestas de otras redes o repetidas no se reportan."""
+        fake_engine.sock.inbox.append(arp_reply_frame("192.168.5.5", bytes(6)))
+        fake_engine.sock.inbox.append(arp_reply_frame("10.0.0.7", bytes.fromhex("aabbccddee07")))
+        replies = []
+
+        fake_engine.sweep("10.0.0.0/24", timeout=0, rate_pps=1_000_000,
+                          on_reply=lambda ip, mac: replies.append(ip))
+
+        assert replies == ["10.0.0.7", "10.0.0.200"]
+
+    def test_skip_avoids_known_hosts(self, fake_engine):
+        """Las IPs de `skip` no se consultan."""
+        result = fake_engine.sweep("10.0.0.0/24", timeout=0, rate_pps=1_000_000, skip={"10.0.0.7"})
+
+        assert result == [("10.0.0.200", "aa:bb:cc:dd:ee:c8")]
+        assert len(fake_engine.sock.sent) == 253
+
+    def test_returns_early_when_every_host_answered(self, fake_engine):
+        """Si respondieron todos los consultados no se espera el timeout."""
+        skip = {f"10.0.0.{i}" for i in range(1, 255)} - {"10.0.0.7", "10.0.0.200"}
+
+        result = fake_engine.sweep("10.0.0.0/24", timeout=30, rate_pps=1_000_000, skip=skip)
+
+        assert len(result) == 2
+
+    def test_stop_cuts_the_sweep(self, fake_engine):
+        """Con el evento ya activo no se envía nada."""
+        stop = threading.Event()
+        stop.set()
+
+        assert fake_engine.sweep("10.0.0.0/24", timeout=5, stop=stop) == []
+        assert fake_engine.sock.sent == []
+
+
+class TestScannerBackend:
+    """Integración del motor con NetworkScanner."""
+
+    def test_auto_backend_uses_raw_engine(self, mocker, fake_engine):
+        """scan_network usa el motor y no llama a scapy."""
+        mocker.patch.object(NetworkScanner, "get_local_range", return_value="10.0.0.1/24")
+        srp = mocker.patch("scapy.all.srp")
+        scanner = NetworkScanner(backend="auto")
+        mocker.patch.object(scanner, "_open_engine", return_value=fake_engine)
+        mocker.patch.object(scanner.vendor_service, "get_vendor", return_value="Acme")
+
+        devices = scanner.scan_network()
+
+        assert [d["ip"] for d in devices] == ["10.0.0.7", "10.0.0.200"]
+        assert devices[0] == {"ip": "10.0.0.7", "mac": "aa:bb:cc:dd:ee:07", "vendor": "Acme"}
+        assert fake_engine.sock.closed
+        srp.assert_not_called()
+
+    def test_falls_back_to_scapy_without_raw_socket(self, mocker):
+        """Sin permisos para AF_PACKET queda en scapy de forma permanente."""
+        mocker.patch.object(NetworkScanner, "get_local_range", return_value="10.0.0.1/24")
+        mocker.patch("core.arp_engine.find_interface", return_value=("eth0", OWN_MAC, "10.0.0.1"))
+        mocker.patch("core.scanner.ArpEngine", side_effect=PermissionError("Operation not permitted"))
+        srp = mocker.patch("scapy.all.srp", return_value=([], []))
+        scanner = NetworkScanner(backend="auto")
+
+        assert scanner.scan_network() == []
+        assert scanner.backend is None
+        srp.assert_called_once()
+
+    def test_network_failure_only_disables_that_target(self, mocker):
+        """Sin interfaz en un rango, ese rango usa scapy pero los demás siguen con el motor."""
+        # Arrange
+        mocker.patch.object(NetworkScanner, "get_local_range", return_value="10.0.0.1/24")
+        mocker.patch.object(arp_engine, "raw_available", return_value=True)
+        find = mocker.patch("core.arp_engine.find_interface", side_effect=[
+            OSError("No interface found on 172.16.0.0/24"), ("eth0", OWN_MAC, "10.0.0.1"),
+        ])
+        engine_cls = mocker.patch("core.scanner.ArpEngine")
+        scanner = NetworkScanner(backend="auto")
+
+        # Act
+        first = scanner._open_engine("172.16.0.0/24")
+        again = scanner._open_engine("172.16.0.0/24")
+        other = scanner._open_engine("10.0.0.0/24")
+
+        # Assert
+        assert first is None and again is None
+        assert other is engine_cls.return_value
+        assert scanner.backend == "auto"
+        assert find.call_count == 2  # La falla queda en caché por (rango, interfaz)
+
+    def test_missing_af_packet_disables_engine(self, mocker):
+        """Sin AF_PACKET en la plataforma el scanner entero queda en scapy."""
+        mocker.patch.object(NetworkScanner, "get_local_range", return_value="10.0.0.1/24")
+        mocker.patch.object(arp_engine, "raw_available", return_value=False)
+        mocker.patch("core.arp_engine.find_interface", return_value=("eth0", OWN_MAC, "10.0.0.1"))
+        mocker.patch("core.scanner.ArpEngine", side_effect=OSError("AF_PACKET sockets are not available"))
+        scanner = NetworkScanner(backend="auto")
+
+        assert scanner._open_engine("10.0.0.0/24") is None
+        assert scanner.backend is None
@@ -4,9 +4,11 @@ Cubre gestión de buffer circular, actualización de datos y escala dinámica.
 """
 
 import pytest
+import numpy as np
 from unittest.mock import Mock, patch
 from collections import deque
 from core.data_manager import DataManager
+from core.quota_tracker import QuotaTracker
 
 
 class TestDataManagerInit:
@@ -202,3 +204,209 @@ class TestDequeMaxlen:
         # Los últimos 10 valores deben ser 0-9
         assert list(manager.download_values)[-10:] == [float(i) for i in range(10)]
         assert list(manager.upload_values)[-10:] == [float(i * 2) for i in range(10)]
+
+
+class TestIncrementalChart:
+    """Tests de la actualización append-and-drop del gráfico."""
+
+    def test_update_appends_and_drops_one_point(self):
+        """Cada muestra agrega un punto al final y quita el primero."""
+        # Arrange
+        manager = DataManager()
+        old_points = list(manager.download_points)
+
+        # Act
+        manager.update_traffic(4.0, 2.0)
+
+        # Assert
+        assert len(manager.download_points) == 60
+        assert manager.download_points[:-1] == old_points[1:]
+        assert manager.download_points[-1].x == 60
+        assert manager.download_points[-1].y == 4.0
+
+    def test_existing_points_are_not_modified(self):
+        """Los puntos ya graficados no se reescriben (patch constante)."""
+        manager = DataManager(chart_window=3600)
+        manager.update_traffic(1.0, 1.0)
+        kept = manager.download_points[-1]
+
+        manager.update_traffic(9.0, 9.0)
+
+        assert kept.y == 1.0
+        assert manager.download_points[-2] is kept
+
+    def test_chart_x_range_follows_samples(self):
+        """El rango X se desplaza con cada muestra."""
+        manager = DataManager(chart_window=10)
+        assert manager.chart_x_range() == (0, 9)
+
+        for _ in range(3):
+            manager.update_traffic(1.0, 1.0)
+
+        assert manager.chart_x_range() == (3, 12)
+        assert manager.download_points[0].x == 3
+        assert manager.download_points[-1].x == 12
+
+    def test_nic_points_align_with_aggregate_x(self):
+        """Los puntos por interfaz usan el mismo eje X que el agregado."""
+        manager = DataManager()
+        manager.update_nic_traffic(["eth0"], np.array([[1.0, 0.5]]))
+        manager.select_nics(["eth0"])
+
+        manager.update_traffic(3.0, 1.0)
+        manager.update_nic_traffic(["eth0"], np.array([[3.0, 1.0]]))
+
+        down_points, _ = manager.nic_points["eth0"]
+        assert down_points[-1].x == manager.download_points[-1].x
+        assert [p.y for p in down_points[-2:]] == [1.0, 3.0]
+
+    def test_nic_x_stays_inside_chart_range(self):
+        """Varios lotes drenados juntos no adelantan ni duplican el x de las interfaces."""
+        # Arrange
+        manager = DataManager(chart_window=10)
+        manager.update_nic_traffic(["eth0"], np.zeros((1, 2)))
+        manager.select_nics(["eth0"])
+
+        # Act: lotes sin muestra por interfaz y muestras repetidas en el mismo x
+        for i in range(26):
+            manager.update_traffic(1.0, 1.0)
+            if i % 3:
+                manager.update_nic_traffic(["eth0"], np.array([[float(i), 0.0]]))
+                manager.update_nic_traffic(["eth0"], np.array([[float(i), 1.0]]))
+
+        # Assert
+        low, high = manager.chart_x_range()
+        down_points, up_points = manager.nic_points["eth0"]
+        xs = [p.x for p in down_points]
+        assert xs == sorted(set(xs))
+        assert low <= xs[0] and xs[-1] == high
+        assert down_points[-1].y == 25.0 and up_points[-1].y == 1.0
+        assert manager.nic_count == 18
+
+
+class TestNicTraffic:
+    """Tests del historial por interfaz."""
+    
+    def test_update_nic_traffic_stores_rows(self):
+        """Guarda una fila por interfaz en la matriz de historial."""
+        # Arrange
+        manager = DataManager()
+        names = ["eth0", "wlan0"]
+        
+        # Act
+        manager.update_nic_traffic(names, np.array([[1.0, 0.5], [2.0, 1.5]]))
+        
+        # Assert
+        assert manager.nic_values.shape == (2, manager.max_chart_window, 2)
+        assert manager.nic_values[1, 0].tolist() == [2.0, 1.5]
+    
+    def test_selected_nic_points_follow_values(self):
+        """Los puntos de una NIC elegida reflejan su historial en orden."""
+        # Arrange
+        manager = DataManager()
+        names = ["eth0", "wlan0"]
+        manager.update_nic_traffic(names, np.zeros((2, 2)))
+        manager.select_nics(["wlan0"])
+        
+        # Act
+        manager.update_traffic(12.0, 10.0)
+        manager.update_nic_traffic(names, np.array([[9.0, 9.0], [3.0, 1.0]]))
+        manager.update_traffic(13.0, 11.0)
+        manager.update_nic_traffic(names, np.array([[9.0, 9.0], [4.0, 2.0]]))
+        
+        # Assert
+        down_points, up_points = manager.nic_points["wlan0"]
+        assert [p.y for p in down_points[-2:]] == [3.0, 4.0]
+        assert up_points[-1].y == 2.0
+        assert "eth0" not in manager.nic_points
+    
+    def test_select_unknown_nic_is_ignored(self):
+        """Ignora interfaces que no existen."""
+        # Arrange
+        manager = DataManager()
+        manager.update_nic_traffic(["eth0"], np.zeros((1, 2)))
+        
+        # Act
+        points = manager.select_nics(["eth0", "ghost0"])
+        
+        # Assert
+        assert list(points) == ["eth0"]
+    
+    def test_selection_before_first_sample_applies_later(self):
+        """Una interfaz elegida antes de su primera muestra se grafica al aparecer."""
+        # Arrange
+        manager = DataManager()
+        manager.select_nics(["tun0"])
+
+        # Act
+        manager.update_traffic(1.0, 1.0)
+        manager.update_nic_traffic(["eth0", "tun0"], np.array([[1.0, 1.0], [4.0, 2.0]]))
+
+        # Assert
+        assert list(manager.nic_points) == ["tun0"]
+        assert manager.nic_points["tun0"][0][-1].y == 4.0
+
+    def test_nic_that_returns_is_reselected(self):
+        """Una interfaz elegida que desaparece vuelve a graficarse cuando regresa."""
+        manager = DataManager()
+        manager.update_nic_traffic(["eth0", "tun0"], np.zeros((2, 2)))
+        manager.select_nics(["tun0"])
+
+        manager.update_nic_traffic(["eth0"], np.zeros((1, 2)))
+        assert manager.selected_nics == []
+        manager.update_nic_traffic(["eth0", "tun0"], np.zeros((2, 2)))
+
+        assert manager.selected_nics == ["tun0"]
+
+    def test_resize_keeps_existing_history(self):
+        """Al aparecer una interfaz nueva se conserva el historial previo."""
+        # Arrange
+        manager = DataManager()
+        manager.update_nic_traffic(["eth0"], np.array([[5.0, 1.0]]))
+        
+        # Act
+        manager.update_traffic(7.0, 2.0)
+        manager.update_nic_traffic(["eth0", "tun0"], np.array([[6.0, 1.0], [1.0, 1.0]]))
+        
+        # Assert
+        assert manager.nic_values[0, 0].tolist() == [5.0, 1.0]
+        assert manager.nic_values[0, 1].tolist() == [6.0, 1.0]
+        assert manager.nic_values[1, 0].tolist() == [0.0, 0.0]
+
+
+class TestSelfTraffic:
+    """El tráfico propio (speedtest de fondo) no entra en la línea base; la cuota sí lo cuenta."""
+
+    def test_self_traffic_skips_baseline_but_counts_quota(self):
+        # Arrange
+        quota = QuotaTracker()
+        manager = DataManager(quota_tracker=quota)
+        manager.update_traffic(1.0, 1.0, timestamp=1000)
+        learned = manager.anomaly_detector.global_count
+
+        # Act
+        span = manager.begin_self_traffic(start=1000.5)
+        manager.update_traffic(50.0, 5.0, timestamp=1001)
+        manager.end_self_traffic(span, end=1001.5)
+        manager.update_traffic(1.0, 1.0, timestamp=1002)
+
+        # Assert: la línea base solo aprende la muestra fuera del intervalo,
+        # la cuota cuenta todo (el proveedor lo factura igual)
+        assert manager.anomaly_detector.global_count == learned + 1
+        assert quota.used_mb == pytest.approx(59.0)
+        # El total general sí incluye todo lo que pasó por la interfaz
+        assert manager.total_download == pytest.approx(52.0)
+
+    def test_open_span_covers_until_closed(self):
+        """Un intervalo sin cerrar cubre todo lo posterior; cerrado y pasado se descarta."""
+        manager = DataManager(quota_tracker=QuotaTracker())
+        span = manager.begin_self_traffic(start=1000)
+
+        manager.update_traffic(9.0, 9.0, timestamp=5000)
+        assert manager.last_anomaly is None
+        manager.end_self_traffic(span, end=5000)
+        manager.update_traffic(1.0, 1.0, timestamp=5001)
+
+        assert manager.quota_tracker.used_mb == pytest.approx(20.0)
+        assert manager.last_anomaly is not None
+        assert not manager.self_traffic_spans
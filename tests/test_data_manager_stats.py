@@ -74,6 +74,23 @@ class TestUpdateTrafficStats:
         dm.update_traffic(5.0, 2.0)
         assert dm.total_download == 30.0
         assert dm.total_upload == 15.0
+    
+    def test_update_traffic_total_uses_elapsed(self):
+        """Verifica que el total pondera la tasa por el tiempo real de la muestra."""
+        dm = DataManager()
+        
+        dm.update_traffic(10.0, 4.0, elapsed_s=0.5)
+        assert dm.total_download == 5.0
+        assert dm.total_upload == 2.0
+        assert dm.get_stats()["avg_download"] == 10.0
+    
+    def test_update_traffic_peak_uses_burst(self):
+        """Verifica que las ráfagas sub-segundo informadas cuentan como pico."""
+        dm = DataManager()
+        
+        dm.update_traffic(2.0, 1.0, peak_download=40.0, peak_upload=0.5)
+        assert dm.peak_download == 40.0
+        assert dm.peak_upload == 1.0  # El promedio nunca puede superar al pico
 
 
 class TestGetStats:
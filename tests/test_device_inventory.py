@@ -0,0 +1,150 @@
+"""
+Tests unitarios para el inventario persistente (core/device_inventory.py).
+Cubre la fusión por lotes, first_seen/last_seen, el historial de IPs,
+las búsquedas indexadas y la persistencia entre reinicios.
+"""
+
+import sqlite3
+import pytest
+from core.device_inventory import DeviceInventory
+from core.scanner import NetworkScanner
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "devices.db")
+
+
+@pytest.fixture
+def inventory(db_path):
+    inv = DeviceInventory(db_path)
+    yield inv
+    inv.close()
+
+
+def device(ip, mac, vendor="Acme", interface="eth0"):
+    return {"ip": ip, "mac": mac, "vendor": vendor, "interface": interface}
+
+
+class TestMerge:
+    """Tests de la fusión de escaneos."""
+
+    def test_first_scan_reports_everything_as_new(self, inventory):
+        """Un inventario vacío reporta todo el escaneo, sin repetir MACs."""
+        scan = [device("10.0.0.1", "AA:00:00:00:00:01"), device("10.0.0.2", "aa:00:00:00:00:02"),
+                device("10.0.0.1", "aa:00:00:00:00:01")]
+
+        new = inventory.merge(scan, timestamp=100)
+
+        assert [d["ip"] for d in new] == ["10.0.0.1", "10.0.0.2"]
+        assert len(inventory) == 2
+
+    def test_known_devices_update_last_seen(self, inventory):
+        """Un dispositivo conocido no es nuevo; conserva first_seen y avanza last_seen."""
+        inventory.merge([device("10.0.0.1", "aa:00:00:00:00:01")], timestamp=100)
+
+        new = inventory.merge([device("10.0.0.1", "aa:00:00:00:00:01"),
+                               device("10.0.0.9", "aa:00:00:00:00:09")], timestamp=200)
+
+        assert [d["mac"] for d in new] == ["aa:00:00:00:00:09"]
+        row = inventory.get("aa:00:00:00:00:01")
+        assert (row["first_seen"], row["last_seen"]) == (100, 200)
+
+    def test_unknown_vendor_keeps_resolved_one(self, inventory):
+        """Un 'Unknown' posterior no pisa el fabricante ya resuelto."""
+        inventory.merge([device("10.0.0.1", "aa:00:00:00:00:01", vendor="Acme")], timestamp=100)
+
+        inventory.merge([device("10.0.0.1", "aa:00:00:00:00:01", vendor="Unknown")], timestamp=200)
+
+        assert inventory.get("aa:00:00:00:00:01")["vendor"] == "Acme"
+
+    def test_devices_without_mac_are_ignored(self, inventory):
+        """Entradas sin MAC no se guardan ni se notifican."""
+        assert inventory.merge([{"ip": "10.0.0.1", "mac": ""}]) == []
+        assert len(inventory) == 0
+
+    def test_merge_is_one_transaction(self, inventory):
+        """Todo el escaneo se escribe con un solo COMMIT."""
+        statements = []
+        inventory._conn.set_trace_callback(statements.append)
+        scan = [device(f"10.0.0.{i}", f"aa:00:00:00:00:{i:02x}") for i in range(1, 51)]
+
+        inventory.merge(scan)
+
+        assert sum(s.strip().upper() == "COMMIT" for s in statements) == 1
+        assert len(inventory) == 50
+
+
+class TestLookups:
+    """Tests de las búsquedas indexadas y el historial de IPs."""
+
+    def test_find_by_ip_and_vendor(self, inventory):
+        inventory.merge([device("10.0.0.1", "aa:00:00:00:00:01", vendor="Acme"),
+                         device("10.0.0.2", "aa:00:00:00:00:02", vendor="Globex")], timestamp=100)
+
+        assert [d["mac"] for d in inventory.find_by_ip("10.0.0.2")] == ["aa:00:00:00:00:02"]
+        assert [d["ip"] for d in inventory.find_by_vendor("Acme")] == ["10.0.0.1"]
+        assert inventory.find_by_ip("10.0.0.99") == []
+
+    def test_lookups_use_indexes(self, inventory):
+        """Las consultas por IP y fabricante no recorren la tabla."""
+        plans = {
+            column: " ".join(row[-1] for row in inventory._conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT * FROM devices WHERE {column} = ?", ("x",)))
+            for column in ("ip", "vendor")
+        }
+
+        assert "devices_by_ip" in plans["ip"]
+        assert "devices_by_vendor" in plans["vendor"]
+
+    def test_ip_history_tracks_address_changes(self, inventory):
+        """Un cambio de IP (DHCP) actualiza la fila y queda en el historial."""
+        inventory.merge([device("10.0.0.5", "aa:00:00:00:00:01")], timestamp=100)
+        inventory.merge([device("10.0.0.8", "aa:00:00:00:00:01")], timestamp=200)
+
+        assert inventory.get("aa:00:00:00:00:01")["ip"] == "10.0.0.8"
+        assert inventory.ip_history("aa:00:00:00:00:01") == [("10.0.0.8", 200, 200), ("10.0.0.5", 100, 100)]
+
+
+class TestPersistence:
+    """Tests de persistencia entre reinicios."""
+
+    def test_reopen_does_not_renotify(self, db_path):
+        """Tras reiniciar, los dispositivos ya vistos no vuelven a ser nuevos."""
+        first = DeviceInventory(db_path)
+        first.merge([device("10.0.0.1", "aa:00:00:00:00:01")])
+        first.close()
+
+        second = DeviceInventory(db_path)
+        try:
+            assert second.merge([device("10.0.0.1", "aa:00:00:00:00:01")]) == []
+        finally:
+            second.close()
+
+    def test_uses_wal_journal(self, inventory, db_path):
+        conn = sqlite3.connect(db_path)
+        try:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        finally:
+            conn.close()
+
+
+class TestScannerIntegration:
+    """NetworkScanner.detect_new_devices con y sin inventario."""
+
+    def test_detect_new_devices_uses_inventory(self, mocker, inventory):
+        mocker.patch.object(NetworkScanner, "get_local_range", return_value="10.0.0.1/24")
+        scanner = NetworkScanner(inventory=inventory)
+        scan = [device("10.0.0.1", "aa:00:00:00:00:01")]
+
+        assert scanner.detect_new_devices(scan) == scan
+        assert scanner.detect_new_devices(scan) == []
+        assert inventory.get("aa:00:00:00:00:01") is not None
+
+    def test_without_inventory_remembers_in_memory(self, mocker):
+        mocker.patch.object(NetworkScanner, "get_local_range", return_value="10.0.0.1/24")
+        scanner = NetworkScanner()
+        scan = [device("10.0.0.1", "aa:00:00:00:00:01")]
+
+        assert scanner.detect_new_devices(scan) == scan
+        assert scanner.detect_new_devices(scan) == []
@@ -0,0 +1,206 @@
+"""
+Tests unitarios para el registro compartido de dispositivos (core/device_registry.py).
+Cubre el TTL, la publicación de eventos, que los refrescos concurrentes
+compartan un único escaneo, que un fallo conserve los datos anteriores y
+que lo visto pasivamente durante un barrido no se pierda.
+"""
+
+import asyncio
+import pytest
+from core.device_registry import (
+    DeviceRegistry, DEVICE, SCAN_FAILED, SCAN_FINISHED, SCAN_STARTED
+)
+
+
+class FakeScanner:
+    """Scanner que entrega `devices` (o falla) y cuenta los barridos."""
+
+    def __init__(self, devices, error=None):
+        self.devices = devices
+        self.error = error
+        self.scans = 0
+        self.release = None  # asyncio.Event para pausar el barrido
+
+    async def scan_all_stream(self):
+        self.scans += 1
+        for device in self.devices:
+            if self.release is not None:
+                await self.release.wait()
+            yield device
+        if self.error:
+            raise self.error
+
+    def detect_new_devices(self, devices):
+        return devices[:1]
+
+    def observed_device(self, observation):
+        return dict(observation)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+DEVICES = [{"ip": "10.0.0.1", "mac": "aa:00:00:00:00:01"}, {"ip": "10.0.0.7", "mac": "aa:00:00:00:00:07"}]
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def registry(clock):
+    return DeviceRegistry(FakeScanner(DEVICES), ttl=60, clock=clock)
+
+
+class TestFreshness:
+    """Tests del TTL y de ensure_fresh."""
+
+    def test_serves_cache_while_fresh(self, registry, clock):
+        """Dentro del TTL ensure_fresh no escanea; vencido, sí."""
+        async def scenario():
+            await registry.refresh()
+            clock.now += 30
+            cached = registry.ensure_fresh()
+            clock.now += 31
+            stale = registry.ensure_fresh()
+            await registry.refresh(force=False)
+            return cached, stale
+
+        cached, stale = asyncio.run(scenario())
+
+        assert (cached, stale) == (False, True)
+        assert registry.scanner.scans == 2
+        assert registry.devices == DEVICES
+
+    def test_empty_registry_is_stale(self, registry):
+        assert registry.age is None
+        assert not registry.is_fresh()
+
+    def test_refresh_without_force_skips_fresh_data(self, registry):
+        async def scenario():
+            await registry.refresh()
+            return await registry.refresh(force=False)
+
+        assert asyncio.run(scenario()) == DEVICES
+        assert registry.scanner.scans == 1
+
+
+class TestEvents:
+    """Tests de la publicación de cambios."""
+
+    def test_publishes_stream_and_result(self, registry):
+        """Inicio, un DEVICE por dispositivo y el resultado con los nuevos."""
+        events = []
+        registry.subscribe(events.append)
+
+        asyncio.run(registry.refresh())
+
+        assert [e.kind for e in events] == [SCAN_STARTED, DEVICE, DEVICE, SCAN_FINISHED]
+        assert [e.device["ip"] for e in events[1:3]] == ["10.0.0.1", "10.0.0.7"]
+        assert list(events[-1].devices) == DEVICES
+        assert list(events[-1].new_devices) == DEVICES[:1]
+
+    def test_unsubscribe(self, registry):
+        events = []
+        unsubscribe = registry.subscribe(events.append)
+        unsubscribe()
+
+        asyncio.run(registry.refresh())
+
+        assert events == []
+
+    def test_failing_subscriber_does_not_block_others(self, registry):
+        """Una excepción en un suscriptor no corta la entrega a los demás."""
+        events = []
+        registry.subscribe(lambda e: 1 / 0)
+        registry.subscribe(events.append)
+
+        asyncio.run(registry.refresh())
+
+        assert events[-1].kind == SCAN_FINISHED
+
+    def test_failed_scan_keeps_previous_devices(self, registry, clock):
+        """Si el barrido falla se publica SCAN_FAILED y los datos no cambian."""
+        events = []
+
+        async def scenario():
+            await registry.refresh()
+            registry.scanner.devices = [{"ip": "10.0.0.9", "mac": "aa:00:00:00:00:09"}]
+            registry.scanner.error = OSError("no interface")
+            registry.subscribe(events.append)
+            clock.now += 120
+            await registry.refresh()
+
+        asyncio.run(scenario())
+
+        assert events[-1].kind == SCAN_FAILED
+        assert isinstance(events[-1].error, OSError)
+        assert registry.devices == DEVICES
+        assert not registry.is_fresh()
+
+
+class TestSharedRefresh:
+    """Varias vistas pidiendo datos a la vez disparan un solo barrido."""
+
+    def test_concurrent_requests_share_one_scan(self, registry):
+        async def scenario():
+            registry.scanner.release = asyncio.Event()
+            started = registry.ensure_fresh()
+            joined = registry.ensure_fresh()
+            waiter = asyncio.ensure_future(registry.refresh())
+            await asyncio.sleep(0)
+            registry.scanner.release.set()
+            return started, joined, await waiter
+
+        started, joined, devices = asyncio.run(scenario())
+
+        assert (started, joined) == (True, True)
+        assert devices == DEVICES
+        assert registry.scanner.scans == 1
+
+
+class TestObservedDuringRefresh:
+    """Lo observado pasivamente mientras corre un barrido sobrevive a su resultado."""
+
+    def test_observed_devices_survive_refresh(self, registry):
+        # Arrange
+        late = {"ip": "10.0.0.42", "mac": "aa:00:00:00:00:42"}
+        named = {"ip": "10.0.0.7", "mac": "aa:00:00:00:00:07", "hostname": "printer"}
+
+        async def scenario():
+            registry.scanner.release = asyncio.Event()
+            task = asyncio.ensure_future(registry.refresh())
+            await asyncio.sleep(0)
+            # Act: llegan observaciones con el barrido en curso
+            await registry.observe(late)
+            await registry.observe(named)
+            registry.scanner.release.set()
+            await task
+
+        asyncio.run(scenario())
+
+        # Assert: el nuevo se agrega y el escaneado conserva el hostname
+        assert registry.devices == DEVICES[:1] + [{**DEVICES[1], "hostname": "printer"}, late]
+
+    def test_observations_do_not_leak_into_next_refresh(self, registry, clock):
+        """Un dispositivo observado en un barrido no reaparece si el siguiente no lo ve."""
+        async def scenario():
+            registry.scanner.release = asyncio.Event()
+            task = asyncio.ensure_future(registry.refresh())
+            await asyncio.sleep(0)
+            await registry.observe({"ip": "10.0.0.42", "mac": "aa:00:00:00:00:42"})
+            registry.scanner.release.set()
+            await task
+            registry.scanner.release = None
+            clock.now += 120
+            await registry.refresh()
+
+        asyncio.run(scenario())
+
+        assert registry.devices == DEVICES
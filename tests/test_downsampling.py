@@ -0,0 +1,195 @@
+"""
+Tests unitarios para LTTB (core/downsampling.py) y las ventanas largas
+del gráfico en DataManager.
+"""
+
+import numpy as np
+import pytest
+from core.data_manager import DataManager
+from core.downsampling import lttb_aligned
+
+
+class TestLttbAligned:
+    """Tests de LTTB con buckets alineados al x absoluto."""
+
+    def test_one_point_per_full_bucket_plus_tail(self):
+        """Un punto por bucket completo; el incompleto aporta su pico y la última muestra."""
+        # Arrange
+        x = np.arange(5, 39)  # Buckets de 10: [5, 10), [10, 20), [20, 30) y [30, 39) incompleto
+        y = np.zeros(len(x))
+        y[x == 33] = 7.0
+
+        # Act
+        idx = lttb_aligned(x, y, 10)
+
+        # Assert
+        assert (x[idx] // 10).tolist() == [0, 1, 2, 3, 3]
+        assert x[idx][-2:].tolist() == [33, 38]
+
+    def test_full_buckets_do_not_depend_on_series_start(self):
+        """Recortar el principio no cambia la elección de los buckets siguientes."""
+        rng = np.random.default_rng(7)
+        x = np.arange(1000)
+        y = rng.random(1000)
+
+        full = x[lttb_aligned(x, y, 12)]
+        # Misma serie desde el bucket 40, anclada en el punto elegido antes
+        anchor = full[(full // 12) == 39][0]
+        tail = x[lttb_aligned(x[480:], y[480:], 12, anchor=(anchor, y[anchor])) + 480]
+
+        assert tail.tolist() == full[full >= 480].tolist()
+
+    def test_keeps_first_last_and_spike(self):
+        """Conserva los extremos y un pico aislado sobrevive a la reducción."""
+        # Arrange
+        x = np.arange(3600)
+        y = np.zeros(3600)
+        y[1234] = 50.0
+
+        # Act
+        idx = lttb_aligned(x, y, 12)
+
+        # Assert
+        assert idx[0] == 0
+        assert idx[-1] == 3599
+        assert 1234 in idx
+        assert np.all(np.diff(idx) > 0)
+
+    def test_matches_reference_implementation(self):
+        """Coincide con una implementación escalar de referencia."""
+        rng = np.random.default_rng(4)
+        x = np.arange(3, 200)
+        y = rng.random(len(x))
+
+        assert lttb_aligned(x, y, 10).tolist() == _reference_lttb_aligned(x, y, 10)
+
+    def test_width_one_keeps_everything(self):
+        idx = lttb_aligned(np.arange(5), np.ones(5), 1)
+
+        assert idx.tolist() == [0, 1, 2, 3, 4]
+
+
+def _reference_lttb_aligned(x, y, width):
+    """LTTB alineado escalar, bucket por bucket (para comparar)."""
+    groups = {}
+    for j, xv in enumerate(x):
+        groups.setdefault(int(xv) // width, []).append(j)
+    buckets = [groups[k] for k in sorted(groups)]
+    out = []
+    ax, ay = x[0], y[0]
+    for i, members in enumerate(buckets):
+        if i + 1 < len(buckets):
+            following = buckets[i + 1]
+            nx = sum(x[j] for j in following) / len(following)
+            ny = sum(y[j] for j in following) / len(following)
+        else:
+            nx, ny = x[-1], y[-1]
+        best, best_area = members[0], -1.0
+        for j in members:
+            area = abs((ax - nx) * (y[j] - ay) - (ax - x[j]) * (ny - ay))
+            if area > best_area:
+                best, best_area = j, area
+        out.append(best)
+        ax, ay = x[best], y[best]
+    if out[-1] != len(x) - 1:
+        out.append(len(x) - 1)
+    return out
+
+
+class TestChartWindows:
+    """Tests de ventanas configurables en DataManager."""
+
+    def test_long_window_is_downsampled_to_budget(self):
+        """Una ventana más larga que el presupuesto se reduce con LTTB sin pasarse."""
+        # Arrange
+        manager = DataManager(pixel_budget=50)
+        manager.set_chart_window(300)
+
+        # Act
+        for i in range(300):
+            manager.update_traffic(float(i % 10), 1.0, timestamp=1000 + i)
+
+        # Assert
+        assert 25 <= len(manager.download_points) <= 50
+        assert manager.download_points[-1].x == manager.chart_x - 1
+        assert manager.chart_x_range() == (manager.chart_x - 300, manager.chart_x - 1)
+
+    def test_set_window_rebuilds_points_from_raw_series(self):
+        """Al cambiar la ventana los puntos salen de la serie cruda."""
+        manager = DataManager()
+        for i in range(100):
+            manager.update_traffic(float(i), 0.0, timestamp=1000 + i)
+
+        manager.set_chart_window(30)
+
+        assert len(manager.download_points) == 30
+        assert [p.y for p in manager.download_points[-3:]] == [97.0, 98.0, 99.0]
+        assert list(manager.download_values)[-1] == 99.0
+
+    def test_points_list_is_updated_in_place(self):
+        """La lista de puntos es la misma que referencia el gráfico."""
+        manager = DataManager(pixel_budget=50)
+        points = manager.download_points
+
+        manager.set_chart_window(900)
+        manager.update_traffic(1.0, 1.0)
+
+        assert manager.download_points is points
+
+    def test_incremental_points_match_rebuild(self):
+        """Recalcular solo la cola da los mismos puntos que redibujar la ventana."""
+        # Arrange
+        manager = DataManager(pixel_budget=50)
+        manager.set_chart_window(900)
+        rng = np.random.default_rng(3)
+
+        # Act
+        for i in range(2000):
+            manager.update_traffic(float(rng.random()), 0.0, timestamp=1000 + i)
+        incremental = [(p.x, p.y) for p in manager.download_points]
+        manager.set_chart_window(900)
+        rebuilt = [(p.x, p.y) for p in manager.download_points]
+
+        # Assert: solo puede diferir el bucket recortado por el borde izquierdo
+        width = manager._bucket_width()
+        first = manager.chart_x_range()[0] // width + 1
+        assert [p for p in incremental if p[0] // width > first] == \
+            [p for p in rebuilt if p[0] // width > first]
+        assert len(incremental) <= 50
+
+    def test_tick_only_touches_tail(self):
+        """Cada muestra solo modifica los últimos puntos de una ventana larga."""
+        manager = DataManager(pixel_budget=50)
+        manager.set_chart_window(900)
+        for i in range(1000):
+            manager.update_traffic(float(i % 7), 0.0, timestamp=1000 + i)
+        before = [(id(p), p.x, p.y) for p in manager.download_points]
+
+        manager.update_traffic(100.0, 0.0, timestamp=3000)
+
+        after = [(id(p), p.x, p.y) for p in manager.download_points]
+        changed = [i for i, (old, new) in enumerate(zip(before, after)) if old != new]
+        assert all(i >= len(before) - 3 for i in changed)
+
+    def test_window_limited_to_max(self):
+        """La ventana no supera max_chart_window."""
+        manager = DataManager(max_chart_window=600)
+        manager.set_chart_window(3600)
+
+        assert manager.chart_window == 600
+
+    @pytest.mark.parametrize("window", [10, 200])
+    def test_nic_points_respect_budget(self, window):
+        """Las series por interfaz también quedan dentro del presupuesto."""
+        manager = DataManager(pixel_budget=20)
+        manager.set_chart_window(window)
+        manager.update_nic_traffic(["eth0"], np.zeros((1, 2)))
+        manager.select_nics(["eth0"])
+
+        for i in range(window):
+            manager.update_traffic(1.0, 1.0, timestamp=1000 + i)
+            manager.update_nic_traffic(["eth0"], np.array([[float(i), 0.0]]))
+
+        down_points, _ = manager.nic_points["eth0"]
+        assert len(down_points) <= 20
+        assert down_points[-1].y == float(window - 1)
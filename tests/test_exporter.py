@@ -0,0 +1,148 @@
+"""
+Tests unitarios para la exportación del historial (core/exporter.py).
+Cubre la lectura por bloques de HistoryStore, CSV, Parquet/Arrow (si
+pyarrow está instalado) y la variante asíncrona.
+"""
+
+import asyncio
+import csv
+import os
+import re
+import pytest
+from core.exporter import (
+    ExportFormat, arrow_available, available_formats, default_export_path, export_history, export_history_async,
+)
+from core.history_store import HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Historial con 100 muestras a 1 s desde t=1000."""
+    path = str(tmp_path / "history.db")
+    writer = HistoryStore(path, flush_interval=60)
+    for i in range(100):
+        writer.append(1000.0 + i, float(i), i / 2)
+    writer.close()
+    store = HistoryStore(path)
+    yield store
+    store.close()
+
+
+class TestIterRange:
+    """Tests de HistoryStore.iter_range."""
+
+    def test_chunks_are_bounded(self, store):
+        """Cada bloque tiene a lo sumo chunk_rows filas y no se pierden filas."""
+        chunks = list(store.iter_range(0, 5000, chunk_rows=30))
+
+        assert [len(c) for c in chunks] == [30, 30, 30, 10]
+        assert chunks[0][0, 0] == 1000.0
+        assert chunks[-1][-1, 0] == 1099.0
+
+    def test_range_is_inclusive(self, store):
+        """Respeta los extremos del rango."""
+        rows = [r for c in store.iter_range(1010.0, 1019.0, chunk_rows=4) for r in c[:, 0]]
+
+        assert rows == [1010.0 + i for i in range(10)]
+
+    def test_empty_range(self, store):
+        """Un rango sin muestras no produce bloques."""
+        assert list(store.iter_range(5000, 6000)) == []
+
+
+class TestCsvExport:
+    """Tests de exportación a CSV."""
+
+    def test_exports_all_rows(self, store, tmp_path):
+        """Escribe encabezado y una línea por muestra."""
+        # Arrange
+        out = tmp_path / "traffic.csv"
+        seen = []
+
+        # Act
+        rows = export_history(store, str(out), ExportFormat.CSV, chunk_rows=16, progress=seen.append)
+
+        # Assert
+        with open(out, newline="") as f:
+            lines = list(csv.reader(f))
+        assert rows == 100
+        assert lines[0][:3] == ["timestamp", "download_mb", "upload_mb"]
+        assert len(lines) == 101
+        assert float(lines[11][0]) == 1010.0
+        assert float(lines[11][1]) == 10.0
+        assert seen[-1] == 100
+
+    def test_time_range(self, store, tmp_path):
+        """Solo exporta el rango pedido."""
+        out = tmp_path / "traffic.csv"
+
+        rows = export_history(store, str(out), "csv", start=1050.0, end=1059.0)
+
+        assert rows == 10
+        assert not (tmp_path / "traffic.csv.tmp").exists()
+
+    def test_async_export(self, store, tmp_path):
+        """La variante asíncrona corre en otro hilo y da el mismo resultado."""
+        out = tmp_path / "traffic.csv"
+
+        rows = asyncio.run(export_history_async(store, str(out)))
+
+        assert rows == 100
+        assert out.exists()
+
+
+class TestExportTarget:
+    """Tests de los formatos ofrecidos y la ruta por defecto (acción Export del Monitor)."""
+
+    def test_default_path_uses_format_extension(self, tmp_path):
+        path = default_export_path(ExportFormat.PARQUET, str(tmp_path), now=0)
+
+        assert os.path.dirname(path) == str(tmp_path)
+        assert re.fullmatch(r"traffic_\d{8}_\d{6}\.parquet", os.path.basename(path))
+
+    def test_default_path_in_data_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("NETWORK_MONITOR_DATA_DIR", str(tmp_path))
+
+        assert default_export_path("csv").startswith(str(tmp_path))
+
+    def test_formats_without_pyarrow(self, monkeypatch):
+        """Sin pyarrow solo se ofrece CSV."""
+        monkeypatch.setattr("core.exporter.pa", None)
+
+        assert available_formats() == [ExportFormat.CSV]
+
+
+class TestArrowExport:
+    """Tests de Parquet y Arrow IPC (requieren pyarrow)."""
+
+    def test_missing_pyarrow_raises(self, store, tmp_path, monkeypatch):
+        """Sin pyarrow, Parquet es un error claro y no deja archivos."""
+        monkeypatch.setattr("core.exporter.pa", None)
+
+        with pytest.raises(RuntimeError):
+            export_history(store, str(tmp_path / "t.parquet"), ExportFormat.PARQUET)
+        assert list(tmp_path.glob("t.parquet*")) == []
+
+    @pytest.mark.skipif(not arrow_available(), reason="pyarrow not installed")
+    def test_parquet_roundtrip(self, store, tmp_path):
+        """El archivo Parquet conserva filas, columnas y valores."""
+        import pyarrow.parquet as pq
+        out = tmp_path / "traffic.parquet"
+
+        export_history(store, str(out), ExportFormat.PARQUET, chunk_rows=32)
+
+        table = pq.read_table(out)
+        assert table.num_rows == 100
+        assert table.column("download_mb").to_pylist()[10] == 10.0
+
+    @pytest.mark.skipif(not arrow_available(), reason="pyarrow not installed")
+    def test_arrow_roundtrip(self, store, tmp_path):
+        """El archivo Arrow IPC conserva filas y valores."""
+        import pyarrow.ipc as pa_ipc
+        out = tmp_path / "traffic.arrow"
+
+        export_history(store, str(out), ExportFormat.ARROW, chunk_rows=32)
+
+        table = pa_ipc.open_file(str(out)).read_all()
+        assert table.num_rows == 100
+        assert table.column("upload_mb").to_pylist()[10] == 5.0
@@ -0,0 +1,114 @@
+"""
+Tests unitarios para la serie comprimida Gorilla (core/gorilla.py).
+Cubre el ida y vuelta sin pérdida, los casos límite de codificación,
+el acceso por rango y la retención.
+"""
+
+import math
+import numpy as np
+import pytest
+from core.gorilla import BitReader, BitWriter, GorillaSeries
+
+BASE_TS = 1_700_000_000.0
+
+
+def fill(series, timestamps, values):
+    for ts, row in zip(timestamps, values):
+        series.append(ts, row)
+
+
+class TestBits:
+    """Tests del escritor/lector de bits."""
+
+    def test_roundtrip_mixed_widths(self):
+        """Lo escrito con anchos variados se lee igual."""
+        fields = [(1, 1), (0, 1), (5, 3), (2**63 + 7, 64), (1234, 12), (0, 7), (2**40 - 1, 40)]
+        writer = BitWriter()
+        for value, nbits in fields:
+            writer.write(value, nbits)
+
+        reader = BitReader(writer.getvalue())
+
+        assert [reader.read(nbits) for _, nbits in fields] == [v for v, _ in fields]
+        assert writer.bit_length == sum(n for _, n in fields)
+
+
+class TestRoundtrip:
+    """Tests de compresión sin pérdida."""
+
+    def test_lossless_random_traffic(self):
+        """Valores y timestamps (a ms) vuelven exactos."""
+        rng = np.random.default_rng(0)
+        ts = BASE_TS + np.cumsum(1.0 + rng.normal(0, 0.003, 3000))
+        values = rng.gamma(2.0, 1.5, (3000, 2))
+        series = GorillaSeries(block_size=256)
+        fill(series, ts.tolist(), values.tolist())
+
+        out_ts, out_values = series.read_range()
+
+        assert np.array_equal(out_values, values)
+        assert np.array_equal(out_ts, np.round(ts * 1000) / 1000)
+
+    def test_edge_values_and_gaps(self):
+        """Ceros, negativos, infinitos, extremos y saltos largos de tiempo."""
+        values = [(0.0, 0.0), (0.0, 0.0), (-1.5, 1e300), (math.inf, 5e-324), (1.0, -0.0), (2.5, 2.5)]
+        timestamps = [BASE_TS, BASE_TS + 1, BASE_TS + 2, BASE_TS + 86400 * 30, BASE_TS + 86400 * 30 + 0.5,
+                      BASE_TS + 86400 * 30 + 0.6]
+        series = GorillaSeries()
+        fill(series, timestamps, values)
+
+        out_ts, out_values = series.read_range()
+
+        assert out_values.tolist() == [list(v) for v in values]
+        assert out_ts.tolist() == pytest.approx(timestamps)
+
+    def test_steady_idle_traffic_is_tiny(self):
+        """A 1 Hz exacto y sin tráfico cada muestra ocupa ~3 bits (más la cabecera de cada bloque)."""
+        series = GorillaSeries()
+        fill(series, [BASE_TS + i for i in range(10_000)], [(0.0, 0.0)] * 10_000)
+
+        blocks = 10_000 // series.block_size + 1
+        assert series.nbytes < 10_000 * 3 / 8 + blocks * 32
+
+
+class TestRangeAndRetention:
+    """Tests de acceso por rango y retención."""
+
+    def test_read_range_is_inclusive(self):
+        """Retorna solo las muestras dentro del rango, cruzando bloques."""
+        series = GorillaSeries(block_size=50)
+        fill(series, [BASE_TS + i for i in range(500)], [(float(i), 0.0) for i in range(500)])
+
+        ts, values = series.read_range(BASE_TS + 120, BASE_TS + 260)
+
+        assert ts[0] == BASE_TS + 120
+        assert ts[-1] == BASE_TS + 260
+        assert values[:, 0].tolist() == [float(i) for i in range(120, 261)]
+
+    def test_open_block_is_readable(self):
+        """Las muestras del bloque aún abierto también se leen."""
+        series = GorillaSeries(block_size=100)
+        fill(series, [BASE_TS + i for i in range(130)], [(float(i), 1.0) for i in range(130)])
+
+        ts, values = series.read_range(BASE_TS + 125)
+
+        assert values[:, 0].tolist() == [125.0, 126.0, 127.0, 128.0, 129.0]
+
+    def test_retention_drops_whole_old_blocks(self):
+        """Al superar max_samples se descartan bloques viejos completos."""
+        series = GorillaSeries(block_size=100, max_samples=300)
+        fill(series, [BASE_TS + i for i in range(1000)], [(float(i), 0.0) for i in range(1000)])
+
+        ts, values = series.read_range()
+
+        assert 300 <= len(series) < 400
+        assert len(ts) == len(series)
+        assert values[-1, 0] == 999.0
+
+    def test_empty_series(self):
+        """Una serie vacía retorna arrays vacíos."""
+        ts, values = GorillaSeries().read_range()
+
+        assert len(ts) == 0
+        assert values.shape == (0, 2)
+
@@ -0,0 +1,248 @@
+"""
+Tests unitarios para HistoryStore (core/history_store.py).
+Cubre volcado por lotes, lectura por rango, acumulados persistidos
+y recuperación de estadísticas en DataManager.
+"""
+
+import sqlite3
+import time
+import pytest
+from core.data_manager import DataManager
+from core.history_store import HistoryStore
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Ruta de base de datos temporal."""
+    return str(tmp_path / "history.db")
+
+
+class TestAppendAndRead:
+    """Tests de escritura por lotes y lectura por rango."""
+
+    def test_append_does_not_write_until_flush(self, db_path):
+        """append solo encola; el disco se toca en el volcado."""
+        # Arrange
+        store = HistoryStore(db_path, flush_interval=60)
+
+        # Act
+        store.append(1000.0, 1.0, 2.0)
+
+        # Assert
+        assert len(store.read_range(0, 2000)) == 0
+        store.close()
+
+    def test_close_flushes_pending_rows(self, db_path):
+        """close vuelca las filas pendientes."""
+        store = HistoryStore(db_path, flush_interval=60)
+        store.append(1000.0, 1.0, 2.0)
+        store.close()
+
+        reopened = HistoryStore(db_path)
+        rows = reopened.read_range(0, 2000)
+        reopened.close()
+
+        assert rows.tolist() == [[1000.0, 1.0, 2.0, 1.0, 1.0, 2.0]]
+
+    def test_same_timestamp_does_not_overwrite(self, db_path):
+        """Muestras con el mismo timestamp se guardan todas, en orden de llegada."""
+        # Arrange
+        store = HistoryStore(db_path, flush_interval=60)
+        store.append(1000.0, 1.0, 0.0)
+        store.append(1000.0, 2.0, 0.0)
+        store.append(1000.0, 3.0, 0.0)
+        store.close()
+        store = HistoryStore(db_path)
+
+        # Act
+        rows = store.read_range(0, 2000)
+        stats = store.load_stats()
+        store.close()
+
+        # Assert
+        assert rows[:, :2].tolist() == [[1000.0, 1.0], [1000.0, 2.0], [1000.0, 3.0]]
+        assert stats["sample_count"] == 3
+
+    def test_same_timestamp_across_flushes(self, db_path):
+        """Un milisegundo ya escrito en un volcado anterior no se pisa."""
+        # Arrange
+        store = HistoryStore(db_path, flush_interval=60)
+        store.append(1000.0, 1.0, 0.0)
+        store.close()
+        store = HistoryStore(db_path, flush_interval=60)
+        store.append(1000.0, 2.0, 0.0)
+        store.close()
+        store = HistoryStore(db_path)
+
+        # Act
+        rows = store.read_range(0, 2000)
+        chunks = list(store.iter_range(0, 2000, chunk_rows=1))
+        store.close()
+
+        # Assert
+        assert rows[:, 1].tolist() == [1.0, 2.0]
+        assert [c[:, 1].tolist() for c in chunks] == [[1.0], [2.0]]
+
+    def test_migrates_table_keyed_by_timestamp_only(self, db_path):
+        """Una base de versiones previas (clave ts_ms) conserva sus muestras."""
+        # Arrange
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "CREATE TABLE samples (ts_ms INTEGER PRIMARY KEY, download_mb REAL NOT NULL,"
+            " upload_mb REAL NOT NULL, elapsed_s REAL NOT NULL, peak_download_mb REAL NOT NULL,"
+            " peak_upload_mb REAL NOT NULL) WITHOUT ROWID"
+        )
+        conn.execute("INSERT INTO samples VALUES (1000000, 1.0, 2.0, 1.0, 1.0, 2.0)")
+        conn.commit()
+        conn.close()
+
+        # Act
+        store = HistoryStore(db_path, flush_interval=60)
+        store.append(1000.0, 3.0, 0.0)
+        store.close()
+        store = HistoryStore(db_path)
+        rows = store.read_range(0, 2000)
+        store.close()
+
+        # Assert
+        assert rows[:, :3].tolist() == [[1000.0, 1.0, 2.0], [1000.0, 3.0, 0.0]]
+
+    def test_read_range_filters_by_timestamp(self, db_path):
+        """Solo retorna las muestras dentro del rango, en orden."""
+        # Arrange
+        store = HistoryStore(db_path, flush_interval=60)
+        for ts in (1003.0, 1001.0, 1002.0, 1010.0):
+            store.append(ts, ts, 0.0)
+        store.close()
+        store = HistoryStore(db_path)
+
+        # Act
+        rows = store.read_range(1001.0, 1003.0)
+        store.close()
+
+        # Assert
+        assert rows[:, 0].tolist() == [1001.0, 1002.0, 1003.0]
+
+    def test_uses_wal_mode(self, db_path):
+        """La base se abre en modo WAL."""
+        store = HistoryStore(db_path)
+        mode = store._connect().execute("PRAGMA journal_mode").fetchone()[0]
+        store.close()
+
+        assert mode == "wal"
+
+
+class TestRetention:
+    """Tests del borrado de muestras viejas."""
+
+    def test_flush_drops_samples_older_than_retention(self, db_path):
+        """Se borran las muestras más viejas que retention_days; los acumulados quedan."""
+        # Arrange
+        day = 86400.0
+        store = HistoryStore(db_path, flush_interval=60, retention_days=2)
+        store.append(1000.0, 1.0, 0.0)
+        store.append(1000.0 + day, 2.0, 0.0)
+        store.close()
+        store = HistoryStore(db_path, flush_interval=60, retention_days=2)
+        store.append(1000.0 + 2.5 * day, 3.0, 0.0)
+        store.close()
+
+        # Act
+        store = HistoryStore(db_path)
+        rows = store.read_range(0, 1000.0 + 3 * day)
+        stats = store.load_stats()
+        store.close()
+
+        # Assert
+        assert rows[:, 1].tolist() == [2.0, 3.0]
+        assert stats["sample_count"] == 3
+
+    def test_none_keeps_everything(self, db_path):
+        """Sin retención no se borra nada."""
+        store = HistoryStore(db_path, flush_interval=60, retention_days=None)
+        store.append(1000.0, 1.0, 0.0)
+        store.append(1000.0 + 365 * 86400.0, 2.0, 0.0)
+        store.close()
+
+        store = HistoryStore(db_path)
+        rows = store.read_range(0, 2000.0 + 365 * 86400.0)
+        store.close()
+
+        assert len(rows) == 2
+
+
+class TestLifetimeStats:
+    """Tests de los acumulados persistidos."""
+
+    def test_stats_accumulate_on_flush(self, db_path):
+        """Los acumulados se actualizan con cada volcado."""
+        # Arrange
+        store = HistoryStore(db_path, flush_interval=60)
+        store.append(1000.0, 2.0, 1.0, elapsed_s=2.0, peak_download=5.0)
+        store.append(1002.0, 4.0, 3.0, elapsed_s=1.0)
+        store.close()
+
+        # Act
+        store = HistoryStore(db_path)
+        stats = store.load_stats()
+        store.close()
+
+        # Assert
+        assert stats["peak_download"] == 5.0
+        assert stats["peak_upload"] == 3.0
+        assert stats["total_download"] == pytest.approx(8.0)
+        assert stats["total_upload"] == pytest.approx(5.0)
+        assert stats["elapsed_total"] == pytest.approx(3.0)
+        assert stats["sample_count"] == 2
+
+    def test_reset_stats_clears_persisted_stats(self, db_path):
+        """reset_stats pone los acumulados en cero en el próximo volcado."""
+        store = HistoryStore(db_path, flush_interval=60)
+        store.append(1000.0, 2.0, 1.0)
+        store.close()
+
+        store = HistoryStore(db_path, flush_interval=60)
+        store.reset_stats()
+        store.close()
+
+        store = HistoryStore(db_path)
+        stats = store.load_stats()
+        store.close()
+        assert stats["total_download"] == 0
+        assert stats["sample_count"] == 0
+
+
+class TestDataManagerPersistence:
+    """Integración con DataManager."""
+
+    def test_stats_survive_restart(self, db_path):
+        """peak/total/avg se recuperan al crear un DataManager nuevo."""
+        # Arrange
+        store = HistoryStore(db_path, flush_interval=60)
+        dm = DataManager(history_store=store)
+        now = time.time()
+        dm.update_traffic(4.0, 2.0, timestamp=now - 2)
+        dm.update_traffic(2.0, 1.0, timestamp=now - 1)
+        store.close()
+
+        # Act
+        store = HistoryStore(db_path)
+        restored = DataManager(history_store=store)
+        store.close()
+
+        # Assert
+        assert restored.get_stats() == pytest.approx(dm.get_stats())
+        assert restored.sample_count == 2
+
+    def test_recent_history_is_restored(self, db_path):
+        """Las muestras de la última hora vuelven al gráfico."""
+        store = HistoryStore(db_path, flush_interval=60)
+        DataManager(history_store=store).update_traffic(7.0, 3.0)
+        store.close()
+
+        store = HistoryStore(db_path)
+        restored = DataManager(history_store=store)
+        store.close()
+
+        assert restored.download_values[-1] == 7.0
+        assert restored.download_points[-1].y == 7.0
@@ -0,0 +1,239 @@
+"""
+Tests unitarios para los rescans incrementales (core/liveness.py y su
+integración con NetworkScanner): TTL por host, backoff exponencial de
+direcciones que no responden, reuso de los dispositivos en caché y que
+un barrido fallido no cuente como falta de respuesta.
+"""
+
+import asyncio
+import errno
+import ipaddress
+import random
+import pytest
+from core.device_registry import DeviceRegistry, SCAN_FAILED
+from core.liveness import LivenessTracker
+from core.scanner import LocalNetwork, NetworkScanner
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def tracker(clock):
+    return LivenessTracker(ttl=600, backoff_base=60, backoff_max=480, ttl_spread=0.25,
+                           clock=clock, rng=random.Random(3))
+
+
+def device(ip, mac="aa:00:00:00:00:01"):
+    return {"ip": ip, "mac": mac, "vendor": "Acme"}
+
+
+class TestLivenessTracker:
+    """Tests del TTL y el backoff."""
+
+    def test_live_host_is_not_due_until_ttl(self, tracker):
+        """Un host que respondió no se consulta hasta que vence su TTL (disperso)."""
+        tracker.seen(device("10.0.0.7"), now=0)
+
+        assert tracker.not_due("10.0.0.0/24", now=449) == {"10.0.0.7"}
+        assert tracker.not_due("10.0.0.0/24", now=600) == set()
+        assert 450 <= tracker.state("10.0.0.7").next_probe <= 600
+
+    def test_ttl_spread_desynchronizes_hosts(self, tracker):
+        for i in range(1, 50):
+            tracker.seen(device(f"10.0.0.{i}"), now=0)
+
+        expiries = {tracker.state(f"10.0.0.{i}").next_probe for i in range(1, 50)}
+
+        assert len(expiries) == 49
+
+    def test_exponential_backoff_with_cap(self, tracker):
+        """Cada falla duplica la espera hasta backoff_max."""
+        waits = []
+        now = 0
+        for _ in range(6):
+            tracker.missed("10.0.0.9", now)
+            waits.append(tracker.state("10.0.0.9").next_probe - now)
+            now = tracker.state("10.0.0.9").next_probe
+
+        assert waits == [60, 120, 240, 480, 480, 480]
+
+    def test_dropped_host_leaves_live_set(self, tracker):
+        """Un host vivo que no responde deja de reportarse y entra en backoff."""
+        tracker.seen(device("10.0.0.7"), now=0)
+        tracker.record_sweep(["10.0.0.7"], answered=set(), now=700)
+
+        assert tracker.live("10.0.0.0/24") == []
+        assert tracker.state("10.0.0.7").next_probe == 760
+
+    def test_cached_requires_same_mac(self, tracker):
+        tracker.seen(device("10.0.0.7"), now=0)
+
+        assert tracker.cached("10.0.0.7", "aa:00:00:00:00:01") is not None
+        assert tracker.cached("10.0.0.7", "bb:00:00:00:00:01") is None
+        assert tracker.cached("10.0.0.8", "aa:00:00:00:00:01") is None
+
+    def test_not_due_filters_by_network(self, tracker):
+        tracker.seen(device("10.0.0.7"), now=0)
+        tracker.seen(device("10.9.0.7"), now=0)
+
+        assert tracker.not_due("10.0.0.0/24", now=1) == {"10.0.0.7"}
+
+
+class FakeEngine:
+    """Motor ARP simulado: responde por las IPs de `alive` que no estén en skip."""
+
+    def __init__(self, alive):
+        self.alive = alive
+        self.probes = []
+        self.error = None  # OSError que lanza el próximo barrido
+
+    def sweep(self, target, timeout=1.0, rate_pps=1000, on_reply=None, stop=None, skip=None):
+        if self.error is not None:
+            raise self.error
+        skip = skip or set()
+        probed = [str(ip) for ip in ipaddress.ip_network(target, strict=False).hosts() if str(ip) not in skip]
+        self.probes.append(probed)
+        replies = [(ip, self.alive[ip]) for ip in probed if ip in self.alive]
+        if on_reply is not None:
+            for ip, mac in replies:
+                on_reply(ip, mac)
+        return replies
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def incremental(mocker, tracker):
+    """NetworkScanner incremental sobre un motor simulado con 3 hosts vivos en /24."""
+    mocker.patch.object(NetworkScanner, "get_local_range", return_value="10.0.0.1/24")
+    engine = FakeEngine({"10.0.0.1": "aa:00:00:00:00:01", "10.0.0.7": "aa:00:00:00:00:07",
+                         "10.0.0.9": "aa:00:00:00:00:09"})
+    scanner = NetworkScanner(backend="auto", liveness=tracker)
+    mocker.patch.object(scanner, "_open_engine", return_value=engine)
+    vendor = mocker.patch.object(scanner.vendor_service, "get_vendor", return_value="Acme")
+    return scanner, engine, vendor
+
+
+class TestIncrementalScan:
+    """Integración de LivenessTracker con scan_network y scan_stream."""
+
+    def test_first_scan_probes_everything(self, incremental):
+        scanner, engine, _ = incremental
+
+        devices = scanner.scan_network()
+
+        assert len(engine.probes[0]) == 254
+        assert sorted(d["ip"] for d in devices) == ["10.0.0.1", "10.0.0.7", "10.0.0.9"]
+
+    def test_steady_state_rescan_sends_nothing(self, incremental, clock):
+        """Antes de vencer TTL o backoff no se envía nada y se devuelve la caché."""
+        scanner, engine, vendor = incremental
+        scanner.scan_network()
+        clock.now = 30
+
+        devices = scanner.scan_network()
+
+        assert len(engine.probes) == 1
+        assert sorted(d["ip"] for d in devices) == ["10.0.0.1", "10.0.0.7", "10.0.0.9"]
+        assert vendor.call_count == 3
+
+    def test_rescan_probes_only_expired_and_backed_off(self, incremental, clock):
+        """Tras el backoff se consultan las direcciones muertas, no los vivos sin vencer."""
+        scanner, engine, _ = incremental
+        scanner.scan_network()
+        clock.now = 61
+
+        scanner.scan_network()
+
+        assert len(engine.probes[1]) == 251
+        assert not {"10.0.0.1", "10.0.0.7", "10.0.0.9"} & set(engine.probes[1])
+
+    def test_dropped_host_disappears_and_new_host_appears(self, incremental, clock):
+        scanner, engine, vendor = incremental
+        scanner.scan_network()
+        del engine.alive["10.0.0.7"]
+        engine.alive["10.0.0.50"] = "aa:00:00:00:00:50"
+        clock.now = 700  # TTL vencido y backoff cumplido
+
+        devices = scanner.scan_network()
+
+        assert sorted(d["ip"] for d in devices) == ["10.0.0.1", "10.0.0.50", "10.0.0.9"]
+        assert vendor.call_count == 4  # Solo el host nuevo resuelve fabricante
+
+    def test_stream_yields_cache_then_probes(self, incremental, clock):
+        """scan_stream entrega la caché al instante y solo consulta lo vencido."""
+        scanner, engine, _ = incremental
+        scanner.scan_network()
+        engine.alive["10.0.0.50"] = "aa:00:00:00:00:50"
+        clock.now = 61
+
+        async def collect():
+            return [d["ip"] async for d in scanner.scan_stream(timeout=0)]
+
+        ips = asyncio.run(collect())
+
+        assert sorted(ips[:3]) == ["10.0.0.1", "10.0.0.7", "10.0.0.9"]
+        assert ips[3:] == ["10.0.0.50"]
+        assert len(engine.probes[1]) == 251
+        assert scanner.liveness.live("10.0.0.0/24")[-1]["ip"] == "10.0.0.50"
+
+
+class TestFailedSweep:
+    """Un barrido que falla no registra faltas ni vacía el resultado."""
+
+    @pytest.fixture
+    def failing(self, incremental, clock):
+        """Escáner con un primer barrido exitoso y el motor ya caído, con el TTL vencido."""
+        scanner, engine, _ = incremental
+        scanner.scan_network()
+        engine.error = OSError(errno.ENETDOWN, "Network is down")
+        clock.now = 700
+        return scanner
+
+    def test_stream_raises_and_keeps_liveness(self, failing):
+        # Arrange
+        def snapshot():
+            return {ip: (state.device, state.misses, state.next_probe)
+                    for ip in ("10.0.0.1", "10.0.0.2") for state in [failing.liveness.state(ip)]}
+
+        before = snapshot()
+
+        async def collect():
+            return [d async for d in failing.scan_stream(timeout=0)]
+
+        # Act / Assert
+        with pytest.raises(OSError):
+            asyncio.run(collect())
+        assert snapshot() == before
+        assert before["10.0.0.1"][0] is not None  # Sigue vivo, sin faltas nuevas
+
+    def test_registry_publishes_scan_failed(self, failing):
+        """El error llega al registro: SCAN_FAILED y se conservan los datos anteriores."""
+        registry = DeviceRegistry(failing)
+        registry._devices = previous = [{"ip": "10.0.0.1", "mac": "aa:00:00:00:00:01"}]
+        events = []
+        registry.subscribe(events.append)
+
+        async def scan_all_stream():
+            async for device in NetworkScanner.scan_all_stream(
+                    failing, [LocalNetwork("eth0", "10.0.0.5", "10.0.0.1/24")], timeout=0, neighbors=False):
+                yield device
+
+        failing.scan_all_stream = scan_all_stream
+        asyncio.run(registry.refresh())
+
+        assert events[-1].kind == SCAN_FAILED
+        assert isinstance(events[-1].error, OSError)
+        assert registry.devices == previous
@@ -0,0 +1,124 @@
+"""
+Tests unitarios para la tabla de vecinos del kernel (core/neighbor_table.py).
+Cubre el parseo de /proc/net/arp, el volcado RTM_GETNEIGH (IPv4 e IPv6)
+y el fallback entre backends.
+"""
+
+import socket
+import struct
+import pytest
+from core import neighbor_table
+from core.neighbor_table import (
+    Neighbor, NetlinkNeighbors, ProcNetArpNeighbors, REACHABLE, STALE, read_neighbors
+)
+
+
+PROC_NET_ARP = (
+    "IP address       HW type     Flags       HW address            Mask     Device\n"
+    "192.168.1.1      0x1         0x2         AA:BB:CC:00:00:01     *        eth0\n"
+    "192.168.1.77     0x1         0x0         00:00:00:00:00:00     *        eth0\n"
+    "10.20.0.9        0x1         0x6         aa:bb:cc:00:00:09     *        vlan20\n"
+)
+
+
+@pytest.fixture
+def arp_file(tmp_path):
+    """Archivo con el formato de /proc/net/arp."""
+    path = tmp_path / "arp"
+    path.write_text(PROC_NET_ARP)
+    return str(path)
+
+
+class TestProcNetArpNeighbors:
+    """Tests del backend procfs."""
+
+    def test_reads_complete_entries(self, arp_file):
+        """Omite las incompletas y normaliza la MAC; sin estado NUD todo es stale."""
+        neighbors = ProcNetArpNeighbors(arp_file).read()
+
+        assert neighbors == [
+            Neighbor("192.168.1.1", "aa:bb:cc:00:00:01", "eth0", STALE),
+            Neighbor("10.20.0.9", "aa:bb:cc:00:00:09", "vlan20", STALE),
+        ]
+
+    def test_malformed_file_raises(self, tmp_path):
+        """Un formato inesperado lanza ValueError."""
+        path = tmp_path / "arp"
+        path.write_text("header\n1.2.3.4 0x1\n")
+
+        with pytest.raises(ValueError):
+            ProcNetArpNeighbors(str(path)).read()
+
+
+def build_neigh_message(family, ifindex, state, dst, lladdr):
+    """Construye un mensaje RTM_NEWNEIGH con NDA_DST y NDA_LLADDR."""
+    payload = NetlinkNeighbors.NDMSG.pack(family, ifindex, state, 0, 1)
+    for atype, data in ((NetlinkNeighbors.NDA_DST, socket.inet_pton(family, dst)),
+                        (NetlinkNeighbors.NDA_LLADDR, lladdr)):
+        attr = struct.pack("=HH", 4 + len(data), atype) + data
+        payload += attr + b"\0" * (-len(attr) % 4)
+    return payload
+
+
+class FakeNetlinkSocket:
+    """Socket netlink falso que responde un volcado armado en memoria."""
+
+    def __init__(self, messages):
+        self.buf = bytearray()
+        self.responses = []
+        for payload in messages:
+            start = len(self.buf)
+            self.buf += payload
+            self.responses.append((NetlinkNeighbors.RTM_NEWNEIGH, start, len(self.buf)))
+
+    def dump(self, msg_type, payload):
+        assert msg_type == NetlinkNeighbors.RTM_GETNEIGH
+        yield from self.responses
+
+    def close(self):
+        pass
+
+
+class TestNetlinkNeighbors:
+    """Tests del backend rtnetlink."""
+
+    def test_parses_ipv4_and_ipv6_with_state(self, mocker):
+        """Mapea estados NUD y descarta incompletas, fallidas y multicast."""
+        mac = bytes.fromhex("aabbcc000001")
+        fake = FakeNetlinkSocket([
+            build_neigh_message(socket.AF_INET, 2, NetlinkNeighbors.NUD_REACHABLE, "192.168.1.1", mac),
+            build_neigh_message(socket.AF_INET, 2, NetlinkNeighbors.NUD_STALE, "192.168.1.5", bytes(range(6))),
+            build_neigh_message(socket.AF_INET, 2, NetlinkNeighbors.NUD_INCOMPLETE, "192.168.1.6", bytes(6)),
+            build_neigh_message(socket.AF_INET, 2, NetlinkNeighbors.NUD_FAILED, "192.168.1.7", mac),
+            build_neigh_message(socket.AF_INET6, 2, NetlinkNeighbors.NUD_DELAY, "fe80::1", mac),
+            build_neigh_message(socket.AF_INET6, 2, NetlinkNeighbors.NUD_NOARP, "ff02::16",
+                                bytes.fromhex("333300000016")),
+        ])
+        mocker.patch.object(neighbor_table, "NetlinkSocket", return_value=fake)
+        mocker.patch("socket.if_indextoname", return_value="eth0")
+
+        neighbors = NetlinkNeighbors().read()
+
+        assert neighbors == [
+            Neighbor("192.168.1.1", "aa:bb:cc:00:00:01", "eth0", REACHABLE),
+            Neighbor("192.168.1.5", "00:01:02:03:04:05", "eth0", STALE),
+            Neighbor("fe80::1", "aa:bb:cc:00:00:01", "eth0", STALE),
+        ]
+
+
+class TestReadNeighbors:
+    """Tests de la selección de backend con fallback."""
+
+    def test_netlink_falls_back_to_procfs(self, mocker, arp_file):
+        """Si netlink no está disponible se lee /proc/net/arp."""
+        mocker.patch.object(NetlinkNeighbors, "__init__", side_effect=OSError("no netlink"))
+        mocker.patch.dict(neighbor_table.BACKENDS, {"procfs": lambda: ProcNetArpNeighbors(arp_file)})
+
+        assert [n.ip for n in read_neighbors()] == ["192.168.1.1", "10.20.0.9"]
+
+    def test_no_backend_returns_empty(self, mocker):
+        """Sin ningún backend (otro sistema operativo) retorna lista vacía."""
+        mocker.patch.object(NetlinkNeighbors, "__init__", side_effect=AttributeError("AF_NETLINK"))
+        mocker.patch.object(ProcNetArpNeighbors, "read", side_effect=OSError("no procfs"))
+
+        assert read_neighbors() == []
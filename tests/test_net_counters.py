@@ -0,0 +1,282 @@
+"""
+Tests unitarios para los backends de contadores (core/net_counters.py).
+Cubre el parseo de /proc/net/dev, el volcado netlink y el fallback a psutil.
+"""
+
+import struct
+import pytest
+import numpy as np
+from collections import namedtuple
+from core import net_counters
+from core.net_counters import (
+    PsutilCounters, ProcNetDevCounters, NetlinkCounters, create_counter_backend
+)
+
+
+PROC_NET_DEV = (
+    "Inter-|   Receive                                                |  Transmit\n"
+    " face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed\n"
+    "    lo: 10796067    1457    0    0    0     0          0         0 10796067    1457    0    0    0     0       0          0\n"
+    "  eth0: 18446744073709551 545    0    0    0     0          0         0    55795     600    0    0    0     0       0          0\n"
+    "wlan0:42 1 0 0 0 0 0 0 7 1 0 0 0 0 0 0\n"
+)
+
+
+@pytest.fixture
+def proc_file(tmp_path):
+    """Archivo con el formato de /proc/net/dev."""
+    path = tmp_path / "dev"
+    path.write_text(PROC_NET_DEV)
+    return str(path)
+
+
+class TestProcNetDevCounters:
+    """Tests del backend procfs."""
+    
+    def test_interface_names(self, proc_file):
+        """Extrae los nombres de interfaz."""
+        backend = ProcNetDevCounters(proc_file)
+        assert backend.interface_names() == ["lo", "eth0", "wlan0"]
+    
+    def test_read_into_parses_bytes(self, proc_file):
+        """Lee rx_bytes y tx_bytes ignorando dígitos del nombre."""
+        # Arrange
+        backend = ProcNetDevCounters(proc_file)
+        out = np.zeros((3, 2), dtype=np.int64)
+        
+        # Act
+        count = backend.read_into(out)
+        
+        # Assert
+        assert count == 3
+        assert out.tolist() == [
+            [10796067, 10796067],
+            [18446744073709551, 55795],
+            [42, 7],
+        ]
+    
+    def test_read_into_reuses_buffer_after_change(self, proc_file, tmp_path):
+        """Relee el mismo archivo abierto y refleja valores nuevos."""
+        # Arrange
+        backend = ProcNetDevCounters(proc_file)
+        out = np.zeros((3, 2), dtype=np.int64)
+        backend.read_into(out)
+        
+        # Act
+        (tmp_path / "dev").write_text(PROC_NET_DEV.replace("wlan0:42", "wlan0:99"))
+        backend.read_into(out)
+        
+        # Assert
+        assert out[2, 0] == 99
+    
+    def test_shorter_file_ignores_stale_buffer_bytes(self, proc_file, tmp_path):
+        """El parseo en el buffer reutilizado se detiene en el tamaño leído."""
+        # Arrange
+        backend = ProcNetDevCounters(proc_file)
+        out = np.zeros((3, 2), dtype=np.int64)
+        backend.read_into(out)
+        shorter = "".join(PROC_NET_DEV.splitlines(keepends=True)[:3])
+
+        # Act
+        (tmp_path / "dev").write_text(shorter)
+        count = backend.read_into(out)
+
+        # Assert
+        assert count == 1
+        assert backend.interface_names() == ["lo"]
+
+    def test_buffer_grows_when_file_is_larger(self, proc_file):
+        """Agranda el buffer si el archivo no entra."""
+        # Arrange
+        backend = ProcNetDevCounters(proc_file, buffer_size=64)
+        out = np.zeros((3, 2), dtype=np.int64)
+        
+        # Act
+        count = backend.read_into(out)
+        
+        # Assert
+        assert count == 3
+        assert out[0, 0] == 10796067
+    
+    def test_read_into_reports_more_interfaces_than_rows(self, proc_file):
+        """Si hay más interfaces que filas, retorna el total real."""
+        out = np.zeros((1, 2), dtype=np.int64)
+        assert ProcNetDevCounters(proc_file).read_into(out) == 3
+        assert out[0, 0] == 10796067
+    
+    def test_replaced_interface_requests_refresh(self, proc_file, tmp_path):
+        """Misma cantidad con otro nombre en una fila retorna -1 (no se resta por posición)."""
+        # Arrange
+        backend = ProcNetDevCounters(proc_file)
+        backend.interface_names()
+        out = np.zeros((3, 2), dtype=np.int64)
+        (tmp_path / "dev").write_text(PROC_NET_DEV.replace("wlan0:", "veth9f:"))
+        
+        # Act
+        count = backend.read_into(out)
+        
+        # Assert
+        assert count == -1
+        assert backend.interface_names() == ["lo", "eth0", "veth9f"]
+        assert backend.read_into(out) == 3
+    
+    def test_malformed_file_raises(self, tmp_path):
+        """Un formato inesperado lanza ValueError."""
+        # Arrange
+        path = tmp_path / "dev"
+        path.write_text(PROC_NET_DEV.splitlines(keepends=True)[0] * 2 + "eth0: 1 2 3\n")
+        
+        # Act & Assert
+        with pytest.raises(ValueError):
+            ProcNetDevCounters(str(path)).read_into(np.zeros((1, 2), dtype=np.int64))
+
+
+class TestPsutilCounters:
+    """Tests del backend psutil."""
+    
+    def test_read_into(self, mocker):
+        """Llena [bytes_recv, bytes_sent] en orden de psutil."""
+        # Arrange
+        Counters = namedtuple("Counters", ["bytes_sent", "bytes_recv"])
+        mocker.patch("psutil.net_io_counters", return_value={
+            "eth0": Counters(bytes_sent=10, bytes_recv=20),
+            "wlan0": Counters(bytes_sent=30, bytes_recv=40),
+        })
+        out = np.zeros((2, 2), dtype=np.int64)
+        
+        # Act
+        count = PsutilCounters().read_into(out)
+        
+        # Assert
+        assert count == 2
+        assert out.tolist() == [[20, 10], [40, 30]]
+    
+    def test_replaced_interface_requests_refresh(self, mocker):
+        """Si otra interfaz ocupa el lugar de una conocida retorna -1."""
+        # Arrange
+        Counters = namedtuple("Counters", ["bytes_sent", "bytes_recv"])
+        counters = mocker.patch("psutil.net_io_counters", return_value={
+            "eth0": Counters(1, 1), "veth1": Counters(500, 500),
+        })
+        backend = PsutilCounters()
+        backend.interface_names()
+        counters.return_value = {"eth0": Counters(2, 2), "veth2": Counters(0, 0)}
+        
+        # Act
+        count = backend.read_into(np.zeros((2, 2), dtype=np.int64))
+        
+        # Assert
+        assert count == -1
+
+
+def build_link_message(ifindex, name):
+    """Construye un mensaje RTM_NEWLINK con IFLA_IFNAME."""
+    ifname = name.encode() + b"\0"
+    ifname_attr = struct.pack("=HH", 4 + len(ifname), NetlinkCounters.IFLA_IFNAME) + ifname
+    ifname_attr += b"\0" * (-len(ifname_attr) % 4)
+    return NetlinkCounters.IFINFOMSG.pack(0, 0, ifindex, 0, 0) + ifname_attr
+
+
+def build_stats_message(ifindex, rx_bytes, tx_bytes):
+    """Construye un mensaje RTM_NEWSTATS con IFLA_STATS_LINK_64."""
+    stats = struct.pack("=QQQQ", 1, 2, rx_bytes, tx_bytes) + b"\0" * 8 * 19
+    stats_attr = struct.pack("=HH", 4 + len(stats), NetlinkCounters.IFLA_STATS_LINK_64) + stats
+    return NetlinkCounters.IF_STATS_MSG.pack(0, 0, 0, ifindex, 1) + stats_attr
+
+
+class FakeNetlinkSocket:
+    """Socket netlink falso que responde volcados armados en memoria."""
+    
+    def __init__(self, links):
+        self.buf = bytearray()
+        self.responses = {NetlinkCounters.RTM_GETLINK: [], NetlinkCounters.RTM_GETSTATS: []}
+        for ifindex, (name, rx, tx) in enumerate(links, start=1):
+            self._add(NetlinkCounters.RTM_GETLINK, NetlinkCounters.RTM_NEWLINK, build_link_message(ifindex, name))
+            self._add(NetlinkCounters.RTM_GETSTATS, NetlinkCounters.RTM_NEWSTATS, build_stats_message(ifindex, rx, tx))
+    
+    def _add(self, request, reply, payload):
+        start = len(self.buf)
+        self.buf += payload
+        self.responses[request].append((reply, start, len(self.buf)))
+    
+    def dump(self, msg_type, payload):
+        yield from self.responses[msg_type]
+    
+    def close(self):
+        pass
+
+
+class TestNetlinkCounters:
+    """Tests del backend rtnetlink."""
+    
+    def test_read_into_parses_stats64(self, mocker):
+        """Extrae rx_bytes/tx_bytes de IFLA_STATS_LINK_64 en la fila de cada ifindex."""
+        # Arrange
+        fake = FakeNetlinkSocket([("lo", 100, 100), ("eth0", 2 ** 40, 7)])
+        mocker.patch.object(net_counters, "NetlinkSocket", return_value=fake)
+        backend = NetlinkCounters()
+        out = np.zeros((2, 2), dtype=np.int64)
+        
+        # Act
+        backend.interface_names()
+        count = backend.read_into(out)
+        
+        # Assert
+        assert count == 2
+        assert out.tolist() == [[100, 100], [2 ** 40, 7]]
+    
+    def test_interface_names(self, mocker):
+        """Extrae los nombres de IFLA_IFNAME."""
+        fake = FakeNetlinkSocket([("lo", 0, 0), ("enp3s0", 0, 0)])
+        mocker.patch.object(net_counters, "NetlinkSocket", return_value=fake)
+        assert NetlinkCounters().interface_names() == ["lo", "enp3s0"]
+    
+    def test_unknown_ifindex_requests_refresh(self, mocker):
+        """Un ifindex sin nombre conocido retorna -1 para forzar el refresco."""
+        # Arrange
+        fake = FakeNetlinkSocket([("lo", 0, 0)])
+        mocker.patch.object(net_counters, "NetlinkSocket", return_value=fake)
+        
+        # Act
+        count = NetlinkCounters().read_into(np.zeros((1, 2), dtype=np.int64))
+        
+        # Assert
+        assert count == -1
+
+
+    def test_replaced_interface_requests_refresh(self, mocker):
+        """Una interfaz recreada trae un ifindex nuevo: retorna -1 aunque la cantidad sea igual."""
+        # Arrange
+        fake = FakeNetlinkSocket([("lo", 0, 0), ("veth1", 0, 0), ("veth2", 0, 0)])
+        mocker.patch.object(net_counters, "NetlinkSocket", return_value=fake)
+        links = fake.responses[NetlinkCounters.RTM_GETLINK]
+        stats = fake.responses[NetlinkCounters.RTM_GETSTATS]
+        fake.responses[NetlinkCounters.RTM_GETLINK] = links[:2]  # veth2 todavía no existe
+        backend = NetlinkCounters()
+        backend.interface_names()
+        fake.responses[NetlinkCounters.RTM_GETSTATS] = [stats[0], stats[2]]  # veth2 reemplazó a veth1
+        
+        # Act
+        count = backend.read_into(np.zeros((2, 2), dtype=np.int64))
+        
+        # Assert
+        assert count == -1
+
+
+class TestCreateCounterBackend:
+    """Tests de la selección de backend con fallback."""
+    
+    def test_psutil_when_requested(self):
+        """Pedir psutil retorna psutil."""
+        assert create_counter_backend("psutil").name == "psutil"
+    
+    def test_fallback_to_psutil(self, mocker):
+        """Si procfs no está disponible cae a psutil."""
+        mocker.patch.object(ProcNetDevCounters, "__init__", side_effect=OSError("no procfs"))
+        assert create_counter_backend("auto").name == "psutil"
+    
+    def test_netlink_falls_back_to_procfs(self, mocker, proc_file):
+        """Si netlink falla se prueba procfs antes que psutil."""
+        mocker.patch.object(NetlinkCounters, "__init__", side_effect=AttributeError("AF_NETLINK"))
+        mocker.patch.dict(net_counters.BACKENDS, {"procfs": lambda: ProcNetDevCounters(proc_file)})
+        assert create_counter_backend("netlink").name == "procfs"
@@ -129,6 +129,23 @@ class TestNotifyHighTraffic:
         assert "50.00" in call_args[0][1]
 
 
+class TestNotifyQuotaWarning:
+    """Tests del método notify_quota_warning"""
+
+    def test_notify_quota_warning_formats_message(self, mocker):
+        """Verifica que el aviso de cuota muestra consumo, cuota y porcentaje."""
+        service = NotificationService()
+        mock_notify = mocker.patch.object(service, "notify", return_value=True)
+
+        service.notify_quota_warning(8192.0, 10240.0, exhausts_at=1704110400.0)
+
+        title, message = mock_notify.call_args[0][:2]
+        assert "Data Cap" in title
+        assert "8.00 GB of 10.00 GB (80%)" in message
+        assert "Cap reached by" in message
+        assert mock_notify.call_args[1]["notification_type"] == "quota"
+
+
 class TestResetCooldown:
     """Tests del método reset_cooldown"""
     
@@ -0,0 +1,251 @@
+"""
+Tests unitarios para el descubrimiento pasivo (core/passive_discovery.py):
+filtro BPF, parseo de ARP/DHCP/mDNS/SSDP sobre un pcap de ejemplo,
+throttling de observaciones repetidas e integración con DeviceRegistry.
+
+El pcap (tests/fixtures/passive_discovery.pcap) trae, en orden:
+ 0. ARP reply de 192.168.1.1
+ 1. Sonda ARP (IP de origen 0.0.0.0)
+ 2. DHCP REQUEST de 02:11:22:33:44:55 pidiendo 192.168.1.50 ("living-room-tv")
+ 3. DHCP ACK del servidor para 192.168.1.50
+ 4. Respuesta mDNS de 192.168.1.60 con el registro A "printer.local"
+ 5. Consulta mDNS de 192.168.1.61
+ 6. SSDP NOTIFY de 192.168.1.70
+ 7. TCP (no pasa el filtro)
+ 8. UDP a otro puerto (DNS, no pasa el filtro)
+ 9. Fragmento IP (no pasa el filtro)
+"""
+
+import asyncio
+import socket
+import struct
+from pathlib import Path
+
+import pytest
+from core import passive_discovery
+from core.arp_engine import attach_filter, raw_available
+from core.device_registry import DeviceRegistry, DEVICE
+from core.passive_discovery import (
+    PASSIVE_BPF, SNAPLEN, ARP, DHCP, MDNS, SSDP,
+    Observation, PassiveDiscovery, parse_frame, read_pcap,
+)
+from core.scanner import LocalNetwork, NetworkScanner
+
+PCAP = Path(__file__).parent / "fixtures" / "passive_discovery.pcap"
+
+ACCEPTED = [True, True, True, True, True, True, True, False, False, False]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def frames():
+    return list(read_pcap(str(PCAP)))
+
+
+def run_bpf(program, frame) -> int:
+    """Intérprete mínimo de BPF clásico (solo las instrucciones de PASSIVE_BPF)."""
+    a = x = pc = 0
+    while True:
+        code, jt, jf, k = program[pc]
+        pc += 1
+        if code == 0x28:  # ldh [k]
+            a = struct.unpack_from("!H", frame, k)[0]
+        elif code == 0x30:  # ldb [k]
+            a = frame[k]
+        elif code == 0x48:  # ldh [x+k]
+            a = struct.unpack_from("!H", frame, x + k)[0]
+        elif code == 0xB1:  # ldxb 4*([k]&0xf)
+            x = (frame[k] & 0x0F) * 4
+        elif code == 0x15:  # jeq #k
+            pc += jt if a == k else jf
+        elif code == 0x45:  # jset #k
+            pc += jt if a & k else jf
+        elif code == 0x06:  # ret #k
+            return k
+        else:
+            raise AssertionError(f"unexpected opcode {code:#x}")
+
+
+class TestPassiveFilter:
+    """Tests del filtro BPF."""
+
+    def test_filter_accepts_only_discovery_traffic(self, frames):
+        """ARP, DHCP, mDNS y SSDP pasan; TCP, otros puertos UDP y fragmentos no."""
+        accepted = [run_bpf(PASSIVE_BPF, frame) == SNAPLEN for frame in frames]
+
+        assert accepted == ACCEPTED
+
+    def test_jumps_stay_inside_program(self):
+        for pc, (code, jt, jf, _k) in enumerate(PASSIVE_BPF):
+            if code & 0x07 == 0x05:  # BPF_JMP
+                assert pc + 1 + max(jt, jf) < len(PASSIVE_BPF)
+
+    @pytest.mark.skipif(not raw_available(), reason="SO_ATTACH_FILTER requires Linux")
+    def test_kernel_accepts_filter(self):
+        """El verificador del kernel acepta el programa."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            attach_filter(sock, PASSIVE_BPF)
+        finally:
+            sock.close()
+
+
+class TestParseFrame:
+    """Tests del parseo de las tramas del pcap."""
+
+    def test_arp_sender(self, frames):
+        assert parse_frame(frames[0], "eth0") == Observation("192.168.1.1", "aa:bb:cc:00:00:01", "eth0", ARP)
+
+    def test_arp_probe_is_ignored(self, frames):
+        """Una sonda ARP (sin IP de origen) no identifica a nadie."""
+        assert parse_frame(frames[1]) is None
+
+    def test_dhcp_request_carries_hostname(self, frames):
+        observation = parse_frame(frames[2])
+
+        assert observation == Observation("192.168.1.50", "02:11:22:33:44:55", "", DHCP, "living-room-tv")
+
+    def test_dhcp_ack_uses_assigned_address(self, frames):
+        """El ACK informa la MAC del cliente y la IP asignada, no la del servidor."""
+        observation = parse_frame(frames[3])
+
+        assert (observation.ip, observation.mac, observation.hostname) == ("192.168.1.50", "02:11:22:33:44:55", None)
+
+    def test_mdns_response_hostname(self, frames):
+        """El nombre sale del registro A (comprimido) que apunta al emisor."""
+        observation = parse_frame(frames[4])
+
+        assert observation == Observation("192.168.1.60", "02:00:00:00:00:60", "", MDNS, "printer")
+
+    def test_mdns_query_and_ssdp_identify_sender(self, frames):
+        assert parse_frame(frames[5])[:2] == ("192.168.1.61", "02:00:00:00:00:61")
+        assert parse_frame(frames[6]) == Observation("192.168.1.70", "02:00:00:00:00:70", "", SSDP)
+
+    def test_parser_matches_filter(self, frames):
+        """Las tramas que el filtro descarta tampoco se parsean en replay()."""
+        for frame, accepted in zip(frames, ACCEPTED):
+            if not accepted:
+                assert parse_frame(frame) is None
+
+    def test_truncated_frames_are_ignored(self, frames):
+        for frame in frames:
+            for size in (0, 13, 30, 60):
+                parse_frame(frame[:size])  # No lanza
+
+
+class TestReadPcap:
+    def test_reads_all_frames(self, frames):
+        assert len(frames) == 10
+
+    def test_rejects_non_pcap(self, tmp_path):
+        path = tmp_path / "bogus.pcap"
+        path.write_bytes(b"not a capture at all....")
+
+        with pytest.raises(ValueError):
+            list(read_pcap(str(path)))
+
+
+class TestPassiveDiscovery:
+    """Tests de PassiveDiscovery sin sockets (replay)."""
+
+    def test_replay_reports_each_device(self, frames, clock):
+        seen = []
+        discovery = PassiveDiscovery(seen.append, clock=clock)
+
+        count = discovery.replay(frames, interface="eth0")
+
+        assert count == 6
+        # El ACK repite la observación del REQUEST (misma IP y MAC): se omite
+        assert [o.ip for o in seen] == ["192.168.1.1", "192.168.1.50", "192.168.1.60",
+                                        "192.168.1.61", "192.168.1.70"]
+        assert all(o.interface == "eth0" for o in seen)
+
+    def test_repeated_chatter_is_throttled(self, frames, clock):
+        """La misma observación se repite recién pasado refresh_interval."""
+        seen = []
+        discovery = PassiveDiscovery(seen.append, refresh_interval=60, clock=clock)
+
+        discovery.replay([frames[6]] * 5)
+        clock.now = 59
+        discovery.replay([frames[6]])
+        clock.now = 61
+        discovery.replay([frames[6]])
+
+        assert len(seen) == 2
+
+    def test_new_hostname_is_reported_and_kept(self, frames, clock):
+        """Un nombre nuevo se informa en el acto y se conserva en las siguientes."""
+        seen = []
+        discovery = PassiveDiscovery(seen.append, refresh_interval=60, clock=clock)
+
+        discovery.replay([frames[3], frames[2]])
+        clock.now = 120
+        discovery.replay([frames[3]])
+
+        assert [o.hostname for o in seen] == [None, "living-room-tv", "living-room-tv"]
+
+    def test_stop_without_start(self):
+        PassiveDiscovery(lambda o: None).stop()
+
+    def test_start_without_af_packet(self, mocker):
+        mocker.patch.object(passive_discovery, "raw_available", return_value=False)
+
+        with pytest.raises(OSError):
+            PassiveDiscovery(lambda o: None).start()
+
+
+class FakeScanner:
+    """Scanner mínimo: observed_device real y detect_new_devices en memoria."""
+
+    def __init__(self):
+        self.known = set()
+        self.networks = [LocalNetwork("eth0", "192.168.1.10", "192.168.1.10/24")]
+
+    def observed_device(self, observation):
+        return NetworkScanner.observed_device(self, observation, self.networks)
+
+    def _make_device(self, ip, mac):
+        return {"ip": ip, "mac": mac, "vendor": "Acme"}
+
+    _tag = staticmethod(NetworkScanner._tag)
+    liveness = None
+
+    def detect_new_devices(self, devices):
+        new = [d for d in devices if d["mac"] not in self.known]
+        self.known.update(d["mac"] for d in devices)
+        return new
+
+
+class TestRegistryObserve:
+    """Integración de las observaciones con DeviceRegistry."""
+
+    def test_observed_devices_are_published(self, clock):
+        registry = DeviceRegistry(FakeScanner(), clock=clock)
+        events = []
+        registry.subscribe(events.append)
+
+        async def observe_all():
+            await registry.observe(Observation("192.168.1.50", "02:11:22:33:44:55", "eth0", DHCP))
+            await registry.observe(Observation("192.168.1.50", "02:11:22:33:44:55", "eth0", ARP))
+            await registry.observe(Observation("192.168.1.50", "02:11:22:33:44:55", "eth0", DHCP, "tv"))
+            await registry.observe(Observation("10.9.9.9", "02:00:00:00:00:99", "eth0", ARP))
+
+        asyncio.run(observe_all())
+
+        # Repetida sin cambios y fuera de las subredes locales: sin evento
+        assert [e.kind for e in events] == [DEVICE, DEVICE]
+        assert [len(e.new_devices) for e in events] == [1, 0]
+        assert registry.devices == [{"ip": "192.168.1.50", "mac": "02:11:22:33:44:55", "vendor": "Acme",
+                                     "interface": "eth0", "subnet": "192.168.1.0/24", "hostname": "tv"}]
@@ -0,0 +1,136 @@
+"""
+Tests unitarios para los estimadores de percentiles (core/quantiles.py).
+Cubre P², el histograma de ventana deslizante y su integración en get_stats.
+"""
+
+import numpy as np
+import pytest
+from core.data_manager import DataManager
+from core.quantiles import P2Quantile, SlidingHistogram, TrafficQuantiles
+
+
+class TestP2Quantile:
+    """Tests del estimador P²."""
+
+    def test_exact_with_few_samples(self):
+        """Con 5 muestras o menos el resultado es exacto."""
+        estimator = P2Quantile(0.5)
+        for x in (5.0, 1.0, 3.0):
+            estimator.add(x)
+
+        assert estimator.value() == 3.0
+
+    def test_empty_returns_zero(self):
+        """Sin muestras retorna 0."""
+        assert P2Quantile(0.95).value() == 0.0
+
+    @pytest.mark.parametrize("p", [0.5, 0.95, 0.99])
+    def test_approximates_uniform_distribution(self, p):
+        """Converge al cuantil real de una distribución uniforme."""
+        # Arrange
+        samples = np.random.default_rng(1).uniform(0, 100, 20000)
+        estimator = P2Quantile(p)
+
+        # Act
+        for x in samples:
+            estimator.add(float(x))
+
+        # Assert
+        assert estimator.value() == pytest.approx(np.quantile(samples, p), rel=0.03)
+
+    def test_approximates_spiky_traffic(self):
+        """Sigue el p95 de tráfico mayormente bajo con ráfagas."""
+        rng = np.random.default_rng(2)
+        samples = np.where(rng.random(20000) < 0.9, rng.exponential(0.5, 20000), rng.uniform(20, 50, 20000))
+        estimator = P2Quantile(0.95)
+        for x in samples:
+            estimator.add(float(x))
+
+        assert estimator.value() == pytest.approx(np.quantile(samples, 0.95), rel=0.1)
+
+
+class TestSlidingHistogram:
+    """Tests del histograma de ventana deslizante."""
+
+    def test_quantile_within_bin_error(self):
+        """El percentil cae dentro del error relativo de un bin."""
+        # Arrange
+        histogram = SlidingHistogram(window_s=300, bucket_s=10, channels=1)
+        samples = np.random.default_rng(3).uniform(1, 10, 300)
+
+        # Act
+        for t, x in enumerate(samples):
+            histogram.add(t, (float(x),))
+
+        # Assert
+        assert histogram.quantile(0.95) == pytest.approx(np.quantile(samples, 0.95), rel=0.05)
+
+    def test_old_buckets_expire(self):
+        """Las muestras fuera de la ventana dejan de contar."""
+        histogram = SlidingHistogram(window_s=60, bucket_s=10, channels=1)
+        for t in range(60):
+            histogram.add(t, (100.0,))
+        for t in range(60, 120):
+            histogram.add(t, (1.0,))
+
+        assert histogram.quantile(0.99) == pytest.approx(1.0, rel=0.05)
+
+    def test_large_gap_clears_window(self):
+        """Un salto mayor que la ventana la vacía entera."""
+        histogram = SlidingHistogram(window_s=60, bucket_s=10, channels=1)
+        histogram.add(0, (100.0,))
+        histogram.add(10_000, (2.0,))
+
+        assert histogram.total.sum() == 1
+
+    def test_zero_traffic(self):
+        """Tráfico nulo reporta 0."""
+        histogram = SlidingHistogram(window_s=60, bucket_s=10, channels=1)
+        histogram.add(0, (0.0,))
+
+        assert histogram.quantile(0.5) == 0.0
+
+    def test_empty_returns_zero(self):
+        """Ventana vacía retorna 0."""
+        assert SlidingHistogram(window_s=60, bucket_s=10).quantile(0.95) == 0.0
+
+
+class TestTrafficQuantiles:
+    """Tests del agregador de percentiles."""
+
+    def test_snapshot_keys(self):
+        """Expone percentiles de toda la vida y por ventana."""
+        snapshot = TrafficQuantiles().snapshot()
+
+        for key in ("p50_download", "p95_upload", "p99_download", "p95_download_5m", "p99_upload_1h"):
+            assert key in snapshot
+
+
+class TestGetStatsPercentiles:
+    """Integración con DataManager.get_stats."""
+
+    def test_get_stats_includes_percentiles(self):
+        """get_stats reporta p95 de download y upload."""
+        # Arrange
+        dm = DataManager()
+
+        # Act
+        for t in range(100):
+            dm.update_traffic(float(t + 1), 1.0, timestamp=1000 + t)
+        stats = dm.get_stats()
+
+        # Assert
+        assert stats["p95_download"] == pytest.approx(95, rel=0.05)
+        assert stats["p95_download_5m"] == pytest.approx(95, rel=0.05)
+        assert stats["p50_upload"] == pytest.approx(1.0, rel=0.05)
+
+    def test_reset_stats_clears_percentiles(self):
+        """reset_stats reinicia los percentiles."""
+        dm = DataManager()
+        dm.update_traffic(10.0, 10.0, timestamp=1000)
+        dm.reset_stats()
+
+        stats = dm.get_stats()
+
+        assert stats["p95_download"] == 0.0
+        assert stats["p95_download_1h"] == 0.0
@@ -0,0 +1,240 @@
+"""
+Tests unitarios para QuotaTracker (core/quota_tracker.py).
+Cubre ciclos de facturación, persistencia, pronóstico de agotamiento,
+avisos y la integración con DataManager.
+"""
+
+import json
+import time
+import pytest
+from core.data_manager import DataManager
+from core.quota_tracker import QuotaTracker, cycle_bounds
+
+
+def local_ts(year, month, day, hour=12):
+    """Epoch de una fecha en hora local."""
+    return time.mktime((year, month, day, hour, 0, 0, 0, 0, -1))
+
+
+def feed(tracker, start, seconds, rate_down, rate_up=0.0):
+    """Alimenta el tracker con una tasa constante (1 muestra por segundo)."""
+    status = None
+    for i in range(seconds):
+        status = tracker.add(start + i, rate_down, rate_up)
+    return status
+
+
+class TestCycleBounds:
+    """Tests del cálculo de ciclos de facturación."""
+
+    def test_cycle_contains_timestamp(self):
+        """El ciclo va del día de corte de este mes al del siguiente."""
+        start, end = cycle_bounds(local_ts(2024, 3, 20), cycle_day=15)
+
+        assert start == local_ts(2024, 3, 15, hour=0)
+        assert end == local_ts(2024, 4, 15, hour=0)
+
+    def test_before_cycle_day_belongs_to_previous_cycle(self):
+        """Antes del día de corte se está en el ciclo del mes anterior (y cruza el año)."""
+        start, end = cycle_bounds(local_ts(2024, 1, 5), cycle_day=15)
+
+        assert start == local_ts(2023, 12, 15, hour=0)
+        assert end == local_ts(2024, 1, 15, hour=0)
+
+    def test_short_month_uses_last_day(self):
+        """El día 31 en febrero se corre al último día del mes."""
+        start, _ = cycle_bounds(local_ts(2024, 2, 29, hour=6), cycle_day=31)
+
+        assert start == local_ts(2024, 2, 29, hour=0)
+
+
+class TestCounting:
+    """Tests de conteo y cambio de ciclo."""
+
+    def test_counts_rate_times_elapsed(self):
+        """Suma MB reales (tasa × tiempo) en ambas direcciones por defecto."""
+        tracker = QuotaTracker()
+        now = time.time()
+
+        tracker.add(now, 2.0, 1.0, elapsed_s=0.5)
+
+        assert tracker.used_mb == pytest.approx(1.5)
+
+    def test_direction_download_only(self):
+        """Con direction='download' la subida no cuenta."""
+        tracker = QuotaTracker(direction="download")
+
+        tracker.add(time.time(), 2.0, 5.0)
+
+        assert tracker.used_mb == pytest.approx(2.0)
+
+    def test_new_cycle_resets_counters(self):
+        """Al pasar el fin del ciclo los contadores vuelven a cero."""
+        tracker = QuotaTracker()
+        tracker.add(time.time(), 10.0, 0.0)
+
+        tracker.add(tracker.cycle_end + 1, 1.0, 0.0)
+
+        assert tracker.used_mb == pytest.approx(1.0)
+
+    def test_clock_going_back_keeps_counters(self):
+        """Un ajuste del reloj hacia atrás no borra el consumo."""
+        tracker = QuotaTracker()
+        tracker.add(time.time(), 10.0, 0.0)
+
+        tracker.add(tracker.cycle_start - 60, 1.0, 0.0)
+
+        assert tracker.used_mb == pytest.approx(11.0)
+
+    def test_invalid_arguments(self):
+        """Dirección o día de corte inválidos son un error."""
+        with pytest.raises(ValueError):
+            QuotaTracker(direction="sideways")
+        with pytest.raises(ValueError):
+            QuotaTracker(cycle_day=0)
+
+    @pytest.mark.parametrize("cap_mb", [-1.0, float("nan"), float("inf")])
+    def test_invalid_cap_is_rejected(self, cap_mb):
+        """Una cuota inválida es un error y no pisa la vigente."""
+        tracker = QuotaTracker(cap_mb=100.0)
+
+        with pytest.raises(ValueError):
+            tracker.set_cap(cap_mb)
+
+        assert tracker.cap_mb == 100.0
+
+
+class TestForecastAndWarnings:
+    """Tests del pronóstico y de los avisos."""
+
+    def test_no_cap_never_warns(self):
+        """Sin cuota solo se cuenta."""
+        tracker = QuotaTracker()
+
+        status = feed(tracker, time.time(), 10, 100.0)
+
+        assert status.cap_mb is None
+        assert status.warning is None
+        assert status.exhausts_at is None
+
+    def test_forecast_uses_recent_rate(self):
+        """El agotamiento se estima con la tasa promedio reciente."""
+        tracker = QuotaTracker(cap_mb=1_000_000.0)
+        start = tracker.cycle_start + 60
+
+        status = feed(tracker, start, 100, 10.0)
+
+        assert status.rate_mb == pytest.approx(10.0)
+        remaining = 1_000_000.0 - 1000.0
+        assert status.exhausts_at == pytest.approx(start + 99 + remaining / 10.0)
+
+    def test_forecast_warning_before_cap(self):
+        """Avisa por pronóstico si la cuota se agota en menos de un día."""
+        tracker = QuotaTracker(cap_mb=10_000.0)
+
+        status = tracker.add(tracker.cycle_start + 60, 10.0, 0.0)
+
+        assert status.warning == "forecast"
+        assert status.exhausts_at - (tracker.cycle_start + 60) == pytest.approx(999.0)
+        assert tracker.add(tracker.cycle_start + 61, 10.0, 0.0).warning is None
+
+    def test_levels_warn_once(self):
+        """Cada nivel de consumo avisa una sola vez por ciclo."""
+        tracker = QuotaTracker(cap_mb=100.0)
+        start = tracker.cycle_start + 60
+        warnings = [tracker.add(start + i, 1.0, 0.0).warning for i in range(120)]
+
+        fired = [w for w in warnings if w is not None]
+
+        assert fired == ["forecast", "80%", "90%", "100%"]
+
+    def test_warnings_are_queued_until_popped(self):
+        """Los avisos de lotes intermedios no se pierden aunque se lea solo el último estado."""
+        # Arrange
+        tracker = QuotaTracker(cap_mb=100.0)
+        start = tracker.cycle_start + 60
+
+        # Act: cuatro lotes en un mismo frame; el último no trae aviso
+        last = [tracker.add(start + i, mb, 0.0) for i, mb in enumerate((85.0, 6.0, 0.5, 0.5))][-1]
+        popped = tracker.pop_warnings()
+
+        # Assert
+        assert last.warning is None
+        assert [status.warning for status in popped] == ["80%", "90%", "forecast"]
+        assert tracker.pop_warnings() == []
+
+    def test_slow_rate_does_not_forecast(self):
+        """Si al ritmo actual no se llega a fin de ciclo, no hay pronóstico."""
+        tracker = QuotaTracker(cap_mb=1e12)
+
+        status = feed(tracker, tracker.cycle_start + 60, 10, 1.0)
+
+        assert status.exhausts_at is None
+        assert status.warning is None
+
+
+class TestPersistence:
+    """Tests de guardado y carga del estado."""
+
+    def test_counters_survive_restart(self, tmp_path):
+        """Un tracker nuevo continúa el consumo y la configuración guardados."""
+        path = str(tmp_path / "quota.json")
+        tracker = QuotaTracker(cap_mb=500.0, state_path=path)
+        tracker.add(time.time(), 30.0, 20.0)
+        tracker.save()
+
+        restored = QuotaTracker(state_path=path)
+
+        assert restored.used_mb == pytest.approx(50.0)
+        assert restored.cap_mb == 500.0
+
+    def test_warnings_not_repeated_after_restart(self, tmp_path):
+        """Los avisos ya dados se recuerdan."""
+        path = str(tmp_path / "quota.json")
+        tracker = QuotaTracker(cap_mb=100.0, state_path=path)
+        tracker.add(time.time(), 85.0, 0.0)
+
+        restored = QuotaTracker(state_path=path)
+
+        assert restored.add(time.time(), 0.0, 0.0).warning is None
+
+    def test_expired_cycle_starts_fresh(self, tmp_path):
+        """Si el ciclo guardado ya terminó, se arranca uno nuevo en cero."""
+        path = tmp_path / "quota.json"
+        tracker = QuotaTracker(state_path=str(path))
+        tracker.add(time.time(), 30.0, 0.0)
+        state = tracker.to_dict()
+        state["cycle_start"], state["cycle_end"] = 0.0, 1.0
+        path.write_text(json.dumps(state))
+
+        restored = QuotaTracker(state_path=str(path))
+
+        assert restored.used_mb == 0.0
+        assert restored.cycle_start <= time.time() < restored.cycle_end
+
+    def test_invalid_state_is_ignored(self, tmp_path):
+        """Un archivo de otra versión no rompe el arranque."""
+        path = tmp_path / "quota.json"
+        path.write_text(json.dumps({"version": 99}))
+
+        assert QuotaTracker(state_path=str(path)).used_mb == 0.0
+
+
+class TestDataManagerIntegration:
+    """Integración con DataManager.update_traffic."""
+
+    def test_update_traffic_feeds_quota(self):
+        """Cada muestra suma a la cuota y deja el estado en last_quota."""
+        dm = DataManager(quota_tracker=QuotaTracker(cap_mb=100.0))
+
+        dm.update_traffic(90.0, 0.0)
+
+        assert dm.last_quota.used_mb == pytest.approx(90.0)
+        assert dm.last_quota.warning == "90%"
+
+    def test_without_tracker(self):
+        """Sin QuotaTracker no hay estado de cuota."""
+        dm = DataManager()
+        dm.update_traffic(1.0, 1.0)
+
+        assert dm.last_quota is None
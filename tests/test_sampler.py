@@ -0,0 +1,239 @@
+"""
+Tests unitarios para TrafficSampler (core/sampler.py).
+Cubre el agrupamiento en lotes, los picos sub-segundo, los deadlines sin deriva
+y el modo hilo con entrega por ring buffer.
+"""
+
+import time
+import pytest
+import numpy as np
+from unittest.mock import Mock
+from core.ring_buffer import SPSCRingBuffer
+from core.sampler import TrafficBatch, TrafficSampler
+from core.sensor import TrafficSample
+
+
+def make_sensor(samples):
+    """Sensor falso que devuelve las muestras indicadas en orden."""
+    sensor = Mock()
+    sensor.sample.side_effect = samples
+    return sensor
+
+
+class TestTrafficSamplerInit:
+    """Tests de inicialización."""
+    
+    def test_rate_is_clamped(self):
+        """La frecuencia se limita al rango 1-100 Hz."""
+        assert TrafficSampler(Mock(), rate_hz=1000).rate_hz == 100
+        assert TrafficSampler(Mock(), rate_hz=0).rate_hz == 1
+    
+    def test_period_from_rate(self):
+        """El período en ns corresponde a la frecuencia."""
+        sampler = TrafficSampler(Mock(), rate_hz=20)
+        assert sampler.period_ns == 50_000_000
+
+
+class TestBatching:
+    """Tests del agrupamiento de muestras en lotes."""
+    
+    def test_batch_emitted_after_interval(self):
+        """Emite un lote solo al completar el intervalo."""
+        # Arrange
+        samples = [TrafficSample(i * 250_000_000, 0.25, 1.0, 0.5) for i in range(1, 5)]
+        sampler = TrafficSampler(make_sensor(samples), rate_hz=4)
+        
+        # Act
+        results = [sampler.sample() for _ in range(4)]
+        
+        # Assert
+        assert results[:3] == [None, None, None]
+        assert results[3].samples == 4
+        assert results[3].elapsed_s == pytest.approx(1.0)
+    
+    def test_batch_mean_weighted_by_elapsed(self):
+        """El promedio del lote pondera cada muestra por su duración real."""
+        # Arrange
+        samples = [
+            TrafficSample(250_000_000, 0.25, 4.0, 0.0),
+            TrafficSample(1_000_000_000, 0.75, 0.0, 0.0),
+        ]
+        sampler = TrafficSampler(make_sensor(samples), rate_hz=4)
+        
+        # Act
+        sampler.sample()
+        batch = sampler.sample()
+        
+        # Assert
+        assert batch.download_mb == pytest.approx(1.0)
+    
+    def test_batch_keeps_subsecond_peak(self):
+        """Una ráfaga corta queda como pico del lote aunque el promedio sea bajo."""
+        # Arrange
+        samples = [TrafficSample(i * 100_000_000, 0.1, 50.0 if i == 3 else 0.0, 0.0) for i in range(1, 11)]
+        sampler = TrafficSampler(make_sensor(samples), rate_hz=10)
+        
+        # Act
+        batch = [sampler.sample() for _ in range(10)][-1]
+        
+        # Assert
+        assert batch.peak_download_mb == 50.0
+        assert batch.download_mb == pytest.approx(5.0)
+
+
+class TestDeadlines:
+    """Tests del cálculo de deadlines absolutos."""
+    
+    def test_next_deadline_advances_one_period(self):
+        """Sin retraso, el deadline avanza exactamente un período."""
+        sampler = TrafficSampler(Mock(), rate_hz=10)
+        assert sampler.next_deadline(1_000_000_000, 1_010_000_000) == 1_100_000_000
+    
+    def test_next_deadline_skips_missed_ticks(self):
+        """Si el loop se atrasó, salta los ticks perdidos sin acumular deriva."""
+        # Arrange
+        sampler = TrafficSampler(Mock(), rate_hz=10)
+        
+        # Act
+        deadline = sampler.next_deadline(1_000_000_000, 1_350_000_000)
+        
+        # Assert
+        assert deadline == 1_400_000_000
+        assert sampler.missed_ticks == 3
+
+
+class TestThreadMode:
+    """Tests del muestreo en hilo propio con entrega por ring buffer."""
+    
+    def test_drain_returns_batches_pushed_by_thread(self):
+        """Los lotes producidos por el hilo llegan íntegros por drain()."""
+        # Arrange
+        sampler = TrafficSampler(Mock(), rate_hz=10)
+        batch = TrafficBatch(123456789, 1.0, 2.5, 0.5, 9.0, 1.0, 10)
+        
+        # Act
+        sampler.ring.push(batch)
+        drained = sampler.drain()
+        
+        # Assert
+        assert drained == [batch]
+    
+    def test_thread_keeps_sampling_while_ui_blocked(self):
+        """El hilo sigue muestreando aunque nadie vacíe el buffer."""
+        # Arrange
+        sensor = Mock()
+        sensor.sample.side_effect = lambda: TrafficSample(time.monotonic_ns(), 0.01, 1.0, 1.0)
+        sampler = TrafficSampler(sensor, rate_hz=100, batch_interval=0.05)
+        
+        # Act
+        sampler.start()
+        time.sleep(0.3)  # La "UI" está bloqueada y no llama a drain()
+        sampler.stop()
+        batches = sampler.drain()
+        
+        # Assert
+        assert sensor.sample.call_count >= 10
+        assert len(batches) >= 2
+        assert sampler.ring.dropped == 0
+    
+    def test_stop_ends_thread(self):
+        """stop() detiene el hilo."""
+        # Arrange
+        sensor = Mock()
+        sensor.sample.side_effect = lambda: TrafficSample(time.monotonic_ns(), 0.01, 0.0, 0.0)
+        sampler = TrafficSampler(sensor, rate_hz=50)
+        sampler.start()
+        thread = sampler._thread
+        
+        # Act
+        sampler.stop()
+        
+        # Assert
+        assert not thread.is_alive()
+
+    def test_nic_rates_sampled_in_thread_per_batch(self):
+        """Con pernic, cada lote llega con las tasas por interfaz leídas en el hilo."""
+        # Arrange
+        sensor = Mock()
+        sensor.sample.side_effect = lambda: TrafficSample(time.monotonic_ns(), 0.01, 1.0, 1.0)
+        names = ["eth0", "wlan0"]
+        sensor.get_traffic_per_nic.side_effect = lambda: (names, np.array([[1.0, 2.0], [3.0, 4.0]]))
+        sampler = TrafficSampler(sensor, rate_hz=100, batch_interval=0.05, pernic=True)
+        
+        # Act
+        sampler.start()
+        time.sleep(0.3)
+        sampler.stop()
+        drained = sampler.drain_with_nics()
+        
+        # Assert
+        assert len(drained) >= 2
+        assert sensor.get_traffic_per_nic.call_count == len(drained)
+        batch, nics = drained[0]
+        assert isinstance(batch, TrafficBatch)
+        assert nics.names == ["eth0", "wlan0"]
+        assert nics.rates.tolist() == [[1.0, 2.0], [3.0, 4.0]]
+        # Mismo conjunto de interfaces: mismo objeto (DataManager no redimensiona)
+        assert drained[-1][1].names is nics.names
+    
+    def test_nic_set_change_is_carried_per_batch(self):
+        """Cada lote conserva los nombres vigentes cuando se leyó."""
+        # Arrange
+        sampler = TrafficSampler(Mock(), rate_hz=10, pernic=True)
+        readings = iter([(["eth0"], np.array([[1.0, 1.0]])),
+                         (["eth0", "tun0"], np.array([[2.0, 2.0], [5.0, 5.0]]))])
+        sampler.sensor.get_traffic_per_nic.side_effect = lambda: next(readings)
+        for i in range(2):
+            sampler._publish(TrafficBatch(i, 1.0, 0.0, 0.0, 0.0, 0.0, 10))
+        
+        # Act
+        drained = sampler.drain_with_nics()
+        
+        # Assert
+        assert [nics.names for _, nics in drained] == [["eth0"], ["eth0", "tun0"]]
+        assert drained[1][1].rates.tolist() == [[2.0, 2.0], [5.0, 5.0]]
+
+    def test_full_ring_drops_batch_and_rates_together(self):
+        """Un descarte por ring lleno no desfasa los lotes siguientes de sus tasas."""
+        # Arrange: ring de 2 filas y tasas que identifican a cada lote
+        sampler = TrafficSampler(Mock(), rate_hz=10, pernic=True)
+        sampler.ring = SPSCRingBuffer(2, sampler.ring._data.shape[1])
+        counter = iter(range(100))
+        sampler.sensor.get_traffic_per_nic.side_effect = lambda: (["eth0"], np.array([[float(next(counter)), 0.0]]))
+
+        # Act
+        for i in range(3):
+            sampler._publish(TrafficBatch(i, 1.0, float(i), 0.0, 0.0, 0.0, 10))
+        first = sampler.drain_with_nics()
+        sampler._publish(TrafficBatch(3, 1.0, 3.0, 0.0, 0.0, 0.0, 10))
+        second = sampler.drain_with_nics()
+
+        # Assert: el lote 2 se perdió entero; cada lote conserva su fila
+        assert sampler.ring.dropped == 1
+        assert [(b.download_mb, n.rates[0, 0]) for b, n in first] == [(0.0, 0.0), (1.0, 1.0)]
+        assert [(b.download_mb, n.rates[0, 0]) for b, n in second] == [(3.0, 3.0)]
+
+    def test_interfaces_beyond_cap_are_reported(self, capsys):
+        """Las interfaces que no entran en MAX_NICS se avisan y quedan en dropped_nics."""
+        sampler = TrafficSampler(Mock(), rate_hz=10, pernic=True)
+        names = [f"eth{i}" for i in range(TrafficSampler.MAX_NICS + 2)]
+        sampler.sensor.get_traffic_per_nic.side_effect = lambda: (names, np.ones((len(names), 2)))
+
+        sampler._publish(TrafficBatch(0, 1.0, 0.0, 0.0, 0.0, 0.0, 10))
+        (_, nics), = sampler.drain_with_nics()
+
+        assert nics.names == names[:TrafficSampler.MAX_NICS]
+        assert sampler.dropped_nics == names[TrafficSampler.MAX_NICS:]
+        assert "eth16, eth17" in capsys.readouterr().out
+
+    def test_old_name_generations_are_pruned(self):
+        """Interfaces que van y vienen no acumulan generaciones de nombres."""
+        sampler = TrafficSampler(Mock(), rate_hz=10, pernic=True)
+        for i in range(50):
+            names = ["eth0"] if i % 2 else ["eth0", "tun0"]
+            sampler.sensor.get_traffic_per_nic.side_effect = lambda: (names, np.ones((len(names), 2)))
+            sampler._publish(TrafficBatch(i, 1.0, 0.0, 0.0, 0.0, 0.0, 10))
+            (_, nics), = sampler.drain_with_nics()
+            assert nics.names == names
+
+        assert len(sampler._nic_names) <= 2
@@ -3,9 +3,22 @@ Tests unitarios para NetworkScanner (core/scanner.py).
 Cubre detección de IP local, escaneo de red y manejo de errores.
 """
 
+import asyncio
+import threading
+import time
 import pytest
 from unittest.mock import Mock, patch, MagicMock
-from core.scanner import NetworkScanner
+# core.scanner importa scapy de forma perezosa: se carga acá para que los
+# fixtures que parchean socket.socket no interfieran con su import
+import scapy.all  # noqa: F401
+from collections import namedtuple
+from core.scanner import LocalNetwork, NetworkScanner, estimate_duration, estimate_sweep_bytes, split_target
+import psutil
+import socket
+
+Addr = namedtuple("Addr", "family address netmask")
+Stats = namedtuple("Stats", "isup")
+LINK = Addr(psutil.AF_LINK, "02:00:00:00:00:01", None)
 
 
 class TestNetworkScannerInit:
@@ -31,54 +44,53 @@ class TestNetworkScannerInit:
 
 
 class TestGetLocalRange:
-    """Tests del método get_local_range."""
-    
-    def test_get_local_range_success(self, mocker):
-        """Detecta IP local correctamente y genera rango /24."""
+    """Tests del método get_local_range (primera red de list_local_networks)."""
+
+    @pytest.fixture
+    def interfaces(self, mocker):
+        """Reemplaza las interfaces de psutil; retorna una función para definirlas."""
+        stats = mocker.patch("psutil.net_if_stats", return_value={})
+        addrs = mocker.patch("psutil.net_if_addrs", return_value={})
+
+        def define(**nics):
+            addrs.return_value = {
+                name: [Addr(socket.AF_INET, ip, mask), Addr(psutil.AF_LINK, "02:00:00:00:00:01", None)]
+                for name, (ip, mask) in nics.items()
+            }
+            stats.return_value = {name: Stats(True) for name in nics}
+
+        return define
+
+    def test_get_local_range_success(self, mocker, interfaces):
+        """Usa la IP y máscara de la interfaz, sin conectarse a internet."""
         # Arrange
-        mock_sock = MagicMock()
-        mock_sock.getsockname.return_value = ("192.168.100.45", 12345)
-        mocker.patch("socket.socket", return_value=mock_sock)
-        
-        scanner = NetworkScanner()
-        
+        interfaces(eth0=("192.168.100.45", "255.255.255.0"))
+        connect = mocker.patch("socket.socket")
+
         # Act
-        result = scanner.target_ip
-        
+        result = NetworkScanner().target_ip
+
         # Assert
         assert result == "192.168.100.1/24"
-        mock_sock.connect.assert_called_once_with(("8.8.8.8", 80))
-        mock_sock.close.assert_called_once()
-    
-    def test_get_local_range_different_subnet(self, mocker):
+        connect.assert_not_called()
+
+    def test_get_local_range_different_subnet(self, interfaces):
         """Funciona con diferentes subredes."""
-        # Arrange
-        mock_sock = MagicMock()
-        mock_sock.getsockname.return_value = ("10.0.5.123", 12345)
-        mocker.patch("socket.socket", return_value=mock_sock)
-        
-        scanner = NetworkScanner()
-        
-        # Act
-        result = scanner.target_ip
-        
-        # Assert
-        assert result == "10.0.5.1/24"
-    
-    def test_get_local_range_fallback_on_exception(self, mocker):
-        """Retorna fallback cuando falla la detección."""
-        # Arrange
-        mock_sock = MagicMock()
-        mock_sock.connect.side_effect = Exception("Network error")
-        mocker.patch("socket.socket", return_value=mock_sock)
-        
-        scanner = NetworkScanner()
-        
-        # Act
-        result = scanner.target_ip
-        
-        # Assert
-        assert result == "192.168.1.1/24"  # Fallback
+        interfaces(eth0=("10.0.5.123", "255.255.255.0"))
+
+        assert NetworkScanner().target_ip == "10.0.5.1/24"
+
+    def test_get_local_range_fallback_without_networks(self, interfaces):
+        """Sin redes locales usables retorna el rango por defecto."""
+        interfaces(lo=("127.0.0.1", "255.0.0.0"))
+
+        assert NetworkScanner().target_ip == "192.168.1.1/24"  # Fallback
+
+    def test_get_local_range_fallback_on_error(self, mocker):
+        """Si psutil falla retorna el rango por defecto."""
+        mocker.patch("psutil.net_if_stats", side_effect=OSError("no access"))
+
+        assert NetworkScanner().target_ip == "192.168.1.1/24"
 
 
 class TestScanNetwork:
@@ -179,3 +191,338 @@ class TestScanNetwork:
         call_kwargs = mock_srp.call_args[1]
         assert call_kwargs["timeout"] == 1
         assert call_kwargs["verbose"] is False
+
+
+class FakeSniffer:
+    """AsyncSniffer falso: guarda el callback y avisa que arrancó."""
+
+    instances = []
+
+    def __init__(self, filter=None, prn=None, store=True, started_callback=None):
+        self.filter = filter
+        self.prn = prn
+        self.started_callback = started_callback
+        self.stopped = False
+        FakeSniffer.instances.append(self)
+
+    def start(self):
+        self.started_callback()
+
+    def stop(self):
+        self.stopped = True
+
+
+def arp_reply(ip, mac):
+    """Respuesta ARP real de scapy (lo que entrega el sniffer)."""
+    import scapy.all as scapy
+    return scapy.Ether() / scapy.ARP(op=2, psrc=ip, hwsrc=mac)
+
+
+class TestScanStream:
+    """Tests del barrido ARP en streaming (scan_stream)."""
+
+    @pytest.fixture
+    def scanner(self, mocker):
+        # Sin mock_socket: el event loop de asyncio necesita sockets reales
+        FakeSniffer.instances.clear()
+        mocker.patch("scapy.all.AsyncSniffer", FakeSniffer)
+        mocker.patch.object(NetworkScanner, "get_local_range", return_value="192.168.1.1/24")
+        scanner = NetworkScanner()
+        mocker.patch.object(scanner.vendor_service, "get_vendor", return_value="Acme")
+        return scanner
+
+    @staticmethod
+    async def collect(stream):
+        return [device async for device in stream]
+
+    def test_yields_devices_as_replies_arrive(self, scanner, mocker):
+        """Cada respuesta se entrega una vez, con fabricante, y el sniffer se detiene."""
+        def send(target, rate_pps, stop, interface, skip):
+            prn = FakeSniffer.instances[0].prn
+            prn(arp_reply("192.168.1.10", "aa:bb:cc:dd:ee:01"))
+            prn(arp_reply("192.168.1.10", "aa:bb:cc:dd:ee:01"))  # Duplicada
+            prn(arp_reply("192.168.1.20", "aa:bb:cc:dd:ee:02"))
+            prn(arp_reply("10.9.9.9", "aa:bb:cc:dd:ee:03"))  # Fuera del rango
+
+        mocker.patch.object(scanner, "_send_requests", side_effect=send)
+
+        devices = asyncio.run(self.collect(scanner.scan_stream("192.168.1.0/24", timeout=0.1)))
+
+        assert sorted(d["ip"] for d in devices) == ["192.168.1.10", "192.168.1.20"]
+        assert all(d["vendor"] == "Acme" for d in devices)
+        assert FakeSniffer.instances[0].filter == "arp and arp[6:2] = 2"
+        assert FakeSniffer.instances[0].stopped
+
+    def test_first_device_arrives_before_sweep_ends(self, scanner, mocker):
+        """El primer dispositivo llega mientras todavía se está enviando."""
+        release = threading.Event()
+
+        def send(target, rate_pps, stop, interface, skip):
+            FakeSniffer.instances[0].prn(arp_reply("192.168.1.5", "aa:bb:cc:dd:ee:05"))
+            release.wait(2)  # Barrido "largo" hasta que el consumidor recibe algo
+
+        mocker.patch.object(scanner, "_send_requests", side_effect=send)
+
+        async def first_then_release():
+            stream = scanner.scan_stream("192.168.1.0/24", timeout=0.05)
+            start = time.monotonic()
+            first = await stream.__anext__()
+            elapsed = time.monotonic() - start
+            release.set()
+            rest = [d async for d in stream]
+            return first, elapsed, rest
+
+        first, elapsed, rest = asyncio.run(first_then_release())
+
+        assert first["ip"] == "192.168.1.5"
+        assert elapsed < 1.0
+        assert rest == []
+
+    def test_falls_back_to_blocking_scan(self, scanner, mocker):
+        """Sin sniffer se usa scan_network y se entregan sus resultados."""
+        mocker.patch.object(scanner, "_start_sniffer", return_value=None)
+        mocker.patch.object(scanner, "scan_network", return_value=[{"ip": "1.2.3.4", "mac": "m", "vendor": "v"}])
+
+        devices = asyncio.run(self.collect(scanner.scan_stream()))
+
+        assert devices == [{"ip": "1.2.3.4", "mac": "m", "vendor": "v"}]
+
+    def test_send_requests_paces_every_address(self, scanner, mocker):
+        """Envía un pedido por dirección del rango por el socket L2."""
+        sock = MagicMock()
+        mocker.patch("scapy.all.conf.L2socket", return_value=sock)
+
+        scanner._send_requests("192.168.1.0/28", rate_pps=100_000)
+
+        assert sock.send.call_count == 16
+        assert sock.send.call_args_list[3][0][0].pdst == "192.168.1.3"
+        sock.close.assert_called_once()
+
+
+
+class TestLargeSubnets:
+    """Tests de máscara real y barrido por bloques."""
+
+    def test_get_local_range_uses_interface_netmask(self, mocker):
+        """Una /20 en la interfaz se barre completa, no solo la /24."""
+        mocker.patch("psutil.net_if_addrs", return_value={
+            "eth0": [Addr(socket.AF_INET, "10.20.5.7", "255.255.240.0"), LINK],
+        })
+
+        assert NetworkScanner().target_ip == "10.20.0.1/20"
+
+    def test_huge_networks_are_capped_to_16(self, mocker):
+        """Una /8 se limita a la /16 que contiene nuestra IP."""
+        mocker.patch("psutil.net_if_addrs", return_value={
+            "eth0": [Addr(socket.AF_INET, "10.20.5.7", "255.0.0.0"), LINK],
+        })
+
+        assert NetworkScanner().target_ip == "10.20.0.1/16"
+
+    def test_split_target(self):
+        """Divide en bloques de `window` direcciones; rangos chicos quedan igual."""
+        assert list(split_target("10.0.0.1/22", window=256)) == [
+            "10.0.0.0/24", "10.0.1.0/24", "10.0.2.0/24", "10.0.3.0/24",
+        ]
+        assert list(split_target("192.168.1.1/24", window=256)) == ["192.168.1.0/24"]
+        assert len(list(split_target("10.0.0.0/16", window=1024))) == 64
+
+    def test_estimate_duration(self):
+        """Un envío continuo paga el timeout una vez; por bloques, una por bloque."""
+        assert estimate_duration("10.0.0.0/16", rate_pps=1000, timeout=1) == pytest.approx(66.536)
+        assert estimate_duration("10.0.0.0/22", rate_pps=1024, timeout=1, window=256) == pytest.approx(5.0)
+
+    def test_estimate_sweep_bytes(self):
+        """Pedido y respuesta ARP por cada dirección de todas las redes."""
+        networks = [LocalNetwork("eth0", "10.20.5.7", "10.20.0.1/16"),
+                    LocalNetwork("eth1", "192.168.1.50", "192.168.1.1/24")]
+
+        assert estimate_sweep_bytes(networks) == (65536 + 256) * 120
+        assert estimate_sweep_bytes([]) == 0
+
+    def test_scan_network_sweeps_in_rate_limited_chunks(self, mocker, mock_socket):
+        """Con scapy, un srp() por bloque con ritmo acotado."""
+        reply = Mock(psrc="10.0.1.9", hwsrc="aa:bb:cc:dd:ee:ff")
+        srp = mocker.patch("scapy.all.srp", side_effect=[([], []), ([(Mock(), reply)], [])])
+        scanner = NetworkScanner()
+
+        devices = scanner.scan_network("10.0.0.0/23", rate_pps=500)
+
+        assert [d["ip"] for d in devices] == ["10.0.1.9"]
+        assert srp.call_count == 2
+        assert srp.call_args_list[1][0][0][1].pdst == "10.0.1.0/24"
+        assert srp.call_args[1]["inter"] == pytest.approx(1 / 500)
+
+
+
+class TestMultiInterface:
+    """Tests del descubrimiento en varias interfaces a la vez."""
+
+    @pytest.fixture
+    def interfaces(self, mocker):
+        mocker.patch("psutil.net_if_addrs", return_value={
+            "lo": [Addr(socket.AF_INET, "127.0.0.1", "255.0.0.0"), Addr(psutil.AF_LINK, "00:00:00:00:00:00", None)],
+            "eth0": [Addr(socket.AF_INET, "192.168.1.50", "255.255.255.0"),
+                     Addr(socket.AF_INET, "192.168.1.51", "255.255.255.0"), LINK],
+            "vlan20": [Addr(socket.AF_INET, "10.20.5.7", "255.255.240.0"),
+                       Addr(socket.AF_INET6, "fe80::1", None), LINK],
+            "wlan0": [Addr(socket.AF_INET, "169.254.3.3", "255.255.0.0"), LINK],
+            "eth1": [Addr(socket.AF_INET, "172.16.0.2", "255.255.255.0"), LINK],
+            # Túnel sin capa de enlace y bridge de docker: no se barren
+            "wg0": [Addr(socket.AF_INET, "10.8.0.2", "255.255.255.0")],
+            "docker0": [Addr(socket.AF_INET, "172.17.0.1", "255.255.0.0"), LINK],
+        })
+        mocker.patch("psutil.net_if_stats", return_value={
+            "lo": Stats(True), "eth0": Stats(True), "vlan20": Stats(True),
+            "wlan0": Stats(True), "eth1": Stats(False), "wg0": Stats(True), "docker0": Stats(True),
+        })
+        # Tabla de vecinos vacía: solo cuenta el barrido activo
+        return mocker.patch("core.neighbor_table.read_neighbors", return_value=[])
+
+    def test_list_local_networks(self, interfaces):
+        """Solo interfaces físicas levantadas, sin loopback, link-local, túneles ni subredes repetidas."""
+        from core.scanner import LocalNetwork, list_local_networks
+
+        networks = list_local_networks()
+
+        assert networks == [
+            LocalNetwork("eth0", "192.168.1.50", "192.168.1.1/24"),
+            LocalNetwork("vlan20", "10.20.5.7", "10.20.0.1/20"),
+        ]
+        assert networks[1].subnet == "10.20.0.0/20"
+
+    def test_scan_all_merges_and_tags(self, mocker, mock_socket, interfaces):
+        """Un barrido por interfaz; los repetidos se combinan y cada uno lleva su origen."""
+        def scan(target, rate_pps, window, interface, skip):
+            if interface == "eth0":
+                return [{"ip": "192.168.1.1", "mac": "aa", "vendor": "A"}]
+            return [{"ip": "10.20.0.1", "mac": "bb", "vendor": "B"},
+                    {"ip": "192.168.1.1", "mac": "aa", "vendor": "A"}]  # Visto por ambas
+
+        scanner = NetworkScanner()
+        spy = mocker.patch.object(scanner, "scan_network", side_effect=scan)
+
+        devices = scanner.scan_all()
+
+        assert sorted(call.args[3] for call in spy.call_args_list) == ["eth0", "vlan20"]
+        assert devices == [
+            {"ip": "192.168.1.1", "mac": "aa", "vendor": "A", "interface": "eth0", "subnet": "192.168.1.0/24"},
+            {"ip": "10.20.0.1", "mac": "bb", "vendor": "B", "interface": "vlan20", "subnet": "10.20.0.0/20"},
+        ]
+
+    def test_scan_all_runs_interfaces_concurrently(self, mocker, mock_socket, interfaces):
+        """Los emisores de cada interfaz corren en paralelo, no uno tras otro."""
+        barrier = threading.Barrier(2, timeout=2)
+
+        def scan(target, rate_pps, window, interface, skip):
+            barrier.wait()  # Solo pasa si ambos barridos están activos a la vez
+            return []
+
+        scanner = NetworkScanner()
+        mocker.patch.object(scanner, "scan_network", side_effect=scan)
+
+        assert scanner.scan_all() == []
+
+    def test_scan_all_stream_merges_interfaces(self, mocker, interfaces):
+        """El streaming combina las interfaces y descarta repetidos."""
+        from core.scanner import list_local_networks
+        mocker.patch.object(NetworkScanner, "get_local_range", return_value="192.168.1.1/24")
+        scanner = NetworkScanner()
+
+        async def stream(target, timeout, rate_pps, interface, skip):
+            yield {"ip": "192.168.1.1", "mac": "aa", "vendor": "A"}
+            if interface == "vlan20":
+                yield {"ip": "10.20.0.9", "mac": "cc", "vendor": "C"}
+
+        mocker.patch.object(scanner, "scan_stream", side_effect=stream)
+
+        async def collect():
+            return [d async for d in scanner.scan_all_stream(list_local_networks())]
+
+        devices = asyncio.run(collect())
+
+        assert sorted((d["ip"], d["interface"]) for d in devices) in (
+            [("10.20.0.9", "vlan20"), ("192.168.1.1", "eth0")],
+            [("10.20.0.9", "vlan20"), ("192.168.1.1", "vlan20")],
+        )
+
+
+class TestNeighborSeeding:
+    """Tests del camino rápido con la tabla de vecinos del kernel."""
+
+    @pytest.fixture
+    def setup(self, mocker):
+        from core.neighbor_table import Neighbor
+        from core.scanner import LocalNetwork
+        mocker.patch.object(NetworkScanner, "get_local_range", return_value="192.168.1.1/24")
+        mocker.patch("core.neighbor_table.read_neighbors", return_value=[
+            Neighbor("192.168.1.1", "aa", "eth0", "reachable"),
+            Neighbor("192.168.1.8", "bb", "eth0", "stale"),
+            Neighbor("fe80::aa", "aa", "eth0", "reachable"),
+            Neighbor("fe80::cc", "cc", "eth0", "stale"),
+            Neighbor("172.16.9.9", "dd", "eth9", "reachable"),  # Fuera de las redes barridas
+        ])
+        scanner = NetworkScanner()
+        mocker.patch.object(scanner.vendor_service, "get_vendor", return_value="Acme")
+        return scanner, [LocalNetwork("eth0", "192.168.1.50", "192.168.1.1/24")]
+
+    def test_neighbor_devices_without_packets(self, setup):
+        """La tabla alcanza para listar dispositivos, con su IPv6 y estado."""
+        scanner, networks = setup
+
+        devices = scanner.neighbor_devices(networks)
+
+        assert [(d["ip"], d["state"]) for d in devices] == [
+            ("192.168.1.1", "reachable"), ("192.168.1.8", "stale"), ("fe80::cc", "stale"),
+        ]
+        assert devices[0]["ipv6"] == ["fe80::aa"]
+        assert devices[0]["interface"] == "eth0"
+
+    def test_scan_all_only_probes_missing_or_stale(self, setup, mocker):
+        """Las IPs REACHABLE no se consultan; un vencido que responde pasa a reachable."""
+        scanner, networks = setup
+        spy = mocker.patch.object(scanner, "scan_network", return_value=[
+            {"ip": "192.168.1.8", "mac": "bb", "vendor": "Acme"},
+            {"ip": "192.168.1.30", "mac": "ee", "vendor": "Acme"},
+        ])
+
+        devices = scanner.scan_all(networks)
+
+        assert spy.call_args.args[4] == {"192.168.1.1"}
+        states = {d["ip"]: d.get("state") for d in devices}
+        assert states == {"192.168.1.1": "reachable", "192.168.1.8": "reachable",
+                          "fe80::cc": "stale", "192.168.1.30": None}
+
+    def test_stream_yields_neighbors_before_the_sweep(self, setup, mocker):
+        """Los vecinos se entregan aunque el barrido activo todavía no respondió nada."""
+        scanner, networks = setup
+        release = asyncio.Event()
+
+        async def stream(target, timeout, rate_pps, interface, skip):
+            assert skip == {"192.168.1.1"}
+            await release.wait()
+            yield {"ip": "192.168.1.30", "mac": "ee", "vendor": "Acme"}
+
+        mocker.patch.object(scanner, "scan_stream", side_effect=stream)
+
+        async def collect():
+            devices = []
+            async for device in scanner.scan_all_stream(networks):
+                devices.append(device["ip"])
+                if len(devices) == 3:
+                    release.set()
+            return devices
+
+        devices = asyncio.run(collect())
+
+        assert sorted(devices[:3]) == ["192.168.1.1", "192.168.1.8", "fe80::cc"]
+        assert devices[3:] == ["192.168.1.30"]
+
+    def test_scapy_chunks_exclude_skipped_addresses(self, mocker, mock_socket):
+        """Con scapy, las IPs a omitir no entran en el pdst de cada bloque."""
+        srp = mocker.patch("scapy.all.srp", return_value=([], []))
+        scanner = NetworkScanner()
+
+        scanner.scan_network("10.0.0.0/30", skip={"10.0.0.1", "10.0.0.2"})
+
+        assert srp.call_args[0][0][1].pdst == ["10.0.0.0", "10.0.0.3"]
@@ -0,0 +1,188 @@
+"""
+Tests unitarios para el planificador de tareas de fondo (core/scheduler.py).
+Cubre el jitter, las prioridades, la no superposición, el límite de
+concurrencia y el presupuesto de ancho de banda.
+"""
+
+import asyncio
+import random
+import pytest
+from core.scheduler import BandwidthBudget, Priority, ScanScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(clock):
+    return ScanScheduler(max_concurrency=1, clock=clock, rng=random.Random(7))
+
+
+class TestJitter:
+    """Tests del cálculo de intervalos."""
+
+    def test_delay_stays_within_jitter(self, scheduler):
+        job = scheduler.add("discovery", lambda: None, 100, jitter=0.2)
+
+        delays = [scheduler.next_delay(job) for _ in range(500)]
+
+        assert all(80 <= d <= 120 for d in delays)
+        assert len(set(delays)) > 1
+
+    def test_first_run_uses_delay(self, scheduler, clock):
+        clock.now = 50
+        job = scheduler.add("discovery", lambda: None, 100, delay=0)
+
+        assert job.next_run == 50
+
+    def test_rejects_invalid_jobs(self, scheduler):
+        scheduler.add("discovery", lambda: None, 100)
+
+        with pytest.raises(ValueError):
+            scheduler.add("discovery", lambda: None, 100)
+        with pytest.raises(ValueError):
+            scheduler.add("other", lambda: None, 0)
+        with pytest.raises(ValueError):
+            scheduler.add("other", lambda: None, 10, jitter=1.5)
+
+
+class TestDispatch:
+    """Tests de prioridades, concurrencia y superposición."""
+
+    def test_priority_wins_the_only_slot(self, scheduler):
+        """Con un solo lugar, entre dos vencidos corre el de mayor prioridad."""
+        async def scenario():
+            scheduler.add("speedtest", lambda: None, 10, priority=Priority.LOW, delay=0)
+            scheduler.add("discovery", lambda: None, 10, priority=Priority.HIGH, delay=0)
+            return [job.name for job in scheduler.dispatch()]
+
+        assert asyncio.run(scenario()) == ["discovery"]
+
+    def test_concurrency_limit(self, clock):
+        scheduler = ScanScheduler(max_concurrency=2, clock=clock)
+
+        async def scenario():
+            for name in ("a", "b", "c"):
+                scheduler.add(name, lambda: None, 10, delay=0)
+            return scheduler.dispatch()
+
+        assert len(asyncio.run(scenario())) == 2
+
+    def test_running_job_is_not_started_twice(self, clock):
+        """Un trabajo en curso no se relanza aunque vuelva a estar vencido."""
+        scheduler = ScanScheduler(max_concurrency=4, clock=clock)
+
+        async def scenario():
+            gate = asyncio.Event()
+            calls = []
+
+            async def slow():
+                calls.append(1)
+                await gate.wait()
+
+            job = scheduler.add("discovery", slow, 10, delay=0)
+            scheduler.dispatch()
+            await asyncio.sleep(0)
+            clock.now += 100
+            again = scheduler.dispatch()
+            gate.set()
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            return calls, again, job
+
+        calls, again, job = asyncio.run(scenario())
+
+        assert calls == [1]
+        assert again == []
+        assert not job.running
+        assert job.next_run >= 100 + 10 * 0.9
+
+    def test_records_errors_and_reschedules(self, scheduler, clock):
+        def broken():
+            raise OSError("no interface")
+
+        async def scenario():
+            job = scheduler.add("discovery", broken, 10, delay=0)
+            scheduler.dispatch()
+            while job.running:
+                await asyncio.sleep(0.01)
+            return job
+
+        job = asyncio.run(scenario())
+
+        assert isinstance(job.last_error, OSError)
+        assert job.runs == 1
+        assert 9 <= job.next_run <= 11
+
+
+class TestBandwidthBudget:
+    """Tests del presupuesto de ancho de banda."""
+
+    def test_sliding_window(self):
+        budget = BandwidthBudget(100, window=60)
+
+        assert budget.try_spend(70, now=0)
+        assert not budget.try_spend(40, now=10)
+        assert budget.next_available(40, now=10) == 60
+        assert budget.try_spend(40, now=60)
+
+    def test_defers_job_over_budget(self, clock):
+        """Un trabajo que no entra en el presupuesto se posterga sin correr."""
+        scheduler = ScanScheduler(max_concurrency=2, budget=BandwidthBudget(100, window=60), clock=clock)
+
+        async def scenario():
+            scheduler.add("speedtest", lambda: None, 10, bandwidth=80, delay=0)
+            first = scheduler.dispatch()
+            await asyncio.sleep(0.05)
+            clock.now = 20
+            scheduler.trigger("speedtest")
+            second = scheduler.dispatch()
+            return first, second
+
+        first, second = asyncio.run(scenario())
+
+        assert len(first) == 1 and second == []
+        assert scheduler.jobs["speedtest"].next_run == 60
+
+    def test_job_bigger_than_budget_is_rejected(self, clock):
+        scheduler = ScanScheduler(budget=BandwidthBudget(100), clock=clock)
+
+        with pytest.raises(ValueError):
+            scheduler.add("speedtest", lambda: None, 10, bandwidth=500)
+
+
+class TestRunLoop:
+    """El bucle completo sobre el reloj real."""
+
+    def test_runs_jobs_repeatedly_until_stopped(self):
+        scheduler = ScanScheduler(max_concurrency=1)
+        counts = {"fast": 0, "sync": 0}
+
+        async def fast():
+            counts["fast"] += 1
+
+        def sync():
+            counts["sync"] += 1
+
+        async def scenario():
+            scheduler.add("fast", fast, 0.02, jitter=0.1, delay=0)
+            scheduler.add("sync", sync, 0.02, jitter=0.1, delay=0)
+            scheduler.start()
+            await asyncio.sleep(0.2)
+            scheduler.stop()
+            await asyncio.sleep(0)
+
+        asyncio.run(scenario())
+
+        assert counts["fast"] >= 3
+        assert counts["sync"] >= 3
@@ -1,12 +1,19 @@
 """
 Tests unitarios para NetworkSensor (core/sensor.py).
-Cubre monitoreo de tráfico y formateo de bytes.
+Cubre monitoreo de tráfico, desbordes de contadores y formateo de bytes.
 """
 
 import pytest
+import numpy as np
 from unittest.mock import Mock, patch
 from collections import namedtuple
-from core.sensor import NetworkSensor
+from core.sensor import NetworkSensor, counter_delta, counter_deltas, COUNTER_32_WRAP
+
+
+@pytest.fixture(autouse=True)
+def one_second_ticks(mock_monotonic_clock):
+    """Cada lectura del sensor ocurre 1 segundo después de la anterior."""
+    return mock_monotonic_clock
 
 
 # Helper: Crear namedtuple compatible con psutil
@@ -256,3 +263,200 @@ class TestFormatBytes:
         
         # Assert
         assert "5.00 GB" in result
+
+
+class TestGetTrafficPerNic:
+    """Tests del modo por interfaz (pernic=True)."""
+    
+    def _counters(self, **nics):
+        """Crea un dict similar a psutil.net_io_counters(pernic=True)."""
+        return {
+            name: NetIOCounters(
+                bytes_sent=sent, bytes_recv=recv,
+                packets_sent=0, packets_recv=0,
+                errin=0, errout=0, dropin=0, dropout=0
+            )
+            for name, (recv, sent) in nics.items()
+        }
+    
+    def test_pernic_computes_delta_per_interface(self, mocker):
+        """Calcula el delta de cada interfaz de forma independiente."""
+        # Arrange
+        first = self._counters(eth0=(0, 0), wlan0=(1000, 500))
+        second = self._counters(eth0=(1048576, 2097152), wlan0=(1000, 500))
+        
+        mocker.patch("psutil.net_io_counters", side_effect=lambda pernic=False: first)
+        sensor = NetworkSensor(pernic=True)
+        mocker.patch("psutil.net_io_counters", side_effect=lambda pernic=False: second)
+        
+        # Act
+        names, rates = sensor.get_traffic_per_nic()
+        
+        # Assert
+        assert names == ["eth0", "wlan0"]
+        assert rates[0].tolist() == pytest.approx([1.0, 2.0])
+        assert rates[1].tolist() == [0.0, 0.0]
+    
+    def test_pernic_exclude_filters_virtual(self, mocker):
+        """Excluye interfaces que coinciden con los patrones."""
+        # Arrange
+        counters = self._counters(lo=(1, 1), eth0=(1, 1), docker0=(1, 1), veth12ab=(1, 1))
+        mocker.patch("psutil.net_io_counters", side_effect=lambda pernic=False: counters)
+        
+        # Act
+        sensor = NetworkSensor(pernic=True, exclude=["lo", "docker*", "veth*"])
+        
+        # Assert
+        assert sensor.nic_names == ["eth0"]
+    
+    def test_pernic_include_filters(self, mocker):
+        """Solo incluye interfaces que coinciden con include."""
+        # Arrange
+        counters = self._counters(eth0=(1, 1), eth1=(1, 1), wlan0=(1, 1))
+        mocker.patch("psutil.net_io_counters", side_effect=lambda pernic=False: counters)
+        
+        # Act
+        sensor = NetworkSensor(pernic=True, include=["eth*"])
+        
+        # Assert
+        assert sensor.nic_names == ["eth0", "eth1"]
+    
+    def test_pernic_handles_new_interface(self, mocker):
+        """Una interfaz nueva aparece con delta cero sin afectar al resto."""
+        # Arrange
+        first = self._counters(eth0=(0, 0))
+        second = self._counters(eth0=(1048576, 0), tun0=(5000, 5000))
+        mocker.patch("psutil.net_io_counters", side_effect=lambda pernic=False: first)
+        sensor = NetworkSensor(pernic=True)
+        mocker.patch("psutil.net_io_counters", side_effect=lambda pernic=False: second)
+        
+        # Act
+        names, rates = sensor.get_traffic_per_nic()
+        
+        # Assert
+        assert names == ["eth0", "tun0"]
+        assert rates[0, 0] == pytest.approx(1.0)
+        assert rates[1].tolist() == [0.0, 0.0]
+
+
+    def test_pernic_replaced_interface_rebaselines(self, mocker):
+        """Una interfaz que reemplaza a otra (misma cantidad) arranca en cero, sin restar entre NICs."""
+        # Arrange
+        first = self._counters(eth0=(0, 0), veth1=(5 * 1048576, 5 * 1048576))
+        second = self._counters(eth0=(1048576, 0), veth2=(1000, 1000))
+        mocker.patch("psutil.net_io_counters", side_effect=lambda pernic=False: first)
+        sensor = NetworkSensor(pernic=True)
+        mocker.patch("psutil.net_io_counters", side_effect=lambda pernic=False: second)
+        
+        # Act
+        names, rates = sensor.get_traffic_per_nic()
+        
+        # Assert
+        assert names == ["eth0", "veth2"]
+        assert rates[0, 0] == pytest.approx(1.0)
+        assert rates[1].tolist() == [0.0, 0.0]
+
+
+class TestMonotonicTiming:
+    """Tests de tasas calculadas sobre el tiempo real transcurrido."""
+    
+    def test_get_traffic_divides_by_elapsed(self, mocker):
+        """Una lectura tras 0.5 s duplica la tasa respecto del delta crudo."""
+        # Arrange
+        initial = NetIOCounters(0, 0, 0, 0, 0, 0, 0, 0)
+        current = NetIOCounters(1048576, 1048576, 0, 0, 0, 0, 0, 0)
+        mocker.patch("psutil.net_io_counters", side_effect=[initial, current])
+        mocker.patch("core.sensor.time.monotonic_ns", side_effect=[0, 500_000_000])
+        sensor = NetworkSensor()
+        
+        # Act
+        download_mb, upload_mb = sensor.get_traffic()
+        
+        # Assert
+        assert download_mb == pytest.approx(2.0)
+        assert upload_mb == pytest.approx(2.0)
+    
+    def test_sample_returns_timestamp_and_elapsed(self, mocker):
+        """sample() incluye timestamp monotónico y segundos transcurridos."""
+        # Arrange
+        counters = NetIOCounters(0, 0, 0, 0, 0, 0, 0, 0)
+        mocker.patch("psutil.net_io_counters", return_value=counters)
+        mocker.patch("core.sensor.time.monotonic_ns", side_effect=[100, 100 + 250_000_000])
+        sensor = NetworkSensor()
+        
+        # Act
+        sample = sensor.sample()
+        
+        # Assert
+        assert sample.timestamp_ns == 100 + 250_000_000
+        assert sample.elapsed_s == pytest.approx(0.25)
+
+
+class TestCounterDelta:
+    """Tests del manejo de desbordes y reinicios de contadores."""
+    
+    def test_normal_increase(self):
+        """Un contador que crece retorna la diferencia."""
+        assert counter_delta(1500, 1000) == 500
+    
+    def test_32bit_wraparound(self):
+        """Un contador de 32 bits que desborda se corrige."""
+        assert counter_delta(100, COUNTER_32_WRAP - 50) == 150
+    
+    def test_interface_reset(self):
+        """Un reinicio de interfaz cuenta lo acumulado desde cero."""
+        assert counter_delta(300, 5_000_000) == 300
+    
+    def test_64bit_counter_reset(self):
+        """Un contador de 64 bits que retrocede se trata como reinicio."""
+        assert counter_delta(10, COUNTER_32_WRAP * 4) == 10
+    
+    def test_vectorized_matches_scalar(self):
+        """La versión vectorizada coincide con la escalar."""
+        # Arrange
+        previous = np.array([[1000, COUNTER_32_WRAP - 50], [5_000_000, 7]], dtype=np.int64)
+        current = np.array([[1500, 100], [300, 7]], dtype=np.int64)
+        out = np.zeros_like(current)
+        
+        # Act
+        counter_deltas(current, previous, out)
+        
+        # Assert
+        expected = [[counter_delta(c, p) for c, p in zip(cr, pr)] for cr, pr in zip(current.tolist(), previous.tolist())]
+        assert out.tolist() == expected
+
+
+class TestCounterBackend:
+    """Tests del sensor alimentado por un backend de contadores."""
+    
+    def test_aggregate_sums_interface_deltas(self, mocker):
+        """Con backend, el agregado es la suma de los deltas por interfaz."""
+        # Arrange
+        first = {"eth0": NetIOCounters(0, 0, 0, 0, 0, 0, 0, 0), "wlan0": NetIOCounters(100, 100, 0, 0, 0, 0, 0, 0)}
+        second = {"eth0": NetIOCounters(1048576, 0, 0, 0, 0, 0, 0, 0), "wlan0": NetIOCounters(100, 1048676, 0, 0, 0, 0, 0, 0)}
+        mocker.patch("psutil.net_io_counters", side_effect=lambda pernic=False: first)
+        sensor = NetworkSensor(backend="psutil")
+        mocker.patch("psutil.net_io_counters", side_effect=lambda pernic=False: second)
+        
+        # Act
+        download_mb, upload_mb = sensor.get_traffic()
+        
+        # Assert
+        assert sensor.io_prev is None
+        assert download_mb == pytest.approx(1.0)
+        assert upload_mb == pytest.approx(1.0)
+    
+    def test_aggregate_with_wrapped_interface(self, mocker):
+        """Un contador de 32 bits que desborda en una NIC no genera saltos negativos."""
+        # Arrange
+        first = {"eth0": NetIOCounters(0, COUNTER_32_WRAP - 1048576, 0, 0, 0, 0, 0, 0)}
+        second = {"eth0": NetIOCounters(0, 1048576, 0, 0, 0, 0, 0, 0)}
+        mocker.patch("psutil.net_io_counters", side_effect=lambda pernic=False: first)
+        sensor = NetworkSensor(backend="psutil")
+        mocker.patch("psutil.net_io_counters", side_effect=lambda pernic=False: second)
+        
+        # Act
+        download_mb, _ = sensor.get_traffic()
+        
+        # Assert
+        assert download_mb == pytest.approx(2.0)
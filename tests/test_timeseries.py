@@ -0,0 +1,142 @@
+"""
+Tests unitarios para TieredTimeSeries (core/timeseries.py).
+Cubre rollups por bucket, vuelta de los buffers circulares y
+selección del nivel según la ventana pedida.
+"""
+
+import numpy as np
+import pytest
+from core.data_manager import DataManager
+from core.timeseries import TieredTimeSeries, TimeSeriesTier
+
+
+class TestTimeSeriesTier:
+    """Tests de un nivel individual."""
+
+    def test_rollup_min_max_mean_sum(self):
+        """Las muestras del mismo bucket se agregan en su lugar."""
+        # Arrange
+        tier = TimeSeriesTier(resolution=10, capacity=4)
+
+        # Act
+        tier.add(100, (1.0, 4.0))
+        tier.add(103, (3.0, 2.0))
+        tier.add(109, (2.0, 0.0))
+        window = tier.window(10)
+
+        # Assert
+        assert window["timestamps"].tolist() == [100]
+        assert window["min"].tolist() == [[1.0, 0.0]]
+        assert window["max"].tolist() == [[3.0, 4.0]]
+        assert window["sum"].tolist() == [[6.0, 6.0]]
+        assert window["mean"].tolist() == [[2.0, 2.0]]
+        assert window["count"].tolist() == [3]
+
+    def test_new_bucket_advances_cursor(self):
+        """Cambiar de bucket abre una celda nueva."""
+        tier = TimeSeriesTier(resolution=1, capacity=4)
+        tier.add(0, (1.0, 1.0))
+        tier.add(1, (2.0, 2.0))
+
+        window = tier.window(4)
+
+        assert window["timestamps"].tolist() == [0, 1]
+        assert window["mean"][:, 0].tolist() == [1.0, 2.0]
+
+    def test_wraparound_keeps_last_capacity(self):
+        """Al dar la vuelta solo quedan los últimos `capacity` buckets."""
+        tier = TimeSeriesTier(resolution=1, capacity=3)
+        for t in range(5):
+            tier.add(t, (float(t), 0.0))
+
+        window = tier.window(10)
+
+        assert window["timestamps"].tolist() == [2, 3, 4]
+
+    def test_window_excludes_gaps(self):
+        """Los buckets fuera de la ventana (por huecos de tiempo) no aparecen."""
+        tier = TimeSeriesTier(resolution=1, capacity=10)
+        tier.add(0, (1.0, 1.0))
+        tier.add(8, (2.0, 2.0))
+
+        window = tier.window(3)
+
+        assert window["timestamps"].tolist() == [8]
+
+    def test_late_sample_is_ignored(self):
+        """Una muestra de un bucket ya cerrado no lo reabre."""
+        tier = TimeSeriesTier(resolution=1, capacity=4)
+        tier.add(5, (1.0, 1.0))
+        tier.add(3, (9.0, 9.0))
+
+        assert tier.window(10)["max"].tolist() == [[1.0, 1.0]]
+
+    def test_empty_window(self):
+        """Sin datos retorna arrays vacíos con la forma correcta."""
+        tier = TimeSeriesTier(resolution=1, capacity=4)
+        window = tier.window(10)
+
+        assert window["mean"].shape == (0, 2)
+        assert window["timestamps"].shape == (0,)
+
+
+class TestTieredTimeSeries:
+    """Tests del conjunto de niveles."""
+
+    def test_add_feeds_all_tiers(self):
+        """Cada muestra llega a todos los niveles."""
+        series = TieredTimeSeries()
+        for t in range(120):
+            series.add(t, 1.0, 2.0)
+
+        counts = [tier.window(86400 * 730)["count"].sum() for tier in series.tiers]
+
+        assert counts == [120] * len(series.tiers)
+
+    def test_coarse_tier_matches_fine_aggregation(self):
+        """El nivel de 1 min coincide con agregar los de 1 s."""
+        # Arrange
+        series = TieredTimeSeries()
+        values = np.random.default_rng(0).random(180)
+        for t, v in enumerate(values):
+            series.add(t, v, 0.0)
+
+        # Act
+        minute = series.tiers[2].window(180)
+
+        # Assert
+        assert minute["max"][:, 0] == pytest.approx(values.reshape(3, 60).max(axis=1))
+        assert minute["mean"][:, 0] == pytest.approx(values.reshape(3, 60).mean(axis=1))
+
+    @pytest.mark.parametrize("seconds, resolution", [
+        (3600, 1),
+        (86400, 60),
+        (30 * 86400, 3600),
+        (365 * 86400, 86400),
+    ])
+    def test_tier_for_window(self, seconds, resolution):
+        """Elige el nivel más fino que cubre la ventana sin exceder los puntos."""
+        series = TieredTimeSeries()
+        assert series.tier_for(seconds).resolution == resolution
+
+    def test_window_reports_resolution(self):
+        """La ventana incluye la resolución del nivel usado."""
+        series = TieredTimeSeries()
+        series.add(0, 1.0, 1.0)
+
+        assert series.window(3600)["resolution"] == 1
+
+
+class TestDataManagerHistory:
+    """Integración del historial con DataManager."""
+
+    def test_update_traffic_feeds_history(self):
+        """update_traffic registra la muestra en el historial."""
+        dm = DataManager()
+        dm.update_traffic(5.0, 1.0, timestamp=1000)
+        dm.update_traffic(3.0, 2.0, timestamp=1001)
+
+        history = dm.get_history(60)
+
+        assert history["timestamps"].tolist() == [1000, 1001]
+        assert history["mean"].tolist() == [[5.0, 1.0], [3.0, 2.0]]
@@ -0,0 +1,141 @@
+"""
+Tests unitarios para TrafficCube (core/traffic_cube.py).
+Cubre la actualización por celda, la carga vectorizada, la combinación
+de cubos, la lectura de exportaciones y la persistencia.
+"""
+
+import json
+import time
+import numpy as np
+import pytest
+from core.data_manager import DataManager
+from core.exporter import export_history
+from core.history_store import HistoryStore
+from core.traffic_cube import TrafficCube, cell_for
+
+
+def local_ts(year, month, day, hour, minute=0):
+    """Epoch de una fecha en hora local."""
+    return time.mktime((year, month, day, hour, minute, 0, 0, 0, -1))
+
+
+# Lunes 2024-01-01 a las 09:00 (hora local)
+MONDAY_9 = local_ts(2024, 1, 1, 9)
+
+
+class TestCells:
+    """Tests de actualización y lectura de celdas."""
+
+    def test_sample_updates_its_cell(self):
+        """Una muestra cae en su día y hora locales."""
+        cube = TrafficCube()
+
+        cube.add(MONDAY_9 + 120, 4.0, 1.0)
+
+        assert cell_for(MONDAY_9) == (0, 9)
+        assert cube.count[0, 9] == 1
+        assert cube.count.sum() == 1
+
+    def test_avg_is_time_weighted_and_peak_is_max(self):
+        """El promedio pondera por tiempo; el pico toma la ráfaga informada."""
+        cube = TrafficCube()
+        cube.add(MONDAY_9, 2.0, 0.0, elapsed_s=3.0)
+        cube.add(MONDAY_9 + 3, 6.0, 0.0, elapsed_s=1.0, peak_download=9.0)
+
+        assert cube.matrix("avg", "download")[0, 9] == pytest.approx(3.0)
+        assert cube.matrix("peak", "download")[0, 9] == 9.0
+        assert cube.matrix("avg", "download")[1, 9] == 0.0
+
+    def test_unknown_metric_raises(self):
+        """Una métrica desconocida es un error."""
+        with pytest.raises(ValueError):
+            TrafficCube().matrix("median")
+
+    def test_add_rows_matches_add(self):
+        """La carga vectorizada da el mismo cubo que muestra por muestra."""
+        rng = np.random.default_rng(1)
+        ts = MONDAY_9 + np.arange(0, 3 * 86400, 37, dtype=np.float64)
+        rows = np.column_stack([ts, rng.random(len(ts)), rng.random(len(ts)), np.ones(len(ts)),
+                                rng.random(len(ts)) * 2, rng.random(len(ts)) * 2])
+        one_by_one = TrafficCube()
+        for t, down, up, elapsed, peak_down, peak_up in rows.tolist():
+            one_by_one.add(t, down, up, elapsed, max(peak_down, down), max(peak_up, up))
+
+        vectorized = TrafficCube()
+        vectorized.add_rows(rows)
+
+        assert np.array_equal(vectorized.count, one_by_one.count)
+        assert np.allclose(vectorized.weighted_sum, one_by_one.weighted_sum)
+        assert np.allclose(vectorized.peak, one_by_one.peak)
+
+
+class TestMerge:
+    """Tests de combinación de cubos y de archivos exportados."""
+
+    def test_merge_sums_and_keeps_max_peak(self):
+        """Combinar suma tiempos y totales y conserva el pico mayor."""
+        a, b = TrafficCube(), TrafficCube()
+        a.add(MONDAY_9, 2.0, 0.0)
+        b.add(MONDAY_9, 4.0, 0.0)
+
+        a.merge(b)
+
+        assert a.count[0, 9] == 2
+        assert a.matrix("avg")[0, 9] == pytest.approx(3.0)
+        assert a.matrix("peak")[0, 9] == 4.0
+
+    def test_from_exports_combines_files(self, tmp_path):
+        """Varios CSV exportados se combinan en un solo cubo."""
+        paths = []
+        for i, rate in enumerate((1.0, 3.0)):
+            store = HistoryStore(str(tmp_path / f"history{i}.db"), flush_interval=60)
+            for s in range(10):
+                store.append(MONDAY_9 + s, rate, 0.0)
+            store.close()
+            store = HistoryStore(str(tmp_path / f"history{i}.db"))
+            path = str(tmp_path / f"export{i}.csv")
+            export_history(store, path, start=0, end=MONDAY_9 + 3600)
+            store.close()
+            paths.append(path)
+
+        cube = TrafficCube.from_exports(paths, chunk_rows=4)
+
+        assert cube.count[0, 9] == 20
+        assert cube.matrix("avg")[0, 9] == pytest.approx(2.0)
+
+
+class TestPersistence:
+    """Tests de guardado y carga."""
+
+    def test_state_survives_restart(self, tmp_path):
+        """Un cubo nuevo recupera las celdas guardadas."""
+        path = str(tmp_path / "cube.json")
+        cube = TrafficCube(state_path=path)
+        cube.add(MONDAY_9, 5.0, 1.0)
+        cube.save()
+
+        restored = TrafficCube(state_path=path)
+
+        assert restored.count[0, 9] == 1
+        assert restored.matrix("avg", "upload")[0, 9] == pytest.approx(1.0)
+
+    def test_invalid_state_is_ignored(self, tmp_path):
+        """Un archivo con otra forma no rompe el arranque."""
+        path = tmp_path / "cube.json"
+        path.write_text(json.dumps({"version": 1, "weighted_sum": [], "peak": [], "elapsed": [], "count": []}))
+
+        assert TrafficCube(state_path=str(path)).count.sum() == 0
+
+
+class TestDataManagerIntegration:
+    """Integración con DataManager.update_traffic."""
+
+    def test_update_traffic_feeds_cube(self):
+        """Cada muestra actualiza una celda del cubo."""
+        cube = TrafficCube()
+        dm = DataManager(traffic_cube=cube)
+
+        dm.update_traffic(3.0, 1.0, peak_download=7.0, timestamp=MONDAY_9)
+
+        assert cube.count[0, 9] == 1
+        assert cube.matrix("peak")[0, 9] == 7.0
@@ -0,0 +1,181 @@
+"""
+Tests unitarios para las estadísticas de ventana deslizante (core/window_stats.py).
+Cubre expiración por tiempo, deques monótonas y su exposición en get_stats.
+"""
+
+import numpy as np
+import pytest
+from core.data_manager import DataManager
+from core.window_stats import RollingStats, WindowStats
+
+
+class TestRollingStats:
+    """Tests de una ventana individual."""
+
+    def test_stats_of_full_window(self):
+        """Promedio, desvío, pico y mínimo de las muestras de la ventana."""
+        # Arrange
+        window = RollingStats(window_s=10, channels=1)
+
+        # Act
+        for t, v in enumerate([2.0, 4.0, 6.0]):
+            window.add(t, (v,))
+        stats = window.stats()
+
+        # Assert
+        assert stats["avg"] == pytest.approx(4.0)
+        assert stats["std"] == pytest.approx(np.std([2.0, 4.0, 6.0]))
+        assert stats["peak"] == 6.0
+        assert stats["min"] == 2.0
+
+    def test_old_samples_expire(self):
+        """Las muestras fuera de la ventana dejan de contar."""
+        window = RollingStats(window_s=3, channels=1)
+        for t, v in enumerate([100.0, 1.0, 2.0, 3.0]):
+            window.add(t, (v,))
+
+        stats = window.stats()
+
+        assert stats["peak"] == 3.0
+        assert stats["avg"] == pytest.approx(2.0)
+        assert len(window.samples) == 3
+
+    def test_average_weighted_by_elapsed(self):
+        """El promedio pondera cada muestra por el tiempo que cubre."""
+        window = RollingStats(window_s=60, channels=1)
+        window.add(0, (10.0,), elapsed_s=3.0)
+        window.add(1, (2.0,), elapsed_s=1.0)
+
+        assert window.stats()["avg"] == pytest.approx(8.0)
+
+    def test_std_weighted_like_average(self):
+        """El desvío usa el mismo peso por tiempo que el promedio."""
+        # Arrange
+        window = RollingStats(window_s=60, channels=1)
+
+        # Act
+        window.add(0, (10.0,), elapsed_s=3.0)
+        window.add(1, (2.0,), elapsed_s=1.0)
+        stats = window.stats()
+
+        # Assert: equivale a las muestras 10, 10, 10, 2 de 1 s
+        assert stats["avg"] == pytest.approx(np.mean([10.0, 10.0, 10.0, 2.0]))
+        assert stats["std"] == pytest.approx(np.std([10.0, 10.0, 10.0, 2.0]))
+
+    def test_peak_includes_bursts(self):
+        """El máximo de la ventana cuenta las ráfagas sub-segundo informadas."""
+        window = RollingStats(window_s=5, channels=1)
+        window.add(0, (2.0,), peaks=(40.0,))
+        window.add(1, (3.0,), peaks=(1.0,))  # Una ráfaga menor que la tasa no la rebaja
+
+        assert window.stats()["peak"] == 40.0
+        assert window.stats()["min"] == 2.0
+
+        window.add(5, (3.0,))
+        assert window.stats()["peak"] == 3.0
+
+    def test_matches_brute_force(self):
+        """Coincide con recalcular la ventana completa en cada paso."""
+        # Arrange
+        rng = np.random.default_rng(5)
+        values = rng.exponential(5, 500)
+        window = RollingStats(window_s=50, channels=1)
+
+        for t, v in enumerate(values):
+            # Act
+            window.add(t, (float(v),))
+            stats = window.stats()
+
+            # Assert
+            expected = values[max(0, t - 49):t + 1]
+            assert stats["peak"] == expected.max()
+            assert stats["min"] == expected.min()
+            assert stats["avg"] == pytest.approx(expected.mean())
+            assert stats["std"] == pytest.approx(expected.std(), abs=1e-6)
+
+    def test_std_stays_precise_for_large_mean(self):
+        """Un desvío chico sobre un promedio grande no se pierde al expirar muestras."""
+        # Arrange: ~1 GB/s con ruido de 0.01 y pesos variables
+        rng = np.random.default_rng(11)
+        values = 1e6 + rng.normal(0, 0.01, 5000)
+        elapsed = rng.uniform(0.5, 1.5, 5000)
+        window = RollingStats(window_s=100, channels=1)
+
+        # Act
+        for t, (v, e) in enumerate(zip(values, elapsed)):
+            window.add(t, (float(v),), elapsed_s=float(e))
+        stats = window.stats()
+
+        # Assert
+        last_v, last_e = values[-100:], elapsed[-100:]
+        mean = np.average(last_v, weights=last_e)
+        assert stats["avg"] == pytest.approx(mean, rel=1e-12)
+        assert stats["std"] == pytest.approx(np.sqrt(np.average((last_v - mean) ** 2, weights=last_e)), rel=1e-4)
+
+    def test_monotonic_deques_stay_bounded(self):
+        """Con tráfico decreciente la deque de máximos no crece sin límite."""
+        window = RollingStats(window_s=10, channels=1)
+        for t in range(1000):
+            window.add(t, (float(1000 - t),))
+
+        assert len(window.max_deques[0]) <= 10
+        assert len(window.min_deques[0]) == 1
+
+    def test_empty_window(self):
+        """Sin muestras retorna ceros."""
+        assert RollingStats(window_s=10).stats() == {"avg": 0.0, "std": 0.0, "peak": 0.0, "min": 0.0}
+
+
+class TestWindowStats:
+    """Tests del agregador de ventanas."""
+
+    def test_snapshot_keys(self):
+        """Reporta cada estadística por canal y ventana."""
+        stats = WindowStats()
+        stats.add(0, 1.0, 2.0)
+
+        snapshot = stats.snapshot()
+
+        for key in ("avg_download_1m", "peak_download_5m", "min_upload_1h", "std_upload_1m"):
+            assert key in snapshot
+
+    def test_reset_empties_windows(self):
+        """reset vacía todas las ventanas."""
+        stats = WindowStats()
+        stats.add(0, 9.0, 9.0)
+        stats.reset()
+
+        assert stats.snapshot()["peak_download_5m"] == 0.0
+
+
+class TestGetStatsWindows:
+    """Integración con DataManager.get_stats."""
+
+    def test_peak_last_5_minutes_and_average_last_minute(self):
+        """El pico de 5 min olvida lo anterior y el promedio de 1 min es local."""
+        # Arrange
+        dm = DataManager()
+        dm.update_traffic(90.0, 1.0, timestamp=1000)
+        for t in range(1, 400):
+            dm.update_traffic(2.0, 1.0, timestamp=1000 + t)
+
+        # Act
+        stats = dm.get_stats()
+
+        # Assert
+        assert stats["peak_download"] == 90.0  # De toda la vida
+        assert stats["peak_download_5m"] == 2.0
+        assert stats["peak_download_1h"] == 90.0
+        assert stats["avg_download_1m"] == pytest.approx(2.0)
+
+    def test_window_peak_uses_burst_peaks(self):
+        """El pico de 5 min incluye las ráfagas informadas por el sampler."""
+        dm = DataManager()
+        dm.update_traffic(2.0, 1.0, peak_download=25.0, peak_upload=4.0, timestamp=1000)
+        dm.update_traffic(2.0, 1.0, timestamp=1001)
+
+        stats = dm.get_stats()
+
+        assert stats["peak_download_5m"] == 25.0
+        assert stats["peak_upload_5m"] == 4.0
+        assert stats["peak_download_5m"] == stats["peak_download"]
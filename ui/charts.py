@@ -1,6 +1,16 @@
 import flet as ft
 import flet_charts as fch
 
+# Colores para las series por interfaz (se reciclan si hay más interfaces)
+NIC_COLORS = [
+    ft.Colors.AMBER_400,
+    ft.Colors.PURPLE_300,
+    ft.Colors.PINK_300,
+    ft.Colors.LIGHT_BLUE_300,
+    ft.Colors.LIME_400,
+    ft.Colors.DEEP_ORANGE_300,
+]
+
 def create_network_chart(download_data, upload_data):
     """Crea el objeto LineChart enlazado a la lista de datos"""
 
@@ -35,7 +45,26 @@ def create_network_chart(download_data, upload_data):
         ),
         min_y=0,
         max_y=100,
+        # El eje X avanza con cada muestra (ver DataManager.chart_x_range)
+        min_x=0,
+        max_x=len(download_data) - 1,
         expand=True,
     )
 
-    return chart
\ No newline at end of file
+    return chart
+
+
+def create_nic_series(nic_points):
+    """
+    Crea las series del gráfico para las interfaces elegidas.
+    Download en línea continua y upload en línea punteada, mismo color por NIC.
+
+    Args:
+        nic_points: Diccionario nombre -> (puntos download, puntos upload)
+    """
+    series = []
+    for i, (down_points, up_points) in enumerate(nic_points.values()):
+        color = NIC_COLORS[i % len(NIC_COLORS)]
+        series.append(fch.LineChartData(points=down_points, stroke_width=1.5, color=color, curved=False))
+        series.append(fch.LineChartData(points=up_points, stroke_width=1.5, color=color, curved=False, dash_pattern=[4, 4]))
+    return series
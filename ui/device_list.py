@@ -11,10 +11,11 @@ def create_device_table():
             ft.DataColumn(ft.Text("IP Address", weight="bold", color="white")),
             ft.DataColumn(ft.Text("MAC Address", weight="bold", color="cyan")),
             ft.DataColumn(ft.Text("Vendor", weight="bold", color="orange")),
+            ft.DataColumn(ft.Text("Interface", weight="bold")),
             ft.DataColumn(ft.Text("Status", weight="bold")),
         ],
         rows=[], # Inicia vacia
-        border=ft.border.all(1, ft.Colors.with_opacity(0.2, ft.Colors.WHITE)),
+        border=ft.Border.all(1, ft.Colors.with_opacity(0.2, ft.Colors.WHITE)),
         vertical_lines=ft.border.BorderSide(1, ft.Colors.with_opacity(0.1, ft.Colors.WHITE)),
         horizontal_lines=ft.border.BorderSide(1, ft.Colors.with_opacity(0.1, ft.Colors.WHITE)),
         heading_row_color=ft.Colors.BLACK_45,
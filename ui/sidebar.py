@@ -39,6 +39,12 @@ def create_sidebar(on_nav_change):
                 selected_icon=ft.Icons.SPEED,
                 label="Speedtest"
             ),
+            # Opcion 4: Mapa de calor (hora de la semana)
+            ft.NavigationRailDestination(
+                icon=ft.Icons.GRID_ON,
+                selected_icon=ft.Icons.GRID_ON,
+                label="Heatmap"
+            ),
         ],
         on_change=on_nav_change # Aca se conecta la logica
     )
\ No newline at end of file
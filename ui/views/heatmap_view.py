@@ -0,0 +1,111 @@
+"""
+Vista de Mapa de Calor.
+Muestra el tráfico promedio o pico por hora de la semana (7 × 24 celdas),
+leído del TrafficCube (nunca del historial crudo).
+"""
+
+import flet as ft
+from core.traffic_cube import DAYS, HOURS, TrafficCube
+
+DAY_LABELS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+# Extremos de la escala de color (tráfico nulo -> máximo)
+COLD_RGB = (0x1E, 0x27, 0x33)
+HOT_RGB = (0xFF, 0x98, 0x00)
+
+
+def _scale_color(fraction: float) -> str:
+    """Interpola entre COLD_RGB y HOT_RGB; fraction en [0, 1]."""
+    rgb = (round(c + (h - c) * fraction) for c, h in zip(COLD_RGB, HOT_RGB))
+    return "#{:02x}{:02x}{:02x}".format(*rgb)
+
+
+def HeatmapView(traffic_cube: TrafficCube, page: ft.Page):
+    """
+    Crea la vista del mapa de calor.
+    Retorna la vista y la función que la refresca desde el cubo.
+    """
+    metric = "avg"
+    channel = "download"
+
+    # Celdas creadas una sola vez; refrescar solo cambia color y tooltip
+    cells = [
+        [ft.Container(width=28, height=22, border_radius=3, bgcolor=_scale_color(0)) for _ in range(HOURS)]
+        for _ in range(DAYS)
+    ]
+    scale_text = ft.Text("Max: -- MB/s", size=12, color=ft.Colors.WHITE_54)
+
+    def refresh():
+        """Vuelve a colorear las celdas con el estado actual del cubo."""
+        matrix = traffic_cube.matrix(metric, channel)
+        top = float(matrix.max())
+        for day in range(DAYS):
+            for hour in range(HOURS):
+                value = float(matrix[day, hour])
+                cell = cells[day][hour]
+                cell.bgcolor = _scale_color(value / top if top > 0 else 0.0)
+                cell.tooltip = f"{DAY_LABELS[day]} {hour:02d}:00 — {value:.2f} MB/s"
+        scale_text.value = f"Max: {top:.2f} MB/s"
+        page.update()
+
+    def on_metric_change(e):
+        nonlocal metric
+        metric = e.control.value
+        refresh()
+
+    def on_channel_change(e):
+        nonlocal channel
+        channel = e.control.value
+        refresh()
+
+    metric_dropdown = ft.Dropdown(
+        width=150,
+        options=[ft.dropdown.Option("avg", "Average"), ft.dropdown.Option("peak", "Peak")],
+        value=metric,
+        label="Metric",
+        text_size=12,
+        height=45,
+        content_padding=10,
+        on_select=on_metric_change
+    )
+    channel_dropdown = ft.Dropdown(
+        width=150,
+        options=[ft.dropdown.Option("download", "Download"), ft.dropdown.Option("upload", "Upload")],
+        value=channel,
+        label="Direction",
+        text_size=12,
+        height=45,
+        content_padding=10,
+        on_select=on_channel_change
+    )
+
+    # Encabezado de horas + una fila por día
+    hour_header = ft.Row(
+        [ft.Container(width=40)] + [
+            ft.Container(ft.Text(f"{h:02d}", size=10, color=ft.Colors.WHITE_54), width=28,
+                         alignment=ft.Alignment.CENTER)
+            for h in range(HOURS)
+        ],
+        spacing=3
+    )
+    rows = [
+        ft.Row([ft.Container(ft.Text(DAY_LABELS[day], size=12), width=40)] + cells[day], spacing=3)
+        for day in range(DAYS)
+    ]
+
+    view = ft.Column(
+        [
+            ft.Text("Traffic by hour of week", size=20, weight="bold"),
+            ft.Row([metric_dropdown, channel_dropdown, scale_text], spacing=20,
+                   vertical_alignment=ft.CrossAxisAlignment.CENTER),
+            ft.Container(
+                content=ft.Column([hour_header] + rows, spacing=3),
+                padding=10,
+                border_radius=10,
+                bgcolor=ft.Colors.BLACK_12
+            ),
+        ],
+        visible=False
+    )
+
+    return view, refresh
@@ -1,6 +1,20 @@
+import math
+import sqlite3
+import time
 import flet as ft
+from core.data_manager import ALERT_MODE_THRESHOLD, ALERT_MODE_ADAPTIVE
+from core.exporter import available_formats, default_export_path, export_history_async
 
-def MonitorView(chart, speed_label, stats_panel, alerts_config):
+# Rangos ofrecidos para exportar (etiqueta -> segundos hacia atrás; None = todo)
+EXPORT_RANGES = {
+    "Last hour": 3600,
+    "Last 24 h": 86400,
+    "Last 7 days": 7 * 86400,
+    "All": None,
+}
+
+def MonitorView(chart, speed_label, stats_panel, alerts_config, nic_selector=None, window_selector=None,
+                export_panel=None):
     """
     Crea la vista del Monitor de trafico.
     Recibe los componentes ya creados (chart, label, stats y alerts) para organizarlos visualmente
@@ -10,7 +24,16 @@ def MonitorView(chart, speed_label, stats_panel, alerts_config):
             ft.Text("Real-Time traffic", size=20, weight="bold"),
 
             # Contenedor para el texto de velocidad 
-            ft.Container(speed_label, padding=ft.padding.only(bottom=10)),
+            ft.Container(speed_label, padding=ft.Padding.only(bottom=10)),
+
+            # Selector de interfaces (una serie por NIC elegida) y de ventana
+            ft.Row(
+                [
+                    ft.Container(nic_selector, visible=nic_selector is not None, expand=True),
+                    ft.Container(window_selector, visible=window_selector is not None),
+                ],
+                vertical_alignment=ft.CrossAxisAlignment.CENTER
+            ),
 
             # Contenedor del grafico con fondo oscuro
             ft.Container(
@@ -24,13 +47,20 @@ def MonitorView(chart, speed_label, stats_panel, alerts_config):
             # Panel de estadísticas
             ft.Container(
                 content=stats_panel,
-                padding=ft.padding.only(top=20, bottom=10)
+                padding=ft.Padding.only(top=20, bottom=10)
             ),
             
             # Configuración de alertas
             ft.Container(
                 content=alerts_config,
-                padding=ft.padding.only(top=10)
+                padding=ft.Padding.only(top=10)
+            ),
+
+            # Exportación del historial
+            ft.Container(
+                content=export_panel,
+                visible=export_panel is not None,
+                padding=ft.Padding.only(top=10)
             ),
         ],
         visible=True # Esta vista arranca visible
@@ -92,6 +122,46 @@ def create_stats_panel():
     return panel, peak_text, total_text, avg_text
 
 
+def parse_number(text, default=None, minimum=0.0, allow_zero=True):
+    """
+    Convierte el texto de un campo numérico; vacío = `default`.
+
+    Raises:
+        ValueError: Si no es un número finito dentro del rango
+    """
+    text = (text or "").strip()
+    if not text:
+        return default
+    value = float(text)
+    if not math.isfinite(value) or value < minimum or (value == minimum and not allow_zero):
+        raise ValueError(text)
+    return value
+
+
+def create_number_field(label, value, width, parse, apply, error):
+    """
+    TextField numérico que valida al confirmar: un valor inválido se
+    marca en el campo y no se aplica.
+
+    Args:
+        label: Etiqueta del campo
+        value: Texto inicial
+        width: Ancho en píxeles
+        parse: Función texto -> valor (lanza ValueError si es inválido)
+        apply: Función que recibe el valor validado (puede lanzar ValueError)
+        error: Mensaje que se muestra si el valor es inválido
+    """
+    def handle_submit(e):
+        try:
+            apply(parse(e.control.value))
+            e.control.error_text = None
+        except ValueError:
+            e.control.error_text = error
+        e.control.update()
+
+    return ft.TextField(label=label, value=value, width=width, on_submit=handle_submit)
+
+
 def create_alerts_config(data_manager):
     """
     Crea el panel de configuración de alertas de tráfico alto.
@@ -105,20 +175,157 @@ def create_alerts_config(data_manager):
     )
     
     # Campo de texto para configurar umbral
-    threshold_field = ft.TextField(
-        label="Threshold (MB/s)",
-        value="10.0",
-        width=150,
-        on_submit=lambda e: data_manager.set_traffic_threshold(float(e.control.value) if e.control.value else 10.0)
+    threshold_field = create_number_field(
+        "Threshold (MB/s)", "10.0", 150,
+        parse=lambda text: parse_number(text, default=10.0, allow_zero=False),
+        apply=data_manager.set_traffic_threshold,
+        error="Enter a number above 0"
     )
     
-    # Panel
-    panel = ft.Row(
-        [
-            alerts_toggle,
-            threshold_field,
+    # Modo: umbral fijo o desvío de la línea base aprendida
+    mode_dropdown = ft.Dropdown(
+        width=150,
+        options=[
+            ft.dropdown.Option(ALERT_MODE_THRESHOLD, "Fixed threshold"),
+            ft.dropdown.Option(ALERT_MODE_ADAPTIVE, "Adaptive"),
         ],
-        spacing=20
+        value=data_manager.alert_mode,
+        label="Alert mode",
+        text_size=12,
+        height=45,
+        content_padding=10,
+        on_select=lambda e: data_manager.set_alert_mode(e.control.value)
     )
     
+    controls = [alerts_toggle, mode_dropdown, threshold_field]
+
+    # Cuota de datos (solo si hay un QuotaTracker configurado)
+    quota = data_manager.quota_tracker
+    if quota is not None:
+        controls.append(create_number_field(
+            "Data cap (GB)", f"{quota.cap_mb / 1024:g}" if quota.cap_mb else "", 150,
+            parse=parse_number,
+            apply=lambda gb: quota.set_cap(gb * 1024 if gb else None),
+            error="Enter GB (empty = no cap)"
+        ))
+        controls.append(create_number_field(
+            "Billing day", str(quota.cycle_day), 110,
+            parse=lambda text: int((text or "").strip() or 1),
+            apply=quota.set_cycle_day,
+            error="Enter a day from 1 to 31"
+        ))
+
+    # Panel
+    panel = ft.Row(controls, spacing=20, wrap=True)
+    
     return panel, alerts_toggle, threshold_field
+
+
+def create_export_panel(history_store, page):
+    """
+    Crea la acción de exportar el historial (formato, rango y botón).
+    La exportación corre en un hilo (export_history_async): la UI no se bloquea.
+
+    Args:
+        history_store: HistoryStore de origen
+        page: Página de Flet (para lanzar la tarea y refrescar el estado)
+    """
+    format_dropdown = ft.Dropdown(
+        width=120,
+        options=[ft.dropdown.Option(fmt.value, fmt.value.upper()) for fmt in available_formats()],
+        value=available_formats()[0].value,
+        label="Format",
+        text_size=12,
+        height=45,
+        content_padding=10,
+    )
+    range_dropdown = ft.Dropdown(
+        width=140,
+        options=[ft.dropdown.Option(label) for label in EXPORT_RANGES],
+        value="Last 24 h",
+        label="Range",
+        text_size=12,
+        height=45,
+        content_padding=10,
+    )
+    status_text = ft.Text("", size=12, color=ft.Colors.WHITE_54)
+
+    async def run_export():
+        export_button.disabled = True
+        status_text.value = "Exporting..."
+        page.update()
+        try:
+            span = EXPORT_RANGES[range_dropdown.value]
+            start = 0.0 if span is None else time.time() - span
+            path = default_export_path(format_dropdown.value)
+            rows = await export_history_async(history_store, path, format_dropdown.value, start=start)
+            status_text.value = f"Exported {rows} samples to {path}"
+        except (OSError, RuntimeError, sqlite3.Error) as e:
+            status_text.value = f"Export failed: {e}"
+        finally:
+            # Cualquier otro error no deja el estado trabado en "Exporting..."
+            if status_text.value == "Exporting...":
+                status_text.value = "Export failed"
+            export_button.disabled = False
+            page.update()
+
+    export_button = ft.Button(
+        "Export history",
+        icon=ft.Icons.DOWNLOAD,
+        on_click=lambda e: page.run_task(run_export)
+    )
+
+    return ft.Row(
+        [format_dropdown, range_dropdown, export_button, status_text],
+        spacing=20,
+        wrap=True,
+        vertical_alignment=ft.CrossAxisAlignment.CENTER
+    )
+
+
+def create_nic_selector(nic_names, on_change, selected=()):
+    """
+    Crea una fila de checkboxes para elegir qué interfaces graficar.
+
+    Args:
+        nic_names: Nombres de interfaz disponibles
+        on_change: Función que recibe la lista de interfaces marcadas
+        selected: Interfaces que arrancan marcadas
+    """
+    selector = ft.Row(wrap=True, spacing=10)
+    set_nic_options(selector, nic_names, on_change, selected)
+    return selector
+
+
+def set_nic_options(selector, nic_names, on_change, selected=()):
+    """
+    Reconstruye los checkboxes del selector (interfaces que aparecen,
+    desaparecen o cambian de nombre). Quedan marcadas las de `selected`.
+    """
+    def handle_change(e):
+        on_change([cb.label for cb in selector.controls[1:] if cb.value])
+
+    selector.controls = [ft.Icon(ft.Icons.SETTINGS_ETHERNET, size=18, color=ft.Colors.WHITE_54)] + [
+        ft.Checkbox(label=name, value=name in selected, on_change=handle_change) for name in nic_names
+    ]
+
+
+def create_window_selector(windows, value, on_change):
+    """
+    Crea el selector de ventana del gráfico (1 min, 15 min, 1 h...).
+
+    Args:
+        windows: Diccionario etiqueta -> segundos
+        value: Segundos de la ventana inicial
+        on_change: Función que recibe los segundos elegidos
+    """
+    return ft.Dropdown(
+        width=120,
+        options=[ft.dropdown.Option(str(seconds), label) for label, seconds in windows.items()],
+        value=str(value),
+        label="Window",
+        text_size=12,
+        height=45,
+        content_padding=10,
+        on_select=lambda e: on_change(int(e.control.value))
+    )
@@ -2,11 +2,12 @@ import asyncio
 import flet as ft
 from ui.device_list import create_device_table
 from core.port_scanner import PortScanner, ScanMode
+from core.device_registry import DEVICE, SCAN_FAILED, SCAN_FINISHED, SCAN_STARTED
 
 class ScannerView(ft.Column):
-    def __init__(self, scanner_service, page: ft.Page, notification_service=None):
+    def __init__(self, registry, page: ft.Page, notification_service=None):
         super().__init__()
-        self.scanner = scanner_service # El servicio de escaneo de red
+        self.registry = registry # Registro compartido con el último escaneo de red
         self.port_scanner = PortScanner() # Nuevo servicio de escaneo de puertos
         self.main_page = page
         self.notification_service = notification_service
@@ -14,6 +15,7 @@ class ScannerView(ft.Column):
         
         # Almacenamiento de dispositivos
         self.all_devices = []
+        self._listed_ips = set() # IPs ya en la tabla durante un escaneo
         self.selected_ips = set() # IPs seleccionadas para port scan
         self.device_alerts_enabled = True
 
@@ -30,7 +32,7 @@ class ScannerView(ft.Column):
         )
         
         self.search_field = ft.TextField(
-            hint_text="Search by IP, MAC or Vendor...",
+            hint_text="Search by IP, MAC, Vendor or Interface...",
             on_change=self.apply_filter,
             prefix_icon=ft.Icons.SEARCH,
             expand=True,
@@ -60,7 +62,7 @@ class ScannerView(ft.Column):
             content_padding=10
         )
         
-        self.btn_scan_ports = ft.ElevatedButton(
+        self.btn_scan_ports = ft.Button(
             "Scan Ports",
             icon=ft.Icons.SECURITY,
             on_click=self.run_port_scan,
@@ -92,7 +94,7 @@ class ScannerView(ft.Column):
                     ],
                     alignment=ft.MainAxisAlignment.SPACE_BETWEEN
                 ),
-                padding=ft.padding.only(bottom=10)
+                padding=ft.Padding.only(bottom=10)
             ),
             
             # Filtros
@@ -127,31 +129,51 @@ class ScannerView(ft.Column):
         ]
         self.expand = True
 
+        self.registry.subscribe(self._on_registry_event)
+
+    def show(self):
+        """Muestra el último escaneo al instante y refresca si está vencido."""
+        if not self.registry.scanning:
+            self.all_devices = self.registry.devices
+            self._listed_ips = {d['ip'] for d in self.all_devices}
+            self.apply_filter(None)
+        self.registry.ensure_fresh()
+
     async def run_scan(self, e):
-        """Ejecuta escaneo de red."""
-        self.btn_scan_network.disabled = True
-        self.btn_scan_network.text = "Scanning..."
-        self.main_page.update()
+        """Fuerza un nuevo escaneo (botón Scan Network)."""
+        await self.registry.refresh()
 
-        try:
-            devices = await asyncio.to_thread(self.scanner.scan_network)
-            
-            # Notificaciones
+    def _on_registry_event(self, event):
+        """Refleja en la tabla los eventos del registro de dispositivos."""
+        if event.kind == SCAN_STARTED:
+            self.btn_scan_network.disabled = True
+            self.btn_scan_network.text = "Scanning..."
+            self._listed_ips = {d['ip'] for d in self.all_devices}
+        elif event.kind == DEVICE:
+            # Los que ya están en la tabla (del escaneo anterior) no se repiten;
+            # los nuevos aparecen apenas responden (o apenas se los ve en el tráfico)
+            device = event.device
+            if device['ip'] not in self._listed_ips:
+                self._listed_ips.add(device['ip'])
+                self.all_devices.append(device)
+                if self._matches_filter(device):
+                    self.table.rows.append(self._device_row(device))
             if self.notification_service and self.device_alerts_enabled:
-                new_devices = self.scanner.detect_new_devices(devices)
-                for device in new_devices:
-                    self.notification_service.notify_new_device(device)
-            
-            self.all_devices = devices
-            self._update_table(devices)
-            
-        except Exception as ex:
-            print(f"Error scanning: {ex}")
-        
-        self.btn_scan_network.disabled = False
-        self.btn_scan_network.text = "Scan Network"
+                for new_device in event.new_devices:
+                    self.notification_service.notify_new_device(new_device)
+        elif event.kind in (SCAN_FINISHED, SCAN_FAILED):
+            if event.kind == SCAN_FINISHED:
+                # El resultado completo reemplaza la tabla (quita los que ya no están)
+                self.all_devices = list(event.devices)
+                self._listed_ips = {d['ip'] for d in self.all_devices}
+                self.table.rows = [self._device_row(d) for d in self.all_devices if self._matches_filter(d)]
+                if self.notification_service and self.device_alerts_enabled:
+                    for new_device in event.new_devices:
+                        self.notification_service.notify_new_device(new_device)
+            self.btn_scan_network.disabled = False
+            self.btn_scan_network.text = "Scan Network"
         self.main_page.update()
-    
+
     def _on_checkbox_change(self, e, ip):
         """Maneja selección de dispositivos."""
         if e.control.value:
@@ -164,44 +186,48 @@ class ScannerView(ft.Column):
         self.btn_scan_ports.text = f"Scan Ports ({len(self.selected_ips)})"
         self.main_page.update()
 
+    def _device_row(self, dev):
+        """Crea la fila de la tabla de un dispositivo."""
+        ip = dev['ip']
+        return ft.DataRow(cells=[
+            # Checkbox Cell
+            ft.DataCell(
+                ft.Checkbox(
+                    value=ip in self.selected_ips,
+                    on_change=lambda e, x=ip: self._on_checkbox_change(e, x)
+                )
+            ),
+            ft.DataCell(ft.Text(ip)),
+            ft.DataCell(ft.Text(dev['mac'], font_family="Consolas")),
+            ft.DataCell(ft.Text(dev.get('vendor', 'Unknown'), size=12)),
+            ft.DataCell(ft.Text(dev.get('interface', ''), size=12, tooltip=dev.get('subnet'))),
+            ft.DataCell(ft.Icon(ft.Icons.CIRCLE, color="green", size=10)),
+        ])
+
     def _update_table(self, devices):
         """Actualiza la tabla con los dispositivos."""
         self.table.rows.clear()
         
         for dev in devices:
-            ip = dev['ip']
-            is_selected = ip in self.selected_ips
-            
-            self.table.rows.append(
-                ft.DataRow(cells=[
-                    # Checkbox Cell
-                    ft.DataCell(
-                        ft.Checkbox(
-                            value=is_selected,
-                            on_change=lambda e, x=ip: self._on_checkbox_change(e, x)
-                        )
-                    ),
-                    ft.DataCell(ft.Text(ip)),
-                    ft.DataCell(ft.Text(dev['mac'], font_family="Consolas")),
-                    ft.DataCell(ft.Text(dev.get('vendor', 'Unknown'), size=12)),
-                    ft.DataCell(ft.Icon(ft.Icons.CIRCLE, color="green", size=10)),
-                ])
-            )
+            self.table.rows.append(self._device_row(dev))
         self.main_page.update()
 
+    def _matches_filter(self, dev):
+        """True si el dispositivo coincide con el texto de búsqueda."""
+        text = (self.search_field.value or "").lower().strip()
+        return (
+            not text or
+            text in dev.get('ip', '').lower() or
+            text in dev.get('mac', '').lower() or
+            text in dev.get('vendor', '').lower() or
+            text in dev.get('interface', '').lower()
+        )
+
     def apply_filter(self, e):
         """Filtra dispositivos."""
         if not self.all_devices: return
         
-        text = self.search_field.value.lower().strip()
-        filtered = [
-            d for d in self.all_devices 
-            if not text or 
-            text in d.get('ip', '').lower() or 
-            text in d.get('mac', '').lower() or 
-            text in d.get('vendor', '').lower()
-        ]
-        self._update_table(filtered)
+        self._update_table([d for d in self.all_devices if self._matches_filter(d)])
 
     def clear_filter(self, e):
         self.search_field.value = ""
@@ -7,10 +7,15 @@ import asyncio
 from core.speedtest_service import SpeedtestService
 
 
-def SpeedtestView(page: ft.Page):
+def SpeedtestView(page: ft.Page, on_schedule_change=None):
     """
     Crea la vista de Speedtest.
     Muestra 3 cards con Download, Upload y Ping.
+
+    Args:
+        page: Página de Flet
+        on_schedule_change: Función que recibe True/False al activar o
+            desactivar el speedtest periódico de fondo (sin ella no se ofrece)
     """
     # Servicio de speedtest
     speedtest_service = SpeedtestService()
@@ -28,14 +33,22 @@ def SpeedtestView(page: ft.Page):
     ping_value = ft.Text("--", size=48, weight="bold", color=ft.Colors.GREEN)
     ping_unit = ft.Text("ms", size=16, color=ft.Colors.GREEN_200)
     
-    server_text = ft.Text("Server: --", size=12, color=ft.Colors.WHITE54)
-    status_text = ft.Text("Ready to test", size=14, color=ft.Colors.WHITE70)
+    server_text = ft.Text("Server: --", size=12, color=ft.Colors.WHITE_54)
+    status_text = ft.Text("Ready to test", size=14, color=ft.Colors.WHITE_70)
     
+    # Speedtest periódico: apagado por defecto (cada test mueve ~200 MB)
+    schedule_switch = ft.Switch(
+        label="Run in background every 6 h",
+        value=False,
+        visible=on_schedule_change is not None,
+        on_change=lambda e: on_schedule_change(e.control.value)
+    )
+
     # Loading indicator
     progress_ring = ft.ProgressRing(visible=False, width=24, height=24)
     
     # Botón de test
-    run_button = ft.ElevatedButton(
+    run_button = ft.Button(
         content=ft.Row(
             [ft.Icon(ft.Icons.SPEED), ft.Text("Run Test")],
             alignment=ft.MainAxisAlignment.CENTER,
@@ -106,8 +119,8 @@ def SpeedtestView(page: ft.Page):
         return ft.Container(
             content=ft.Column(
                 [
-                    ft.Icon(icon, size=32, color=ft.Colors.WHITE70),
-                    ft.Text(title, size=14, color=ft.Colors.WHITE54),
+                    ft.Icon(icon, size=32, color=ft.Colors.WHITE_70),
+                    ft.Text(title, size=14, color=ft.Colors.WHITE_54),
                     ft.Row(
                         [value_text, unit_text],
                         alignment=ft.MainAxisAlignment.CENTER,
@@ -138,7 +151,7 @@ def SpeedtestView(page: ft.Page):
     return ft.Column(
         [
             ft.Text("Internet Speed Test", size=24, weight="bold"),
-            ft.Text("Test your connection speed", size=14, color=ft.Colors.WHITE54),
+            ft.Text("Test your connection speed", size=14, color=ft.Colors.WHITE_54),
             
             # Espacio
             ft.Container(height=20),
@@ -161,13 +174,19 @@ def SpeedtestView(page: ft.Page):
             ),
             ft.Container(
                 content=status_text,
-                padding=ft.padding.only(top=10)
+                padding=ft.Padding.only(top=10)
             ),
             
             # Server info
             ft.Container(
                 content=server_text,
-                padding=ft.padding.only(top=20)
+                padding=ft.Padding.only(top=20)
+            ),
+
+            # Speedtest de fondo (opt-in)
+            ft.Container(
+                content=schedule_switch,
+                padding=ft.Padding.only(top=20)
             )
         ],
         horizontal_alignment=ft.CrossAxisAlignment.CENTER,
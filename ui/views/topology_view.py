@@ -5,17 +5,19 @@ Muestra una visualización jerárquica (árbol) de los dispositivos.
 
 import flet as ft
 from core.device_classifier import DeviceClassifier, DeviceType
-from core.scanner import NetworkScanner
+from core.device_registry import DeviceRegistry, DEVICE, SCAN_FAILED, SCAN_FINISHED, SCAN_STARTED
 
 
-def TopologyView(scanner_service: NetworkScanner, page: ft.Page):
+def TopologyView(registry: DeviceRegistry, page: ft.Page):
     """
     Crea la vista de Topología.
     Muestra un árbol visual con el Router arriba y dispositivos conectados.
+    No escanea por su cuenta: dibuja lo que publica el registro compartido.
     """
     
-    # Estado local
-    devices = []
+    # Estado local: IPs dibujadas y el router elegido
+    shown_ips = set()
+    router = None
     
     # Mapeo de Tipos a Iconos Flet
     ICON_MAP = {
@@ -37,11 +39,11 @@ def TopologyView(scanner_service: NetworkScanner, page: ft.Page):
         spacing=40
     )
     
-    status_text = ft.Text("Waiting...", color=ft.Colors.WHITE54)
+    status_text = ft.Text("Waiting...", color=ft.Colors.WHITE_54)
     refresh_button = ft.IconButton(
         icon=ft.Icons.REFRESH,
         tooltip="Refresh Topology",
-        on_click=lambda e: load_topology()
+        on_click=lambda e: page.run_task(registry.refresh)
     )
     
     def get_device_card(device):
@@ -55,13 +57,13 @@ def TopologyView(scanner_service: NetworkScanner, page: ft.Page):
         icon = ICON_MAP.get(dtype, ft.Icons.DEVICE_UNKNOWN)
         
         # Color del ícono según tipo
-        icon_color = ft.Colors.CYAN if dtype == DeviceType.ROUTER else ft.Colors.WHITE70
+        icon_color = ft.Colors.CYAN if dtype == DeviceType.ROUTER else ft.Colors.WHITE_70
         
         return ft.Container(
             content=ft.Column([
                 ft.Icon(icon, size=40, color=icon_color),
                 ft.Text(ip, weight="bold", size=12),
-                ft.Text(vendor[:15] + "..." if len(vendor) > 15 else vendor, size=10, color=ft.Colors.WHITE54),
+                ft.Text(vendor[:15] + "..." if len(vendor) > 15 else vendor, size=10, color=ft.Colors.WHITE_54),
             ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=2),
             padding=10,
             bgcolor=ft.Colors.BLACK_26,
@@ -71,64 +73,87 @@ def TopologyView(scanner_service: NetworkScanner, page: ft.Page):
             tooltip=f"IP: {ip}\nMAC: {mac}\nVendor: {vendor}\nType: {dtype.value}"
         )
     
-    def load_topology():
-        """Carga y dibuja la topología."""
-        status_text.value = "Updating topology..."
-        status_text.color = ft.Colors.AMBER
-        topology_container.controls.clear()
-        page.update()
-        
-        # Obtener dispositivos (reusamos lógica del scanner)
-        # Nota: Idealmente deberíamos cachear esto o pasarlo desde el main
-        try:
-            current_devices = scanner_service.scan_network()
-            
-            # Buscar el Gateway/Router (normalmente termina en .1)
-            router = next((d for d in current_devices if d.get("ip", "").endswith(".1")), None)
-            
-            # Si no encontramos router explícito, creamos uno virtual
-            if not router:
-                router = {"ip": "Gateway", "mac": "", "vendor": "Router"}
-            
-            # El resto son clientes
-            clients = [d for d in current_devices if d != router]
-            
-            # --- CONSTRUCCIÓN VISUAL ---
-            
-            # 1. Nivel Superior: Router
-            router_node = get_device_card(router)
-            
-            # 2. Conector Central (Línea vertical)
-            connector_line = ft.Container(
-                width=2, height=40, bgcolor=ft.Colors.GREY_700
-            )
-            
-            # 3. Nivel Inferior: Clientes (Grid)
-            # Usamos Wrap para que se acomoden responsive
-            clients_wrap = ft.Row(
-                wrap=True,
-                spacing=20,
-                run_spacing=20,
-                alignment=ft.MainAxisAlignment.CENTER,
-                controls=[get_device_card(c) for c in clients]
-            )
-            
-            # Armar árbol
-            topology_container.controls = [
-                router_node,
-                connector_line,
-                clients_wrap
-            ]
-            
-            status_text.value = f"Topology mapped. {len(clients) + 1} devices found."
+    # --- CONSTRUCCIÓN VISUAL ---
+
+    # 1. Nivel Superior: Router. Hasta que aparezca el Gateway
+    # (normalmente termina en .1) mostramos uno virtual
+    router_slot = ft.Container()
+
+    # 2. Conector Central (Línea vertical)
+    connector_line = ft.Container(
+        width=2, height=40, bgcolor=ft.Colors.GREY_700
+    )
+
+    # 3. Nivel Inferior: Clientes (Grid)
+    # Usamos Wrap para que se acomoden responsive
+    clients_wrap = ft.Row(
+        wrap=True,
+        spacing=20,
+        run_spacing=20,
+        alignment=ft.MainAxisAlignment.CENTER,
+        controls=[]
+    )
+
+    # Armar árbol
+    topology_container.controls = [
+        router_slot,
+        connector_line,
+        clients_wrap
+    ]
+
+    def add_device(device):
+        """Agrega un nodo (o lo ubica como router) si todavía no está dibujado."""
+        nonlocal router
+        ip = device.get("ip", "")
+        if ip in shown_ips:
+            return
+        shown_ips.add(ip)
+        if router is None and ip.endswith(".1"):
+            router = device
+            router_slot.content = get_device_card(router)
+        else:
+            clients_wrap.controls.append(get_device_card(device))
+
+    def render(devices):
+        """Redibuja el árbol completo con una lista de dispositivos."""
+        nonlocal router
+        router = None
+        shown_ips.clear()
+        router_slot.content = get_device_card({"ip": "Gateway", "mac": "", "vendor": "Router"})
+        clients_wrap.controls.clear()
+        for device in devices:
+            add_device(device)
+
+    def on_registry_event(event):
+        """Refleja los eventos del registro de dispositivos."""
+        if event.kind == SCAN_STARTED:
+            status_text.value = "Updating topology..."
+            status_text.color = ft.Colors.AMBER
+        elif event.kind == DEVICE:
+            # Cada dispositivo nuevo se dibuja apenas responde al barrido
+            # o apenas aparece en el tráfico (descubrimiento pasivo)
+            add_device(event.device)
+            if registry.scanning:
+                status_text.value = f"Mapping... {len(shown_ips)} devices"
+        elif event.kind == SCAN_FINISHED:
+            render(event.devices)
+            status_text.value = f"Topology mapped. {len(shown_ips)} devices found."
             status_text.color = ft.Colors.GREEN
-            
-        except Exception as e:
-            status_text.value = f"Error loading topology: {e}"
+        elif event.kind == SCAN_FAILED:
+            status_text.value = f"Error loading topology: {event.error}"
             status_text.color = ft.Colors.RED
-        
         page.update()
 
+    def load_topology():
+        """Dibuja al instante el último escaneo y lo refresca si está vencido."""
+        if not registry.scanning:
+            render(registry.devices)
+        registry.ensure_fresh()
+        page.update()
+
+    registry.subscribe(on_registry_event)
+    render([])
+
     # Layout Principal
     view = ft.Column(
         [
@@ -146,7 +171,7 @@ def TopologyView(scanner_service: NetworkScanner, page: ft.Page):
                 content=topology_container,
                 expand=True,
                 padding=20,
-                # border=ft.border.all(1, ft.Colors.GREY_800),
+                # border=ft.Border.all(1, ft.Colors.GREY_800),
                 # border_radius=10
             )
         ],